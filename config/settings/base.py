@@ -180,6 +180,7 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "kinesinlms.core.profiling.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -188,6 +189,8 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "kinesinlms.course.middleware.EnrollmentInProgressMiddleware",
+    "kinesinlms.core.middleware.SiteMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "waffle.middleware.WaffleMiddleware",
@@ -462,6 +465,40 @@ AWS_SECRET_ACCESS_KEY = env("DJANGO_AWS_SECRET_ACCESS_KEY", default=None)
 # Lambda for handling and storing events
 AWS_KINESINLMS_EVENTS_LAMBDA = env("DJANGO_AWS_KINESINLMS_EVENTS_LAMBDA", default=None)
 
+# Shared HTTP layer for external integrations (see kinesinlms.core.http).
+# Keys are integration names. Values missing from an entry are taken from DEFAULT.
+INTEGRATION_HTTP = {
+    "DEFAULT": {
+        "CONNECT_TIMEOUT": env.float("INTEGRATION_HTTP_CONNECT_TIMEOUT", default=3.05),
+        "READ_TIMEOUT": env.float("INTEGRATION_HTTP_READ_TIMEOUT", default=15),
+        "POOL_MAXSIZE": env.int("INTEGRATION_HTTP_POOL_MAXSIZE", default=10),
+        "FAILURE_THRESHOLD": env.int("INTEGRATION_HTTP_FAILURE_THRESHOLD", default=5),
+        "RECOVERY_SECONDS": env.int("INTEGRATION_HTTP_RECOVERY_SECONDS", default=30),
+    },
+    "discourse": {
+        "READ_TIMEOUT": env.float("INTEGRATION_HTTP_DISCOURSE_READ_TIMEOUT", default=10),
+    },
+    "aws_lambda": {
+        "READ_TIMEOUT": env.float("INTEGRATION_HTTP_AWS_LAMBDA_READ_TIMEOUT", default=5),
+    },
+}
+
+# Request profiling (see kinesinlms.core.profiling).
+# Profiles a sample of requests and logs any that go over budget.
+REQUEST_PROFILING = {
+    "ENABLED": env.bool("REQUEST_PROFILING_ENABLED", default=False),
+    "SAMPLE_RATE": env.float("REQUEST_PROFILING_SAMPLE_RATE", default=0.05),
+    "QUERY_BUDGET": env.int("REQUEST_PROFILING_QUERY_BUDGET", default=50),
+    "DB_TIME_BUDGET_MS": env.int("REQUEST_PROFILING_DB_TIME_BUDGET_MS", default=500),
+    "HTTP_TIME_BUDGET_MS": env.int("REQUEST_PROFILING_HTTP_TIME_BUDGET_MS", default=1000),
+}
+
+# Celery task wait time / runtime metrics (see kinesinlms.core.task_metrics).
+TASK_METRICS = {
+    "ENABLED": env.bool("TASK_METRICS_ENABLED", default=False),
+    "RETENTION_HOURS": env.int("TASK_METRICS_RETENTION_HOURS", default=48),
+}
+
 #  For our slack messaging
 SLACK_TOKEN = env("DJANGO_SLACK_TOKEN", default=None)
 
@@ -1,4 +1,3 @@
-from django.db.models import Count
 from rest_framework import viewsets, authentication, permissions
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
@@ -6,8 +5,10 @@ from rest_framework.response import Response
 from kinesinlms.course.constants import MilestoneType
 from kinesinlms.course.models import Course, Milestone
 from kinesinlms.course.serializers import MilestoneWithProgressesSerializer
-from kinesinlms.tracking.event_types import TrackingEventType
-from kinesinlms.tracking.models import TrackingEvent
+from kinesinlms.forum.activity import get_forum_post_counts
+
+# Number of posts needed to achieve the 'default' forum milestone.
+FORUM_MILESTONE_POST_COUNT = 10
 
 
 class EngagementDataViewSet(viewsets.ViewSet):
@@ -47,43 +48,30 @@ class EngagementDataViewSet(viewsets.ViewSet):
 
 
 def get_forum_milestone(course: Course):
-    forum_post_events = TrackingEvent.objects.filter(
-        course_slug=course.slug,
-        course_run=course.run,
-        event_type=TrackingEventType.FORUM_POST.value,
-    )
-
-    passing_post_count = 10
-
-    users_posts_counts = forum_post_events.values("user").annotate(
-        event_count=Count("user")
-    )
-
-    users_posts = {}
-    for user_posts in users_posts_counts.all():
-        event_count = user_posts["event_count"]
-        user_id = user_posts["user"]
-        users_posts[user_id] = {
-            "student": user_id,
-            "count": event_count,
-            "achieved": event_count >= passing_post_count,
-        }
+    # Post counts are kept up to date by forum callbacks (see ForumActivityCounter),
+    # so there's no need to aggregate tracking events here.
+    users_posts_counts = get_forum_post_counts(course)
 
     # Make sure to report every student's counts, even those that have 0.
     progresses = []
-    for user in course.enrollments.filter(active=True).all():
-        count_obj = users_posts.get(
-            user.id, {"student": user.id, "count": 0, "achieved": False}
+    student_ids = course.enrollments.filter(active=True).values_list("student_id", flat=True)
+    for student_id in student_ids:
+        event_count = users_posts_counts.get(student_id, 0)
+        progresses.append(
+            {
+                "student": student_id,
+                "count": event_count,
+                "achieved": event_count >= FORUM_MILESTONE_POST_COUNT,
+            }
         )
-        progresses.append(count_obj)
 
     forum_milestone = {
         "course_token": course.token,
         "slug": "forum_posts",
         "name": "Forum Posts",
-        "description": "Make at least 10 Forum Posts",
+        "description": f"Make at least {FORUM_MILESTONE_POST_COUNT} Forum Posts",
         "type": MilestoneType.FORUM_POSTS.name,
-        "count_requirement": 10,
+        "count_requirement": FORUM_MILESTONE_POST_COUNT,
         "required_to_pass": False,
         "progresses": progresses,
     }
@@ -1,7 +1,7 @@
 import logging
 
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 from kinesinlms.badges.models import BadgeClass, BadgeClassType
 from kinesinlms.badges.utils import get_badge_service
@@ -26,7 +26,6 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         course_token = options['course']
         username = options['username']
-        User.objects.get(username=username)
         courses = []
 
         if course_token:
@@ -39,29 +38,35 @@ class Command(BaseCommand):
             target_courses_msg = ",".join([course.token for course in courses])
 
         if username:
-            users = [User.objects.get(username=username)]
+            users = User.objects.filter(username=username)
+            if not users.exists():
+                raise CommandError(f"User {username} does not exist.")
             target_user_msg = f"username: {username}"
         else:
             target_user_msg = "(all users)"
             users = User.objects.all()
 
-        logger.info(f"Creating badge assertion for username {target_courses_msg} in courses {target_user_msg}")
+        logger.info(f"Creating badge assertion for username {target_user_msg} in courses {target_courses_msg}")
+
+        badge_service = get_badge_service()
+        if not badge_service:
+            raise CommandError("No badge provider is configured.")
 
         for course in courses:
             logger.info(f" ")
             logger.info(f"Creating badges for course: {course.display_name} ")
             badge_class = BadgeClass.objects.get(course=course,
                                                  type=BadgeClassType.COURSE_PASSED.name)
-            badge_service = get_badge_service()
-            for user in users:
-                logger.info(f"User: {user.username}")
-                try:
-                    ba = badge_service.issue_badge_assertion(badge_class=badge_class,
-                                                             recipient=user,
-                                                             do_async=False)
-                    logger.info(f"Badge assertion created: {ba}")
-                except Exception as e:
-                    logger.exception(f"Could not create badge assertion "
-                                     f"for user {user.username} "
-                                     f"badge_class: {badge_class} : {e}")
-                    continue
+            # Only students who passed the course earn its badge.
+            recipients = list(users.filter(course_passed_items__course=course))
+            try:
+                staged = badge_service.issue_badge_assertions(badge_class=badge_class,
+                                                              recipients=recipients,
+                                                              do_async=False)
+            except Exception as e:
+                logger.exception(f"Could not create badge assertions "
+                                 f"for course {course.token} "
+                                 f"badge_class: {badge_class} : {e}")
+                continue
+            logger.info(f"Badge assertions created: {len(staged)} "
+                        f"(skipped {len(recipients) - len(staged)} already complete or in progress)")
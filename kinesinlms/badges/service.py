@@ -6,21 +6,40 @@ This module also contains an async Celery task method,
 """
 
 import logging
-from typing import Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
 
-import requests
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils.timezone import now
 from rest_framework.status import HTTP_401_UNAUTHORIZED, HTTP_200_OK, HTTP_201_CREATED
 
 from kinesinlms.badges.models import BadgeAssertion, BadgeProviderType, BadgeAssertionCreationStatus
 from kinesinlms.badges.models import BadgeClass
 from kinesinlms.badges.models import BadgeProvider
+from kinesinlms.core.http import BADGR, get_integration_session
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+# Maximum number of badge assertion requests sent to the badge service at once.
+BADGE_ASSERTION_CONCURRENCY = 4
+
+# Number of badge assertions handled by each create_external_badge_assertions_task.
+BADGE_ASSERTION_BATCH_SIZE = 50
+
+
+@dataclass
+class BadgeAssertionBatchResult:
+    complete: int = 0
+    failed: int = 0
+
+    def summary(self) -> str:
+        return f"Created {self.complete} remote badge assertions, {self.failed} failed."
+
 
 class BadgeCreationException(Exception):
     pass
@@ -50,6 +69,101 @@ class BaseBadgeService:
     def retry_badge_assertion(self, badge_assertion: BadgeAssertion) -> bool:
         raise NotImplementedError()
 
+    def create_remote_badge_assertions(self, badge_assertions: List[BadgeAssertion]) -> BadgeAssertionBatchResult:
+        """
+        Create remote badge assertions for several local BadgeAssertions.
+        Services that can do this more efficiently should override this method.
+        """
+        result = BadgeAssertionBatchResult()
+        for badge_assertion in badge_assertions:
+            if self.create_remote_badge_assertion(badge_assertion):
+                result.complete += 1
+            else:
+                result.failed += 1
+        return result
+
+    def issue_badge_assertions(self,
+                               badge_class: BadgeClass,
+                               recipients: List,
+                               do_async: bool = True) -> List[BadgeAssertion]:
+        """
+        Like issue_badge_assertion(), but for many recipients at once.
+
+        Local BadgeAssertions are created or staged with a few bulk queries. The remote
+        assertions are then created in batches of BADGE_ASSERTION_BATCH_SIZE, either by
+        create_external_badge_assertions_task once the current transaction commits,
+        or directly in process.
+
+        Recipients whose badge assertion is already complete or in progress are skipped.
+
+        Args:
+            badge_class:    The BadgeClass that the recipients have earned
+            recipients:     The users who have earned the badge
+            do_async:       If True, the requests to the external service will be made asynchronously.
+
+        Returns:
+            The BadgeAssertions that were staged.
+        """
+        if badge_class.provider.type != BadgeProviderType.BADGR.name:
+            raise Exception(f"BadgeService: Not configured to send a badge assertion request "
+                            f"to {badge_class.provider}. Only BADGR is supported at the moment.")
+
+        issued_on = now()
+        recipients_by_id = {recipient.id: recipient for recipient in recipients}
+        existing_assertions = BadgeAssertion.objects.filter(
+            badge_class=badge_class,
+            recipient_id__in=list(recipients_by_id.keys())
+        ).select_related('recipient')
+
+        staged: List[BadgeAssertion] = []
+        existing_recipient_ids = set()
+        for badge_assertion in existing_assertions:
+            existing_recipient_ids.add(badge_assertion.recipient_id)
+            if badge_assertion.creation_status in [BadgeAssertionCreationStatus.COMPLETE.name,
+                                                   BadgeAssertionCreationStatus.IN_PROGRESS.name]:
+                continue
+            badge_assertion.badge_class = badge_class
+            # Failed assertions start over.
+            badge_assertion.open_badge_id = None
+            badge_assertion.badge_image_url = None
+            badge_assertion.external_entity_id = None
+            badge_assertion.error_message = None
+            badge_assertion.creation_status = BadgeAssertionCreationStatus.STAGED.name
+            badge_assertion.issued_on = issued_on
+            staged.append(badge_assertion)
+        BadgeAssertion.objects.bulk_update(staged, ['open_badge_id',
+                                                    'badge_image_url',
+                                                    'external_entity_id',
+                                                    'error_message',
+                                                    'creation_status',
+                                                    'issued_on'])
+
+        new_assertions = [
+            BadgeAssertion(badge_class=badge_class,
+                           recipient=recipient,
+                           creation_status=BadgeAssertionCreationStatus.STAGED.name,
+                           issued_on=issued_on)
+            for recipient_id, recipient in recipients_by_id.items()
+            if recipient_id not in existing_recipient_ids
+        ]
+        staged.extend(BadgeAssertion.objects.bulk_create(new_assertions))
+
+        logger.info(f"BadgeService: Staged {len(staged)} badge assertions for badge class {badge_class}")
+
+        if do_async:
+            from kinesinlms.badges.tasks import create_external_badge_assertions_task
+            badge_assertion_ids = [badge_assertion.id for badge_assertion in staged]
+            for start in range(0, len(badge_assertion_ids), BADGE_ASSERTION_BATCH_SIZE):
+                batch_ids = badge_assertion_ids[start:start + BADGE_ASSERTION_BATCH_SIZE]
+                transaction.on_commit(
+                    lambda ids=batch_ids: create_external_badge_assertions_task.delay(badge_assertion_ids=ids)
+                )
+        else:
+            for start in range(0, len(staged), BADGE_ASSERTION_BATCH_SIZE):
+                self.create_remote_badge_assertions(staged[start:start + BADGE_ASSERTION_BATCH_SIZE])
+
+        return staged
+
     def issue_badge_assertion(self, badge_class: BadgeClass, recipient, do_async: bool = True) -> BadgeAssertion:
         """
         Create a local and remote BadgeAssertion for a recipient who achieved the required
@@ -139,6 +253,8 @@ class BadgrBadgeService(BaseBadgeService):
         if not badge_provider:
             raise Exception("Must configure provider")
         self.badge_provider = badge_provider
+        # Only one thread renews the access token at a time.
+        self._token_lock = threading.Lock()
 
     def create_remote_badge_assertion(self, badge_assertion: BadgeAssertion) -> bool:
         """
@@ -157,39 +273,32 @@ class BadgrBadgeService(BaseBadgeService):
 
         """
         success = True
-        badge_provider: BadgeProvider = badge_assertion.badge_class.provider
 
         # Make sure we have access to remote service...
-        if not badge_provider.access_token:
-            try:
-                # Use the BADGR username and email stored in the environment
-                # to get an access token.
-                # TODO: Figure out problems with Badgr refresh token.
-                #       Then use API key and refresh token here instead
-                #       of creating new key/refresh token pair each time.
-                self.create_new_provider_tokens(badge_provider)
-            except Exception:
-                logger.exception("Error creating badge assertion")
-                badge_assertion.error_message = "Error creating badge assertion."
-                badge_assertion.save()
-                success = False
-                return success
+        try:
+            access_token = self.get_access_token()
+        except Exception:
+            logger.exception("Error creating badge assertion")
+            badge_assertion.error_message = "Error creating badge assertion."
+            badge_assertion.save()
+            success = False
+            return success
 
         # Create badge assertion...
         try:
-            self._create_badge_assertion(badge_assertion)
-            badge_assertion.creation_status = BadgeAssertionCreationStatus.COMPLETE.name
-        except APITokenNotValidException:
-            # Create a new access token and try again
-            self.create_new_provider_tokens(badge_provider)
             try:
-                self._create_badge_assertion(badge_assertion)
-            except APITokenNotValidException as api_e:
-                error_message = f"Could not get valid token to access Badgr API. : {api_e}"
-                logger.error(error_message)
-                badge_assertion.creation_status = BadgeAssertionCreationStatus.FAILED.name
-                badge_assertion.error_message = error_message
-                success = False
+                self._create_badge_assertion(badge_assertion, access_token=access_token)
+            except APITokenNotValidException:
+                # Create a new access token and try again
+                access_token = self.renew_access_token(stale_token=access_token)
+                self._create_badge_assertion(badge_assertion, access_token=access_token)
+            badge_assertion.creation_status = BadgeAssertionCreationStatus.COMPLETE.name
+        except APITokenNotValidException as api_e:
+            error_message = f"Could not get valid token to access Badgr API. : {api_e}"
+            logger.error(error_message)
+            badge_assertion.creation_status = BadgeAssertionCreationStatus.FAILED.name
+            badge_assertion.error_message = error_message
+            success = False
         except BaseBadgeServiceError as ebs_e:
             logger.error(f"Error creating badge assertion: {ebs_e}")
             badge_assertion.creation_status = BadgeAssertionCreationStatus.FAILED.name
@@ -205,6 +314,140 @@ class BadgrBadgeService(BaseBadgeService):
 
         return success
 
+    def create_remote_badge_assertions(self,
+                                       badge_assertions: List[BadgeAssertion],
+                                       concurrency: int = BADGE_ASSERTION_CONCURRENCY) -> BadgeAssertionBatchResult:
+        """
+        Create remote badge assertions for several local BadgeAssertions.
+
+        One access token is used for the whole batch. Requests are sent over the shared
+        Badgr session, at most 'concurrency' at a time. If Badgr rejects the token, it's
+        renewed once and the rejected assertions are sent again. Statuses are then saved
+        with a single bulk update.
+
+        Args:
+            badge_assertions:   BadgeAssertions to create remotely. Their badge_class
+                                and recipient should already be loaded.
+            concurrency:        Maximum number of requests to send at once.
+
+        Returns:
+            BadgeAssertionBatchResult with counts of what happened.
+        """
+        result = BadgeAssertionBatchResult()
+        if not badge_assertions:
+            return result
+
+        BadgeAssertion.objects.filter(
+            id__in=[badge_assertion.id for badge_assertion in badge_assertions]
+        ).update(creation_status=BadgeAssertionCreationStatus.IN_PROGRESS.name)
+
+        try:
+            access_token = self.get_access_token()
+        except Exception:
+            logger.exception("Error creating badge assertions")
+            for badge_assertion in badge_assertions:
+                badge_assertion.creation_status = BadgeAssertionCreationStatus.FAILED.name
+                badge_assertion.error_message = "Could not get access token for badge service."
+            self._save_badge_assertion_results(badge_assertions)
+            result.failed = len(badge_assertions)
+            return result
+
+        token_rejected = self._send_badge_assertions(badge_assertions, access_token, concurrency)
+        if token_rejected:
+            try:
+                access_token = self.renew_access_token(stale_token=access_token)
+            except Exception:
+                logger.exception("Could not renew Badgr access token")
+            else:
+                token_rejected = self._send_badge_assertions(token_rejected, access_token, concurrency)
+            for badge_assertion in token_rejected:
+                badge_assertion.creation_status = BadgeAssertionCreationStatus.FAILED.name
+                badge_assertion.error_message = "Could not get valid token to access Badgr API."
+
+        self._save_badge_assertion_results(badge_assertions)
+        for badge_assertion in badge_assertions:
+            if badge_assertion.creation_status == BadgeAssertionCreationStatus.COMPLETE.name:
+                result.complete += 1
+            else:
+                result.failed += 1
+        logger.info(f"BadgrBadgeService: {result.summary()}")
+        return result
+
+    def _send_badge_assertions(self,
+                               badge_assertions: List[BadgeAssertion],
+                               access_token: str,
+                               concurrency: int) -> List[BadgeAssertion]:
+        """
+        Send badge assertions to Badgr concurrently, updating each
+        BadgeAssertion's status (but not saving it).
+
+        Worker threads only make HTTP requests; all database
+        access stays in the calling thread.
+
+        Returns:
+            BadgeAssertions that weren't sent because Badgr rejected the access token.
+        """
+
+        def _send(badge_assertion: BadgeAssertion) -> bool:
+            try:
+                self._create_badge_assertion(badge_assertion, access_token=access_token)
+                badge_assertion.creation_status = BadgeAssertionCreationStatus.COMPLETE.name
+            except APITokenNotValidException:
+                return False
+            except Exception:
+                logger.exception(f"Error creating badge assertion {badge_assertion}")
+                badge_assertion.creation_status = BadgeAssertionCreationStatus.FAILED.name
+                badge_assertion.error_message = "Error creating badge assertion."
+            return True
+
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(badge_assertions)))) as executor:
+            sent = list(executor.map(_send, badge_assertions))
+        return [badge_assertion for badge_assertion, was_sent in zip(badge_assertions, sent) if not was_sent]
+
+    @staticmethod
+    def _save_badge_assertion_results(badge_assertions: List[BadgeAssertion]):
+        BadgeAssertion.objects.bulk_update(badge_assertions, ['creation_status',
+                                                              'open_badge_id',
+                                                              'external_entity_id',
+                                                              'badge_image_url',
+                                                              'error_message'])
+
+    def get_access_token(self) -> str:
+        """
+        Get the Badgr API access token, creating one if we don't have one yet.
+        """
+        if not self.badge_provider.access_token:
+            self.renew_access_token(stale_token=None)
+        return self.badge_provider.access_token
+
+    def renew_access_token(self, stale_token: Optional[str]) -> str:
+        """
+        Replace an access token that Badgr rejected (or create the first one).
+
+        Callers that saw the same stale token wait here for a single renewal
+        and then share its result. The provider is re-read first in case another
+        process has already renewed the token.
+
+        Args:
+            stale_token:    The token Badgr rejected, if any.
+
+        Returns:
+            A new access token.
+        """
+        with self._token_lock:
+            if self.badge_provider.access_token and self.badge_provider.access_token != stale_token:
+                return self.badge_provider.access_token
+            self.badge_provider.refresh_from_db(fields=['access_token', 'refresh_token'])
+            if self.badge_provider.access_token and self.badge_provider.access_token != stale_token:
+                return self.badge_provider.access_token
+            # Use the BADGR username and email stored in the environment
+            # to get an access token.
+            # TODO: Figure out problems with Badgr refresh token.
+            #       Then use API key and refresh token here instead
+            #       of creating new key/refresh token pair each time.
+            self.create_new_provider_tokens(self.badge_provider)
+            return self.badge_provider.access_token
+
     def create_new_provider_tokens(self, badge_provider: BadgeProvider):
         try:
             access_token, refresh_token = self.create_tokens()
@@ -244,7 +487,7 @@ class BadgrBadgeService(BaseBadgeService):
         }
         r = None
         try:
-            r = requests.post(token_url, data=params)
+            r = get_integration_session(BADGR).post(token_url, data=params)
             if not r or r.status_code != HTTP_200_OK:
                 raise Exception()
         except Exception:
@@ -294,7 +537,7 @@ class BadgrBadgeService(BaseBadgeService):
         }
         r = None
         try:
-            r = requests.post(token_refresh_url, headers=headers, data=data)
+            r = get_integration_session(BADGR).post(token_refresh_url, headers=headers, data=data)
             if not r or r.status_code != HTTP_200_OK:
                 raise Exception()
         except Exception:
@@ -308,12 +551,14 @@ class BadgrBadgeService(BaseBadgeService):
         new_access_token = data['access_token']
         return new_access_token
 
-    def _create_badge_assertion(self, badge_assertion: BadgeAssertion) -> str:
+    def _create_badge_assertion(self, badge_assertion: BadgeAssertion, access_token: str) -> str:
         """
         Create a Badge Assertion in remote Badgr service.
+        The BadgeAssertion is updated with the result but not saved.
 
         Args:
             badge_assertion         A BadgeAssertion instance representing the new badge assertion
+            access_token            Badgr API access token
 
         Returns:
             badge_image_url         URL for new badge image representing assertion.
@@ -325,10 +570,9 @@ class BadgrBadgeService(BaseBadgeService):
         """
         entity_id = badge_assertion.badge_class.external_entity_id
 
-        access_token = badge_assertion.badge_class.provider.access_token
         if not access_token:
             raise BadgeCreationException(f"access_token is not set on "
-                                         f"BadgeProvider: {badge_assertion.badge_class.provider}")
+                                         f"BadgeProvider: {self.badge_provider}")
 
         badge_assertion_url = f"{self.badge_provider.api_url}v2/badgeclasses/{entity_id}/assertions"
         salt = self.badge_provider.salt
@@ -349,7 +593,7 @@ class BadgrBadgeService(BaseBadgeService):
             }
         }
 
-        r = requests.post(badge_assertion_url, headers=headers, json=data)
+        r = get_integration_session(BADGR).post(badge_assertion_url, headers=headers, json=data)
         if r.status_code == HTTP_401_UNAUTHORIZED:
             raise APITokenNotValidException()
         elif r.status_code != HTTP_201_CREATED:
@@ -374,7 +618,6 @@ class BadgrBadgeService(BaseBadgeService):
         badge_assertion.open_badge_id = open_badge_id
         badge_assertion.external_entity_id = entity_id
         badge_assertion.badge_image_url = badge_image_url
-        badge_assertion.save()
         return badge_image_url
 
     def retry_badge_assertion(self, badge_assertion: BadgeAssertion) -> bool:
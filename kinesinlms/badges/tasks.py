@@ -1,4 +1,5 @@
 import logging
+from typing import List
 
 from celery import Task
 from django.contrib.auth import get_user_model
@@ -36,6 +37,42 @@ def create_external_badge_assertion_task_error_handler(self, exc, task_id, args,
                  f"  einfo: {einfo} \n")
 
 
+def create_external_badge_assertions_task_error_handler(self, exc, task_id, args, kwargs, einfo):  # noqa: F841
+    """
+    Handles the create_external_badge_assertions_task failing part way through
+    (e.g. hitting its time limit). The batch was marked IN_PROGRESS before any
+    request went out, and issue_badge_assertions() skips IN_PROGRESS assertions,
+    so mark any that didn't finish as FAILED so they're issued again next time.
+
+    Args:
+        self:
+        exc:
+        task_id:
+        args:
+        kwargs:
+        einfo:
+
+    Returns:
+        ( nothing )
+    """
+    create_external_badge_assertion_task_error_handler(self, exc, task_id, args, kwargs, einfo)
+
+    badge_assertion_ids = kwargs.get('badge_assertion_ids') if kwargs else None
+    if badge_assertion_ids is None and args:
+        badge_assertion_ids = args[0]
+    if not badge_assertion_ids:
+        return
+    try:
+        num_failed = BadgeAssertion.objects.filter(
+            id__in=badge_assertion_ids,
+            creation_status=BadgeAssertionCreationStatus.IN_PROGRESS.name
+        ).update(creation_status=BadgeAssertionCreationStatus.FAILED.name,
+                 error_message="Badge assertion task did not complete.")
+        logger.error(f"Marked {num_failed} unfinished badge assertions as FAILED after task {task_id} failed.")
+    except Exception:
+        logger.exception(f"Could not mark unfinished badge assertions as FAILED after task {task_id} failed.")
+
+
 # noinspection PyUnusedLocal
 @celery_app.task(bind=True,
                  autoretry_for=[BadgeAssertion.DoesNotExist],
@@ -87,3 +124,37 @@ def create_external_badge_assertion_task(self: Task, badge_assertion_id: int):
                 f"open_badge_id : {badge_assertion.open_badge_id}")
 
     return True
+
+
+# noinspection PyUnusedLocal
+@celery_app.task(bind=True,
+                 time_limit=60 * 10,
+                 soft_time_limit=60 * 9,
+                 on_failure=create_external_badge_assertions_task_error_handler)
+def create_external_badge_assertions_task(self: Task, badge_assertion_ids: List[int]) -> int:
+    """
+    Contact external badge service to create badge assertions for a batch of
+    recipients. Same assumptions as create_external_badge_assertion_task, but
+    one access token and one bulk status update are used for the whole batch.
+
+    Args:
+        self:                    Instance of Celery task.
+        badge_assertion_ids:     IDs of BadgeAssertions to create remotely.
+
+    Returns:
+        Number of remote badge assertions created.
+    """
+    service = get_badge_service()
+    if not service:
+        logger.warning("create_external_badge_assertions_task(): No badge service configured.")
+        return 0
+
+    badge_assertions = list(BadgeAssertion.objects.filter(
+        id__in=badge_assertion_ids
+    ).exclude(
+        creation_status=BadgeAssertionCreationStatus.COMPLETE.name
+    ).select_related('badge_class', 'recipient'))
+
+    result = service.create_remote_badge_assertions(badge_assertions)
+    logger.info(f"create_external_badge_assertions_task(): {result.summary()}")
+    return result.complete
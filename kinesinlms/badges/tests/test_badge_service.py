@@ -1,14 +1,15 @@
 import logging
 from unittest import skipUnless
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.timezone import now
 from rest_framework.test import APIClient
 
 from kinesinlms.badges.service import BadgrBadgeService
-from kinesinlms.badges.models import BadgeAssertion, BadgeClass
+from kinesinlms.badges.tasks import create_external_badge_assertions_task_error_handler
+from kinesinlms.badges.models import BadgeAssertion, BadgeAssertionCreationStatus, BadgeClass
 from kinesinlms.badges.tests.factories import BadgeProviderFactory, BadgeClassFactory
 from kinesinlms.course.models import Enrollment
 from kinesinlms.course.tests.factories import CourseFactory
@@ -85,3 +86,100 @@ class TestBadgrIntegration(TestCase):
         service = BadgrBadgeService(badge_provider=badge_provider)
         success = service.create_remote_badge_assertion(badge_assertion=badge_assertion)
         self.assertTrue(success)
+
+
+@override_settings(BADGE_PROVIDER_USERNAME="badgr-user", BADGE_PROVIDER_PASSWORD="badgr-password")
+class TestBadgrBatchIssuing(TestCase):
+    """
+    Issue badge assertions in a batch against a mocked Badgr API.
+    """
+
+    def setUp(self):
+        self.badge_provider = BadgeProviderFactory.create(access_token="stale-token")
+        self.badge_class = BadgeClassFactory.create(provider=self.badge_provider,
+                                                    slug="batch-test-badge",
+                                                    external_entity_id="badge-class-entity")
+        self.recipients = [UserFactory(username=f"badge-recipient-{index}",
+                                       email=f"badge-recipient-{index}@example.com")
+                           for index in range(5)]
+        self.token_requests = 0
+
+        session = MagicMock()
+        session.post.side_effect = self._post
+        patcher = patch("kinesinlms.badges.service.get_integration_session", return_value=session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, url, headers=None, data=None, json=None):
+        response = MagicMock()
+        if url.endswith("o/token"):
+            self.token_requests += 1
+            response.status_code = 200
+            response.json.return_value = {"access_token": "new-token", "refresh_token": "new-refresh"}
+        elif headers["Authorization"] == "Bearer stale-token":
+            response.status_code = 401
+        else:
+            identity = json["recipient"]["identity"]
+            response.status_code = 201
+            response.json.return_value = {"result": [{
+                "openBadgeId": f"https://api.badgr.io/public/assertions/{identity}",
+                "entityId": identity[:20],
+                "image": f"https://api.badgr.io/public/assertions/{identity}/image",
+            }]}
+        return response
+
+    def test_batch_renews_token_once_and_completes_all(self):
+        service = BadgrBadgeService(badge_provider=self.badge_provider)
+
+        staged = service.issue_badge_assertions(badge_class=self.badge_class,
+                                                recipients=self.recipients,
+                                                do_async=False)
+
+        self.assertEqual(len(staged), 5)
+        self.assertEqual(self.token_requests, 1)
+        self.badge_provider.refresh_from_db()
+        self.assertEqual(self.badge_provider.access_token, "new-token")
+        self.assertEqual(BadgeAssertion.objects.filter(
+            badge_class=self.badge_class,
+            creation_status=BadgeAssertionCreationStatus.COMPLETE.name,
+            open_badge_id__isnull=False,
+        ).count(), 5)
+
+    def test_complete_assertions_are_not_issued_again(self):
+        service = BadgrBadgeService(badge_provider=self.badge_provider)
+        service.issue_badge_assertions(badge_class=self.badge_class,
+                                       recipients=self.recipients[:2],
+                                       do_async=False)
+
+        staged = service.issue_badge_assertions(badge_class=self.badge_class,
+                                                recipients=self.recipients,
+                                                do_async=False)
+
+        self.assertEqual(sorted(badge_assertion.recipient_id for badge_assertion in staged),
+                         sorted(recipient.id for recipient in self.recipients[2:]))
+        self.assertEqual(BadgeAssertion.objects.filter(badge_class=self.badge_class).count(), 5)
+
+    def test_failed_batch_task_releases_in_progress_assertions(self):
+        service = BadgrBadgeService(badge_provider=self.badge_provider)
+        with patch.object(BadgrBadgeService, "create_remote_badge_assertions"):
+            staged = service.issue_badge_assertions(badge_class=self.badge_class,
+                                                    recipients=self.recipients,
+                                                    do_async=False)
+        # Simulate the task dying after the batch was marked IN_PROGRESS.
+        badge_assertion_ids = [badge_assertion.id for badge_assertion in staged]
+        BadgeAssertion.objects.filter(id__in=badge_assertion_ids).update(
+            creation_status=BadgeAssertionCreationStatus.IN_PROGRESS.name
+        )
+
+        create_external_badge_assertions_task_error_handler(None, Exception("time limit"), "task-id",
+                                                             [badge_assertion_ids], {}, None)
+
+        self.assertEqual(BadgeAssertion.objects.filter(
+            id__in=badge_assertion_ids,
+            creation_status=BadgeAssertionCreationStatus.FAILED.name,
+        ).count(), 5)
+        # Failed assertions are picked up again on the next issue.
+        staged = service.issue_badge_assertions(badge_class=self.badge_class,
+                                                recipients=self.recipients,
+                                                do_async=False)
+        self.assertEqual(len(staged), 5)
@@ -2,10 +2,10 @@ import logging
 from typing import Optional
 
 from django.contrib.auth import get_user_model
-from django.contrib.sites.models import Site
 
 from kinesinlms.badges.models import BadgeProviderType
 from kinesinlms.badges.service import BadgrBadgeService
+from kinesinlms.core.site_cache import get_site_provider
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +24,5 @@ def get_badge_service() -> Optional['kinesinlms.badges.service.BaseBadgeService'
 
 
 def get_badge_provider() -> Optional['kinesinlms.badges.model.BadgeProvider']:
-    site = Site.objects.get_current()
-    badge_provider = getattr(site, 'badge_provider', None)
+    badge_provider = get_site_provider('badge_provider')
     return badge_provider
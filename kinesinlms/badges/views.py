@@ -19,6 +19,7 @@ from rest_framework.response import Response
 from kinesinlms.badges.forms import BadgeAssertionForm
 from kinesinlms.badges.models import BadgeClass, BadgeAssertion, BadgeClassType
 from kinesinlms.badges.utils import get_badge_service
+from kinesinlms.core.http import BADGR, get_integration_session
 from kinesinlms.course.models import CoursePassed, Enrollment
 from kinesinlms.course.utils_access import can_access_course
 from kinesinlms.course.view_helpers import access_denied_hx
@@ -192,7 +193,7 @@ def download_badge_assertion_image(request,
 
     badge_image_url = badge_assertion.badge_image_url
 
-    resp = requests.get(badge_image_url, stream=True)
+    resp = get_integration_session(BADGR).get(badge_image_url, stream=True)
     if not resp or resp.status_code != requests.codes.ok:
         logger.error(f"Could not download badge assertion {badge_assertion_id} "
                      f"for student {request.user}. Status code : {resp.status_code}")
@@ -0,0 +1,333 @@
+"""
+Enroll many students in a course at once.
+
+do_enrollment() enrolls one student at a time: it adds them to a cohort and the
+course groups, saves the Enrollment (which fires signals that queue forum and
+survey work) and tracks an event. That's fine for a single enrollment but
+far too slow for a partner list of thousands of students.
+
+bulk_enroll() does the same work with a handful of set-based queries:
+
+    - students are looked up by username or email in one query
+    - Enrollments, CohortMemberships and course group memberships are bulk created
+      (inactive enrollments are reactivated with one update)
+    - students already in the course but in a different cohort are moved with one update
+      (any other cohort memberships they have in the course are deleted), and removing
+      them from their old cohorts' forum groups is queued
+
+bulk_create() and update() don't fire model signals, so bulk_enroll() clears
+the course access cache (see course/access_cache.py) itself, and the work those
+signals would do (forum group memberships, survey emails) plus the
+ENROLLMENT_ACTIVATED tracking events are done by process_bulk_enrollment_task
+in the background, in chunks of BULK_ENROLLMENT_TASK_CHUNK_SIZE students.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.timezone import now
+
+from kinesinlms.course.access_cache import invalidate_course_access, mark_recent_enrollments
+from kinesinlms.course.models import Cohort, CohortMembership, Course, Enrollment
+from kinesinlms.forum.membership import queue_group_membership_changes
+from kinesinlms.forum.models import ForumGroupMembershipAction
+from kinesinlms.forum.utils import get_forum_service
+from kinesinlms.survey.service import SurveyEmailService
+from kinesinlms.tracking.event_types import TrackingEventType
+from kinesinlms.tracking.tracker import Tracker
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Number of students handled by each process_bulk_enrollment_task.
+BULK_ENROLLMENT_TASK_CHUNK_SIZE = 500
+
+
+@dataclass
+class BulkEnrollmentResult:
+    added_student_ids: List[int] = field(default_factory=list)
+    moved_student_ids: List[int] = field(default_factory=list)
+    skipped_student_ids: List[int] = field(default_factory=list)
+    # Emails that didn't match a registered user (candidates for an invite).
+    unmatched_emails: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+def find_students(identifiers: List[str]) -> Dict[str, User]:
+    """
+    Look up users by email (case-insensitive) or username in one query.
+
+    Args:
+        identifiers:    Emails and usernames. Anything containing '@' is treated as an email.
+
+    Returns:
+        Dictionary of identifier to user, for the identifiers that matched a user.
+    """
+    emails = {identifier.lower(): identifier for identifier in identifiers if "@" in identifier}
+    usernames = [identifier for identifier in identifiers if "@" not in identifier]
+    if not emails and not usernames:
+        return {}
+
+    users = User.objects.annotate(
+        email_lower=Lower('email')
+    ).filter(
+        Q(username__in=usernames) | Q(email_lower__in=list(emails.keys()))
+    ).order_by('id')
+
+    found: Dict[str, User] = {}
+    usernames = set(usernames)
+    for user in users:
+        if user.username in usernames:
+            found[user.username] = user
+        identifier = emails.get(user.email_lower)
+        # If more than one user has the same email, use the first one.
+        if identifier and identifier not in found:
+            found[identifier] = user
+    return found
+
+
+def bulk_enroll(course: Course, cohort: Optional[Cohort], identifiers: List[str]) -> BulkEnrollmentResult:
+    """
+    Enroll the students identified by email or username in a course and cohort.
+
+    Students who are already enrolled are moved into the cohort if they're in a
+    different one, otherwise they're skipped.
+
+    Args:
+        course:         Course to enroll students in.
+        cohort:         Cohort to add students to. If None, the course's DEFAULT cohort.
+        identifiers:    Emails and/or usernames of students.
+
+    Returns:
+        BulkEnrollmentResult describing what happened to each student.
+    """
+    if cohort is None:
+        cohort = course.get_default_cohort()
+    elif cohort.course_id != course.id:
+        raise ValueError(f"Cannot enroll students in cohort {cohort} as that "
+                         f"cohort is for a different course: {cohort.course}.")
+
+    result = BulkEnrollmentResult()
+
+    found = find_students(identifiers)
+    for identifier in identifiers:
+        if identifier in found:
+            continue
+        if "@" in identifier:
+            result.unmatched_emails.append(identifier)
+            result.errors.append(f"Cannot find user with email: {identifier}")
+        else:
+            result.errors.append(f"Cannot find user with username: {identifier}")
+
+    # The same user may have been listed by both email and username.
+    students: Dict[int, User] = {user.id: user for user in found.values()}
+    if not students:
+        return result
+
+    with transaction.atomic():
+        enrollments = {
+            enrollment.student_id: enrollment
+            for enrollment in Enrollment.objects.filter(course=course, student_id__in=students.keys())
+        }
+        memberships: Dict[int, List[CohortMembership]] = {}
+        for membership in CohortMembership.objects.filter(cohort__course=course, student_id__in=students.keys()):
+            memberships.setdefault(membership.student_id, []).append(membership)
+
+        new_enrollments = []
+        reactivate_enrollment_ids = []
+        new_memberships = []
+        move_membership_ids = []
+        delete_membership_ids = []
+        # Students leaving each cohort, so they can be removed from its forum group.
+        left_cohort_student_ids: Dict[int, List[int]] = {}
+        for student_id, student in students.items():
+            enrollment = enrollments.get(student_id)
+            student_memberships = memberships.get(student_id, [])
+
+            # A student should end up with exactly one membership in the course: keep one
+            # already in the cohort, or move their first one, and delete the rest.
+            kept_membership = next(
+                (membership for membership in student_memberships if membership.cohort_id == cohort.id),
+                None
+            )
+            needs_move = kept_membership is None and bool(student_memberships)
+            if needs_move:
+                kept_membership = student_memberships[0]
+                move_membership_ids.append(kept_membership.id)
+            for membership in student_memberships:
+                if membership is not kept_membership:
+                    delete_membership_ids.append(membership.id)
+                if membership.cohort_id != cohort.id:
+                    left_cohort_student_ids.setdefault(membership.cohort_id, []).append(student_id)
+
+            if enrollment and enrollment.active:
+                if not needs_move and kept_membership is not None:
+                    result.skipped_student_ids.append(student_id)
+                    continue
+                # Need to move already enrolled user to new cohort
+                if not student_memberships:
+                    new_memberships.append(CohortMembership(cohort=cohort, student=student))
+                result.moved_student_ids.append(student_id)
+                continue
+
+            if enrollment:
+                reactivate_enrollment_ids.append(enrollment.id)
+            else:
+                new_enrollments.append(Enrollment(student=student, course=course, active=True))
+            if not student_memberships:
+                new_memberships.append(CohortMembership(cohort=cohort, student=student))
+            result.added_student_ids.append(student_id)
+
+        if delete_membership_ids:
+            CohortMembership.objects.filter(id__in=delete_membership_ids).delete()
+        CohortMembership.objects.bulk_create(new_memberships, batch_size=1000, ignore_conflicts=True)
+        if move_membership_ids:
+            CohortMembership.objects.filter(id__in=move_membership_ids).update(cohort=cohort, updated_at=now())
+        _remove_from_cohort_forum_groups(students, left_cohort_student_ids)
+        Enrollment.objects.bulk_create(new_enrollments, batch_size=1000)
+        if reactivate_enrollment_ids:
+            Enrollment.objects.filter(id__in=reactivate_enrollment_ids).update(active=True, updated_at=now())
+        _add_to_course_groups(course, result.added_student_ids)
+        invalidate_course_access(course.id, result.added_student_ids + result.moved_student_ids)
+        mark_recent_enrollments(course.id, result.added_student_ids)
+
+        _schedule_bulk_enrollment_processing(course, cohort, result)
+
+    logger.info(f"bulk_enroll(): course {course} cohort {cohort}: added {len(result.added_student_ids)}, "
+                f"moved {len(result.moved_student_ids)}, skipped {len(result.skipped_student_ids)}, "
+                f"{len(result.errors)} errors.")
+    return result
+
+
+def process_bulk_enrollment(course: Course,
+                            cohort: Cohort,
+                            added_student_ids: List[int],
+                            moved_student_ids: List[int]):
+    """
+    Do the work that enrollment and cohort membership signals (and do_enrollment())
+    would have done for each student, in bulk:
+
+        - queue forum group membership changes
+        - schedule start-of-course survey emails
+        - track ENROLLMENT_ACTIVATED events
+
+    Args:
+        course:             Course students were enrolled in.
+        cohort:             Cohort students were added to.
+        added_student_ids:  IDs of students who were enrolled.
+        moved_student_ids:  IDs of already enrolled students who were moved into the cohort.
+    """
+    usernames = dict(User.objects.filter(
+        id__in=added_student_ids + moved_student_ids
+    ).values_list('id', 'username'))
+    added_usernames = [usernames[student_id] for student_id in added_student_ids if student_id in usernames]
+    cohort_usernames = [usernames[student_id] for student_id in added_student_ids + moved_student_ids
+                        if student_id in usernames]
+
+    try:
+        forum_service = get_forum_service()
+    except Exception:
+        logger.exception("process_bulk_enrollment(): Could not get forum service.")
+        forum_service = None
+    if forum_service:
+        course_forum_group = getattr(course, 'course_forum_group', None)
+        if course_forum_group and course_forum_group.group_id:
+            queue_group_membership_changes(group_id=course_forum_group.group_id,
+                                           usernames=added_usernames,
+                                           action=ForumGroupMembershipAction.ADD)
+        cohort_forum_group = getattr(cohort, 'cohort_forum_group', None)
+        if cohort_forum_group and cohort_forum_group.group_id:
+            queue_group_membership_changes(group_id=cohort_forum_group.group_id,
+                                           usernames=cohort_usernames,
+                                           action=ForumGroupMembershipAction.ADD)
+
+    course_surveys = list(course.surveys.all())
+    if course_surveys and added_student_ids:
+        try:
+            SurveyEmailService.schedule_survey_emails_for_start_of_course_bulk(user_ids=added_student_ids,
+                                                                               course_surveys=course_surveys)
+        except Exception:
+            logger.exception(f"#Survey: Could not schedule SurveyEmails for bulk enrollment in course {course}")
+
+    students = User.objects.filter(id__in=added_student_ids)
+    event_data = {"cohort_id": cohort.id, "cohort_name": str(cohort)}
+    for student in students:
+        try:
+            Tracker.track(
+                event_type=TrackingEventType.ENROLLMENT_ACTIVATED.value,
+                user=student,
+                course=course,
+                event_data=event_data,
+            )
+        except Exception:
+            logger.exception("process_bulk_enrollment(): Could not create tracking event for ENROLLMENT_ACTIVATED")
+
+
+def _remove_from_cohort_forum_groups(students: Dict[int, User], left_cohort_student_ids: Dict[int, List[int]]):
+    """
+    Queue removing students from the forum groups of cohorts they've left, as
+    the cohort membership post_delete signal does for a single student.
+    (Moving a membership with update() doesn't fire any signals.)
+    """
+    if not left_cohort_student_ids:
+        return
+    try:
+        forum_service = get_forum_service()
+    except Exception:
+        logger.exception("bulk_enroll(): Could not get forum service.")
+        forum_service = None
+    if not forum_service:
+        return
+    cohorts = Cohort.objects.filter(id__in=left_cohort_student_ids.keys()).select_related('cohort_forum_group')
+    for cohort in cohorts:
+        cohort_forum_group = getattr(cohort, 'cohort_forum_group', None)
+        if not cohort_forum_group or not cohort_forum_group.group_id:
+            continue
+        usernames = [students[student_id].username for student_id in left_cohort_student_ids[cohort.id]]
+        queue_group_membership_changes(group_id=cohort_forum_group.group_id,
+                                       usernames=usernames,
+                                       action=ForumGroupMembershipAction.REMOVE)
+
+
+def _add_to_course_groups(course: Course, student_ids: List[int]):
+    """
+    Add students to the Django Groups for a course, as Enrollment.save() and do_enrollment() do.
+    """
+    if not student_ids:
+        return
+    groups = [Group.objects.get_or_create(name=course.token)[0]]
+    try:
+        groups.append(Group.objects.get(name=course.course_group_name))
+    except Group.DoesNotExist:
+        logger.warning(f"bulk_enroll(): Could not add users to course group for "
+                       f"{course} because it doesn't exist.")
+    UserGroup = User.groups.through
+    UserGroup.objects.bulk_create([
+        UserGroup(user_id=student_id, group_id=group.id)
+        for group in groups
+        for student_id in student_ids
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+def _schedule_bulk_enrollment_processing(course: Course, cohort: Cohort, result: BulkEnrollmentResult):
+    # Import here to avoid circular import with tasks module.
+    from kinesinlms.catalog.tasks import process_bulk_enrollment_task
+
+    chunk_size = BULK_ENROLLMENT_TASK_CHUNK_SIZE
+    added = result.added_student_ids
+    moved = result.moved_student_ids
+    for start in range(0, max(len(added), len(moved)), chunk_size):
+        kwargs = {
+            "course_id": course.id,
+            "cohort_id": cohort.id,
+            "added_student_ids": added[start:start + chunk_size],
+            "moved_student_ids": moved[start:start + chunk_size],
+        }
+        transaction.on_commit(lambda task_kwargs=kwargs: process_bulk_enrollment_task.delay(**task_kwargs))
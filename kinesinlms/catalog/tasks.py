@@ -0,0 +1,37 @@
+import logging
+from typing import List
+
+from config import celery_app
+from kinesinlms.catalog.bulk_enrollment import process_bulk_enrollment
+from kinesinlms.course.models import Cohort
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(ignore_result=True,
+                 retry_backoff=True,
+                 retry_kwargs={'max_retries': 3})
+def process_bulk_enrollment_task(course_id: int,
+                                 cohort_id: int,
+                                 added_student_ids: List[int],
+                                 moved_student_ids: List[int]) -> None:
+    """
+    Queue forum group changes, schedule survey emails and track enrollment
+    events for a chunk of students enrolled by bulk_enroll().
+
+    Args:
+        course_id:          ID of the course students were enrolled in.
+        cohort_id:          ID of the cohort students were added to.
+        added_student_ids:  IDs of students who were enrolled.
+        moved_student_ids:  IDs of already enrolled students who were moved into the cohort.
+    """
+    try:
+        cohort = Cohort.objects.select_related('course').get(id=cohort_id, course_id=course_id)
+    except Cohort.DoesNotExist:
+        logger.warning(f"process_bulk_enrollment_task(): cohort {cohort_id} in course {course_id} "
+                       f"no longer exists.")
+        return
+    process_bulk_enrollment(course=cohort.course,
+                            cohort=cohort,
+                            added_student_ids=added_student_ids,
+                            moved_student_ids=moved_student_ids)
@@ -0,0 +1,92 @@
+from django.contrib.auth.models import Group
+from django.contrib.sites.models import Site
+from django.test import TestCase
+
+from kinesinlms.catalog.bulk_enrollment import bulk_enroll
+from kinesinlms.course.models import Cohort, CohortMembership, Enrollment
+from kinesinlms.course.tests.factories import CourseFactory
+from kinesinlms.forum.models import ForumGroupMembershipAction, ForumGroupMembershipChange
+from kinesinlms.forum.tests.factories import FormCohortGroupFactory, ForumProviderFactory
+from kinesinlms.users.tests.factories import UserFactory
+
+
+class TestBulkEnrollment(TestCase):
+
+    def setUp(self):
+        self.course = CourseFactory()
+        self.default_cohort = self.course.get_default_cohort()
+        self.cohort = Cohort.objects.create(course=self.course, name="Partner cohort", slug="partner-cohort")
+        self.new_students = [UserFactory(username=f"bulk-student-{index}",
+                                         email=f"bulk-student-{index}@example.com")
+                             for index in range(3)]
+        self.enrolled_student = UserFactory(username="bulk-enrolled-student",
+                                            email="bulk-enrolled-student@example.com")
+        Enrollment.objects.create(course=self.course, student=self.enrolled_student, active=True)
+        CohortMembership.objects.create(student=self.enrolled_student, cohort=self.default_cohort)
+
+    def test_bulk_enroll(self):
+        identifiers = [
+            "bulk-student-0",
+            "BULK-STUDENT-1@example.com",
+            "bulk-student-2",
+            "bulk-student-2@example.com",
+            "bulk-enrolled-student",
+            "no-such-student",
+            "no-such-student@example.com",
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = bulk_enroll(course=self.course, cohort=self.cohort, identifiers=identifiers)
+
+        new_student_ids = sorted(student.id for student in self.new_students)
+        self.assertEqual(sorted(result.added_student_ids), new_student_ids)
+        self.assertEqual(result.moved_student_ids, [self.enrolled_student.id])
+        self.assertEqual(result.skipped_student_ids, [])
+        self.assertEqual(result.unmatched_emails, ["no-such-student@example.com"])
+        self.assertEqual(len(result.errors), 2)
+
+        self.assertEqual(Enrollment.objects.filter(course=self.course, active=True).count(), 4)
+        self.assertEqual(
+            sorted(CohortMembership.objects.filter(cohort=self.cohort).values_list('student_id', flat=True)),
+            sorted(new_student_ids + [self.enrolled_student.id])
+        )
+        course_group = Group.objects.get(name=self.course.token)
+        self.assertEqual(sorted(course_group.user_set.values_list('id', flat=True)),
+                         sorted(new_student_ids + [self.enrolled_student.id]))
+
+        # Enrolling the same list again changes nothing.
+        result = bulk_enroll(course=self.course, cohort=self.cohort, identifiers=identifiers)
+        self.assertEqual(result.added_student_ids, [])
+        self.assertEqual(result.moved_student_ids, [])
+        self.assertEqual(len(result.skipped_student_ids), 4)
+
+    def test_bulk_enroll_reactivates_enrollment(self):
+        student = self.new_students[0]
+        Enrollment.objects.create(course=self.course, student=student, active=False)
+
+        result = bulk_enroll(course=self.course, cohort=self.cohort, identifiers=[student.username])
+
+        self.assertEqual(result.added_student_ids, [student.id])
+        self.assertTrue(Enrollment.objects.get(course=self.course, student=student).active)
+        self.assertEqual(CohortMembership.objects.get(cohort__course=self.course, student=student).cohort,
+                         self.cohort)
+
+    def test_bulk_enroll_moves_student_out_of_every_old_cohort(self):
+        ForumProviderFactory(site=Site.objects.get_current())
+        self.default_cohort.cohort_forum_group = FormCohortGroupFactory(group_id=30, name="default-group")
+        self.default_cohort.save()
+        other_cohort = Cohort.objects.create(course=self.course, name="Other cohort", slug="other-cohort",
+                                             cohort_forum_group=FormCohortGroupFactory(group_id=31,
+                                                                                       name="other-group"))
+        CohortMembership.objects.create(student=self.enrolled_student, cohort=other_cohort)
+
+        result = bulk_enroll(course=self.course, cohort=self.cohort, identifiers=[self.enrolled_student.username])
+
+        self.assertEqual(result.moved_student_ids, [self.enrolled_student.id])
+        memberships = CohortMembership.objects.filter(cohort__course=self.course, student=self.enrolled_student)
+        self.assertEqual([membership.cohort for membership in memberships], [self.cohort])
+        removed_group_ids = ForumGroupMembershipChange.objects.filter(
+            username=self.enrolled_student.username,
+            action=ForumGroupMembershipAction.REMOVE.name,
+        ).values_list('group_id', flat=True)
+        self.assertEqual(sorted(removed_group_ids), [30, 31])
@@ -23,3 +23,4 @@ class CertificateTemplateAdmin(admin.ModelAdmin):
 class CertificateAdmin(admin.ModelAdmin):
     model = Certificate
     list_display = ('student', 'certificate_template', 'uuid', "created_at")
+    readonly_fields = ('pdf_version',)
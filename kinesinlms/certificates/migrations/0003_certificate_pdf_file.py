@@ -0,0 +1,28 @@
+# Generated by Django 5.0.9 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("certificates", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="certificate",
+            name="pdf_file",
+            field=models.FileField(blank=True, null=True, upload_to="certificates/pdfs/"),
+        ),
+        migrations.AddField(
+            model_name="certificate",
+            name="pdf_version",
+            field=models.CharField(
+                blank=True,
+                help_text="Version of the certificate content the stored PDF was rendered from.",
+                max_length=64,
+                null=True,
+            ),
+        ),
+    ]
@@ -106,6 +106,20 @@ class Certificate(Trackable):
         default=uuid.uuid4, unique=True, null=True, blank=False, editable=True
     )
 
+    # The certificate rendered as a PDF, so downloads don't have to render it again.
+    # pdf_version identifies what was rendered (layout, student name, course name,
+    # signatories). If it no longer matches, the PDF is rendered again.
+    pdf_file = models.FileField(
+        upload_to="certificates/pdfs/", null=True, blank=True
+    )
+
+    pdf_version = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        help_text=_("Version of the certificate content the stored PDF was rendered from."),
+    )
+
     @property
     def certificate_url(self):
         if self.certificate_template and self.certificate_template.course:
@@ -6,6 +6,7 @@ from django.forms.widgets import Select
 from django.utils.translation import gettext_lazy as _
 
 from kinesinlms.learning_library.models import Block, Resource, ResourceType
+from kinesinlms.learning_library.service import link_resource_to_block
 
 logger = logging.getLogger(__name__)
 
@@ -88,9 +89,14 @@ class ResourceForm(ModelForm):
     def save(self, commit=True):
         resource = super().save(commit=commit)
 
-        # If we have a block, create the relationship
+        # If we have a block, create the relationship. If the block already
+        # has a resource with the same file contents, use that one instead
+        # and drop the duplicate we just created.
         if commit and self.block:
-            self.block.resources.add(resource)
+            block_resource, linked_resource = link_resource_to_block(block=self.block, resource=resource)
+            if linked_resource.id != resource.id:
+                resource.delete()
+                resource = linked_resource
 
         return resource
 
@@ -41,6 +41,7 @@ from kinesinlms.forum.service.base_service import BaseForumService
 from kinesinlms.forum.utils import get_forum_service
 from kinesinlms.learning_library.constants import BlockType, ResourceType
 from kinesinlms.learning_library.models import Block, BlockResource, Resource, UnitBlock
+from kinesinlms.learning_library.service import link_resource_to_block
 from kinesinlms.sits.models import SimpleInteractiveTool
 from kinesinlms.survey.models import Survey, SurveyBlock
 
@@ -303,9 +304,7 @@ class JupyterPanelForm(BasePanelModelForm):
 
                 # Create new BlockResource association
                 if selected_resource:
-                    BlockResource.objects.create(
-                        block=block, resource=selected_resource
-                    )
+                    link_resource_to_block(block=block, resource=selected_resource)
 
                 block.save()
 
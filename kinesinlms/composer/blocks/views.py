@@ -77,7 +77,7 @@ def block_resource_upload_hx(request, course_id: int, pk: int):
         if form.is_valid(block=block):
             resource = form.save()
             logger.debug(f"Created Resource {resource}")
-            block_resource = BlockResource.objects.create(
+            block_resource = BlockResource.objects.get(
                 block=block, resource=resource
             )
             logger.debug(f"Created BlockResource {block_resource}")
@@ -102,6 +102,39 @@ class ImportCourseFromArchiveForm(forms.Form):
         return cleaned_data
 
 
+class CloneCourseForm(forms.Form):
+    course_slug = forms.SlugField(
+        max_length=200,
+        help_text="Slug for the new course. Usually the same as the original course's slug.",
+    )
+
+    course_run = forms.SlugField(
+        max_length=200,
+        help_text="Run for the new course, e.g. '2025' or 'FALL2025'.",
+    )
+
+    display_name = forms.CharField(
+        max_length=400,
+        required=False,
+        help_text="Course name for the new run. Leave blank to use the original course's name.",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = FormHelper()
+        self.helper.add_input(Submit("submit", "Create new run"))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        course_slug = cleaned_data.get("course_slug", None)
+        course_run = cleaned_data.get("course_run", None)
+        if course_slug and course_run and Course.objects.filter(slug=course_slug, run=course_run).exists():
+            raise forms.ValidationError(f"A course with slug {course_slug} and run {course_run} already exists.")
+        if cleaned_data.get("display_name", None) == "":
+            cleaned_data["display_name"] = None
+        return cleaned_data
+
+
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Model Forms
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~
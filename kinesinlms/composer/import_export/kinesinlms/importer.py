@@ -1,6 +1,5 @@
 import json
 import logging
-import os
 import zipfile
 from typing import Dict, List, Optional
 
@@ -16,6 +15,7 @@ from kinesinlms.composer.import_export.model import CourseImportOptions
 from kinesinlms.composer.models import CourseMetaConfig
 from kinesinlms.course.constants import NodeType
 from kinesinlms.course.models import Course, CourseNode, CourseResource
+from kinesinlms.course.nav import course_nav_bulk_edit
 from kinesinlms.course.serializers import (
     CourseNodeSerializer,
     CourseSerializer,
@@ -24,6 +24,7 @@ from kinesinlms.course.serializers import (
 from kinesinlms.forum.utils import get_forum_service
 from kinesinlms.learning_library.constants import ResourceType
 from kinesinlms.learning_library.models import Resource
+from kinesinlms.learning_library.service import attach_resource_blob
 
 logger = logging.getLogger(__name__)
 
@@ -95,17 +96,7 @@ class KinesinLMSCourseImporter(CourseImporterBase):
         except Course.DoesNotExist:
             pass  # That's good. We'll create one now...
 
-        # Get a default import configuration and set with top-level config values.
-        course_import_config: CourseMetaConfig = CourseMetaConfig()
-
-        # ...then override with all other config settings if any are set in json...
-        import_config_json = course_json.pop("import_config", {})
-        if import_config_json:
-            for key, value in import_config_json.items():
-                try:
-                    setattr(course_import_config, key, value)
-                except Exception:
-                    raise ValidationError(f"Cannot set import_config property {key} to {value}")
+        course_import_config = self._build_course_import_config(course_json.pop("import_config", {}))
 
         # The serializer will handle creating the Course and CourseCatalogDescription
         # NOT the CourseNode tree and the related UnitBlocks, SubBlocks, etc.
@@ -138,16 +129,19 @@ class KinesinLMSCourseImporter(CourseImporterBase):
         course_root_node_json["slug"] = course.token
 
         # NOTE: Kept getting recursion errors when trying to deserialize
-        # course_nodes into MPTT, so creating CourseNode tree manually
-        course_root_node = self._deserialize_course_node_tree(
-            course_node_json=course_root_node_json,
-            course=course,
-            parent_node=None,
-            level=0,
-            content_index=0,
-            node_index=1,
-            course_import_config=course_import_config,
-        )
+        # course_nodes into MPTT, so creating CourseNode tree manually.
+        # MPTT updates are delayed so the tree is built in one rebuild
+        # rather than shifted on every insert.
+        with course_nav_bulk_edit(course):
+            course_root_node = self._deserialize_course_node_tree(
+                course_node_json=course_root_node_json,
+                course=course,
+                parent_node=None,
+                level=0,
+                content_index=0,
+                node_index=1,
+                course_import_config=course_import_config,
+            )
         course.course_root_node = course_root_node
         course.save()
 
@@ -349,6 +343,20 @@ class KinesinLMSCourseImporter(CourseImporterBase):
     # PRIVATE METHODS
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
+    def _build_course_import_config(self, import_config_json: Optional[Dict]) -> CourseMetaConfig:
+        """
+        Get a default import configuration and override with
+        any config settings defined in the incoming json.
+        """
+        course_import_config: CourseMetaConfig = CourseMetaConfig()
+        if import_config_json:
+            for key, value in import_config_json.items():
+                try:
+                    setattr(course_import_config, key, value)
+                except Exception:
+                    raise ValidationError(f"Cannot set import_config property {key} to {value}")
+        return course_import_config
+
     def _load_course_resources(
         self,
         filename_parts: List[str],
@@ -397,15 +405,16 @@ class KinesinLMSCourseImporter(CourseImporterBase):
         # Sometimes the Resource model instance will exist, but the actual file in the
         # MEDIA folder does not. Check for that. If it's missing from the media folder,
         # we'll copy it back in. If it doesn't exist (e.g. because it's new), we'll create it.
-        if resource.resource_file and resource.resource_file.path:
-            media_file_exists = os.path.exists(resource.resource_file.path)
+        # Files are stored by content hash, so if another course already has an identical
+        # file we just point this resource at that shared blob rather than writing a copy.
+        if resource.resource_file:
+            media_file_exists = resource.resource_file.storage.exists(resource.resource_file.name)
         else:
             media_file_exists = False
 
         if not media_file_exists:
             resource_file_content = zp.read(file_path)
-            content_file = ContentFile(resource_file_content)
-            resource.resource_file.save(file_name, content_file, save=True)
+            attach_resource_blob(resource=resource, content=resource_file_content, file_name=file_name)
             if resource_created:
                 logger.info(f" - saved file {file_name} to resource {resource}")
             else:
@@ -0,0 +1,629 @@
+import copy
+import json
+import logging
+import zipfile
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.db.models import Model
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import ValidationError
+
+from kinesinlms.composer.import_export.importer import ImportStatus
+from kinesinlms.composer.import_export.kinesinlms.constants import KinesinLMSCourseExportFormatID
+from kinesinlms.composer.import_export.kinesinlms.importer import KinesinLMSCourseImporter
+from kinesinlms.composer.import_export.model import CourseImportOptions
+from kinesinlms.composer.models import CourseMetaConfig
+from kinesinlms.course.constants import NodeType
+from kinesinlms.course.models import Course, CourseNode, CourseResource, CourseUnit
+from kinesinlms.course.nav import course_nav_bulk_edit
+from kinesinlms.course.serializers import CourseUnitSerializer
+from kinesinlms.learning_library.models import Block, BlockResource, Resource, UnitBlock
+from kinesinlms.learning_library.serializers import UnitBlockSerializer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CourseUpdateReport:
+    """
+    Describes the changes made (or, in a dry run, that would be made)
+    when applying a course export to an existing course.
+    """
+
+    nodes_created: List[str] = field(default_factory=list)
+    nodes_updated: List[str] = field(default_factory=list)
+    nodes_moved: List[str] = field(default_factory=list)
+    nodes_deleted: List[str] = field(default_factory=list)
+    # Nodes that aren't in the export but were kept (remove_missing_nodes was off).
+    nodes_missing: List[str] = field(default_factory=list)
+    units_updated: List[str] = field(default_factory=list)
+    blocks_updated: List[str] = field(default_factory=list)
+    unit_blocks_added: List[str] = field(default_factory=list)
+    unit_blocks_updated: List[str] = field(default_factory=list)
+    unit_blocks_removed: List[str] = field(default_factory=list)
+    resources_added: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return any(
+            getattr(self, report_field)
+            for report_field in self.__dataclass_fields__
+            if report_field != "nodes_missing"
+        )
+
+    def summary(self) -> str:
+        lines = []
+        for report_field in self.__dataclass_fields__:
+            items = getattr(self, report_field)
+            lines.append(f"{report_field.replace('_', ' ')}: {len(items)}")
+            for item in items:
+                lines.append(f"  - {item}")
+        return "\n".join(lines)
+
+
+class KinesinLMSCourseUpdater(KinesinLMSCourseImporter):
+    """
+    Applies a KinesinLMS course export to an *existing* course run,
+    rather than building a new course from scratch.
+
+    Only the differences are written: changed nodes, units, blocks and
+    unit blocks are updated in place, moved nodes are re-parented, new
+    nodes and blocks are created and new resources are loaded. Existing
+    rows keep their primary keys, so student progress, bookmarks and
+    other rows pointing at them are untouched.
+
+    Nodes are matched to the export by their unit's uuid (for UNIT nodes)
+    or by type and slug (for MODULE and SECTION nodes). Blocks are matched
+    by uuid within each unit.
+
+    Course-level settings (catalog description, dates, surveys, etc.)
+    are not changed by an update.
+    """
+
+    NODE_FIELDS = [
+        "display_name",
+        "purpose",
+        "release_datetime",
+        "content_index",
+        "display_sequence",
+    ]
+
+    UNIT_FIELDS = [
+        "type",
+        "display_name",
+        "short_description",
+        "course_only",
+        "enable_template_tags",
+        "html_content",
+        "json_content",
+        "status",
+    ]
+
+    UNIT_BLOCK_FIELDS = [
+        "label",
+        "index_label",
+        "block_order",
+        "hide",
+        "read_only",
+        "include_in_summary",
+    ]
+
+    BLOCK_FIELDS = [
+        "display_name",
+        "short_description",
+        "course_only",
+        "enable_template_tags",
+        "html_content",
+        "json_content",
+    ]
+
+    ASSESSMENT_FIELDS = [
+        "question",
+        "question_as_statement",
+        "definition_json",
+        "solution_json",
+        "explanation",
+        "show_answer",
+        "show_slug",
+        "attempts_allowed",
+        "has_correct_answer",
+        "complete_mode",
+        "graded",
+    ]
+
+    SIT_FIELDS = [
+        "name",
+        "instructions",
+        "graded",
+        "max_score",
+        "definition",
+    ]
+
+    def __init__(self, cache_key: str = None):
+        super().__init__(cache_key=cache_key)
+        self.report = CourseUpdateReport()
+        self._nodes_by_unit_uuid: Dict[str, CourseNode] = {}
+        self._nodes_by_type_and_slug: Dict[tuple, List[CourseNode]] = defaultdict(list)
+        self._matched_node_ids = set()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # PUBLIC METHODS
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def update_course_from_json(
+        self,
+        course: Course,
+        course_json: Dict,
+        options: CourseImportOptions = None,
+    ) -> CourseUpdateReport:
+        """
+        Apply the course described in course_json to an existing course.
+
+        Args:
+            course:         Existing course to update.
+            course_json:    JSON representation of the course, either the
+                            full export format or just the 'course' dictionary.
+            options:        CourseImportOptions instance with options for import.
+
+        Returns:
+            CourseUpdateReport describing the changes made.
+        """
+        if not course_json:
+            raise Exception("Course json is empty!")
+        if options is None:
+            options = CourseImportOptions()
+
+        if "course" in course_json:
+            course_json = course_json["course"]
+
+        root_node_json = course_json.get("course_root_node", None)
+        if not root_node_json:
+            raise ValidationError("Course json is missing 'course_root_node'")
+
+        course_import_config = self._build_course_import_config(course_json.get("import_config", {}))
+
+        root_node: CourseNode = course.course_root_node
+        if not root_node:
+            raise Exception(f"Course {course} has no root node. Use a full import instead.")
+
+        existing_nodes = list(root_node.get_descendants().select_related("unit"))
+        for node in existing_nodes:
+            if node.unit:
+                self._nodes_by_unit_uuid[str(node.unit.uuid)] = node
+            self._nodes_by_type_and_slug[(node.type, node.slug)].append(node)
+
+        # Delay MPTT updates so all moves, inserts and deletes
+        # cost a single rebuild of the course tree.
+        with course_nav_bulk_edit(course):
+            self._update_children(
+                course=course,
+                parent_node=root_node,
+                children_json=copy.deepcopy(root_node_json.get("children", None) or []),
+                level=1,
+                course_import_config=course_import_config,
+            )
+
+            if options.remove_missing_nodes:
+                self._delete_unmatched_nodes(existing_nodes)
+            else:
+                self._report_unmatched_nodes(existing_nodes)
+
+        return self.report
+
+    def update_course_from_archive(
+        self,
+        file,
+        course: Course,
+        options: CourseImportOptions = None,
+        dry_run: bool = False,
+    ) -> CourseUpdateReport:
+        """
+        Apply a course archive (.zip) to an existing course, then load any
+        resource files that the course doesn't have yet.
+
+        Args:
+            file:       Course archive file.
+            course:     Existing course to update.
+            options:    CourseImportOptions instance with options for import.
+            dry_run:    If True, the caller will roll back the database changes, so
+                        skip the steps a rollback can't undo: configuring the
+                        forum and writing resource files to storage.
+
+        Returns:
+            CourseUpdateReport describing the changes made.
+        """
+        if file is None:
+            raise ValueError("file cannot be None")
+        if options is None:
+            options = CourseImportOptions()
+
+        self.update_cache(
+            ImportStatus(
+                percent_complete=10,
+                progress_message=_("Loading course archive"),
+            )
+        )
+
+        zp = zipfile.ZipFile(file)
+        info_list: List[zipfile.ZipInfo] = zp.infolist()
+        if "course.json" not in [zipinfo.filename for zipinfo in info_list]:
+            raise Exception("Archive is missing a course.json file at the top level.")
+
+        course_export_json: Dict = json.loads(zp.read("course.json"))
+        document_type = course_export_json.get("document_type", None)
+        if document_type != KinesinLMSCourseExportFormatID.KINESIN_LMS_FORMAT.value:
+            raise Exception(f"Invalid document type: {document_type}")
+
+        self.update_cache(
+            ImportStatus(
+                percent_complete=30,
+                progress_message=_("Applying course changes"),
+            )
+        )
+
+        self.update_course_from_json(course=course, course_json=course_export_json, options=options)
+
+        if dry_run:
+            logger.info("Dry run: skipping forum configuration and resource files.")
+            self.update_cache(
+                ImportStatus(
+                    percent_complete=100,
+                    progress_message=_("Course update dry run complete"),
+                    course_token=course.token,
+                )
+            )
+            return self.report
+
+        if options.create_forum_items and self.report.unit_blocks_added:
+            self.update_cache(
+                ImportStatus(
+                    percent_complete=60,
+                    progress_message=_("Updating forum items"),
+                )
+            )
+            from kinesinlms.forum.utils import get_forum_service
+
+            try:
+                service = get_forum_service()
+                service.configure_forum_for_new_course(course=course)
+            except Exception:
+                raise Exception("Could not configure forum topics.")
+
+        self.update_cache(
+            ImportStatus(
+                percent_complete=70,
+                progress_message=_("Loading new course and block resources"),
+            )
+        )
+
+        for file_info in info_list:
+            if file_info.is_dir():
+                continue
+            file_path = file_info.filename
+            filename_parts = file_path.split("/")
+            first_filename_part = filename_parts[0]
+            if first_filename_part == "block_resources":
+                # Only writes the file if the resource doesn't have it yet.
+                self._load_block_resources(
+                    filename_parts=filename_parts,
+                    zp=zp,
+                    file_path=file_path,
+                    file_info=file_info,
+                )
+            elif first_filename_part == "course_resources":
+                try:
+                    self._load_course_resources(
+                        filename_parts=filename_parts,
+                        course=course,
+                        zp=zp,
+                        file_path=file_path,
+                    )
+                except CourseResource.DoesNotExist:
+                    logger.warning(f"Skipping course resource {file_path}: not defined in local course.")
+
+        self.update_cache(
+            ImportStatus(
+                percent_complete=100,
+                progress_message=_("Course update complete"),
+                course_token=course.token,
+            )
+        )
+        return self.report
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # PRIVATE METHODS
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _update_children(
+        self,
+        course: Course,
+        parent_node: CourseNode,
+        children_json: List[Dict],
+        level: int,
+        course_import_config: CourseMetaConfig,
+    ) -> None:
+        """
+        Match each child in children_json to an existing node (updating or
+        moving it as needed), or create it if there's no match.
+        Uses the same content_index rules as a full import.
+        """
+        auto_content_start_index = course_import_config.auto_content_start_index(node_type=parent_node.type)
+        content_index = auto_content_start_index if auto_content_start_index else None
+
+        for node_index, child_json in enumerate(children_json):
+            if not auto_content_start_index:
+                content_index = child_json.get("content_index", None)
+
+            if content_index is not None:
+                child_json["content_index"] = content_index
+
+            node = self._match_node(node_json=child_json, parent_node=parent_node)
+            grandchildren_json = child_json.pop("children", None) or []
+            if node is None:
+                # New node. Let the importer build it, but handle its children
+                # here so any existing nodes moved under it are matched rather
+                # than recreated.
+                for key in ["node_url", "id", "parent"]:
+                    child_json.pop(key, None)
+                node = self._deserialize_course_node_tree(
+                    course_node_json=child_json,
+                    course=course,
+                    parent_node=parent_node,
+                    level=level,
+                    node_index=node_index,
+                    # Already set on child_json above.
+                    content_index=None,
+                    course_import_config=course_import_config,
+                )
+                self._matched_node_ids.add(node.id)
+                self.report.nodes_created.append(f"{node.type} {node.slug}")
+            else:
+                node = self._update_node(node=node, node_json=child_json, parent_node=parent_node)
+                unit_json = child_json.get("unit", None)
+                if unit_json:
+                    self._update_node_unit(
+                        course=course,
+                        node=node,
+                        unit_json=unit_json,
+                        course_import_config=course_import_config,
+                    )
+
+            if grandchildren_json:
+                self._update_children(
+                    course=course,
+                    parent_node=node,
+                    children_json=grandchildren_json,
+                    level=level + 1,
+                    course_import_config=course_import_config,
+                )
+
+            if auto_content_start_index:
+                content_index += 1
+
+    def _match_node(self, node_json: Dict, parent_node: CourseNode) -> Optional[CourseNode]:
+        """
+        Find the existing node that corresponds to node_json, if any.
+        UNIT nodes with a unit uuid are only matched on that uuid, so
+        a unit that was moved to another section is moved rather than recreated.
+        """
+        unit_json = node_json.get("unit", None) or {}
+        unit_uuid = unit_json.get("uuid", None)
+        if unit_uuid:
+            node = self._nodes_by_unit_uuid.get(str(unit_uuid), None)
+            if node and node.id not in self._matched_node_ids:
+                self._matched_node_ids.add(node.id)
+                return node
+            return None
+
+        candidates = [
+            node
+            for node in self._nodes_by_type_and_slug.get((node_json.get("type"), node_json.get("slug")), [])
+            if node.id not in self._matched_node_ids
+        ]
+        if not candidates:
+            return None
+        # Prefer a node that's already in the right place.
+        node = next((node for node in candidates if node.parent_id == parent_node.id), candidates[0])
+        self._matched_node_ids.add(node.id)
+        return node
+
+    def _update_node(self, node: CourseNode, node_json: Dict, parent_node: CourseNode) -> CourseNode:
+        node_json = dict(node_json)
+        if "release_datetime" in node_json and isinstance(node_json["release_datetime"], str):
+            node_json["release_datetime"] = parse_datetime(node_json["release_datetime"])
+
+        changed_fields = self._apply_field_changes(node, node_json, self.NODE_FIELDS)
+        moved = node.parent_id != parent_node.id
+        if moved:
+            node.parent = parent_node
+        if changed_fields or moved:
+            node.save()
+        if moved:
+            self.report.nodes_moved.append(f"{node.type} {node.slug}")
+        if changed_fields:
+            self.report.nodes_updated.append(f"{node.type} {node.slug} ({', '.join(changed_fields)})")
+        return node
+
+    def _update_node_unit(
+        self,
+        course: Course,
+        node: CourseNode,
+        unit_json: Dict,
+        course_import_config: CourseMetaConfig,
+    ) -> None:
+        if node.type != NodeType.UNIT.name:
+            raise ValidationError("Only nodes of type UNIT can define a 'unit' object.")
+
+        if not node.unit:
+            course_unit_serializer = CourseUnitSerializer(
+                data=unit_json,
+                context={
+                    "course": course,
+                    "course_import_config": course_import_config,
+                },
+            )
+            course_unit_serializer.is_valid(raise_exception=True)
+            node.unit = course_unit_serializer.save(course=course)
+            node.save()
+            self.report.units_updated.append(f"{node.unit.slug} (new unit)")
+            return
+
+        course_unit: CourseUnit = node.unit
+        changed_fields = self._apply_field_changes(course_unit, unit_json, self.UNIT_FIELDS)
+        if changed_fields:
+            course_unit.save()
+            self.report.units_updated.append(f"{course_unit.slug} ({', '.join(changed_fields)})")
+
+        self._update_unit_blocks(
+            course_unit=course_unit,
+            unit_blocks_json=unit_json.get("unit_blocks", None) or [],
+            course_import_config=course_import_config,
+        )
+
+    def _update_unit_blocks(
+        self,
+        course_unit: CourseUnit,
+        unit_blocks_json: List[Dict],
+        course_import_config: CourseMetaConfig,
+    ) -> None:
+        existing_unit_blocks = list(course_unit.unit_blocks.select_related("block"))
+        by_uuid = {str(unit_block.block.uuid): unit_block for unit_block in existing_unit_blocks}
+        # Older exports don't always include block uuids, so fall back to type and slug.
+        by_type_and_slug = {
+            (unit_block.block.type, unit_block.block.slug): unit_block
+            for unit_block in existing_unit_blocks
+            if unit_block.block.slug
+        }
+
+        matches: List[Optional[int]] = []
+        for unit_block_json in unit_blocks_json:
+            block_json = unit_block_json.get("block", None) or {}
+            block_uuid = block_json.get("uuid", None)
+            if block_uuid:
+                unit_block = by_uuid.get(str(block_uuid), None)
+            else:
+                unit_block = by_type_and_slug.get((block_json.get("type"), block_json.get("slug")), None)
+            matches.append(unit_block.id if unit_block else None)
+
+        # Remove blocks that are no longer in the unit first, since
+        # delete_block() renumbers the remaining block_order values.
+        for unit_block in existing_unit_blocks:
+            if unit_block.id not in matches:
+                self.report.unit_blocks_removed.append(f"{course_unit.slug} : {unit_block.block}")
+                course_unit.delete_block(unit_block.block)
+
+        unit_blocks_by_id: Dict[int, UnitBlock] = {
+            unit_block.id: unit_block for unit_block in course_unit.unit_blocks.select_related("block")
+        }
+
+        for unit_block_json, unit_block_id in zip(unit_blocks_json, matches):
+            unit_block = unit_blocks_by_id.get(unit_block_id, None)
+            if unit_block is None:
+                unit_block_serializer = UnitBlockSerializer(
+                    data=copy.deepcopy(unit_block_json),
+                    context={"course_import_config": course_import_config},
+                )
+                unit_block_serializer.is_valid(raise_exception=True)
+                unit_block = unit_block_serializer.save(course_unit=course_unit)
+                self.report.unit_blocks_added.append(f"{course_unit.slug} : {unit_block.block}")
+                continue
+
+            changed_fields = self._apply_field_changes(unit_block, unit_block_json, self.UNIT_BLOCK_FIELDS)
+            if changed_fields:
+                unit_block.save()
+                self.report.unit_blocks_updated.append(f"{course_unit.slug} : {unit_block.block}")
+
+            # Read-only unit blocks only carry the block uuid, not its content.
+            if not unit_block.read_only:
+                self._update_block(block=unit_block.block, block_json=unit_block_json.get("block", None) or {})
+
+    def _update_block(self, block: Block, block_json: Dict) -> None:
+        changed_fields = self._apply_field_changes(block, block_json, self.BLOCK_FIELDS)
+        if changed_fields:
+            block.save()
+
+        assessment_json = block_json.get("assessment", None)
+        if assessment_json and hasattr(block, "assessment"):
+            assessment_changes = self._apply_field_changes(block.assessment, assessment_json, self.ASSESSMENT_FIELDS)
+            if assessment_changes:
+                block.assessment.save()
+                changed_fields += [f"assessment.{name}" for name in assessment_changes]
+
+        sit_json = block_json.get("simple_interactive_tool", None)
+        if sit_json and hasattr(block, "simple_interactive_tool"):
+            sit = block.simple_interactive_tool
+            sit_changes = self._apply_field_changes(sit, sit_json, self.SIT_FIELDS)
+            if sit_changes:
+                sit.save()
+                changed_fields += [f"simple_interactive_tool.{name}" for name in sit_changes]
+
+        if changed_fields:
+            self.report.blocks_updated.append(f"{block} ({', '.join(changed_fields)})")
+
+        for resource_json in block_json.get("resources", None) or []:
+            self._link_block_resource(block=block, resource_json=resource_json)
+
+    def _link_block_resource(self, block: Block, resource_json: Dict) -> None:
+        resource_uuid = resource_json.get("uuid", None)
+        if not resource_uuid:
+            return
+        resource, resource_created = Resource.objects.get_or_create(uuid=resource_uuid)
+        if resource_created:
+            resource.type = resource_json.get("type", resource.type)
+            resource.slug = resource_json.get("slug", None)
+            resource.save()
+        block_resource, block_resource_created = BlockResource.objects.get_or_create(block=block, resource=resource)
+        if block_resource_created:
+            self.report.resources_added.append(f"{block} : {resource}")
+
+    def _report_unmatched_nodes(self, existing_nodes: List[CourseNode]) -> None:
+        """
+        Note (without deleting them) the nodes that weren't in the export.
+        """
+        for node in existing_nodes:
+            if node.id not in self._matched_node_ids:
+                self.report.nodes_missing.append(f"{node.type} {node.slug}")
+        if self.report.nodes_missing:
+            logger.info(f"Keeping {len(self.report.nodes_missing)} course nodes that aren't in the export. "
+                        f"Use remove_missing_nodes to delete them: {self.report.nodes_missing}")
+
+    def _delete_unmatched_nodes(self, existing_nodes: List[CourseNode]) -> None:
+        """
+        Delete nodes that weren't in the export. Matched nodes have already
+        been moved out of any unmatched parents, so deleting an unmatched
+        node (and its remaining descendants) never removes matched content.
+        """
+        unmatched_nodes = sorted(
+            [node for node in existing_nodes if node.id not in self._matched_node_ids],
+            key=lambda node: node.level,
+        )
+        for node in unmatched_nodes:
+            try:
+                node = CourseNode.objects.select_related("unit").get(id=node.id)
+            except CourseNode.DoesNotExist:
+                # Already removed along with an unmatched parent.
+                continue
+            self.report.nodes_deleted.append(f"{node.type} {node.slug}")
+            course_unit: Optional[CourseUnit] = node.unit
+            node.delete()
+            if course_unit and not course_unit.course_nodes.exists():
+                course_unit.delete()
+
+    @staticmethod
+    def _apply_field_changes(instance: Model, data: Dict, field_names: List[str]) -> List[str]:
+        """
+        Set each field in field_names that's present in data and differs
+        from the instance's current value. Returns the names of changed fields.
+        """
+        changed_fields = []
+        for field_name in field_names:
+            if field_name not in data:
+                continue
+            new_value = data[field_name]
+            if getattr(instance, field_name) != new_value:
+                setattr(instance, field_name, new_value)
+                changed_fields.append(field_name)
+        return changed_fields
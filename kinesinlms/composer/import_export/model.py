@@ -4,3 +4,9 @@ from dataclasses import dataclass
 @dataclass()
 class CourseImportOptions:
     create_forum_items: bool = True
+
+    # Only used when applying an export to an existing course
+    # (see KinesinLMSCourseUpdater). If True, nodes in the local course
+    # that don't appear in the export are deleted, along with any student
+    # rows pointing at them. Otherwise they're kept and only reported.
+    remove_missing_nodes: bool = False
@@ -0,0 +1,95 @@
+import json
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from kinesinlms.composer.import_export.kinesinlms.updater import KinesinLMSCourseUpdater
+from kinesinlms.composer.import_export.model import CourseImportOptions
+from kinesinlms.course.models import Course
+
+logger = logging.getLogger(__name__)
+
+
+class DryRunRollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply a KinesinLMS course export (.zip or course.json) to an existing course, "
+        "writing only what has changed. Existing nodes, units and blocks keep their IDs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", type=str, required=True, help="Course token, e.g. SLUG_RUN")
+        parser.add_argument("--path", type=str, required=True, help="Path to a course .zip or course.json file")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change, then roll back. Forum items and resource files are not created.",
+        )
+        parser.add_argument(
+            "--remove-missing-nodes",
+            action="store_true",
+            help="Delete course nodes (and units) that aren't in the export, along with any student "
+                 "progress tied to them. Without this they're kept and listed as 'nodes missing'.",
+        )
+        parser.add_argument(
+            "--create-forum-items",
+            action="store_true",
+            help="Create forum items for any new forum topic blocks.",
+        )
+
+    def handle(self, *args, **options):
+        token = options["course"]
+        try:
+            slug, run = token.split("_")
+        except ValueError:
+            raise CommandError(f"Invalid course token: {token}")
+
+        try:
+            course = Course.objects.get(slug=slug, run=run)
+        except Course.DoesNotExist:
+            raise CommandError(f"NO ACTION! Can't find course with token {token}")
+
+        path = options["path"]
+        import_options = CourseImportOptions(
+            create_forum_items=options["create_forum_items"],
+            remove_missing_nodes=options["remove_missing_nodes"],
+        )
+
+        updater = KinesinLMSCourseUpdater()
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                if path.endswith(".zip"):
+                    with open(path, "rb") as f:
+                        report = updater.update_course_from_archive(
+                            file=f,
+                            course=course,
+                            options=import_options,
+                            dry_run=options["dry_run"],
+                        )
+                else:
+                    with open(path) as f:
+                        course_json = json.load(f)
+                    report = updater.update_course_from_json(
+                        course=course,
+                        course_json=course_json,
+                        options=import_options,
+                    )
+                if options["dry_run"]:
+                    raise DryRunRollback()
+        except DryRunRollback:
+            report = updater.report
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(report.summary())
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"DRY RUN: no changes saved. ({elapsed:.2f}s)"))
+        elif report.has_changes:
+            self.stdout.write(self.style.SUCCESS(f"Updated course {token} in {elapsed:.2f}s"))
+        else:
+            self.stdout.write(f"Course {token} is already up to date. ({elapsed:.2f}s)")
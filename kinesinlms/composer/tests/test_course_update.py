@@ -0,0 +1,169 @@
+import copy
+import io
+import json
+import logging
+import uuid
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import TestCase
+
+from kinesinlms.badges.tests.factories import BadgeClassFactory
+from kinesinlms.composer.forms.course import AddCourseForm
+from kinesinlms.composer.import_export.kinesinlms.constants import KinesinLMSCourseExportFormatID
+from kinesinlms.composer.import_export.kinesinlms.updater import KinesinLMSCourseUpdater
+from kinesinlms.composer.import_export.model import CourseImportOptions
+from kinesinlms.composer.views import load_course_from_form
+from kinesinlms.course.models import CourseNode
+from kinesinlms.learning_library.models import Resource, UnitBlock
+from kinesinlms.speakers.tests.factory import SpeakerFactory
+from kinesinlms.survey.tests.factories import SurveyProviderFactory
+
+logger = logging.getLogger(__name__)
+
+
+class TestCourseUpdate(TestCase):
+    """
+    Test applying a course export to a course that's already been imported.
+    Existing rows should be updated in place rather than recreated.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        SpeakerFactory(full_name="Test Speaker 1", slug="test-speaker-1")
+        SpeakerFactory(full_name="Test Speaker 2", slug="test-speaker-2")
+        SurveyProviderFactory(slug="qualtrics-kinesinlms")
+        BadgeClassFactory.create(slug="TEST_SP-course-passed")
+
+    def setUp(self):
+        path = Path(settings.APPS_DIR) / "composer/tests/data/basic_test_course.json"
+        with open(path) as json_file:
+            self.course_json_str = json_file.read()
+        form = AddCourseForm({"course_json": self.course_json_str, "create_forum_items": False})
+        self.course = load_course_from_form(form)
+        self.assertIsNotNone(self.course)
+
+    def _updated_json(self):
+        course_json = json.loads(self.course_json_str)
+        return copy.deepcopy(course_json)
+
+    @staticmethod
+    def _course_dict(course_json):
+        return course_json.get("course", course_json)
+
+    def test_unchanged_export_makes_no_changes(self):
+        node_ids = set(CourseNode.objects.filter(tree_id=self.course.course_root_node.tree_id).values_list("id"))
+        unit_block_ids = set(UnitBlock.objects.values_list("id", flat=True))
+
+        report = KinesinLMSCourseUpdater().update_course_from_json(
+            course=self.course,
+            course_json=self._updated_json(),
+        )
+
+        self.assertFalse(report.has_changes, report.summary())
+        self.assertEqual(
+            node_ids,
+            set(CourseNode.objects.filter(tree_id=self.course.course_root_node.tree_id).values_list("id")),
+        )
+        self.assertEqual(unit_block_ids, set(UnitBlock.objects.values_list("id", flat=True)))
+
+    def test_changes_applied_in_place(self):
+        root = self.course.course_root_node
+        module_node = root.get_children().get()
+        unit_node = CourseNode.objects.get(tree_id=root.tree_id, type="UNIT")
+        html_unit_block = unit_node.unit.unit_blocks.get(block__type="HTML_CONTENT")
+
+        course_json = self._updated_json()
+        module_json = self._course_dict(course_json)["course_root_node"]["children"][0]
+        module_json["display_name"] = "Renamed module"
+        unit_json = module_json["children"][0]["children"][0]["unit"]
+        unit_json["display_name"] = "Renamed unit"
+        html_block_json = next(ub for ub in unit_json["unit_blocks"] if ub["block"]["type"] == "HTML_CONTENT")
+        html_block_json["block"]["html_content"] = "<p>Updated content</p>"
+        # Drop the assessment block and add a second section.
+        unit_json["unit_blocks"] = [ub for ub in unit_json["unit_blocks"] if ub["block"]["type"] != "ASSESSMENT"]
+        module_json["children"].append(
+            {
+                "type": "SECTION",
+                "slug": "new-section",
+                "display_name": "New section",
+                "display_sequence": 2,
+                "children": [],
+            }
+        )
+
+        report = KinesinLMSCourseUpdater().update_course_from_json(course=self.course, course_json=course_json)
+
+        self.assertTrue(report.has_changes)
+        module_node.refresh_from_db()
+        unit_node.refresh_from_db()
+        html_unit_block.refresh_from_db()
+        self.assertEqual(module_node.display_name, "Renamed module")
+        self.assertEqual(unit_node.unit.display_name, "Renamed unit")
+        self.assertEqual(html_unit_block.block.html_content, "<p>Updated content</p>")
+        self.assertFalse(unit_node.unit.unit_blocks.filter(block__type="ASSESSMENT").exists())
+        self.assertTrue(module_node.get_children().filter(slug="new-section").exists())
+        self.assertEqual(len(report.unit_blocks_removed), 1)
+        self.assertEqual(len(report.nodes_created), 1)
+
+    def test_moved_unit_keeps_id_and_missing_section_removed(self):
+        root = self.course.course_root_node
+        unit_node = CourseNode.objects.get(tree_id=root.tree_id, type="UNIT")
+
+        course_json = self._updated_json()
+        module_json = self._course_dict(course_json)["course_root_node"]["children"][0]
+        old_section_json = module_json["children"][0]
+        module_json["children"] = [
+            {
+                "type": "SECTION",
+                "slug": "replacement-section",
+                "display_name": "Replacement section",
+                "display_sequence": 1,
+                "children": old_section_json["children"],
+            }
+        ]
+
+        report = KinesinLMSCourseUpdater().update_course_from_json(
+            course=self.course,
+            course_json=course_json,
+            options=CourseImportOptions(remove_missing_nodes=True),
+        )
+
+        moved_unit_node = CourseNode.objects.get(id=unit_node.id)
+        self.assertEqual(moved_unit_node.parent.slug, "replacement-section")
+        self.assertFalse(CourseNode.objects.filter(tree_id=root.tree_id, slug="test-section").exists())
+        self.assertEqual(len(report.nodes_deleted), 1)
+
+    def test_missing_nodes_kept_by_default(self):
+        root = self.course.course_root_node
+        course_json = self._updated_json()
+        self._course_dict(course_json)["course_root_node"]["children"] = []
+
+        report = KinesinLMSCourseUpdater().update_course_from_json(course=self.course, course_json=course_json)
+
+        self.assertFalse(report.nodes_deleted)
+        self.assertIn("UNIT", [item.split(" ")[0] for item in report.nodes_missing])
+        self.assertTrue(CourseNode.objects.filter(tree_id=root.tree_id, type="UNIT").exists())
+
+    def test_dry_run_archive_skips_forum_and_resource_files(self):
+        course_json = self._updated_json()
+        course_json["document_type"] = KinesinLMSCourseExportFormatID.KINESIN_LMS_FORMAT.value
+        resource_uuid = str(uuid.uuid4())
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zp:
+            zp.writestr("course.json", json.dumps(course_json))
+            zp.writestr(f"block_resources/image/{resource_uuid}/diagram.png", b"not really a png")
+        archive.seek(0)
+
+        with patch("kinesinlms.forum.utils.get_forum_service") as mock_get_forum_service:
+            KinesinLMSCourseUpdater().update_course_from_archive(
+                file=archive,
+                course=self.course,
+                options=CourseImportOptions(create_forum_items=True),
+                dry_run=True,
+            )
+
+        mock_get_forum_service.assert_not_called()
+        self.assertFalse(Resource.objects.filter(uuid=resource_uuid).exists())
@@ -169,6 +169,11 @@ urlpatterns = [
         views.CourseDeleteView.as_view(),
         name="course_delete",
     ),
+    path(
+        "course/<int:pk>/clone",
+        views.CourseCloneView.as_view(),
+        name="course_clone",
+    ),
     path(
         "course/<int:course_id>/unit_node/<int:unit_node_id>",
         views.course_edit,
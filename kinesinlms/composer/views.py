@@ -19,7 +19,7 @@ from django.http import (
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils.translation import gettext as _
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView
+from django.views.generic import CreateView, DeleteView, FormView, ListView, UpdateView
 
 from kinesinlms.badges.models import BadgeClass
 from kinesinlms.catalog.models import CourseCatalogDescription
@@ -33,6 +33,7 @@ from kinesinlms.composer.factory import (
 )
 from kinesinlms.composer.forms.catalog import CourseCatalogDescriptionForm
 from kinesinlms.composer.forms.course import (
+    CloneCourseForm,
     CourseForm,
     DeleteCourseForm,
     EditCourseHeaderForm,
@@ -51,9 +52,11 @@ from kinesinlms.composer.models import ComposerSettings, CourseImportTaskResult,
 from kinesinlms.composer.tasks import generate_course_import_task
 from kinesinlms.composer.view_helpers import get_course_edit_tabs
 from kinesinlms.core.decorators import composer_author_required
+from kinesinlms.course.clone import clone_course
 from kinesinlms.course.constants import CourseUnitType, NodeType
 from kinesinlms.course.delete_utils import delete_course, get_exclusive_resources
 from kinesinlms.course.models import Course, CourseNode, CourseUnit
+from kinesinlms.course.nav import course_nav_bulk_edit
 from kinesinlms.course.views import get_course_nav
 from kinesinlms.forum.models import (
     CourseForumGroup,
@@ -264,6 +267,60 @@ class ComposerSettingsView(StaffOrSuperuserRequiredMixin, UpdateView):
         return reverse("composer:settings")
 
 
+class CourseCloneView(SuperuserRequiredMixin, FormView):
+    """
+    Create a new run of a course. The copy is done in the database
+    (see kinesinlms.course.clone) and shares content blocks with the
+    original course where possible.
+    """
+
+    template_name = "composer/course/course_clone.html"
+    form_class = CloneCourseForm
+
+    def dispatch(self, request, *args, **kwargs):
+        self.course = get_object_or_404(Course, id=kwargs["pk"])
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_initial(self):
+        return {"course_slug": self.course.slug}
+
+    def form_valid(self, form):
+        try:
+            result = clone_course(
+                self.course,
+                new_slug=form.cleaned_data["course_slug"],
+                new_run=form.cleaned_data["course_run"],
+                display_name=form.cleaned_data["display_name"],
+            )
+        except ValueError as e:
+            form.add_error(None, str(e))
+            return self.form_invalid(form)
+
+        new_course = result.course
+        logger.info(result.summary())
+        msg = _("Course {} created from {} in {:.2f} seconds. Review its dates and catalog description before release.")
+        messages.add_message(
+            self.request,
+            messages.INFO,
+            msg.format(new_course.token, self.course.token, result.total_time),
+        )
+        for warning in result.warnings:
+            messages.add_message(self.request, messages.WARNING, warning)
+        return HttpResponseRedirect(reverse("composer:course_edit_settings", kwargs={"pk": new_course.id}))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["course"] = self.course
+        context["title"] = f"Create a new run of {self.course.token}"
+        context["breadcrumbs"] = [
+            {
+                "label": f"Edit Course : {self.course.display_name}",
+                "url": reverse("composer:course_edit_settings", args=[self.course.id]),
+            }
+        ]
+        return context
+
+
 class CourseDeleteView(SuperuserRequiredMixin, DeleteView):
     model = Course
     template_name = "composer/course/course_confirm_delete.html"
@@ -1095,10 +1152,10 @@ def delete_module_node_hx(request, course_id: int, pk: int):
         return HttpResponseBadRequest("Can only delete empty MODULE " "nodes with no SECTIONs.")
 
     # Delete node itself...
-    module_node.delete()
+    with course_nav_bulk_edit(course):
+        module_node.delete()
 
     # Rebuild nav and return...
-    delete_course_nav_cache(course.slug, course.run)
     course_nav = get_course_nav(course)
     context = {
         "course": course,
@@ -1123,10 +1180,10 @@ def delete_section_node_hx(request, course_id: int, module_node_id: int, pk: int
         return HttpResponseBadRequest("Can only delete empty SECTION " "nodes with no UNITs.")
 
     # Delete node itself...
-    section_node.delete()
+    with course_nav_bulk_edit(course):
+        section_node.delete()
 
     # Rebuild nav and return...
-    delete_course_nav_cache(course.slug, course.run)
     course_nav = get_course_nav(course)
     context = {
         "course": course,
@@ -1149,17 +1206,17 @@ def delete_unit_node_hx(request, course_id: int, module_node_id: int, section_no
     if unit_node.type != NodeType.UNIT.name:
         return HttpResponseBadRequest("This is not a UNIT node.")
 
-    # Delete attached CourseUnit if this is its only parent...
-    course_unit: Optional[CourseUnit] = unit_node.unit
-    if course_unit and course_unit.course_nodes.count() == 1:
-        # If this node is the CourseUnit's only parent, delete it too.
-        course_unit.delete()
+    with course_nav_bulk_edit(course):
+        # Delete attached CourseUnit if this is its only parent...
+        course_unit: Optional[CourseUnit] = unit_node.unit
+        if course_unit and course_unit.course_nodes.count() == 1:
+            # If this node is the CourseUnit's only parent, delete it too.
+            course_unit.delete()
 
-    # Delete node itself...
-    unit_node.delete()
+        # Delete node itself...
+        unit_node.delete()
 
     # Rebuild nav and return...
-    delete_course_nav_cache(course.slug, course.run)
     course_nav = get_course_nav(course)
     context = {
         "course": course,
@@ -1178,11 +1235,11 @@ def add_module_to_root_node_hx(request, pk: int):
     course = get_object_or_404(Course, id=pk)
     root_node: CourseNode = course.course_root_node
 
-    module_node = create_module_node(root_node=root_node)
+    with course_nav_bulk_edit(course):
+        module_node = create_module_node(root_node=root_node)
     logger.info(f"Created module node: {module_node}")
 
     # Rebuild nav and return...
-    delete_course_nav_cache(course.slug, course.run)
     course_nav = get_course_nav(course)
     context = {
         "course": course,
@@ -1202,11 +1259,11 @@ def add_section_node_to_module_hx(request, course_id: int, module_node_id: int):
     course = get_object_or_404(Course, id=course_id)
     module_node = get_object_or_404(CourseNode, id=module_node_id)
 
-    section_node = create_section_node(module_node=module_node)
+    with course_nav_bulk_edit(course):
+        section_node = create_section_node(module_node=module_node)
     logger.info(f"Created section node: {section_node}")
 
     # Rebuild nav and return...
-    delete_course_nav_cache(course.slug, course.run)
     course_nav = get_course_nav(course)
     context = {
         "course": course,
@@ -1228,11 +1285,11 @@ def add_unit_to_section_hx(request, course_id: int, module_node_id: int, section
     section_node = get_object_or_404(CourseNode, id=section_node_id)
 
     # Add a new Unit Node and CourseUnit
-    unit_node = create_unit_node(course=course, section_node=section_node)
+    with course_nav_bulk_edit(course):
+        unit_node = create_unit_node(course=course, section_node=section_node)
     logger.info(f"Created section node: {unit_node}")
 
     # Rebuild nav and return...
-    delete_course_nav_cache(course.slug, course.run)
     course_nav = get_course_nav(course)
     context = {
         "course": course,
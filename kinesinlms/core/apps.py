@@ -14,3 +14,5 @@ class CoreConfig(AppConfig):
         from allauth.account.forms import ResetPasswordForm
         # Use our no op method to prevent email reset spam
         ResetPasswordForm._send_unknown_account_mail = mock_do_not_send_unknown_account_password_reset_email
+
+        import kinesinlms.core.signals  # noqa: F401
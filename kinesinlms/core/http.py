@@ -0,0 +1,289 @@
+"""
+Shared HTTP layer for external integrations (Discourse, ActiveCampaign, Badgr, AWS).
+
+Each integration gets one long-lived IntegrationSession per process, so
+connections are pooled per host and kept alive between requests rather than
+opened for every API call. Sessions also:
+
+    - apply the integration's default (connect, read) timeout when none is given
+    - keep a circuit breaker per host: after FAILURE_THRESHOLD consecutive
+      failures (connection errors, timeouts or 5xx responses) calls fail fast with
+      IntegrationUnavailable for RECOVERY_SECONDS, after which one trial call is let through
+    - record latency and error counts per host (see get_integration_stats()),
+      and add each call's time to the current request profile (see kinesinlms.core.profiling).
+
+Clients that don't use requests (e.g. boto3) can wrap their calls in
+integration_call() to get the same circuit breaker and metrics.
+
+Configuration is read from settings.INTEGRATION_HTTP, keyed by integration
+name, with any missing values taken from the 'DEFAULT' entry.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from kinesinlms.core.profiling import record_http_call
+
+logger = logging.getLogger(__name__)
+
+DISCOURSE = "discourse"
+ACTIVE_CAMPAIGN = "active_campaign"
+BADGR = "badgr"
+AWS_LAMBDA = "aws_lambda"
+
+DEFAULT_INTEGRATION_HTTP_CONFIG = {
+    "CONNECT_TIMEOUT": 3.05,
+    "READ_TIMEOUT": 15,
+    "POOL_CONNECTIONS": 4,
+    "POOL_MAXSIZE": 10,
+    "FAILURE_THRESHOLD": 5,
+    "RECOVERY_SECONDS": 30,
+    "SLOW_REQUEST_SECONDS": 2,
+}
+
+
+class IntegrationUnavailable(requests.exceptions.ConnectionError):
+    """
+    Raised instead of making a request when the circuit breaker for
+    an integration's host is open.
+    """
+    pass
+
+
+def get_integration_config(name: str) -> Dict:
+    configured = getattr(settings, "INTEGRATION_HTTP", {}) or {}
+    config = dict(DEFAULT_INTEGRATION_HTTP_CONFIG)
+    config.update(configured.get("DEFAULT", {}))
+    config.update(configured.get(name, {}))
+    return config
+
+
+def get_integration_timeout(name: str) -> Tuple[float, float]:
+    config = get_integration_config(name)
+    return config["CONNECT_TIMEOUT"], config["READ_TIMEOUT"]
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# CIRCUIT BREAKER AND METRICS
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class CircuitBreaker:
+    """
+    A simple in-process circuit breaker.
+
+    CLOSED:     calls go through. Consecutive failures are counted.
+    OPEN:       calls are refused until recovery_seconds have passed.
+    HALF_OPEN:  one trial call is let through. Success closes the breaker,
+                failure opens it again.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, failure_threshold: int, recovery_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_seconds:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+@dataclass
+class IntegrationStats:
+    requests: int = 0
+    errors: int = 0
+    rejected: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        if not self.requests:
+            return 0.0
+        return self.total_seconds / self.requests
+
+
+_registry_lock = threading.Lock()
+_sessions: Dict[str, "IntegrationSession"] = {}
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_stats: Dict[Tuple[str, str], IntegrationStats] = {}
+
+
+def _get_breaker(name: str, host: str) -> CircuitBreaker:
+    key = (name, host)
+    with _registry_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            config = get_integration_config(name)
+            breaker = CircuitBreaker(failure_threshold=config["FAILURE_THRESHOLD"],
+                                     recovery_seconds=config["RECOVERY_SECONDS"])
+            _breakers[key] = breaker
+        return breaker
+
+
+def _record(name: str, host: str, seconds: Optional[float], ok: bool = True, rejected: bool = False):
+    with _registry_lock:
+        stats = _stats.setdefault((name, host), IntegrationStats())
+        if rejected:
+            stats.rejected += 1
+            return
+        stats.requests += 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        if not ok:
+            stats.errors += 1
+
+    if seconds > get_integration_config(name)["SLOW_REQUEST_SECONDS"]:
+        logger.warning(f"Slow {name} request to {host}: {seconds:.2f}s")
+
+
+def get_integration_stats() -> Dict[str, Dict]:
+    """
+    Latency and error counts for each integration host used by this process.
+
+    Returns:
+        Dictionary keyed by "<integration>:<host>"
+    """
+    with _registry_lock:
+        return {
+            f"{name}:{host}": {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "rejected": stats.rejected,
+                "mean_seconds": stats.mean_seconds,
+                "max_seconds": stats.max_seconds,
+                "circuit": _breakers[(name, host)].state if (name, host) in _breakers else CircuitBreaker.CLOSED,
+            }
+            for (name, host), stats in _stats.items()
+        }
+
+
+def _open_call(name: str, host: str) -> CircuitBreaker:
+    breaker = _get_breaker(name, host)
+    if not breaker.allow_request():
+        _record(name, host, None, rejected=True)
+        raise IntegrationUnavailable(f"{name} at {host} is unavailable (circuit open)")
+    return breaker
+
+
+def _close_call(name: str, host: str, breaker: CircuitBreaker, start: float, ok: bool):
+    if ok:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+    seconds = time.monotonic() - start
+    _record(name, host, seconds, ok=ok)
+    record_http_call(seconds)
+
+
+@contextmanager
+def integration_call(name: str, host: str):
+    """
+    Run a call to an external service through the circuit breaker for
+    (name, host) and record its latency. Any exception raised inside the
+    block counts as a failure.
+
+    Raises:
+        IntegrationUnavailable if the circuit breaker is open.
+    """
+    breaker = _open_call(name, host)
+    start = time.monotonic()
+    try:
+        yield
+    except Exception:
+        _close_call(name, host, breaker, start, ok=False)
+        raise
+    _close_call(name, host, breaker, start, ok=True)
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# SESSIONS
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class IntegrationSession(requests.Session):
+    """
+    A requests Session for one integration. Use get_integration_session()
+    rather than creating these directly, so the pool is shared.
+    """
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        config = get_integration_config(name)
+        self.default_timeout = (config["CONNECT_TIMEOUT"], config["READ_TIMEOUT"])
+        # No automatic retries at this level: each integration decides what's safe to retry.
+        adapter = HTTPAdapter(pool_connections=config["POOL_CONNECTIONS"],
+                              pool_maxsize=config["POOL_MAXSIZE"],
+                              max_retries=0)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.default_timeout
+        host = urlparse(url).netloc
+        breaker = _open_call(self.name, host)
+        start = time.monotonic()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            _close_call(self.name, host, breaker, start, ok=False)
+            raise
+        # Server errors count as failures, but the response is still returned to the caller.
+        _close_call(self.name, host, breaker, start, ok=response.status_code < 500)
+        return response
+
+
+def get_integration_session(name: str) -> IntegrationSession:
+    with _registry_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = IntegrationSession(name)
+            _sessions[name] = session
+        return session
+
+
+def reset_integration_http():
+    """
+    Close all integration sessions and clear circuit breakers
+    and metrics. Mainly for tests.
+    """
+    with _registry_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _breakers.clear()
+        _stats.clear()
@@ -0,0 +1,47 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from kinesinlms.core.profiling import get_profile_report, reset_profile_report
+
+logger = logging.getLogger(__name__)
+
+SORT_CHOICES = ["total_ms", "db_ms", "queries", "http_ms", "requests", "over_budget",
+                "mean_total_ms", "mean_db_ms", "mean_queries", "mean_http_ms"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the per-view request profiling counters (query count, db, cache and http time) "
+        "aggregated by RequestProfilingMiddleware."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sort", choices=SORT_CHOICES, default="total_ms",
+                            help="Counter to sort views by (descending)")
+        parser.add_argument("--limit", type=int, default=50,
+                            help="Number of views to show")
+        parser.add_argument("--reset", action="store_true",
+                            help="Clear the counters after showing them")
+
+    def handle(self, *args, **options):
+        report = get_profile_report()
+        if not report:
+            self.stdout.write("No profiled requests recorded. Is REQUEST_PROFILING enabled?")
+        else:
+            report.sort(key=lambda row: row[options["sort"]], reverse=True)
+            self.stdout.write(f"{'view':<50} {'reqs':>7} {'over':>6} {'queries':>8} {'db ms':>8} "
+                              f"{'hit %':>6} {'http':>6} {'http ms':>8} {'total ms':>9}   (mean per request)")
+            for row in report[:options["limit"]]:
+                lookups = row["cache_hits"] + row["cache_misses"]
+                hit_percent = 100 * row["cache_hits"] / lookups if lookups else 0
+                self.stdout.write(
+                    f"{row['view_name'][:50]:<50} {row['requests']:>7} {row['over_budget']:>6} "
+                    f"{row['mean_queries']:>8.1f} {row['mean_db_ms']:>8.1f} {hit_percent:>6.0f} "
+                    f"{row['mean_http_calls']:>6.1f} {row['mean_http_ms']:>8.1f} {row['mean_total_ms']:>9.1f}"
+                )
+
+        if options["reset"]:
+            reset_profile_report()
+            self.stdout.write("Counters reset.")
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -1,4 +1,4 @@
-from django.contrib.sites.models import Site
+from kinesinlms.core.site_cache import get_cached_site
 
 
 class SiteMiddleware:
@@ -7,6 +7,7 @@ class SiteMiddleware:
 
     def __call__(self, request):
         # Set the 'site' context variable
-        request.site = Site.objects.get_current()
+        # (Cached per process. See kinesinlms.core.site_cache.)
+        request.site = get_cached_site(check_version=True)
         response = self.get_response(request)
         return response
@@ -0,0 +1,359 @@
+"""
+Request profiling: how many SQL queries, and how much time in the database,
+the cache and external HTTP calls, each view uses.
+
+RequestProfilingMiddleware profiles a sample of requests (SAMPLE_RATE) and for each one records:
+
+    - number of SQL queries and total time spent running them
+    - cache hits and misses (cache.get() and cache.get_many())
+    - number of calls to external integrations and total time spent
+      on them (see kinesinlms.core.http)
+
+If a request goes over any of the configured budgets it's logged as a warning,
+with its numbers. The numbers are also added to per-view counters in the shared
+cache, so they're aggregated across processes. Use the request_profile_report
+management command to see (or reset) them.
+
+Configuration is read from settings.REQUEST_PROFILING, with any missing values
+taken from DEFAULT_REQUEST_PROFILING_CONFIG. Profiling is off by default.
+"""
+
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUEST_PROFILING_CONFIG = {
+    "ENABLED": False,
+    # Fraction of requests to profile (0.0 to 1.0).
+    "SAMPLE_RATE": 0.05,
+    # A profiled request that goes over any of these is logged.
+    "QUERY_BUDGET": 50,
+    "DB_TIME_BUDGET_MS": 500,
+    "HTTP_TIME_BUDGET_MS": 1000,
+    # Add profiled requests to per-view counters in the shared cache.
+    "AGGREGATE": True,
+}
+
+# Counters aggregated per view. Times are stored in whole milliseconds.
+PROFILE_COUNTERS = [
+    "requests",
+    "over_budget",
+    "queries",
+    "db_ms",
+    "cache_hits",
+    "cache_misses",
+    "http_calls",
+    "http_ms",
+    "total_ms",
+]
+
+PROFILE_VIEWS_CACHE_KEY = "request_profile_views"
+
+
+def get_request_profiling_config() -> Dict:
+    config = dict(DEFAULT_REQUEST_PROFILING_CONFIG)
+    config.update(getattr(settings, "REQUEST_PROFILING", {}) or {})
+    return config
+
+
+@dataclass
+class RequestProfile:
+    view_name: str = ""
+    queries: int = 0
+    db_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    http_calls: int = 0
+    http_seconds: float = 0.0
+    total_seconds: float = 0.0
+    slowest_queries: List[str] = field(default_factory=list)
+
+    def get_exceeded_budgets(self, config: Dict) -> List[str]:
+        """
+        Returns:
+            Descriptions of the budgets this request went over.
+        """
+        exceeded = []
+        if self.queries > config["QUERY_BUDGET"]:
+            exceeded.append(f"{self.queries} queries > {config['QUERY_BUDGET']}")
+        if self.db_seconds * 1000 > config["DB_TIME_BUDGET_MS"]:
+            exceeded.append(f"{self.db_seconds * 1000:.0f}ms in db > {config['DB_TIME_BUDGET_MS']}ms")
+        if self.http_seconds * 1000 > config["HTTP_TIME_BUDGET_MS"]:
+            exceeded.append(f"{self.http_seconds * 1000:.0f}ms in http > {config['HTTP_TIME_BUDGET_MS']}ms")
+        return exceeded
+
+    def summary(self) -> str:
+        return (f"{self.queries} queries ({self.db_seconds * 1000:.0f}ms), "
+                f"cache {self.cache_hits} hits / {self.cache_misses} misses, "
+                f"{self.http_calls} http calls ({self.http_seconds * 1000:.0f}ms), "
+                f"total {self.total_seconds * 1000:.0f}ms")
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+# Number of slowest queries kept for the budget warning.
+_SLOWEST_QUERIES_KEPT = 3
+
+
+def get_current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+class _QueryTimer:
+    """
+    Database execute wrapper (see connection.execute_wrapper()) that
+    counts and times every query run while a profile is active.
+    """
+
+    def __init__(self, profile: RequestProfile):
+        self.profile = profile
+        self._slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.monotonic() - start
+            self.profile.queries += 1
+            self.profile.db_seconds += seconds
+            self._slowest.append((seconds, sql))
+            self._slowest.sort(key=lambda item: item[0], reverse=True)
+            del self._slowest[_SLOWEST_QUERIES_KEPT:]
+            self.profile.slowest_queries = [f"{item[0] * 1000:.0f}ms: {item[1][:200]}" for item in self._slowest]
+
+
+@contextmanager
+def profile_block(view_name: str = ""):
+    """
+    Profile everything run inside the block (in this thread).
+
+    Yields:
+        The RequestProfile being filled in.
+    """
+    install_cache_instrumentation()
+    profile = RequestProfile(view_name=view_name)
+    token = _current_profile.set(profile)
+    timer = _QueryTimer(profile)
+    start = time.monotonic()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            yield profile
+    finally:
+        profile.total_seconds = time.monotonic() - start
+        _current_profile.reset(token)
+
+
+def record_cache_lookup(hits: int = 0, misses: int = 0):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.cache_hits += hits
+        profile.cache_misses += misses
+
+
+def record_http_call(seconds: float):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.http_calls += 1
+        profile.http_seconds += seconds
+
+
+_MISSING = object()
+
+
+def install_cache_instrumentation():
+    """
+    Wrap get() and get_many() of the default cache backend's class so
+    lookups made while a profile is active are counted as hits or misses.
+    Only done once per class. Lookups outside a profile just pass through.
+    """
+    backend_class = type(caches["default"])
+    if getattr(backend_class, "_request_profiling_installed", False):
+        return
+
+    original_get = backend_class.get
+    original_get_many = backend_class.get_many
+
+    def get(self, key, default=None, *args, **kwargs):
+        if _current_profile.get() is None:
+            return original_get(self, key, default, *args, **kwargs)
+        value = original_get(self, key, _MISSING, *args, **kwargs)
+        if value is _MISSING:
+            record_cache_lookup(misses=1)
+            return default
+        record_cache_lookup(hits=1)
+        return value
+
+    def get_many(self, keys, *args, **kwargs):
+        if _current_profile.get() is None:
+            return original_get_many(self, keys, *args, **kwargs)
+        # Materialize first, as keys may be a generator that get_many() would use up.
+        keys = list(keys)
+        values = original_get_many(self, keys, *args, **kwargs)
+        record_cache_lookup(hits=len(values), misses=len(keys) - len(values))
+        return values
+
+    backend_class.get = get
+    backend_class.get_many = get_many
+    backend_class._request_profiling_installed = True
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# AGGREGATED COUNTERS
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def _counter_key(view_name: str, counter: str) -> str:
+    return f"request_profile:{view_name}:{counter}"
+
+
+@contextmanager
+def cache_lock(key: str, timeout: int = 5, attempts: int = 5):
+    """
+    A short-lived lock in the shared cache, for read-modify-write updates of a
+    cache entry from several processes. Yields whether the lock was acquired,
+    so callers can skip (and retry on a later call) rather than block.
+    """
+    lock_key = f"{key}:lock"
+    acquired = False
+    for attempt in range(attempts):
+        if cache.add(lock_key, True, timeout):
+            acquired = True
+            break
+        time.sleep(0.01 * (attempt + 1))
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(lock_key)
+
+
+def add_cached_name(key: str, name: str):
+    """
+    Add a name to a sorted list of names kept in the cache under key
+    (e.g. the views we have counters for).
+
+    Names are only added when missing, so the lock is rarely needed. If it
+    can't be acquired the name isn't added this time, but will be on the
+    caller's next attempt.
+    """
+    if name in (cache.get(key) or []):
+        return
+    with cache_lock(key) as acquired:
+        if not acquired:
+            logger.warning(f"Could not lock {key} to add {name}. Will try again next time.")
+            return
+        names = cache.get(key) or []
+        if name not in names:
+            cache.set(key, sorted(set(names) | {name}), None)
+
+
+def record_profile(profile: RequestProfile, over_budget: bool = False):
+    """
+    Add a profiled request to its view's counters in the shared cache.
+    """
+    values = {
+        "requests": 1,
+        "over_budget": 1 if over_budget else 0,
+        "queries": profile.queries,
+        "db_ms": int(profile.db_seconds * 1000),
+        "cache_hits": profile.cache_hits,
+        "cache_misses": profile.cache_misses,
+        "http_calls": profile.http_calls,
+        "http_ms": int(profile.http_seconds * 1000),
+        "total_ms": int(profile.total_seconds * 1000),
+    }
+    # Don't count the counters' own cache traffic in a profile that's still active.
+    token = _current_profile.set(None)
+    try:
+        add_cached_name(PROFILE_VIEWS_CACHE_KEY, profile.view_name)
+        for counter, value in values.items():
+            key = _counter_key(profile.view_name, counter)
+            cache.add(key, 0, None)
+            if value:
+                cache.incr(key, value)
+    except Exception:
+        logger.exception(f"Could not record request profile for {profile.view_name}")
+    finally:
+        _current_profile.reset(token)
+
+
+def get_profile_report() -> List[Dict]:
+    """
+    Returns:
+        Aggregated counters for each profiled view, plus per-request averages.
+    """
+    report = []
+    view_names = cache.get(PROFILE_VIEWS_CACHE_KEY) or []
+    for view_name in view_names:
+        keys = {counter: _counter_key(view_name, counter) for counter in PROFILE_COUNTERS}
+        stored = cache.get_many(list(keys.values()))
+        row = {counter: stored.get(key, 0) or 0 for counter, key in keys.items()}
+        if not row["requests"]:
+            continue
+        row["view_name"] = view_name
+        for counter in ["queries", "db_ms", "cache_hits", "cache_misses", "http_calls", "http_ms", "total_ms"]:
+            row[f"mean_{counter}"] = row[counter] / row["requests"]
+        report.append(row)
+    return report
+
+
+def reset_profile_report():
+    view_names = cache.get(PROFILE_VIEWS_CACHE_KEY) or []
+    cache.delete_many([
+        _counter_key(view_name, counter)
+        for view_name in view_names
+        for counter in PROFILE_COUNTERS
+    ])
+    cache.delete(PROFILE_VIEWS_CACHE_KEY)
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# MIDDLEWARE
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def get_view_name(request) -> str:
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return "unresolved"
+    return resolver_match.view_name or resolver_match._func_path
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile a sample of requests. See module docstring.
+    Should be placed near the top of MIDDLEWARE so it covers the other middleware too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_request_profiling_config()
+        if not config["ENABLED"] or random.random() >= config["SAMPLE_RATE"]:
+            return self.get_response(request)
+
+        with profile_block() as profile:
+            response = self.get_response(request)
+        profile.view_name = get_view_name(request)
+
+        exceeded = profile.get_exceeded_budgets(config)
+        if exceeded:
+            slowest = "\n    ".join(profile.slowest_queries)
+            logger.warning(f"Request over budget ({'; '.join(exceeded)}): {request.method} {request.path} "
+                           f"view {profile.view_name} status {response.status_code}: {profile.summary()}\n"
+                           f"  Slowest queries:\n    {slowest}")
+        if config["AGGREGATE"]:
+            record_profile(profile, over_budget=bool(exceeded))
+        return response
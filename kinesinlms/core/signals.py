@@ -0,0 +1,35 @@
+import logging
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.db.models.signals import post_delete, post_save
+
+from kinesinlms.core.site_cache import invalidate_site_config
+from kinesinlms.core.task_metrics import task_finished, task_published, task_started
+
+logger = logging.getLogger(__name__)
+
+# Models that make up the site configuration cached in kinesinlms.core.site_cache.
+# (Referenced by label so core doesn't import the apps that define them.)
+SITE_CONFIG_MODELS = [
+    "sites.Site",
+    "core.SiteProfile",
+    "forum.ForumProvider",
+    "badges.BadgeProvider",
+    "email_automation.EmailAutomationProvider",
+]
+
+
+# noinspection PyUnusedLocal
+def site_config_changed(sender, **kwargs):
+    invalidate_site_config()
+
+
+for model_label in SITE_CONFIG_MODELS:
+    post_save.connect(site_config_changed, sender=model_label, dispatch_uid=f"site_config_saved_{model_label}")
+    post_delete.connect(site_config_changed, sender=model_label, dispatch_uid=f"site_config_deleted_{model_label}")
+
+
+# Celery task metrics (see kinesinlms.core.task_metrics).
+before_task_publish.connect(task_published, dispatch_uid="task_metrics_published")
+task_prerun.connect(task_started, dispatch_uid="task_metrics_started")
+task_postrun.connect(task_finished, dispatch_uid="task_metrics_finished")
@@ -0,0 +1,144 @@
+"""
+Process-local cache of the current site's configuration.
+
+The current Site, its SiteProfile and its providers (forum, badge, email
+automation) are read by middleware, context processors, template tags,
+views and services, often several times per request. They change very
+rarely (only when an admin edits them), so each process keeps one copy.
+
+Providers are the Site's reverse one-to-one relations, so they're loaded
+lazily on our cached Site instance and cached on it by Django (including
+'not configured'). Each is read from the database at most once per process
+until the configuration changes.
+
+When any of these models is saved or deleted (see core/signals.py), the
+process that made the change drops its copy right away and bumps a version
+number in the shared cache. Other processes (web and celery workers) compare
+that version with their own and drop their copy when it differs: SiteMiddleware
+checks on every request, other callers at most every SITE_CONFIG_CHECK_SECONDS.
+
+We only keep a copy that was loaded outside a transaction. Data read inside a
+transaction might not be committed yet (and might never be, e.g. in tests),
+so it's used for that call only. SiteMiddleware runs before the view's
+transaction (ATOMIC_REQUESTS) starts, so it's the one that usually loads the copy.
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+SITE_CONFIG_VERSION_CACHE_KEY = "site_config_version"
+
+# How often callers outside a request check whether another process changed the site configuration.
+SITE_CONFIG_CHECK_SECONDS = 5
+
+_lock = threading.Lock()
+_state = {
+    "site": None,
+    "version": None,
+    "checked_at": 0.0,
+}
+
+
+def get_cached_site(check_version: bool = False) -> Site:
+    """
+    Get the current Site, from the process-local cache when possible.
+
+    Args:
+        check_version:  Check the shared configuration version now,
+                        rather than at most every SITE_CONFIG_CHECK_SECONDS.
+
+    Returns:
+        Site instance. Its providers (e.g. site.forum_provider) are cached on it.
+    """
+    _check_version(force=check_version)
+    site = _state["site"]
+    if site is not None:
+        return site
+
+    site = Site.objects.get(id=settings.SITE_ID)
+    if _can_store():
+        with _lock:
+            if _state["site"] is None:
+                _state["site"] = site
+            site = _state["site"]
+    return site
+
+
+def get_site_provider(related_name: str):
+    """
+    Get one of the current site's providers.
+
+    Args:
+        related_name:   Name of the provider's relation on Site,
+                        e.g. 'forum_provider' or 'badge_provider'.
+
+    Returns:
+        The provider, or None if the site doesn't have one.
+    """
+    return getattr(get_cached_site(), related_name, None)
+
+
+def clear_site_cache():
+    """
+    Drop this process's copy of the site configuration.
+    """
+    with _lock:
+        _state["site"] = None
+    # Django keeps its own copy for Site.objects.get_current().
+    Site.objects.clear_cache()
+
+
+def invalidate_site_config():
+    """
+    Drop this process's copy of the site configuration and tell other
+    processes to drop theirs, now and again once the current transaction commits.
+    """
+    clear_site_cache()
+    _bump_version()
+
+    def _on_commit():
+        clear_site_cache()
+        _bump_version()
+
+    transaction.on_commit(_on_commit)
+
+
+def _bump_version():
+    version = uuid.uuid4().hex
+    try:
+        cache.set(SITE_CONFIG_VERSION_CACHE_KEY, version, None)
+    except Exception:
+        logger.exception("Could not update site config version in cache")
+        return
+    with _lock:
+        _state["version"] = version
+
+
+def _check_version(force: bool = False):
+    current_time = time.monotonic()
+    if not force and current_time - _state["checked_at"] < SITE_CONFIG_CHECK_SECONDS:
+        return
+    try:
+        version = cache.get(SITE_CONFIG_VERSION_CACHE_KEY)
+    except Exception:
+        logger.exception("Could not read site config version from cache")
+        return
+    with _lock:
+        _state["checked_at"] = current_time
+        if version != _state["version"]:
+            _state["version"] = version
+            _state["site"] = None
+            Site.objects.clear_cache()
+
+
+def _can_store() -> bool:
+    return not connection.in_atomic_block
@@ -0,0 +1,305 @@
+"""
+Celery task metrics: how long each type of task waits in the queue,
+how long it runs, and how often it's retried or fails.
+
+Handlers for Celery's signals (connected in kinesinlms.core.signals) record, per task name:
+
+    - published:    tasks sent to the broker (including retries)
+    - started:      tasks picked up by a worker
+    - wait time:    from being due (sent to the broker, or its eta/countdown if
+                    it was scheduled for later) to being picked up
+    - runtime:      from being picked up to finishing
+    - succeeded, failed and retried: how each run ended
+    - queued:       published but not yet started, i.e. the task's share of the queue
+
+The counters are kept in the shared cache (Redis) in hourly buckets, so they're
+aggregated across web and worker processes, and the management "Task metrics"
+page can show the last few hours. Buckets expire after RETENTION_HOURS.
+
+"queued" isn't bucketed: it's a running count of this task's messages waiting
+in the broker. Tasks that are revoked or expire before running are never
+started, so it can drift upwards over time; resetting the metrics clears it.
+
+Configuration is read from settings.TASK_METRICS, with any missing values
+taken from DEFAULT_TASK_METRICS_CONFIG. Metrics are off by default.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from kinesinlms.core.profiling import add_cached_name, cache_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_METRICS_CONFIG = {
+    "ENABLED": False,
+    # How long hourly buckets are kept.
+    "RETENTION_HOURS": 48,
+}
+
+# Counters kept per task name in each hourly bucket. Times are stored in whole milliseconds.
+TASK_METRIC_COUNTERS = [
+    "published",
+    "started",
+    "succeeded",
+    "failed",
+    "retried",
+    # Number of started tasks we know the wait time of (only tasks published
+    # while metrics were enabled carry their publish time).
+    "waits",
+    "wait_ms",
+    "max_wait_ms",
+    "runtime_ms",
+    "max_runtime_ms",
+]
+
+TASK_NAMES_CACHE_KEY = "task_metrics_tasks"
+
+# Message header holding the time (epoch seconds) a task was published.
+PUBLISHED_AT_HEADER = "kinesinlms_published_at"
+
+BUCKET_FORMAT = "%Y%m%d%H"
+
+# How long the management page waits for the broker before giving up on its queue length.
+BROKER_CONNECT_TIMEOUT_SECONDS = 2
+
+# Start times of tasks running in this worker process, by task id.
+_started_at: Dict[str, float] = {}
+
+
+def get_task_metrics_config() -> Dict:
+    config = dict(DEFAULT_TASK_METRICS_CONFIG)
+    config.update(getattr(settings, "TASK_METRICS", {}) or {})
+    return config
+
+
+def _bucket(at: Optional[datetime] = None) -> str:
+    return (at or datetime.now(timezone.utc)).strftime(BUCKET_FORMAT)
+
+
+def _counter_key(bucket: str, task_name: str, counter: str) -> str:
+    return f"task_metrics:{bucket}:{task_name}:{counter}"
+
+
+def _queued_key(task_name: str) -> str:
+    return f"task_metrics:queued:{task_name}"
+
+
+def _record(task_name: str, **values: int):
+    """
+    Add values to a task's counters in the current hourly bucket.
+    Counters named max_* keep the largest value seen instead.
+    """
+    config = get_task_metrics_config()
+    timeout = config["RETENTION_HOURS"] * 60 * 60
+    bucket = _bucket()
+    try:
+        add_cached_name(TASK_NAMES_CACHE_KEY, task_name)
+        for counter, value in values.items():
+            key = _counter_key(bucket, task_name, counter)
+            if counter.startswith("max_"):
+                _record_max(key, value, timeout)
+                continue
+            cache.add(key, 0, timeout)
+            if value:
+                cache.incr(key, value)
+    except Exception:
+        logger.exception(f"Could not record task metrics for {task_name}")
+
+
+def _record_max(key: str, value: int, timeout: int):
+    """
+    Keep the larger of value and the stored value. A new maximum is
+    written under a lock so a concurrent, smaller one can't overwrite it.
+    """
+    if value <= (cache.get(key) or 0):
+        return
+    with cache_lock(key) as acquired:
+        if not acquired:
+            # Rare, and only for a short moment: losing one sample of a maximum is acceptable.
+            logger.warning(f"Could not lock {key} to record {value}.")
+            return
+        if value > (cache.get(key) or 0):
+            cache.set(key, value, timeout)
+
+
+def _adjust_queued(task_name: str, delta: int):
+    key = _queued_key(task_name)
+    try:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+    except Exception:
+        logger.exception(f"Could not update queued count for {task_name}")
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# SIGNAL HANDLERS
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# noinspection PyUnusedLocal
+def task_published(sender=None, headers=None, **kwargs):
+    """
+    before_task_publish handler. Runs in the process sending the task
+    (sender is the task name). Stamps the message with the publish time.
+    """
+    if not get_task_metrics_config()["ENABLED"] or headers is None:
+        return
+    headers[PUBLISHED_AT_HEADER] = time.time()
+    _record(sender, published=1)
+    _adjust_queued(sender, 1)
+
+
+def _get_published_at(task) -> Optional[float]:
+    request = task.request
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+    if published_at is None:
+        published_at = (getattr(request, "headers", None) or {}).get(PUBLISHED_AT_HEADER)
+    return published_at
+
+
+def _get_eta(task) -> Optional[float]:
+    """
+    Returns:
+        The time (epoch seconds) the task was scheduled to run at with
+        eta or countdown (which includes retries), or None if it wasn't.
+    """
+    eta = getattr(task.request, "eta", None)
+    if not eta:
+        return None
+    try:
+        if not isinstance(eta, datetime):
+            eta = datetime.fromisoformat(eta)
+    except (TypeError, ValueError):
+        logger.warning(f"Could not parse eta {eta!r} of task {task.name}")
+        return None
+    if eta.tzinfo is None:
+        eta = eta.replace(tzinfo=timezone.utc)
+    return eta.timestamp()
+
+
+# noinspection PyUnusedLocal
+def task_started(sender=None, task_id=None, task=None, **kwargs):
+    """
+    task_prerun handler. Runs in the worker, just before the task runs.
+    """
+    if not get_task_metrics_config()["ENABLED"] or task is None:
+        return
+    _started_at[task_id] = time.monotonic()
+    values = {"started": 1}
+    published_at = _get_published_at(task)
+    if published_at is not None:
+        # A task scheduled for later isn't waiting on the queue until it's due.
+        due_at = max(float(published_at), _get_eta(task) or 0)
+        wait_ms = max(0, int((time.time() - due_at) * 1000))
+        values.update(waits=1, wait_ms=wait_ms, max_wait_ms=wait_ms)
+        # Only tasks stamped when published were counted as queued. (Tasks run
+        # eagerly, or published before metrics were enabled, aren't stamped.)
+        _adjust_queued(task.name, -1)
+    _record(task.name, **values)
+
+
+# noinspection PyUnusedLocal
+def task_finished(sender=None, task_id=None, task=None, state=None, **kwargs):
+    """
+    task_postrun handler. Runs in the worker, after the task returns or raises.
+    """
+    started_at = _started_at.pop(task_id, None)
+    if not get_task_metrics_config()["ENABLED"] or task is None:
+        return
+    values = {}
+    if started_at is not None:
+        runtime_ms = int((time.monotonic() - started_at) * 1000)
+        values.update(runtime_ms=runtime_ms, max_runtime_ms=runtime_ms)
+    if state == "SUCCESS":
+        values["succeeded"] = 1
+    elif state == "RETRY":
+        values["retried"] = 1
+    elif state == "FAILURE":
+        values["failed"] = 1
+    _record(task.name, **values)
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# REPORT
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def get_task_metrics_report(hours: int = 24) -> List[Dict]:
+    """
+    Args:
+        hours:      How many hourly buckets (including the current one) to add up.
+
+    Returns:
+        Counters for each task name over the last `hours` hours,
+        plus means, failure rate and current queued count.
+    """
+    now = datetime.now(timezone.utc)
+    buckets = [_bucket(now - timedelta(hours=offset)) for offset in range(hours)]
+    report = []
+    for task_name in cache.get(TASK_NAMES_CACHE_KEY) or []:
+        keys = [
+            (counter, _counter_key(bucket, task_name, counter))
+            for bucket in buckets
+            for counter in TASK_METRIC_COUNTERS
+        ]
+        stored = cache.get_many([key for _, key in keys])
+        row = {counter: 0 for counter in TASK_METRIC_COUNTERS}
+        for counter, key in keys:
+            value = stored.get(key) or 0
+            if counter.startswith("max_"):
+                row[counter] = max(row[counter], value)
+            else:
+                row[counter] += value
+        row["queued"] = max(0, cache.get(_queued_key(task_name)) or 0)
+        if not (row["published"] or row["started"] or row["queued"]):
+            continue
+        finished = row["succeeded"] + row["failed"] + row["retried"]
+        row["task_name"] = task_name
+        row["mean_wait_ms"] = row["wait_ms"] / row["waits"] if row["waits"] else 0
+        row["mean_runtime_ms"] = row["runtime_ms"] / finished if finished else 0
+        row["failure_rate"] = row["failed"] / finished if finished else 0
+        report.append(row)
+    return report
+
+
+def reset_task_metrics():
+    task_names = cache.get(TASK_NAMES_CACHE_KEY) or []
+    config = get_task_metrics_config()
+    now = datetime.now(timezone.utc)
+    buckets = [_bucket(now - timedelta(hours=offset)) for offset in range(config["RETENTION_HOURS"] + 1)]
+    cache.delete_many([
+        _counter_key(bucket, task_name, counter)
+        for task_name in task_names
+        for bucket in buckets
+        for counter in TASK_METRIC_COUNTERS
+    ] + [_queued_key(task_name) for task_name in task_names])
+    cache.delete(TASK_NAMES_CACHE_KEY)
+
+
+def get_broker_queue_length(queue_name: str = None) -> Optional[int]:
+    """
+    Returns:
+        Number of messages waiting in a broker queue (the default
+        queue if not given), or None if the broker can't be reached.
+    """
+    from kombu.exceptions import ChannelError
+
+    from config import celery_app
+
+    queue_name = queue_name or celery_app.conf.task_default_queue
+    try:
+        with celery_app.connection_for_read(connect_timeout=BROKER_CONNECT_TIMEOUT_SECONDS) as connection:
+            # Fail fast rather than going through kombu's connection retry loop,
+            # so an unreachable broker doesn't hold up the page.
+            connection.ensure_connection(max_retries=1, interval_start=0, timeout=BROKER_CONNECT_TIMEOUT_SECONDS)
+            return connection.default_channel.queue_declare(queue=queue_name, passive=True).message_count
+    except ChannelError:
+        # The Redis transport reports an empty queue as not found.
+        return 0
+    except Exception:
+        logger.exception(f"Could not get length of broker queue {queue_name}")
+        return None
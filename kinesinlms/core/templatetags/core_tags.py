@@ -4,13 +4,13 @@ from typing import Optional
 from django import template
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.sites.models import Site
 from django.contrib.sites.shortcuts import get_current_site
 from django.template import Context, Template
 from django.utils.safestring import mark_safe
 from markdownify.templatetags.markdownify import markdownify
 
 from config.settings.base import ACCEPT_ANALYTICS_COOKIE_NAME
+from kinesinlms.core.site_cache import get_cached_site
 from kinesinlms.course.models import CourseUnit
 from kinesinlms.learning_library.constants import ContentFormatType
 from kinesinlms.learning_library.models import Block, Resource, ResourceType
@@ -66,14 +66,14 @@ def is_analytics_cookies_accepted(context):
 
 @register.simple_tag
 def site_url() -> str:
-    current_site = Site.objects.get_current()
+    current_site = get_cached_site()
     url = f"https://{current_site.domain}"
     return url
 
 
 @register.simple_tag
 def site_domain() -> str:
-    current_site = Site.objects.get_current()
+    current_site = get_cached_site()
     return current_site.domain
 
 
@@ -93,7 +93,7 @@ def site_name(context) -> Optional[str]:
 
 @register.simple_tag()
 def newsletter_signup_url():
-    site = Site.objects.get_current()
+    site = get_cached_site()
     site_profile = getattr(site, "profile", None)
     if site_profile and site_profile.newsletter_signup_url:
         return site_profile.newsletter_signup_url
@@ -102,7 +102,7 @@ def newsletter_signup_url():
 
 @register.simple_tag()
 def educators_newsletter_signup_url():
-    site = Site.objects.get_current()
+    site = get_cached_site()
     site_profile = getattr(site, "profile", None)
     if site_profile and site_profile.educators_newsletter_signup_url:
         return site_profile.educators_newsletter_signup_url
@@ -111,7 +111,7 @@ def educators_newsletter_signup_url():
 
 @register.simple_tag()
 def facebook_page_url() -> Optional[str]:
-    site = Site.objects.get_current()
+    site = get_cached_site()
     site_profile = getattr(site, "profile", None)
     if site_profile and site_profile.facebook_url:
         return site_profile.facebook_url
@@ -120,7 +120,7 @@ def facebook_page_url() -> Optional[str]:
 
 @register.simple_tag()
 def twitter_username() -> Optional[str]:
-    site = Site.objects.get_current()
+    site = get_cached_site()
     site_profile = getattr(site, "profile", None)
     if site_profile and site_profile.twitter_username:
         return site_profile.twitter_username
@@ -129,7 +129,7 @@ def twitter_username() -> Optional[str]:
 
 @register.simple_tag()
 def twitter_page_url() -> Optional[str]:
-    site = Site.objects.get_current()
+    site = get_cached_site()
     site_profile = getattr(site, "profile", None)
     if site_profile:
         username = site_profile.twitter_username
@@ -152,7 +152,7 @@ def support_email() -> Optional[str]:
     Otherwise, return the basic contact email, if available.
     """
     try:
-        site = Site.objects.get_current()
+        site = get_cached_site()
         site_profile = getattr(site, "profile", None)
         if site_profile and site_profile.support_email:
             return site_profile.support_email
@@ -240,21 +240,21 @@ def block_resource_url(context, block_resource_slug: str) -> str:
 
 @register.simple_tag
 def get_badge_provider_enabled():
-    current_site = Site.objects.get_current()
+    current_site = get_cached_site()
     enabled = hasattr(current_site, "badge_provider") and current_site.badge_provider.active
     return enabled
 
 
 @register.simple_tag
 def get_email_automation_provider_enabled():
-    current_site = Site.objects.get_current()
+    current_site = get_cached_site()
     enabled = hasattr(current_site, "email_automation_provider") and current_site.email_automation_provider.active
     return enabled
 
 
 @register.simple_tag
 def get_forum_provider_enabled():
-    current_site = Site.objects.get_current()
+    current_site = get_cached_site()
     enabled = hasattr(current_site, "forum_provider") and current_site.forum_provider.active
     return enabled
 
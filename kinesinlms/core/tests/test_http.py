@@ -0,0 +1,88 @@
+"""
+Test the shared integration HTTP layer against a local stub server.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from kinesinlms.core.http import (
+    IntegrationUnavailable,
+    get_integration_session,
+    get_integration_stats,
+    reset_integration_http,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so connections are kept alive between requests.
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests += 1
+        self.server.client_ports.add(self.client_address[1])
+        if self.path == "/slow":
+            time.sleep(0.5)
+        status = 500 if self.path == "/error" else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(INTEGRATION_HTTP={
+    "DEFAULT": {"CONNECT_TIMEOUT": 1, "READ_TIMEOUT": 0.2, "FAILURE_THRESHOLD": 2, "RECOVERY_SECONDS": 60},
+})
+class TestIntegrationHTTP(SimpleTestCase):
+
+    def setUp(self):
+        reset_integration_http()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.requests = 0
+        self.server.client_ports = set()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.host = f"127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        reset_integration_http()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_reused(self):
+        session = get_integration_session("stub")
+        self.assertIs(session, get_integration_session("stub"))
+        for _ in range(3):
+            self.assertEqual(session.get(f"{self.base_url}/ok").status_code, 200)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(len(self.server.client_ports), 1)
+        self.assertEqual(get_integration_stats()[f"stub:{self.host}"]["requests"], 3)
+
+    def test_default_timeout_applied(self):
+        session = get_integration_session("stub")
+        with self.assertRaises(requests.exceptions.Timeout):
+            session.get(f"{self.base_url}/slow")
+        # An explicit timeout overrides the default.
+        self.assertEqual(session.get(f"{self.base_url}/slow", timeout=2).status_code, 200)
+
+    def test_circuit_opens_after_failures(self):
+        session = get_integration_session("stub")
+        for _ in range(2):
+            self.assertEqual(session.get(f"{self.base_url}/error").status_code, 500)
+
+        with self.assertRaises(IntegrationUnavailable):
+            session.get(f"{self.base_url}/ok")
+        self.assertEqual(self.server.requests, 2)
+
+        stats = get_integration_stats()[f"stub:{self.host}"]
+        self.assertEqual(stats["errors"], 2)
+        self.assertEqual(stats["rejected"], 1)
+        self.assertEqual(stats["circuit"], "OPEN")
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from kinesinlms.core.profiling import (
+    add_cached_name,
+    cache_lock,
+    get_profile_report,
+    profile_block,
+    record_http_call,
+    reset_profile_report,
+)
+
+User = get_user_model()
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-request-profiling",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestRequestProfiling(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_profile_block_counts_queries_cache_and_http(self):
+        cache.set("profiled-key", "value")
+
+        with profile_block() as profile:
+            User.objects.count()
+            User.objects.filter(username="nobody").exists()
+            cache.get("profiled-key")
+            cache.get("missing-key")
+            cache.get_many(["profiled-key", "another-missing-key"])
+            # Keys given as a generator are counted too.
+            cache.get_many(key for key in ["profiled-key", "generated-missing-key"])
+            record_http_call(0.25)
+
+        self.assertEqual(profile.queries, 2)
+        self.assertEqual(profile.cache_hits, 3)
+        self.assertEqual(profile.cache_misses, 3)
+        self.assertEqual(profile.http_calls, 1)
+        self.assertAlmostEqual(profile.http_seconds, 0.25)
+
+        # Nothing is recorded outside a profile.
+        User.objects.count()
+        self.assertEqual(profile.queries, 2)
+
+    @override_settings(REQUEST_PROFILING={"ENABLED": True, "SAMPLE_RATE": 1.0, "QUERY_BUDGET": 0})
+    def test_middleware_logs_over_budget_request_and_aggregates(self):
+        with self.assertLogs("kinesinlms.core.profiling", level="WARNING") as logs:
+            response = self.client.get(reverse("catalog:index"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Request over budget", logs.output[0])
+
+        report = get_profile_report()
+        row = next(row for row in report if row["view_name"] == "catalog:index")
+        self.assertEqual(row["requests"], 1)
+        self.assertEqual(row["over_budget"], 1)
+        self.assertGreater(row["queries"], 0)
+
+        reset_profile_report()
+        self.assertEqual(get_profile_report(), [])
+
+    def test_add_cached_name_waits_for_lock(self):
+        add_cached_name("profiled-names", "b")
+        with cache_lock("profiled-names") as acquired:
+            self.assertTrue(acquired)
+            # Another process holds the lock, so the name can't be added yet.
+            with self.assertLogs("kinesinlms.core.profiling", level="WARNING"):
+                add_cached_name("profiled-names", "a")
+            self.assertEqual(cache.get("profiled-names"), ["b"])
+
+        add_cached_name("profiled-names", "a")
+        add_cached_name("profiled-names", "b")
+        self.assertEqual(cache.get("profiled-names"), ["a", "b"])
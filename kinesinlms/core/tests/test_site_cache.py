@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from kinesinlms.core.site_cache import (
+    SITE_CONFIG_VERSION_CACHE_KEY,
+    clear_site_cache,
+    get_cached_site,
+    get_site_provider,
+)
+from kinesinlms.forum.tests.factories import ForumProviderFactory
+from kinesinlms.forum.utils import get_forum_provider
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-site-cache",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestSiteCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        clear_site_cache()
+        # Tests run inside a transaction, where the site cache is normally not kept.
+        can_store_patcher = patch("kinesinlms.core.site_cache._can_store", return_value=True)
+        can_store_patcher.start()
+        self.addCleanup(can_store_patcher.stop)
+        self.addCleanup(clear_site_cache)
+        self.addCleanup(cache.clear)
+
+    def test_site_and_provider_loaded_once(self):
+        get_cached_site(check_version=True)
+        self.assertIsNone(get_site_provider("forum_provider"))
+
+        with self.assertNumQueries(0):
+            get_cached_site(check_version=True)
+            self.assertIsNone(get_forum_provider())
+
+    def test_provider_change_clears_cache(self):
+        self.assertIsNone(get_forum_provider())
+
+        forum_provider = ForumProviderFactory.create(site=Site.objects.get(id=get_cached_site().id))
+
+        self.assertEqual(get_forum_provider(), forum_provider)
+
+    def test_change_in_other_process_clears_cache(self):
+        get_cached_site(check_version=True)
+
+        # Another process saved the site configuration.
+        cache.set(SITE_CONFIG_VERSION_CACHE_KEY, "changed-elsewhere")
+
+        with self.assertNumQueries(1):
+            get_cached_site(check_version=True)
@@ -0,0 +1,136 @@
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from config import celery_app
+from kinesinlms.core.task_metrics import (
+    BROKER_CONNECT_TIMEOUT_SECONDS,
+    PUBLISHED_AT_HEADER,
+    get_broker_queue_length,
+    get_task_metrics_report,
+    reset_task_metrics,
+    task_finished,
+    task_published,
+    task_started,
+)
+
+User = get_user_model()
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-task-metrics",
+    }
+}
+
+TASK_NAME = "kinesinlms.tracking.tasks.example_task"
+
+
+def run_task(task_id: str, state: str = "SUCCESS", wait_seconds: float = 0.0):
+    """
+    Fire the metrics signal handlers as Celery would for one task,
+    published wait_seconds before it starts.
+    """
+    headers = {}
+    task_published(sender=TASK_NAME, headers=headers)
+    headers[PUBLISHED_AT_HEADER] -= wait_seconds
+    task = SimpleNamespace(name=TASK_NAME, request=SimpleNamespace(headers=headers))
+    task_started(task_id=task_id, task=task)
+    task_finished(task_id=task_id, task=task, state=state)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, TASK_METRICS={"ENABLED": True})
+class TestTaskMetrics(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_records_wait_runtime_and_outcome(self):
+        run_task("task-1", wait_seconds=2)
+        run_task("task-2", state="RETRY", wait_seconds=4)
+        run_task("task-3", state="FAILURE")
+        # Published, but not picked up by a worker yet.
+        task_published(sender=TASK_NAME, headers={})
+
+        report = get_task_metrics_report(hours=1)
+        self.assertEqual(len(report), 1)
+        row = report[0]
+        self.assertEqual(row["task_name"], TASK_NAME)
+        self.assertEqual(row["published"], 4)
+        self.assertEqual(row["started"], 3)
+        self.assertEqual(row["queued"], 1)
+        self.assertEqual(row["succeeded"], 1)
+        self.assertEqual(row["retried"], 1)
+        self.assertEqual(row["failed"], 1)
+        self.assertAlmostEqual(row["mean_wait_ms"], 2000, delta=200)
+        self.assertAlmostEqual(row["max_wait_ms"], 4000, delta=200)
+        self.assertAlmostEqual(row["failure_rate"], 1 / 3)
+
+        reset_task_metrics()
+        self.assertEqual(get_task_metrics_report(hours=1), [])
+
+    def test_wait_measured_from_eta(self):
+        # Published ten seconds ago with a countdown of nine seconds, so it's waited about one.
+        headers = {}
+        task_published(sender=TASK_NAME, headers=headers)
+        headers[PUBLISHED_AT_HEADER] -= 10
+        eta = datetime.now(timezone.utc) - timedelta(seconds=1)
+        task = SimpleNamespace(name=TASK_NAME, request=SimpleNamespace(headers=headers, eta=eta.isoformat()))
+        task_started(task_id="eta", task=task)
+        task_finished(task_id="eta", task=task, state="SUCCESS")
+
+        row = get_task_metrics_report(hours=1)[0]
+        self.assertEqual(row["waits"], 1)
+        self.assertAlmostEqual(row["max_wait_ms"], 1000, delta=200)
+
+    def test_task_not_published_with_metrics_has_no_wait(self):
+        task = SimpleNamespace(name=TASK_NAME, request=SimpleNamespace(headers=None))
+        task_started(task_id="eager", task=task)
+        time.sleep(0.01)
+        task_finished(task_id="eager", task=task, state="SUCCESS")
+
+        row = get_task_metrics_report(hours=1)[0]
+        self.assertEqual(row["started"], 1)
+        self.assertEqual(row["waits"], 0)
+        self.assertEqual(row["queued"], 0)
+        self.assertGreater(row["runtime_ms"], 0)
+
+    @override_settings(TASK_METRICS={"ENABLED": False})
+    def test_nothing_recorded_when_disabled(self):
+        headers = {}
+        task_published(sender=TASK_NAME, headers=headers)
+        self.assertNotIn(PUBLISHED_AT_HEADER, headers)
+        self.assertEqual(get_task_metrics_report(), [])
+
+    @patch("kinesinlms.management.views.get_broker_queue_length", return_value=3)
+    def test_management_page(self, mock_queue_length):
+        run_task("task-1", wait_seconds=1)
+        admin_user = User.objects.create(username="task-admin", is_staff=True, is_superuser=True)
+        self.client.force_login(admin_user)
+
+        response = self.client.get(reverse("management:task_metrics"), {"hours": 6, "sort": "max_wait_ms"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, TASK_NAME)
+        self.assertEqual(response.context["broker_queue_length"], 3)
+
+        response = self.client.post(reverse("management:task_metrics"))
+        self.assertRedirects(response, reverse("management:task_metrics"))
+        self.assertEqual(get_task_metrics_report(), [])
+
+    @patch.object(celery_app, "connection_for_read")
+    def test_unreachable_broker_fails_fast(self, mock_connection_for_read):
+        connection = mock_connection_for_read.return_value.__enter__.return_value
+        connection.ensure_connection.side_effect = ConnectionRefusedError()
+
+        self.assertIsNone(get_broker_queue_length())
+
+        mock_connection_for_read.assert_called_once_with(connect_timeout=BROKER_CONNECT_TIMEOUT_SECONDS)
+        self.assertEqual(connection.ensure_connection.call_args.kwargs["max_retries"], 1)
+        connection.default_channel.queue_declare.assert_not_called()
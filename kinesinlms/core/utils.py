@@ -2,12 +2,14 @@ import binascii
 import logging
 
 import boto3
+from botocore.config import Config
 from django.conf import settings
-from django.contrib.sites.models import Site
 from django.contrib.sites.shortcuts import get_current_site
 from lxml.html.clean import Cleaner
 
+from kinesinlms.core.http import AWS_LAMBDA, get_integration_config
 from kinesinlms.core.models import SiteProfile
+from kinesinlms.core.site_cache import get_cached_site
 
 logger = logging.getLogger(__name__)
 # ~~~~~~~~~~~~~~~~~~~~
@@ -22,9 +24,10 @@ aws_dynamodb_resource = None
 
 def get_current_site_profile() -> SiteProfile:
     if settings.SITE_ID:
-        site = Site.objects.get(id=settings.SITE_ID)
-        if hasattr(site, 'profile'):
-            return site.profile
+        site = get_cached_site()
+        site_profile = getattr(site, 'profile', None)
+        if site_profile:
+            return site_profile
         else:
             site_profile = SiteProfile.objects.get_or_create(site=site)[0]
             return site_profile
@@ -40,10 +43,19 @@ def get_current_site_profile() -> SiteProfile:
 def get_aws_lambda_client():
     global aws_lamba_client
     if not aws_lamba_client:
+        # boto3 keeps its own connection pool, so we can't use the shared integration
+        # session here. But we do give it the same timeouts and pool size.
+        # Callers should wrap calls in kinesinlms.core.http.integration_call().
+        http_config = get_integration_config(AWS_LAMBDA)
+        config = Config(connect_timeout=http_config["CONNECT_TIMEOUT"],
+                        read_timeout=http_config["READ_TIMEOUT"],
+                        max_pool_connections=http_config["POOL_MAXSIZE"],
+                        retries={"max_attempts": 2, "mode": "standard"})
         aws_lamba_client = boto3.client('lambda',
                                         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                                         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                                        region_name="us-west-1")
+                                        region_name="us-west-1",
+                                        config=config)
     return aws_lamba_client
 
 
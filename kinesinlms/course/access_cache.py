@@ -0,0 +1,242 @@
+"""
+Caching of the lookups course views make on every request.
+
+Nearly every course view looks up the Course by slug and run, the student's
+Enrollment in it and then decides whether the student can access the course.
+Many also need the student's cohort. Those lookups rarely change, so we keep:
+
+    - a request-scoped copy (stored on the request), so a view, its helpers and
+      template tags share one lookup per request.
+    - a short-lived shared copy in the cache, so consecutive requests from the
+      same student (unit pages, HTMx endpoints...) don't hit the database.
+
+Only positive lookups are shared: a missing enrollment is never cached, so a
+student who has just enrolled is seen as enrolled on their next request.
+
+When an enrollment is saved we also set a short-lived 'recent enrollment' marker,
+before the transaction commits. A request that arrives in between finds the
+marker but not the enrollment, and gets EnrollmentInProgress rather than being
+denied access (see EnrollmentInProgressMiddleware).
+
+The shared copy is deleted whenever a Course, Enrollment or CohortMembership is
+saved or deleted (see course/signals.py). bulk_enroll() doesn't fire those
+signals so it deletes the entries itself.
+
+The access decision itself is computed from the cached objects without any
+queries, so it's only memoized for the request: it depends on the current time
+(course start, beta period) and shouldn't outlive it.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+
+from kinesinlms.course.models import Cohort, CohortMembership, Course, Enrollment
+from kinesinlms.course.utils_access import can_access_course
+
+logger = logging.getLogger(__name__)
+
+# How long a shared copy of a course or a student's enrollment is kept.
+COURSE_ACCESS_CACHE_TIMEOUT = 60
+
+# How long after an enrollment is saved we consider it 'recent'. See find_active_enrollment().
+RECENT_ENROLLMENT_SECONDS = 30
+
+
+class EnrollmentInProgress(Exception):
+    """
+    Raised when a user's enrollment in a course has just been saved but
+    isn't visible yet (its transaction hasn't committed).
+    """
+
+    def __init__(self, course: Course, user):
+        super().__init__(f"Enrollment of user {user.id} in course {course.id} is still being saved.")
+        self.course = course
+        self.user = user
+
+
+@dataclass
+class CourseAccess:
+    course: Course
+    enrollment: Optional[Enrollment] = None
+    cohort: Optional[Cohort] = None
+    _can_access: Optional[bool] = None
+
+    def can_access(self, user) -> bool:
+        """
+        Whether the user can access the course, memoized for this request.
+        """
+        if self._can_access is None:
+            if self.enrollment:
+                self._can_access = can_access_course(user=user, course=self.course, enrollment=self.enrollment)
+            else:
+                self._can_access = bool(user.is_superuser or user.is_staff)
+        return self._can_access
+
+
+def course_cache_key(course_slug: str, course_run: str) -> str:
+    return f"course_{course_slug}_{course_run}"
+
+
+def course_access_cache_key(course_id: int, user_id: int) -> str:
+    return f"course_access_{course_id}_{user_id}"
+
+
+def recent_enrollment_cache_key(course_id: int, user_id: int) -> str:
+    return f"course_recent_enrollment_{course_id}_{user_id}"
+
+
+def get_cached_course(course_slug: str, course_run: str) -> Course:
+    """
+    Get a course by slug and run, from the cache if possible.
+
+    Raises:
+        Course.DoesNotExist if there's no such course.
+    """
+    key = course_cache_key(course_slug, course_run)
+    course = cache.get(key)
+    if course is None:
+        course = Course.objects.select_related('catalog_description').get(slug=course_slug, run=course_run)
+        cache.set(key, course, COURSE_ACCESS_CACHE_TIMEOUT)
+    return course
+
+
+def get_course_access(request, course_slug: str, course_run: str) -> CourseAccess:
+    """
+    Get the course and the requesting user's active enrollment and cohort in it.
+
+    Args:
+        request:        Current request. Lookups are remembered on it for the rest of the request.
+        course_slug:    Course slug
+        course_run:     Course run
+
+    Returns:
+        CourseAccess. enrollment (and cohort) are None if the user isn't actively enrolled.
+
+    Raises:
+        Course.DoesNotExist if there's no such course.
+    """
+    request_cache: Dict[Tuple[str, str], CourseAccess] = getattr(request, "_course_access_cache", None)
+    if request_cache is None:
+        request_cache = {}
+        request._course_access_cache = request_cache
+
+    access = request_cache.get((course_slug, course_run))
+    if access:
+        return access
+
+    course = get_cached_course(course_slug, course_run)
+    access = CourseAccess(course=course)
+    user = request.user
+    if user.is_authenticated:
+        key = course_access_cache_key(course.id, user.id)
+        entry = cache.get(key)
+        if entry is None:
+            enrollment = find_active_enrollment(course=course, user=user)
+            if enrollment:
+                membership = CohortMembership.objects.filter(
+                    cohort__course=course, student=user
+                ).select_related('cohort').order_by('id').last()
+                entry = {
+                    "enrollment": enrollment,
+                    "cohort": membership.cohort if membership else None,
+                }
+                cache.set(key, entry, COURSE_ACCESS_CACHE_TIMEOUT)
+        if entry:
+            access.enrollment = entry["enrollment"]
+            access.cohort = entry["cohort"]
+            # Share the instances we already have, so related lookups don't query again.
+            access.enrollment.course = course
+            access.enrollment.student = user
+            if access.cohort:
+                access.cohort.course = course
+
+    request_cache[(course_slug, course_run)] = access
+    return access
+
+
+def get_course_access_or_404(request, course_slug: str, course_run: str) -> CourseAccess:
+    """
+    Like get_course_access(), but raises Http404 if the course doesn't exist
+    or the user isn't actively enrolled in it.
+    """
+    try:
+        access = get_course_access(request, course_slug, course_run)
+    except Course.DoesNotExist:
+        raise Http404("No Course matches the given query.")
+    if access.enrollment is None:
+        raise Http404("No Enrollment matches the given query.")
+    return access
+
+
+def find_active_enrollment(course: Course, user) -> Optional[Enrollment]:
+    """
+    Get the user's active enrollment in a course from the database.
+
+    A request that arrives just as the enrollment is being saved might not see it
+    (the enrollment event can reach the student before the transaction commits).
+    Rather than waiting and trying again, we check for the marker set when the
+    enrollment was saved and, if it's there, raise EnrollmentInProgress so the
+    caller can ask the client to try again shortly.
+
+    Returns:
+        The Enrollment, or None if the user isn't actively enrolled.
+
+    Raises:
+        EnrollmentInProgress if the enrollment has been saved but isn't visible yet.
+    """
+    try:
+        return Enrollment.objects.get(course=course, student=user, active=True)
+    except Enrollment.DoesNotExist:
+        pass
+
+    if cache.get(recent_enrollment_cache_key(course.id, user.id)):
+        logger.warning(f"User {user.username} wants to view course ID {course.id} and enrollment "
+                       f"was just saved but not found. Asking client to try again.")
+        raise EnrollmentInProgress(course=course, user=user)
+    return None
+
+
+def invalidate_course(course: Course):
+    cache.delete(course_cache_key(course.slug, course.run))
+
+
+def invalidate_course_access(course_id: int, user_ids: Iterable[int]):
+    """
+    Delete the shared copy of these users' enrollments in a course,
+    now and again once the current transaction commits (so a request
+    that read the old data in the meantime doesn't leave it cached).
+    """
+    keys = [course_access_cache_key(course_id, user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def mark_recent_enrollments(course_id: int, user_ids: Iterable[int]):
+    """
+    Note that these users' enrollments in a course have just been saved.
+    The marker is set straight away, not on commit, so requests that arrive
+    before the commit can tell the enrollment is on its way.
+    See find_active_enrollment().
+    """
+    keys = [recent_enrollment_cache_key(course_id, user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.set_many({key: True for key in keys}, RECENT_ENROLLMENT_SECONDS)
+
+
+def clear_recent_enrollments(course_id: int, user_ids: Iterable[int]):
+    """
+    Remove the 'recent enrollment' marker for these users, e.g. when
+    their enrollment is deactivated or deleted.
+    """
+    keys = [recent_enrollment_cache_key(course_id, user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
@@ -0,0 +1,213 @@
+"""
+Bulk generation of a course's certificate PDFs.
+
+When a course closes, many students download their certificates within a few
+hours. Rather than rendering each PDF in a web request, course staff can
+start generate_course_certificates_task, which:
+
+    1.  makes sure a Certificate exists for every CoursePassed in the course.
+    2.  queues store_certificate_pdfs_task for chunks of certificates that don't
+        have an up-to-date PDF, so the chunks are rendered in parallel by
+        the celery worker processes.
+
+Progress is stored in the certificates themselves (see pdfs.py): a certificate
+whose pdf_version doesn't match its content still needs rendering. If the job
+stops part-way, running it again only renders what's left.
+
+Once PDFs are stored, write_course_certificates_zip() gathers them into one
+ZIP file for educators.
+"""
+
+import io
+import logging
+import zipfile
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from kinesinlms.certificates.models import Certificate
+from kinesinlms.certificates.service import CertificateTemplateFactory
+from kinesinlms.course.certificates.pdfs import get_certificate_pdf_version, store_certificate_pdf
+from kinesinlms.course.models import Course, CoursePassed
+
+logger = logging.getLogger(__name__)
+
+# Number of certificates rendered by each store_certificate_pdfs_task.
+CERTIFICATE_GENERATION_CHUNK_SIZE = 25
+
+# Don't queue the same course's job again while it's being queued.
+_GENERATION_LOCK_SECONDS = 60 * 5
+
+
+@dataclass
+class CertificateGenerationProgress:
+    generated: int = 0
+    total: int = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.generated
+
+    @property
+    def percent(self) -> int:
+        if not self.total:
+            return 100
+        return int(100 * self.generated / self.total)
+
+
+def _generation_lock_key(course_id: int) -> str:
+    return f"certificate_generation_{course_id}"
+
+
+def get_course_certificates(course: Course):
+    """
+    Returns:
+        Queryset of the course's certificates, with everything needed to render them.
+    """
+    return Certificate.objects.filter(
+        certificate_template__course=course
+    ).select_related(
+        'student', 'certificate_template__course'
+    ).prefetch_related(
+        'certificate_template__signatories'
+    ).order_by('id')
+
+
+def create_missing_certificates(course: Course) -> int:
+    """
+    Make sure every student who passed the course has a Certificate.
+
+    Returns:
+        Number of certificates created.
+    """
+    if not course.enable_certificates:
+        return 0
+    certificate_template, created = CertificateTemplateFactory.get_or_create_certificate_template(course)
+    existing_student_ids = set(Certificate.objects.filter(
+        certificate_template=certificate_template
+    ).values_list('student_id', flat=True))
+    passed_student_ids = CoursePassed.objects.filter(course=course).values_list('student_id', flat=True)
+    new_certificates = [
+        Certificate(certificate_template=certificate_template, student_id=student_id)
+        for student_id in passed_student_ids
+        if student_id not in existing_student_ids
+    ]
+    Certificate.objects.bulk_create(new_certificates, ignore_conflicts=True)
+    return len(new_certificates)
+
+
+def get_certificate_ids_needing_pdf(course: Course) -> List[int]:
+    """
+    Returns:
+        IDs of the course's certificates that don't have an up-to-date PDF.
+    """
+    return [
+        certificate.id
+        for certificate in get_course_certificates(course)
+        if not certificate.pdf_file or certificate.pdf_version != get_certificate_pdf_version(certificate)
+    ]
+
+
+def get_certificate_generation_progress(course: Course) -> CertificateGenerationProgress:
+    total = get_course_certificates(course).count()
+    remaining = len(get_certificate_ids_needing_pdf(course))
+    return CertificateGenerationProgress(generated=total - remaining, total=total)
+
+
+def schedule_certificate_generation(course: Course) -> bool:
+    """
+    Queue generate_course_certificates_task once the current transaction commits,
+    unless it was queued for this course very recently.
+
+    Returns:
+        True if the task was queued.
+    """
+    if not cache.add(_generation_lock_key(course.id), True, _GENERATION_LOCK_SECONDS):
+        return False
+
+    # Import here to avoid circular import with tasks module.
+    from kinesinlms.course.tasks import generate_course_certificates_task
+
+    course_id = course.id
+
+    def _schedule():
+        try:
+            generate_course_certificates_task.delay(course_id=course_id)
+        except Exception:
+            logger.exception(f"Could not queue generate_course_certificates_task for course {course_id}")
+            cache.delete(_generation_lock_key(course_id))
+
+    transaction.on_commit(_schedule)
+    return True
+
+
+def queue_certificate_pdfs(course: Course, chunk_size: int = CERTIFICATE_GENERATION_CHUNK_SIZE) -> int:
+    """
+    Create any missing certificates for the course and queue a
+    store_certificate_pdfs_task for each chunk that needs rendering.
+
+    Returns:
+        Number of certificates queued for rendering.
+    """
+    # Import here to avoid circular import with tasks module.
+    from kinesinlms.course.tasks import store_certificate_pdfs_task
+
+    created = create_missing_certificates(course)
+    if created:
+        logger.info(f"Created {created} missing certificates for course {course}")
+
+    certificate_ids = get_certificate_ids_needing_pdf(course)
+    for start in range(0, len(certificate_ids), chunk_size):
+        store_certificate_pdfs_task.delay(certificate_ids=certificate_ids[start:start + chunk_size])
+    cache.delete(_generation_lock_key(course.id))
+    logger.info(f"Queued {len(certificate_ids)} certificate PDFs for course {course}")
+    return len(certificate_ids)
+
+
+def store_certificate_pdfs(certificate_ids: List[int]) -> Tuple[int, int]:
+    """
+    Render and store the PDFs for the given certificates.
+    Certificates that already have an up-to-date PDF are skipped.
+
+    Returns:
+        Number of PDFs stored (or already up-to-date), number that failed.
+    """
+    stored = 0
+    failed = 0
+    certificates = Certificate.objects.filter(id__in=certificate_ids).select_related(
+        'student', 'certificate_template__course'
+    ).prefetch_related('certificate_template__signatories')
+    for certificate in certificates:
+        try:
+            store_certificate_pdf(certificate)
+            stored += 1
+        except Exception:
+            logger.exception(f"Could not store PDF for certificate {certificate.uuid}")
+            failed += 1
+    return stored, failed
+
+
+def write_course_certificates_zip(course: Course) -> Tuple[io.BytesIO, int]:
+    """
+    Gather the course's stored certificate PDFs into one ZIP file.
+    Certificates that haven't been rendered yet are left out.
+
+    Returns:
+        Buffer with the ZIP file, number of certificates in it.
+    """
+    buffer = io.BytesIO()
+    count = 0
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for certificate in get_course_certificates(course).exclude(pdf_file=""):
+            filename = f"{certificate.student.username}_{course.token}_certificate.pdf"
+            try:
+                with certificate.pdf_file.open("rb") as pdf_file:
+                    zip_file.writestr(filename, pdf_file.read())
+            except Exception:
+                logger.exception(f"Could not add PDF for certificate {certificate.uuid} to ZIP file")
+                continue
+            count += 1
+    buffer.seek(0)
+    return buffer, count
@@ -1,11 +1,12 @@
 import io
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
 from django.conf import settings
 from django.utils import formats
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
 from reportlab.lib.utils import ImageReader
 from reportlab.platypus import Frame, BaseDocTemplate, PageTemplate, Paragraph, Image, Table, Spacer
@@ -13,6 +14,81 @@ from reportlab.platypus import Frame, BaseDocTemplate, PageTemplate, Paragraph,
 from kinesinlms.certificates.models import Certificate, Signatory
 
 
+# Bump when the layout of the base certificate changes, so stored PDFs are rendered again.
+BASE_CERTIFICATE_LAYOUT_VERSION = 1
+
+CERTIFICATE_IMAGES_DIR = f"{settings.APPS_DIR}/static/certificates/images"
+
+
+@lru_cache(maxsize=None)
+def get_border_images() -> Tuple[ImageReader, ImageReader, ImageReader, ImageReader]:
+    """
+    Load the certificate border images once per process.
+
+    Returns:
+        Upper left, upper right, bottom left and bottom right border images.
+    """
+    return (
+        ImageReader(f"{CERTIFICATE_IMAGES_DIR}/upper-left-corner.png"),
+        ImageReader(f"{CERTIFICATE_IMAGES_DIR}/upper-right-corner.png"),
+        ImageReader(f"{CERTIFICATE_IMAGES_DIR}/bottom-left-corner.png"),
+        ImageReader(f"{CERTIFICATE_IMAGES_DIR}/bottom-right-corner.png"),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_logo_image_data() -> bytes:
+    """
+    Read the certificate logo once per process.
+    """
+    with open(f"{CERTIFICATE_IMAGES_DIR}/site-logo-certificate.png", "rb") as logo_file:
+        return logo_file.read()
+
+
+@lru_cache(maxsize=None)
+def get_certificate_styles() -> StyleSheet1:
+    """
+    Build the paragraph styles used by the base certificate once per process.
+    Styles are only read while rendering, so they can be shared.
+    """
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='student_name',
+                              alignment=TA_CENTER,
+                              fontSize=22,
+                              leading=24,
+                              spaceBefore=40,
+                              spaceAfter=20))
+    styles.add(ParagraphStyle(name='course_name',
+                              alignment=TA_CENTER,
+                              fontSize=22,
+                              leading=24,
+                              spaceBefore=20,
+                              spaceAfter=20))
+    styles.add(ParagraphStyle(name='normal',
+                              alignment=TA_CENTER,
+                              leftIndent=20,
+                              rightIndent=20,
+                              fontSize=16,
+                              leading=22,
+                              spaceAfter=6))
+    styles.add(ParagraphStyle(name='muted',
+                              alignment=TA_CENTER,
+                              fontSize=12,
+                              leading=14,
+                              textColor="#999999"))
+    styles.add(ParagraphStyle(name='signature_name',
+                              alignment=TA_CENTER,
+                              spaceBefore=4,
+                              spaceAfter=10,
+                              fontSize=12,
+                              leading=14))
+    styles.add(ParagraphStyle(name='signature_info',
+                              alignment=TA_CENTER,
+                              fontSize=10,
+                              leading=14))
+    return styles
+
+
 def draw_certificate_borders(canvas, doc):   # noqa: F841
     canvas.setPageSize(landscape(letter))
 
@@ -22,10 +98,8 @@ def draw_certificate_borders(canvas, doc):   # noqa: F841
     # Draw the static stuff
 
     # create borders
-    upper_left_border_img = ImageReader(f"{settings.APPS_DIR}/static/certificates/images/upper-left-corner.png")
-    upper_right_border_img = ImageReader(f"{settings.APPS_DIR}/static/certificates/images/upper-right-corner.png")
-    bottom_left_border_img = ImageReader(f"{settings.APPS_DIR}/static/certificates/images/bottom-left-corner.png")
-    bottom_right_border_img = ImageReader(f"{settings.APPS_DIR}/static/certificates/images/bottom-right-corner.png")
+    upper_left_border_img, upper_right_border_img, \
+        bottom_left_border_img, bottom_right_border_img = get_border_images()
 
     canvas.drawImage(upper_left_border_img, 0.2 * inch, 7.2 * inch, width=74, height=74)
     canvas.drawImage(upper_right_border_img, 9.7 * inch, 7.2 * inch, width=74, height=74)
@@ -69,46 +143,12 @@ def generate_base_certificate(certificate: Certificate) -> io.BytesIO:
     # Add the template to the doc
     doc.addPageTemplates([template])
 
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='student_name',
-                              alignment=TA_CENTER,
-                              fontSize=22,
-                              leading=24,
-                              spaceBefore=40,
-                              spaceAfter=20))
-    styles.add(ParagraphStyle(name='course_name',
-                              alignment=TA_CENTER,
-                              fontSize=22,
-                              leading=24,
-                              spaceBefore=20,
-                              spaceAfter=20))
-    styles.add(ParagraphStyle(name='normal',
-                              alignment=TA_CENTER,
-                              leftIndent=20,
-                              rightIndent=20,
-                              fontSize=16,
-                              leading=22,
-                              spaceAfter=6))
-    styles.add(ParagraphStyle(name='muted',
-                              alignment=TA_CENTER,
-                              fontSize=12,
-                              leading=14,
-                              textColor="#999999"))
-    styles.add(ParagraphStyle(name='signature_name',
-                              alignment=TA_CENTER,
-                              spaceBefore=4,
-                              spaceAfter=10,
-                              fontSize=12,
-                              leading=14))
-    styles.add(ParagraphStyle(name='signature_info',
-                              alignment=TA_CENTER,
-                              fontSize=10,
-                              leading=14))
+    styles = get_certificate_styles()
 
     # container for pdf elements
     elements = []
 
-    logo = Image(f"{settings.APPS_DIR}/static/certificates/images/site-logo-certificate.png",
+    logo = Image(io.BytesIO(get_logo_image_data()),
                  width=254,
                  height=83)
     elements.append(logo)
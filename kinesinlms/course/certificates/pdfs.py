@@ -0,0 +1,143 @@
+"""
+Rendered certificate PDFs.
+
+A certificate's PDF is rendered once, in the background, when the certificate is
+awarded, and stored on the Certificate (pdf_file). Downloads serve the stored file.
+
+Each stored PDF is keyed by a version computed from everything that appears on it
+(layout version, custom template, student name, course name, award date and
+signatories). If any of those change, the stored PDF no longer matches and is
+rendered again the next time it's needed.
+"""
+
+import hashlib
+import io
+import logging
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from kinesinlms.certificates.models import Certificate
+from kinesinlms.course.certificates.generators import (
+    BASE_CERTIFICATE_LAYOUT_VERSION,
+    generate_base_certificate,
+    generate_custom_certificate,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_certificate_pdf_version(certificate: Certificate) -> str:
+    """
+    Returns:
+        A short hash of everything that's rendered on the certificate.
+    """
+    certificate_template = certificate.certificate_template
+    parts = [
+        str(BASE_CERTIFICATE_LAYOUT_VERSION),
+        certificate_template.custom_template_name or "",
+        certificate.student_name or "",
+        certificate.course_name or "",
+        certificate.created_at.isoformat() if certificate.created_at else "",
+        str(certificate.uuid),
+    ]
+    # Sorted here rather than in the query so prefetched signatories can be used.
+    for signatory in sorted(certificate_template.signatories.all(), key=lambda item: item.id):
+        parts.extend([
+            str(signatory.id),
+            signatory.name,
+            signatory.title,
+            signatory.organization or "",
+            signatory.signature_image.name,
+        ])
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def render_certificate_pdf(certificate: Certificate) -> bytes:
+    """
+    Render the certificate as a PDF, without storing it.
+    """
+    if certificate.certificate_template.custom_template_name:
+        cert_buffer: io.BytesIO = generate_custom_certificate(certificate)
+    else:
+        cert_buffer: io.BytesIO = generate_base_certificate(certificate)
+    try:
+        return cert_buffer.getvalue()
+    finally:
+        cert_buffer.close()
+
+
+def store_certificate_pdf(certificate: Certificate, force: bool = False) -> bytes:
+    """
+    Render the certificate as a PDF and store it on the certificate,
+    unless the stored PDF is already up-to-date.
+
+    Args:
+        certificate:    Certificate to render.
+        force:          Render again even if the stored PDF is up-to-date.
+
+    Returns:
+        The PDF.
+    """
+    version = get_certificate_pdf_version(certificate)
+    if not force:
+        pdf = _read_stored_pdf(certificate, version)
+        if pdf is not None:
+            return pdf
+
+    pdf = render_certificate_pdf(certificate)
+
+    if certificate.pdf_file:
+        try:
+            certificate.pdf_file.delete(save=False)
+        except Exception:
+            logger.exception(f"Could not delete old PDF for certificate {certificate.uuid}")
+    certificate.pdf_file.save(f"{certificate.uuid}_{version}.pdf", ContentFile(pdf), save=False)
+    certificate.pdf_version = version
+    certificate.save(update_fields=["pdf_file", "pdf_version", "updated_at"])
+    logger.info(f"Stored PDF version {version} for certificate {certificate.uuid}")
+    return pdf
+
+
+def get_certificate_pdf(certificate: Certificate) -> bytes:
+    """
+    Get the certificate as a PDF, from the stored file if it's up-to-date.
+    Otherwise, render it and store it for next time.
+    """
+    try:
+        return store_certificate_pdf(certificate)
+    except Exception:
+        # Still give the student their certificate if storage is having trouble.
+        logger.exception(f"Could not store PDF for certificate {certificate.uuid}. Rendering without storing.")
+        return render_certificate_pdf(certificate)
+
+
+def schedule_certificate_pdf(certificate: Certificate):
+    """
+    Render and store the certificate's PDF in the background
+    once the current transaction commits.
+    """
+    # Import here to avoid circular import with tasks module.
+    from kinesinlms.course.tasks import store_certificate_pdf_task
+
+    certificate_id = certificate.id
+
+    def _schedule():
+        try:
+            store_certificate_pdf_task.delay(certificate_id=certificate_id)
+        except Exception:
+            # The PDF will be rendered when the student first downloads it.
+            logger.exception(f"Could not queue store_certificate_pdf_task for certificate {certificate_id}")
+
+    transaction.on_commit(_schedule)
+
+
+def _read_stored_pdf(certificate: Certificate, version: str):
+    if not certificate.pdf_file or certificate.pdf_version != version:
+        return None
+    try:
+        with certificate.pdf_file.open("rb") as pdf_file:
+            return pdf_file.read()
+    except Exception:
+        logger.exception(f"Could not read stored PDF for certificate {certificate.uuid}. Rendering again.")
+        return None
@@ -0,0 +1,471 @@
+"""
+Database-side cloning of a course into a new run.
+
+Rather than exporting a course and importing the result (or walking the
+course with serializers), clone_course() reads each table once and writes
+the copies with bulk inserts. The copied CourseNode tree keeps the
+original's MPTT values, so no tree rebuild is needed.
+
+Blocks are shared between the original course and the clone, except
+for block types that can only appear in one place (assessments and
+forum topics) and survey blocks pointing at one of the original
+course's surveys. Those are copied so each run gets its own.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.utils.text import slugify
+from taggit.models import TaggedItem
+
+from kinesinlms.assessments.models import Assessment
+from kinesinlms.certificates.models import CertificateTemplate
+from kinesinlms.course.factory import CourseFactory
+from kinesinlms.course.models import (
+    Course,
+    CourseNode,
+    CourseUnit,
+    EnrollmentSurvey,
+    EnrollmentSurveyQuestion,
+    Milestone,
+)
+from kinesinlms.learning_library.constants import BlockType
+from kinesinlms.learning_library.models import Block, BlockLearningObjective, BlockResource, UnitBlock
+from kinesinlms.speakers.models import CourseSpeaker
+from kinesinlms.survey.models import Survey, SurveyBlock
+
+logger = logging.getLogger(__name__)
+
+# Course fields that are set for the new run rather than copied.
+COURSE_SKIP_FIELDS = [
+    "slug",
+    "run",
+    "display_name",
+    "short_name",
+    "course_root_node",
+    "catalog_description",
+    "start_date",
+    "end_date",
+    "advertised_start_date",
+    "enrollment_start_date",
+    "enrollment_end_date",
+]
+
+
+@dataclass
+class CourseCloneResult:
+    """
+    The new course created by clone_course(), plus
+    how many rows were copied and how long each step took.
+    """
+
+    course: Course
+    counts: Dict[str, int] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.timings.values())
+
+    def summary(self) -> str:
+        lines = [f"Cloned course {self.course.token} in {self.total_time:.2f}s"]
+        for step, seconds in self.timings.items():
+            count = self.counts.get(step, None)
+            count_str = f" ({count} rows)" if count is not None else ""
+            lines.append(f"  - {step}: {seconds:.3f}s{count_str}")
+        for warning in self.warnings:
+            lines.append(f"  ! {warning}")
+        return "\n".join(lines)
+
+
+def clone_course(
+    course: Course,
+    new_slug: str,
+    new_run: str,
+    display_name: Optional[str] = None,
+    short_name: Optional[str] = None,
+    self_paced: Optional[bool] = None,
+) -> CourseCloneResult:
+    """
+    Create a new run of a course by copying its navigation, units,
+    milestones, surveys, catalog description and related settings.
+
+    Student data (enrollments, progress, answers) is never copied, and
+    the new course's catalog description is always hidden so it can be
+    edited before release. Dates are left empty for the same reason.
+
+    Args:
+        course:         Course to clone.
+        new_slug:       Slug for the new course.
+        new_run:        Run for the new course.
+        display_name:   Display name for the new course. Defaults to the original's.
+        short_name:     Short name for the new course. Defaults to the original's.
+        self_paced:     Override the original's self_paced setting.
+
+    Returns:
+        A CourseCloneResult with the new course and per-step timings.
+    """
+    if not new_slug or not new_run:
+        raise ValueError("new_slug and new_run are required.")
+    if Course.objects.filter(slug=new_slug, run=new_run).exists():
+        raise ValueError(f"A course with slug {new_slug} and run {new_run} already exists.")
+    if not course.course_root_node:
+        raise ValueError(f"Course {course} has no course nav to clone.")
+
+    logger.info(f"Cloning course {course} to {new_slug}_{new_run}")
+    with transaction.atomic():
+        cloner = _CourseCloner(source=course)
+        result = cloner.clone(
+            new_slug=new_slug,
+            new_run=new_run,
+            display_name=display_name,
+            short_name=short_name,
+            self_paced=self_paced,
+        )
+    logger.info(result.summary())
+    return result
+
+
+class _CourseCloner:
+    def __init__(self, source: Course):
+        self.source = source
+        self.target: Optional[Course] = None
+        self.counts: Dict[str, int] = {}
+        self.timings: Dict[str, float] = {}
+        self.warnings: List[str] = []
+        self.unit_id_map: Dict[int, int] = {}
+        self.block_id_map: Dict[int, int] = {}
+        self.survey_id_map: Dict[int, int] = {}
+
+    @contextmanager
+    def _step(self, name: str):
+        start = time.perf_counter()
+        yield
+        self.timings[name] = time.perf_counter() - start
+
+    def clone(self, new_slug, new_run, display_name, short_name, self_paced) -> CourseCloneResult:
+        with self._step("course"):
+            self._clone_course(new_slug, new_run, display_name, short_name, self_paced)
+        with self._step("surveys"):
+            self._clone_surveys()
+        with self._step("course units"):
+            self._clone_course_units()
+        with self._step("blocks"):
+            self._clone_single_use_blocks()
+        with self._step("unit blocks"):
+            self._clone_unit_blocks()
+        with self._step("course nodes"):
+            self._clone_course_nodes()
+        with self._step("milestones"):
+            self._clone_milestones()
+        with self._step("course settings"):
+            self._clone_course_settings()
+        return CourseCloneResult(
+            course=self.target,
+            counts=self.counts,
+            timings=self.timings,
+            warnings=self.warnings,
+        )
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # STEPS
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _clone_course(self, new_slug, new_run, display_name, short_name, self_paced):
+        source = self.source
+
+        catalog_description = None
+        if source.catalog_description:
+            # Always hide the new run's catalog entry until it's been edited.
+            catalog_description = _copy_instance(source.catalog_description, visible=False)
+            catalog_description.save()
+
+        course_kwargs = _field_values(source, exclude=COURSE_SKIP_FIELDS)
+        if self_paced is not None:
+            course_kwargs["self_paced"] = self_paced
+        # CourseFactory also sets up the course's Django group and default cohort.
+        self.target = CourseFactory.create(
+            create_course_root_node=False,
+            slug=new_slug,
+            run=new_run,
+            display_name=display_name or source.display_name,
+            short_name=short_name or source.short_name,
+            catalog_description=catalog_description,
+            **course_kwargs,
+        )
+        self.counts["course"] = 1
+        _copy_tags(Course, {source.id: self.target.id})
+
+    def _clone_surveys(self):
+        surveys = list(Survey.objects.filter(course=self.source))
+        new_slugs = _unique_slugs(
+            Survey,
+            [f"{self.target.slug}-{self.target.run}-{survey.type}" for survey in surveys],
+        )
+        new_surveys = []
+        old_ids = []
+        for survey, new_slug in zip(surveys, new_slugs):
+            new_survey = _copy_instance(survey, course_id=self.target.id)
+            if survey.slug:
+                new_survey.slug = new_slug
+            new_surveys.append(new_survey)
+            old_ids.append(survey.id)
+        Survey.objects.bulk_create(new_surveys)
+        self.survey_id_map = {old_id: new.id for old_id, new in zip(old_ids, new_surveys)}
+        self.counts["surveys"] = len(new_surveys)
+
+    def _clone_course_units(self):
+        unit_ids = (
+            CourseNode.objects.filter(tree_id=self.source.course_root_node.tree_id, unit__isnull=False)
+            .values_list("unit_id", flat=True)
+            .distinct()
+        )
+        course_units = list(CourseUnit.objects.filter(id__in=unit_ids))
+        # Unit slugs are unique across the site, so prefix them with the new run.
+        new_slugs = _unique_slugs(CourseUnit, [f"{self.target.run}-{unit.slug}" for unit in course_units])
+        new_units = [
+            _copy_instance(unit, exclude=["uuid"], course_id=self.target.id, slug=new_slug if unit.slug else None)
+            for unit, new_slug in zip(course_units, new_slugs)
+        ]
+        CourseUnit.objects.bulk_create(new_units)
+        self.unit_id_map = {unit.id: new_unit.id for unit, new_unit in zip(course_units, new_units)}
+        _copy_tags(CourseUnit, self.unit_id_map)
+        self.counts["course units"] = len(new_units)
+
+    def _clone_single_use_blocks(self):
+        """
+        Copy blocks that can't be shared between courses. Every other
+        block is shared by pointing the new UnitBlocks at it.
+        """
+        blocks = Block.objects.filter(unit_blocks__course_unit_id__in=self.unit_id_map.keys()).distinct()
+        single_parent_types = BlockType.get_single_parent_type_names()
+        source_survey_ids = set(self.survey_id_map.keys())
+        course_survey_block_ids = set(
+            SurveyBlock.objects.filter(block__in=blocks, survey_id__in=source_survey_ids).values_list(
+                "block_id",
+                flat=True,
+            )
+        )
+        blocks_to_copy = [
+            block for block in blocks if block.type in single_parent_types or block.id in course_survey_block_ids
+        ]
+        if not blocks_to_copy:
+            self.counts["blocks"] = 0
+            return
+
+        new_blocks = [_copy_instance(block, exclude=["uuid"]) for block in blocks_to_copy]
+        Block.objects.bulk_create(new_blocks)
+        self.block_id_map = {block.id: new_block.id for block, new_block in zip(blocks_to_copy, new_blocks)}
+        old_block_ids = list(self.block_id_map.keys())
+
+        Assessment.objects.bulk_create(
+            [
+                _copy_instance(assessment, block_id=self.block_id_map[assessment.block_id])
+                for assessment in Assessment.objects.filter(block_id__in=old_block_ids)
+            ]
+        )
+        SurveyBlock.objects.bulk_create(
+            [
+                _copy_instance(
+                    survey_block,
+                    block_id=self.block_id_map[survey_block.block_id],
+                    survey_id=self.survey_id_map.get(survey_block.survey_id, survey_block.survey_id),
+                )
+                for survey_block in SurveyBlock.objects.filter(block_id__in=old_block_ids)
+            ]
+        )
+        BlockResource.objects.bulk_create(
+            [
+                _copy_instance(block_resource, block_id=self.block_id_map[block_resource.block_id])
+                for block_resource in BlockResource.objects.filter(block_id__in=old_block_ids)
+            ]
+        )
+        BlockLearningObjective.objects.bulk_create(
+            [
+                _copy_instance(block_objective, block_id=self.block_id_map[block_objective.block_id])
+                for block_objective in BlockLearningObjective.objects.filter(block_id__in=old_block_ids)
+            ]
+        )
+        _copy_tags(Block, self.block_id_map)
+        # Forum topics for copied FORUM_TOPIC blocks are created by the
+        # forum service when the new course's forum is configured.
+        self.counts["blocks"] = len(new_blocks)
+
+    def _clone_unit_blocks(self):
+        unit_blocks = list(UnitBlock.objects.filter(course_unit_id__in=self.unit_id_map.keys()))
+        # Unit block slugs are unique across the site and importers build them as
+        # "<course token>_<label>", so swap in the new course's token.
+        source_prefix = f"{self.source.token}_"
+        new_slugs = _unique_slugs(
+            UnitBlock,
+            [
+                f"{self.target.token}_{(unit_block.slug or '').removeprefix(source_prefix)}"
+                for unit_block in unit_blocks
+            ],
+        )
+        new_unit_blocks = [
+            _copy_instance(
+                unit_block,
+                course_unit_id=self.unit_id_map[unit_block.course_unit_id],
+                block_id=self.block_id_map.get(unit_block.block_id, unit_block.block_id),
+                slug=new_slug if unit_block.slug else None,
+            )
+            for unit_block, new_slug in zip(unit_blocks, new_slugs)
+        ]
+        UnitBlock.objects.bulk_create(new_unit_blocks)
+        self.counts["unit blocks"] = len(new_unit_blocks)
+
+    def _clone_course_nodes(self):
+        """
+        Copy the nav tree with its MPTT values intact (only tree_id changes),
+        inserting one level at a time so each node's parent already exists.
+        """
+        source_root = self.source.course_root_node
+        nodes = list(CourseNode.objects.filter(tree_id=source_root.tree_id).order_by("level", "lft"))
+        new_tree_id = CourseNode.objects._get_next_tree_id()
+
+        nodes_by_level: Dict[int, List[CourseNode]] = defaultdict(list)
+        for node in nodes:
+            nodes_by_level[node.level].append(node)
+
+        node_id_map: Dict[int, int] = {}
+        new_root = None
+        for level in sorted(nodes_by_level.keys()):
+            level_nodes = nodes_by_level[level]
+            new_nodes = []
+            for node in level_nodes:
+                overrides = {
+                    "tree_id": new_tree_id,
+                    "parent_id": node_id_map.get(node.parent_id, None),
+                    "unit_id": self.unit_id_map.get(node.unit_id, None),
+                }
+                if node.id == source_root.id:
+                    overrides["slug"] = self.target.token.lower()
+                    overrides["display_name"] = self.target.token
+                new_nodes.append(_copy_instance(node, **overrides))
+            CourseNode.objects.bulk_create(new_nodes)
+            for node, new_node in zip(level_nodes, new_nodes):
+                node_id_map[node.id] = new_node.id
+                if node.id == source_root.id:
+                    new_root = new_node
+
+        self.target.course_root_node = new_root
+        self.target.save()
+        self.counts["course nodes"] = len(node_id_map)
+
+    def _clone_milestones(self):
+        new_milestones = []
+        dropped_badges = False
+        for milestone in Milestone.objects.filter(course=self.source).select_related("badge_class"):
+            new_milestone = _copy_instance(milestone, course_id=self.target.id)
+            if milestone.badge_class and milestone.badge_class.course_id == self.source.id:
+                # Badge classes belong to a single course run.
+                new_milestone.badge_class = None
+                dropped_badges = True
+            new_milestones.append(new_milestone)
+        Milestone.objects.bulk_create(new_milestones)
+        if dropped_badges:
+            self.warnings.append("Milestone badge classes belong to the original course and were not copied.")
+        self.counts["milestones"] = len(new_milestones)
+
+    def _clone_course_settings(self):
+        rows = 0
+
+        course_speakers = [
+            _copy_instance(course_speaker, course_id=self.target.id)
+            for course_speaker in CourseSpeaker.objects.filter(course=self.source)
+        ]
+        CourseSpeaker.objects.bulk_create(course_speakers)
+        rows += len(course_speakers)
+
+        enrollment_survey = EnrollmentSurvey.objects.filter(course=self.source).first()
+        if enrollment_survey:
+            new_enrollment_survey = _copy_instance(enrollment_survey, course_id=self.target.id)
+            new_enrollment_survey.save()
+            questions = list(enrollment_survey.questions.all())
+            new_questions = [_copy_instance(question) for question in questions]
+            EnrollmentSurveyQuestion.objects.bulk_create(new_questions)
+            new_enrollment_survey.questions.add(*new_questions)
+            rows += 1 + len(new_questions)
+
+        certificate_template = CertificateTemplate.objects.filter(course=self.source).first()
+        if certificate_template:
+            new_certificate_template = _copy_instance(certificate_template, course_id=self.target.id)
+            new_certificate_template.save()
+            new_certificate_template.signatories.set(certificate_template.signatories.all())
+            rows += 1
+
+        self.counts["course settings"] = rows
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# HELPER METHODS
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+
+def _field_values(instance: models.Model, exclude: Iterable[str] = ()) -> Dict:
+    """
+    Get the concrete field values of a model instance (by attname, so
+    foreign keys are copied as ids without being fetched), leaving out
+    the primary key, created/updated timestamps and any excluded fields.
+    """
+    exclude = set(exclude) | {"created_at", "updated_at"}
+    values = {}
+    for model_field in instance._meta.concrete_fields:
+        if model_field.primary_key or model_field.name in exclude or model_field.attname in exclude:
+            continue
+        values[model_field.attname] = getattr(instance, model_field.attname)
+    return values
+
+
+def _copy_instance(instance: models.Model, exclude: Iterable[str] = (), **overrides) -> models.Model:
+    """
+    Build an unsaved copy of a model instance, with overrides
+    applied. Excluded fields get their model defaults.
+    """
+    values = _field_values(instance, exclude=exclude)
+    values.update(overrides)
+    return type(instance)(**values)
+
+
+def _copy_tags(model, id_map: Dict[int, int]) -> None:
+    if not id_map:
+        return
+    content_type = ContentType.objects.get_for_model(model)
+    tagged_items = TaggedItem.objects.filter(content_type=content_type, object_id__in=id_map.keys())
+    TaggedItem.objects.bulk_create(
+        [
+            TaggedItem(content_type=content_type, object_id=id_map[item.object_id], tag_id=item.tag_id)
+            for item in tagged_items
+        ]
+    )
+
+
+def _unique_slugs(model, bases: List[str]) -> List[str]:
+    """
+    Build a site-unique slug for each entry in ``bases``, checking the
+    database for all candidates at once and only falling back to
+    per-slug queries on collision.
+    """
+    max_length = model._meta.get_field("slug").max_length
+    bases = [slugify(base)[:max_length] for base in bases]
+    taken = set(model.objects.filter(slug__in=bases).values_list("slug", flat=True))
+    used_slugs = set()
+    slugs = []
+    for base in bases:
+        slug = base
+        index = 1
+        while slug in used_slugs or slug in taken or (slug != base and model.objects.filter(slug=slug).exists()):
+            index += 1
+            suffix = f"-{index}"
+            slug = f"{base[: max_length - len(suffix)]}{suffix}"
+        used_slugs.add(slug)
+        slugs.append(slug)
+    return slugs
@@ -6,6 +6,7 @@ from kinesinlms.badges.models import BadgeClass, BadgeClassType
 from kinesinlms.badges.utils import get_badge_service
 from kinesinlms.certificates.models import Certificate
 from kinesinlms.certificates.service import CertificateTemplateFactory
+from kinesinlms.course.certificates.pdfs import schedule_certificate_pdf
 from kinesinlms.course.models import Course, CoursePassed
 from kinesinlms.tracking.event_types import TrackingEventType
 from kinesinlms.tracking.tracker import Tracker
@@ -70,6 +71,8 @@ def student_passed_course(student: User, course: Course) -> Optional[CoursePasse
             certificate = None
 
         if certificate:
+            # Render the PDF now so downloads can serve it directly.
+            schedule_certificate_pdf(certificate)
             Tracker.track(
                 event_type=TrackingEventType.COURSE_CERTIFICATE_EARNED.value,
                 user=student,
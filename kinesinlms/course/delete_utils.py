@@ -50,6 +50,11 @@ def delete_course(
                     unit_block = None
                 if unit_block:
                     for child_block in unit_block.contents.all():
+                        # Blocks can be shared with other runs of this course
+                        # (see kinesinlms.course.clone). Leave those in place.
+                        if child_block.unit_blocks.exclude(course_unit__course=course).exists():
+                            continue
+
                         # Delete learning objectives if they're not used by
                         # any other courses...
                         for learning_objective in child_block.learning_objectives.all():
@@ -94,13 +99,20 @@ def delete_course(
 def get_exclusive_resources(course) -> list["kinesinlms.learning_library.models.Resource"]:
     """
     Get all block resources used by this course and no other.
+
+    Note that an "exclusive" Resource may still share its underlying file
+    (ResourceBlob) with Resources in other courses, since files are stored
+    by content hash. Deleting the Resource only releases its reference to
+    the blob; the file itself is removed from storage once no Resource uses it.
     """
     course_units = CourseUnit.objects.filter(course=course)
     course_unit_blocks = UnitBlock.objects.filter(course_unit__in=course_units)
     blocks = Block.objects.filter(unit_blocks__in=course_unit_blocks)
+    other_blocks = Block.objects.exclude(id__in=blocks.values("id"))
     exclusive_resources = (
         Resource.objects.filter(block_resources__block__in=blocks)
-        .prefetch_related("block_resources__block")
+        .exclude(block_resources__block__in=other_blocks)
+        .select_related("blob")
         .distinct()
     )
     return exclusive_resources
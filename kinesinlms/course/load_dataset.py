@@ -0,0 +1,483 @@
+"""
+Synthetic, large-scale course data for performance work.
+
+build_load_dataset() creates a number of courses, each starting from a
+CourseFactory course and grown to a realistic size: modules, sections and
+units, each unit with a mix of HTML, assessment, video and SIT blocks. A pool
+of students is enrolled in every course (spread over a few cohorts) and given
+activity: tracking events, bookmarks, submitted answers, SIT submissions and
+milestone progress.
+
+Everything beyond the base courses is bulk created in batches, so large
+datasets build in minutes rather than hours. Tracking events, which can run
+to millions of rows, are written with COPY when the database is Postgres.
+
+The data is generated from a seeded random number generator, so the same
+config produces the same content, students and activity every time
+(database ids aside).
+
+Used by the generate_load_dataset management command and the query budget
+benchmarks in course/tests/benchmarks.
+"""
+
+import csv
+import io
+import logging
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import islice
+from typing import Callable, Iterable, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from kinesinlms.assessments.models import Assessment, SubmittedAnswer
+from kinesinlms.course.constants import CourseUnitType, NodeType
+from kinesinlms.course.models import (
+    Bookmark,
+    Cohort,
+    CohortMembership,
+    Course,
+    CourseNode,
+    CourseUnit,
+    Enrollment,
+    Milestone,
+    MilestoneProgress,
+)
+from kinesinlms.course.nav import course_nav_bulk_edit
+from kinesinlms.course.tests.factories import CourseFactory
+from kinesinlms.learning_library.constants import AnswerStatus, AssessmentType, BlockType
+from kinesinlms.learning_library.models import Block, UnitBlock
+from kinesinlms.sits.constants import SimpleInteractiveToolSubmissionStatus, SimpleInteractiveToolType
+from kinesinlms.sits.models import SimpleInteractiveTool, SimpleInteractiveToolSubmission
+from kinesinlms.tracking.event_types import TrackingEventType
+from kinesinlms.tracking.models import TrackingEvent
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+LOAD_STUDENT_PASSWORD = "load-test-password"
+
+# Rows per INSERT (bulk_create) or per COPY chunk.
+BATCH_SIZE = 5000
+
+# A unit's blocks are taken from this list in order, repeating as needed.
+UNIT_BLOCK_PATTERN = [
+    BlockType.HTML_CONTENT,
+    BlockType.ASSESSMENT,
+    BlockType.VIDEO,
+    BlockType.SIMPLE_INTERACTIVE_TOOL,
+]
+
+# Relative frequency of the tracking event types generated.
+EVENT_TYPE_WEIGHTS = {
+    TrackingEventType.COURSE_PAGE_VIEW.value: 70,
+    TrackingEventType.COURSE_VIDEO_ACTIVITY.value: 20,
+    TrackingEventType.COURSE_ASSESSMENT_ANSWER_SUBMITTED.value: 7,
+    TrackingEventType.COURSE_SIMPLE_INTERACTIVE_TOOL_SUBMITTED.value: 3,
+}
+
+MULTIPLE_CHOICE_DEFINITION = {
+    "choices": [
+        {"text": "Walther Flemming", "choice_key": "A"},
+        {"text": "Robert Hooke", "choice_key": "B"},
+        {"text": "Isaac Newton", "choice_key": "C"},
+        {"text": "Antonie van Leeuvenhoek", "choice_key": "D"},
+    ]
+}
+
+MULTIPLE_CHOICE_SOLUTION = {"join": "AND", "correct_choice_keys": ["B"]}
+
+
+@dataclass
+class LoadDatasetConfig:
+    courses: int = 1
+    modules: int = 10
+    sections_per_module: int = 5
+    units_per_section: int = 6
+    blocks_per_unit: int = 4
+    # Every student is enrolled in every course.
+    students: int = 2000
+    cohorts: int = 4
+    # Per student, per course.
+    events_per_student: int = 10
+    bookmarks_per_student: int = 2
+    # Fraction of a course's assessments (and SITs) each student has submitted.
+    submission_rate: float = 0.5
+    # Used to make slugs and usernames unique, so more than one dataset can exist at once.
+    prefix: str = "load"
+    seed: int = 42
+
+
+@dataclass
+class LoadCourse:
+    course: Course
+    unit_nodes: List[CourseNode] = field(default_factory=list)
+    assessments: List[Assessment] = field(default_factory=list)
+    sits: List[SimpleInteractiveTool] = field(default_factory=list)
+
+
+@dataclass
+class LoadDataset:
+    courses: List[LoadCourse] = field(default_factory=list)
+    students: List = field(default_factory=list)
+
+    @property
+    def student(self):
+        """
+        A typical enrolled student to make requests as.
+        """
+        return self.students[len(self.students) // 2]
+
+
+def build_load_dataset(config: LoadDatasetConfig = None,
+                       progress: Optional[Callable[[str], None]] = None) -> LoadDataset:
+    """
+    Build large synthetic courses with enrolled students and their activity.
+
+    Args:
+        config:     Size of the dataset. Defaults to LoadDatasetConfig().
+        progress:   Optional callable that's given a message as each step finishes.
+
+    Returns:
+        LoadDataset
+    """
+    if config is None:
+        config = LoadDatasetConfig()
+    rng = random.Random(config.seed)
+
+    def report(message: str):
+        logger.info(message)
+        if progress:
+            progress(message)
+
+    dataset = LoadDataset(students=_build_students(config, rng))
+    report(f"Created {len(dataset.students)} students")
+
+    for course_index in range(config.courses):
+        with transaction.atomic():
+            load_course = _build_course(course_index, config)
+            report(f"Created course {load_course.course.token} with {len(load_course.unit_nodes)} units, "
+                   f"{len(load_course.assessments)} assessments and {len(load_course.sits)} SITs")
+            _enroll_students(load_course.course, dataset.students, config)
+            report(f"Enrolled {len(dataset.students)} students in {load_course.course.token}")
+            counts = _build_student_activity(load_course, dataset.students, config, rng)
+            report(f"Created activity in {load_course.course.token}: "
+                   + ", ".join(f"{count} {name}" for name, count in counts.items()))
+        dataset.courses.append(load_course)
+
+    return dataset
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# COURSES
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def _build_course(course_index: int, config: LoadDatasetConfig) -> LoadCourse:
+    prefix = f"{config.prefix}_{course_index}"
+    course = CourseFactory(
+        slug=f"{config.prefix.upper()}{course_index + 1}",
+        run="LOAD",
+        display_name=f"{config.prefix} load course {course_index + 1}",
+        start_date=now() - timedelta(days=30),
+    )
+    load_course = LoadCourse(course=course)
+
+    num_units = config.modules * config.sections_per_module * config.units_per_section
+    course_units = CourseUnit.objects.bulk_create([
+        CourseUnit(
+            course=course,
+            type=CourseUnitType.STANDARD.name,
+            slug=f"{prefix}_unit_{index}",
+            display_name=f"Load unit {index}",
+        )
+        for index in range(num_units)
+    ], batch_size=BATCH_SIZE)
+
+    block_types = [
+        UNIT_BLOCK_PATTERN[order % len(UNIT_BLOCK_PATTERN)]
+        for order in range(config.blocks_per_unit)
+    ]
+    blocks = Block.objects.bulk_create([
+        _make_block(block_type, f"{prefix}_{index}_{order}", index)
+        for index in range(num_units)
+        for order, block_type in enumerate(block_types)
+    ], batch_size=BATCH_SIZE)
+    UnitBlock.objects.bulk_create([
+        UnitBlock(course_unit=course_unit,
+                  block=blocks[index * len(block_types) + order],
+                  block_order=order + 1)
+        for index, course_unit in enumerate(course_units)
+        for order in range(len(block_types))
+    ], batch_size=BATCH_SIZE)
+
+    load_course.assessments = Assessment.objects.bulk_create([
+        Assessment(
+            block=block,
+            type=AssessmentType.MULTIPLE_CHOICE.name,
+            slug=block.slug,
+            question=f"Which scientist coined the term “cells”? ({block.slug})",
+            definition_json=MULTIPLE_CHOICE_DEFINITION,
+            solution_json=MULTIPLE_CHOICE_SOLUTION,
+            has_correct_answer=True,
+            graded=True,
+        )
+        for block in blocks if block.type == BlockType.ASSESSMENT.name
+    ], batch_size=BATCH_SIZE)
+    load_course.sits = SimpleInteractiveTool.objects.bulk_create([
+        SimpleInteractiveTool(
+            block=block,
+            tool_type=SimpleInteractiveToolType.DIAGRAM.name,
+            slug=block.slug,
+            name=block.display_name,
+            definition={},
+            graded=True,
+        )
+        for block in blocks if block.type == BlockType.SIMPLE_INTERACTIVE_TOOL.name
+    ], batch_size=BATCH_SIZE)
+
+    load_course.unit_nodes = _build_course_nav(course, course_units, prefix, config)
+    return load_course
+
+
+def _make_block(block_type: BlockType, slug: str, unit_index: int) -> Block:
+    block = Block(type=block_type.name, slug=slug, display_name=f"Load {block_type.value} {slug}")
+    if block_type == BlockType.HTML_CONTENT:
+        block.html_content = (f"<h1>Load unit {unit_index}</h1>"
+                              f"<p>Some content to read for unit {unit_index}.</p>")
+    elif block_type == BlockType.VIDEO:
+        block.json_content = {"video_id": "wf9QrrRzJys", "header": f"Video for unit {unit_index}"}
+    return block
+
+
+def _build_course_nav(course: Course,
+                      course_units: List[CourseUnit],
+                      prefix: str,
+                      config: LoadDatasetConfig) -> List[CourseNode]:
+    unit_nodes = []
+    unit_index = 0
+    content_index = CourseNode.objects.filter(tree_id=course.course_root_node.tree_id).count()
+    with course_nav_bulk_edit(course):
+        for module_index in range(config.modules):
+            module_node = CourseNode.objects.create(
+                type=NodeType.MODULE.name,
+                parent=course.course_root_node,
+                display_name=f"Load module {module_index}",
+                display_sequence=module_index + 10,
+                slug=f"{prefix}_module_{module_index}",
+            )
+            for section_index in range(config.sections_per_module):
+                content_index += 1
+                section_node = CourseNode.objects.create(
+                    type=NodeType.SECTION.name,
+                    parent=module_node,
+                    display_name=f"Load section {module_index}.{section_index}",
+                    display_sequence=section_index + 1,
+                    content_index=content_index,
+                    slug=f"{prefix}_section_{module_index}_{section_index}",
+                )
+                for unit_sequence in range(config.units_per_section):
+                    course_unit = course_units[unit_index]
+                    unit_nodes.append(CourseNode.objects.create(
+                        type=NodeType.UNIT.name,
+                        parent=section_node,
+                        display_name=course_unit.display_name,
+                        display_sequence=unit_sequence + 1,
+                        unit=course_unit,
+                        slug=course_unit.slug,
+                    ))
+                    unit_index += 1
+    return unit_nodes
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# STUDENTS
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def _build_students(config: LoadDatasetConfig, rng: random.Random) -> List:
+    # Hash the password once; it's the slow part of creating a user.
+    template_user = User(username="template")
+    template_user.set_password(LOAD_STUDENT_PASSWORD)
+    _bulk_create(User, (
+        User(username=f"{config.prefix}-student-{index}",
+             email=f"{config.prefix}-student-{index}@example.com",
+             anon_username=_random_uuid(rng),
+             password=template_user.password)
+        for index in range(config.students)
+    ))
+    return list(User.objects.filter(username__startswith=f"{config.prefix}-student-").order_by("id"))
+
+
+def _enroll_students(course: Course, students: List, config: LoadDatasetConfig):
+    cohorts = [course.get_default_cohort()] + [
+        Cohort.objects.create(course=course,
+                              name=f"Load cohort {index}",
+                              slug=f"{course.slug.lower()}-cohort-{index}")
+        for index in range(1, config.cohorts)
+    ]
+    _bulk_create(Enrollment, (
+        Enrollment(course=course, student=student, active=True)
+        for student in students
+    ))
+    _bulk_create(CohortMembership, (
+        CohortMembership(cohort=cohorts[index % len(cohorts)], student=student)
+        for index, student in enumerate(students)
+    ))
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# STUDENT ACTIVITY
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def _build_student_activity(load_course: LoadCourse,
+                            students: List,
+                            config: LoadDatasetConfig,
+                            rng: random.Random) -> dict:
+    course = load_course.course
+    unit_nodes = load_course.unit_nodes
+    counts = {}
+
+    counts["submitted answers"] = _bulk_create(SubmittedAnswer, (
+        _make_submitted_answer(course, assessment, student, rng)
+        for student in students
+        for assessment in _sample(rng, load_course.assessments, config.submission_rate)
+    ))
+
+    counts["SIT submissions"] = _bulk_create(SimpleInteractiveToolSubmission, (
+        SimpleInteractiveToolSubmission(
+            course=course,
+            simple_interactive_tool=sit,
+            student=student,
+            status=SimpleInteractiveToolSubmissionStatus.COMPLETE.name,
+            score=sit.max_score,
+            json_content={"nodes": [{"id": 1, "label": "Start"}], "edges": []},
+        )
+        for student in students
+        for sit in _sample(rng, load_course.sits, config.submission_rate)
+    ))
+
+    counts["bookmarks"] = _bulk_create(Bookmark, (
+        Bookmark(course=course, student=student, unit_node=unit_node)
+        for student in students
+        for unit_node in rng.sample(unit_nodes, min(config.bookmarks_per_student, len(unit_nodes)))
+    ), ignore_conflicts=True)
+
+    milestones = list(Milestone.objects.filter(course=course))
+    counts["milestone progress"] = _bulk_create(MilestoneProgress, (
+        MilestoneProgress(course=course, milestone=milestone, student=student, count=rng.randint(0, 3))
+        for student in students
+        for milestone in milestones
+    ))
+
+    event_types = list(EVENT_TYPE_WEIGHTS.keys())
+    event_weights = list(EVENT_TYPE_WEIGHTS.values())
+    start_time = course.start_date
+    span_seconds = (now() - start_time).total_seconds()
+    counts["tracking events"] = _copy_rows(TrackingEvent, [
+        "uuid", "event_type", "time", "user", "anon_username", "course_slug", "course_run",
+        "unit_node_slug", "course_unit_id", "course_unit_slug",
+    ], (
+        (
+            _random_uuid(rng),
+            rng.choices(event_types, event_weights)[0],
+            start_time + timedelta(seconds=rng.uniform(0, span_seconds)),
+            student.id,
+            student.anon_username,
+            course.slug,
+            course.run,
+            unit_node.slug,
+            unit_node.unit_id,
+            unit_node.slug,
+        )
+        for student in students
+        for unit_node in (rng.choice(unit_nodes) for _ in range(config.events_per_student))
+    ))
+    return counts
+
+
+def _make_submitted_answer(course: Course, assessment: Assessment, student, rng: random.Random) -> SubmittedAnswer:
+    choice_key = rng.choice(["A", "B", "B", "C", "D"])
+    correct = choice_key in MULTIPLE_CHOICE_SOLUTION["correct_choice_keys"]
+    return SubmittedAnswer(
+        course=course,
+        assessment=assessment,
+        student=student,
+        status=AnswerStatus.CORRECT.name if correct else AnswerStatus.INCORRECT.name,
+        score=assessment.max_score if correct else 0,
+        attempts=rng.randint(1, 3),
+        json_content={"answer": [choice_key]},
+    )
+
+
+def _sample(rng: random.Random, items: List, rate: float) -> List:
+    return rng.sample(items, round(len(items) * rate))
+
+
+def _random_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# BULK WRITES
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def _chunked(iterable: Iterable, size: int) -> Iterable[List]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _bulk_create(model, objects: Iterable, ignore_conflicts: bool = False) -> int:
+    """
+    bulk_create() objects from an iterable, a batch at a time,
+    so they never all have to be in memory at once.
+
+    Returns:
+        Number of objects written.
+    """
+    count = 0
+    for chunk in _chunked(objects, BATCH_SIZE):
+        model.objects.bulk_create(chunk, ignore_conflicts=ignore_conflicts)
+        count += len(chunk)
+    return count
+
+
+def _copy_rows(model, field_names: List[str], rows: Iterable[tuple]) -> int:
+    """
+    Write rows (tuples of values for field_names) to a model's table.
+
+    On Postgres this uses COPY, which is many times faster than INSERT
+    for millions of rows and, unlike bulk_create(), keeps the values given
+    for auto_now_add fields. Other databases fall back to bulk_create().
+
+    Returns:
+        Number of rows written.
+    """
+    model_fields = [model._meta.get_field(name) for name in field_names]
+    if connection.vendor != "postgresql":
+        attnames = [model_field.attname for model_field in model_fields]
+        return _bulk_create(model, (model(**dict(zip(attnames, row))) for row in rows))
+
+    columns = ", ".join(connection.ops.quote_name(model_field.column) for model_field in model_fields)
+    sql = f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN"
+    count = 0
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        for chunk in _chunked(rows, BATCH_SIZE):
+            if hasattr(raw_cursor, "copy"):
+                # psycopg 3
+                with raw_cursor.copy(sql) as copy:
+                    for row in chunk:
+                        copy.write_row(row)
+            else:
+                # psycopg2
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(chunk)
+                buffer.seek(0)
+                raw_cursor.copy_expert(f"{sql} WITH (FORMAT csv)", buffer)
+            count += len(chunk)
+    return count
@@ -0,0 +1,49 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kinesinlms.course.clone import clone_course
+from kinesinlms.course.models import Course
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a new run of a course by copying its navigation, units, milestones, "
+        "surveys and catalog description in the database. Content blocks are shared "
+        "with the original course where possible."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("token", type=str, help="Token of the course to clone, e.g. SLUG_RUN")
+        parser.add_argument("--slug", type=str, default=None, help="Slug for the new course (defaults to same slug)")
+        parser.add_argument("--run", type=str, required=True, help="Run for the new course")
+        parser.add_argument("--display-name", type=str, default=None)
+        parser.add_argument("--short-name", type=str, default=None)
+
+    def handle(self, *args, **options):
+        token = options["token"]
+        try:
+            slug, run = token.split("_")
+        except ValueError:
+            raise CommandError(f"Invalid course token: {token}")
+
+        try:
+            course = Course.objects.get(slug=slug, run=run)
+        except Course.DoesNotExist:
+            raise CommandError(f"NO ACTION! Can't find course with token {token}")
+
+        try:
+            result = clone_course(
+                course,
+                new_slug=options["slug"] or course.slug,
+                new_run=options["run"],
+                display_name=options["display_name"],
+                short_name=options["short_name"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(result.summary())
+        self.stdout.write(self.style.SUCCESS(f"Created course {result.course.token}"))
@@ -0,0 +1,81 @@
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from kinesinlms.course.load_dataset import LOAD_STUDENT_PASSWORD, LoadDatasetConfig, build_load_dataset
+from kinesinlms.course.models import Course
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate large synthetic courses, students and student activity (answers, SIT submissions, "
+        "milestone progress, tracking events) for reproducing performance problems locally. "
+        "The same options and seed always generate the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--courses", type=int, default=1)
+        parser.add_argument("--modules", type=int, default=10, help="Modules per course")
+        parser.add_argument("--sections-per-module", type=int, default=5)
+        parser.add_argument("--units-per-section", type=int, default=6)
+        parser.add_argument("--blocks-per-unit", type=int, default=4,
+                            help="Blocks per unit, cycling through HTML, assessment, video and SIT")
+        parser.add_argument("--students", type=int, default=2000,
+                            help="Students to create. Every student is enrolled in every course.")
+        parser.add_argument("--cohorts", type=int, default=4, help="Cohorts per course")
+        parser.add_argument("--events-per-student", type=int, default=10,
+                            help="Tracking events per student, per course")
+        parser.add_argument("--bookmarks-per-student", type=int, default=2)
+        parser.add_argument("--submission-rate", type=float, default=0.5,
+                            help="Fraction of each course's assessments and SITs a student has submitted")
+        parser.add_argument("--prefix", type=str, default="load",
+                            help="Prefix for course slugs and usernames (letters and digits only)")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--force", action="store_true",
+                            help="Run even when DEBUG is off")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("NO ACTION! DEBUG is off. This command is meant for local databases; "
+                               "use --force to run it anyway.")
+
+        prefix = options["prefix"]
+        if not prefix.isalnum():
+            raise CommandError(f"Invalid prefix '{prefix}': use letters and digits only.")
+        if not 0 <= options["submission_rate"] <= 1:
+            raise CommandError("--submission-rate must be between 0 and 1.")
+        if Course.objects.filter(slug__startswith=prefix.upper(), run="LOAD").exists() or \
+                User.objects.filter(username__startswith=f"{prefix}-student-").exists():
+            raise CommandError(f"NO ACTION! Data with prefix '{prefix}' already exists. "
+                               f"Use a different --prefix or an empty database.")
+
+        config = LoadDatasetConfig(
+            courses=options["courses"],
+            modules=options["modules"],
+            sections_per_module=options["sections_per_module"],
+            units_per_section=options["units_per_section"],
+            blocks_per_unit=options["blocks_per_unit"],
+            students=options["students"],
+            cohorts=options["cohorts"],
+            events_per_student=options["events_per_student"],
+            bookmarks_per_student=options["bookmarks_per_student"],
+            submission_rate=options["submission_rate"],
+            prefix=prefix,
+            seed=options["seed"],
+        )
+
+        start = time.monotonic()
+        dataset = build_load_dataset(config, progress=self.stdout.write)
+
+        self.stdout.write(f"Students log in as {prefix}-student-<n> with password '{LOAD_STUDENT_PASSWORD}'.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(dataset.courses)} courses and {len(dataset.students)} students "
+            f"in {time.monotonic() - start:.0f}s"
+        ))
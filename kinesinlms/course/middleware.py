@@ -0,0 +1,36 @@
+from django.shortcuts import render
+
+from kinesinlms.course.access_cache import EnrollmentInProgress
+
+# How long (in seconds) the client should wait before trying again.
+ENROLLMENT_IN_PROGRESS_RETRY_SECONDS = 2
+
+
+class EnrollmentInProgressMiddleware:
+    """
+    Answer requests that arrive while the user's enrollment is still being
+    saved (see kinesinlms.course.access_cache.find_active_enrollment) with a
+    202 that asks the client to try again shortly, rather than denying access.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, EnrollmentInProgress):
+            return None
+        context = {
+            "retry_url": request.get_full_path(),
+            "retry_seconds": ENROLLMENT_IN_PROGRESS_RETRY_SECONDS,
+            "display_name": exception.course.display_name,
+        }
+        if request.headers.get("HX-Request"):
+            template_name = "course/hx/enrollment_in_progress_hx.html"
+        else:
+            template_name = "course/enrollment_in_progress.html"
+        response = render(request, template_name, context, status=202)
+        response["Retry-After"] = str(ENROLLMENT_IN_PROGRESS_RETRY_SECONDS)
+        return response
@@ -247,6 +247,68 @@ class MilestoneMonitor:
 
         return any_milestone_achieved
 
+    @classmethod
+    def track_forum_activity(
+        cls,
+        course: Course,
+        student: User,
+        post_count: int,
+    ) -> bool:
+        """
+        Update progress towards the course's forum post milestones
+        from the student's forum activity count (see ForumActivityCounter).
+
+        Args:
+            course:         Course object
+            student:        User object
+            post_count:     Number of forum posts the student has made in the course.
+
+        Returns:
+            A boolean flag indicating whether the student just achieved
+            any forum post Milestone.
+        """
+        if course.has_finished:
+            raise CourseFinishedException(
+                "Cannot track forum activity: Course has already finished."
+            )
+
+        any_milestone_achieved = False
+        check_for_course_passed = False
+        milestones = course.milestones.filter(type=MilestoneType.FORUM_POSTS.name)
+        for milestone in milestones.all():
+            progress, _created = MilestoneProgress.objects.get_or_create(
+                course_id=course.id, milestone_id=milestone.id, student_id=student.id
+            )
+            if progress.achieved or progress.count >= post_count:
+                continue
+
+            progress.count = post_count
+            just_achieved = progress.mark_achieved()
+            progress.save()
+
+            Tracker.track(
+                event_type=(
+                    TrackingEventType.MILESTONE_COMPLETED.value
+                    if just_achieved
+                    else TrackingEventType.MILESTONE_PROGRESSED.value
+                ),
+                user=student,
+                event_data={
+                    "milestone_type": milestone.type,
+                    "milestone_id": milestone.id,
+                },
+                course=course,
+            )
+            if just_achieved:
+                any_milestone_achieved = True
+                if milestone.required_to_pass:
+                    check_for_course_passed = True
+
+        if check_for_course_passed:
+            cls._award_course_passed_if_course_passed(course=course, student=student)
+
+        return any_milestone_achieved
+
     @classmethod
     def remove_assessment_from_progress_by_id(
         cls,
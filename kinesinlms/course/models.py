@@ -1,5 +1,6 @@
 import logging
 import uuid
+from collections import defaultdict
 from enum import Enum
 from typing import List, Optional
 
@@ -564,36 +565,40 @@ class CourseNode(MPTTModel):
     def reindex_course_nav_content(self, start_module_index_at: int = 0) -> None:
         """
         Renumber the "content_index" for each node in the course navigation.
+
+        Modules are numbered from start_module_index_at, while sections and
+        units are numbered from 1 within their parent. The subtree is read in
+        one query and only nodes whose index actually changes are written,
+        via a single bulk_update (which skips MPTT bookkeeping, which
+        is fine as content_index has no bearing on the tree structure).
         """
-        module_index = start_module_index_at
-        for module_node in self.children.order_by("display_sequence").all():
-            module_node.content_index = module_index
-            module_node.save()
-            module_index += 1
-            section_index = 1
-            for section_node in module_node.children.order_by("display_sequence").all():
-                section_node.content_index = section_index
-                section_node.save()
-                section_index += 1
-                unit_index = 1
-                for unit_node in section_node.children.order_by("display_sequence").all():
-                    unit_node.content_index = unit_index
-                    unit_node.save()
-                    unit_index += 1
+        descendants = list(self.get_descendants().filter(level__lte=self.level + 3).order_by("display_sequence", "lft"))
+        children_by_parent_id = defaultdict(list)
+        for node in descendants:
+            children_by_parent_id[node.parent_id].append(node)
+
+        changed_nodes = []
+
+        def renumber(parent_id: int, start_index: int) -> None:
+            for content_index, node in enumerate(children_by_parent_id[parent_id], start=start_index):
+                if node.content_index != content_index:
+                    node.content_index = content_index
+                    changed_nodes.append(node)
+                renumber(node.id, 1)
+
+        renumber(self.id, start_module_index_at)
+
+        if changed_nodes:
+            CourseNode.objects.bulk_update(changed_nodes, ["content_index"])
 
     def clear_course_nav_content_index(self) -> None:
         """
         Clear indexing in course navigation.
         """
-        for module_node in self.children.all():
-            module_node.content_index = None
-            module_node.save()
-            for section_node in module_node.children.all():
-                section_node.content_index = None
-                section_node.save()
-                for unit_node in section_node.children.all():
-                    unit_node.content_index = None
-                    unit_node.save()
+        self.get_descendants().filter(
+            level__lte=self.level + 3,
+            content_index__isnull=False,
+        ).update(content_index=None)
 
     def __str__(self) -> str:
         return f"{self.id} : {self.display_name} "
@@ -1070,6 +1075,13 @@ class Course(Trackable):
         # Update this to something more granular if you want.
         return self.can_view_course_admin(user)
 
+    def can_view_course_admin_certificates(self, user) -> bool:
+        """
+        Indicates whether user can view the Course Admin Certificates endpoints.
+        """
+        # Update this to something more granular if you want.
+        return self.can_view_course_admin(user)
+
     def can_view_course_admin_resources(self, user) -> bool:
         """
         Indicates whether user can view the course admin  for this course.
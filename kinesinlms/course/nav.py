@@ -1,3 +1,5 @@
+import threading
+from contextlib import contextmanager
 from datetime import timedelta
 from typing import Dict, Tuple
 
@@ -6,11 +8,13 @@ from django.utils.timezone import now
 
 from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
 import logging
 
 from kinesinlms.course.models import Course, CourseNode
 from kinesinlms.course.serializers import CourseNodeSimpleSerializer
 from kinesinlms.course.utils import update_node_time
+from kinesinlms.management.utils import delete_course_nav_cache
 
 
 logger = logging.getLogger(__name__)
@@ -20,6 +24,62 @@ class CourseNavException(Exception):
     pass
 
 
+# Courses touched by the outermost active course_nav_bulk_edit() block on this thread.
+_bulk_edit_state = threading.local()
+
+
+@contextmanager
+def course_nav_bulk_edit(course: Course):
+    """
+    Context manager for making structural changes to a course's CourseNode
+    tree (adding, moving or deleting nodes).
+
+    Normally every CourseNode insert, move or delete rewrites lft/rght for
+    large parts of the tree. Inside this block MPTT updates are delayed
+    and each modified tree gets a single partial rebuild at the end.
+    The course nav cache is then cleared once (and again on commit if
+    we're inside an outer transaction).
+
+    Note that MPTT tree methods (get_children(), get_descendants(), etc.)
+    can return stale results inside the block, so read structure from
+    the parent foreign key if you need it before the block exits.
+
+    Blocks can be nested: only the outermost block rebuilds and clears caches.
+
+    Usage::
+
+        with course_nav_bulk_edit(course):
+            create_module_node(root_node=course.course_root_node)
+            ...
+
+    Args:
+        course:     The course whose navigation is being changed.
+    """
+    pending_courses = getattr(_bulk_edit_state, "pending_courses", None)
+    if pending_courses is not None:
+        pending_courses.add((course.slug, course.run))
+        yield
+        return
+
+    pending_courses = {(course.slug, course.run)}
+    _bulk_edit_state.pending_courses = pending_courses
+    try:
+        with transaction.atomic():
+            with CourseNode.objects.delay_mptt_updates():
+                yield
+    finally:
+        _bulk_edit_state.pending_courses = None
+
+    for course_slug, course_run in pending_courses:
+        delete_course_nav_cache(course_slug=course_slug, course_run=course_run)
+        if transaction.get_connection().in_atomic_block:
+            # Still inside an outer transaction (e.g. ATOMIC_REQUESTS), so
+            # another request could cache the old nav before we commit.
+            transaction.on_commit(
+                lambda slug=course_slug, run=course_run: delete_course_nav_cache(course_slug=slug, course_run=run)
+            )
+
+
 def get_course_nav(course: Course, is_beta_tester: bool = False) -> Dict:
     """
     Return a dictionary representing course nav
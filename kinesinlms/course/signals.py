@@ -0,0 +1,48 @@
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from kinesinlms.course.access_cache import (
+    clear_recent_enrollments,
+    invalidate_course,
+    invalidate_course_access,
+    mark_recent_enrollments,
+)
+from kinesinlms.course.models import CohortMembership, Course, Enrollment
+
+logger = logging.getLogger(__name__)
+
+
+# Keep the course access cache (see kinesinlms.course.access_cache) in step
+# with changes to courses, enrollments and cohort memberships.
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, instance: Course, **kwargs):
+    invalidate_course(instance)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def enrollment_changed(sender, instance: Enrollment, **kwargs):
+    invalidate_course_access(instance.course_id, [instance.student_id])
+    if kwargs.get('signal') is post_save and instance.active:
+        mark_recent_enrollments(instance.course_id, [instance.student_id])
+    else:
+        clear_recent_enrollments(instance.course_id, [instance.student_id])
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=CohortMembership)
+@receiver(post_delete, sender=CohortMembership)
+def cohort_membership_changed(sender, instance: CohortMembership, **kwargs):
+    try:
+        course_id = instance.cohort.course_id
+    except Exception:
+        # Cohort may already be gone if its course is being deleted.
+        logger.debug(f"cohort_membership_changed(): no cohort for membership {instance.id}")
+        return
+    invalidate_course_access(course_id, [instance.student_id])
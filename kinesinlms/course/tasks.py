@@ -1,9 +1,12 @@
 import logging
-from typing import Optional
+from typing import List, Optional
 
 from django.contrib.auth import get_user_model
 
 from config import celery_app
+from kinesinlms.certificates.models import Certificate
+from kinesinlms.course.certificates.bulk import queue_certificate_pdfs, store_certificate_pdfs
+from kinesinlms.course.certificates.pdfs import store_certificate_pdf
 from kinesinlms.course.exceptions import CourseFinishedException
 from kinesinlms.course.milestone_monitor import MilestoneMonitor
 from kinesinlms.course.models import Course
@@ -121,3 +124,72 @@ def rescore_assessment_milestone_progress(course_id: int,
     return mm.rescore_assessment_progress_by_id(course_id=course_id,
                                                 user_id=user_id,
                                                 assessment_id=assessment_id)
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# CERTIFICATE TASKS
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+@celery_app.task(retry_backoff=True,
+                 retry_kwargs={'max_retries': 3},
+                 on_failure=task_error_handler)
+def store_certificate_pdf_task(certificate_id: int) -> bool:
+    """
+    Renders a certificate as a PDF and stores it, so downloads can serve it directly.
+
+    Args:
+        certificate_id:  ID of the Certificate to render.
+
+    Returns:
+        True if the PDF was stored.
+    """
+    try:
+        certificate = Certificate.objects.select_related(
+            'student', 'certificate_template__course'
+        ).get(id=certificate_id)
+    except Certificate.DoesNotExist:
+        logger.warning(f"store_certificate_pdf_task(): certificate {certificate_id} no longer exists.")
+        return False
+    store_certificate_pdf(certificate)
+    return True
+
+
+@celery_app.task(ignore_result=True,
+                 on_failure=task_error_handler)
+def generate_course_certificates_task(course_id: int) -> int:
+    """
+    Pre-generates certificate PDFs for everyone who passed a course,
+    by queuing store_certificate_pdfs_task for chunks of certificates.
+    Safe to run again: only certificates without an up-to-date PDF are queued.
+
+    Args:
+        course_id:  ID of the course.
+
+    Returns:
+        Number of certificates queued for rendering.
+    """
+    try:
+        course = Course.objects.get(id=course_id)
+    except Course.DoesNotExist:
+        logger.warning(f"generate_course_certificates_task(): course {course_id} no longer exists.")
+        return 0
+    return queue_certificate_pdfs(course)
+
+
+@celery_app.task(retry_backoff=True,
+                 retry_kwargs={'max_retries': 3},
+                 on_failure=task_error_handler)
+def store_certificate_pdfs_task(certificate_ids: List[int]) -> int:
+    """
+    Renders and stores PDFs for a chunk of certificates.
+
+    Args:
+        certificate_ids:  IDs of the Certificates to render.
+
+    Returns:
+        Number of PDFs stored.
+    """
+    stored, failed = store_certificate_pdfs(certificate_ids)
+    if failed:
+        logger.warning(f"store_certificate_pdfs_task(): {failed} of {len(certificate_ids)} certificates failed.")
+    return stored
@@ -401,6 +401,11 @@ def can_view_course_admin_assessments(user, course) -> bool:
     return course.can_view_course_admin_assessments(user)
 
 
+@register.simple_tag
+def can_view_course_admin_certificates(user, course) -> bool:
+    return course.can_view_course_admin_certificates(user)
+
+
 @register.simple_tag
 def can_view_course_admin_resources(user, course) -> bool:
     return course.can_view_course_admin_resources(user)
@@ -0,0 +1,151 @@
+"""
+Query-count and wall-time budgets for the views students hit most.
+
+These tests build a large synthetic course (see course/load_dataset.py) and
+request each view as an enrolled student, twice: once with empty caches
+("cold") and once again straight after ("warm"). Each request must stay within its view's
+budget of SQL queries, and the warm request within its time budget.
+
+They're slow to set up, so they only run when RUN_BENCHMARKS is set:
+
+    RUN_BENCHMARKS=1 pytest kinesinlms/course/tests/benchmarks
+
+The test settings' database (Postgres in docker-compose) is used as is. The
+dummy cache from the test settings is swapped for a local memory cache,
+standing in for Redis, so cached lookups behave as they do in production.
+Set BENCHMARK_SCALE (default 1.0) to grow or shrink the dataset.
+
+Budgets are upper limits. When a change makes a view cheaper, lower its
+budget in BUDGETS so the improvement can't silently regress.
+"""
+
+import logging
+import os
+import time
+import unittest
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kinesinlms.course.load_dataset import LoadDatasetConfig, build_load_dataset
+
+logger = logging.getLogger(__name__)
+
+RUN_BENCHMARKS = bool(os.environ.get("RUN_BENCHMARKS"))
+
+BENCHMARK_SCALE = float(os.environ.get("BENCHMARK_SCALE", "1.0"))
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmarks",
+    }
+}
+
+
+@dataclass
+class Budget:
+    cold_queries: int
+    warm_queries: int
+    warm_seconds: float
+
+
+BUDGETS = {
+    "unit_page": Budget(cold_queries=120, warm_queries=60, warm_seconds=1.0),
+    "progress_overview_page": Budget(cold_queries=60, warm_queries=40, warm_seconds=1.0),
+    "course_search_page": Budget(cold_queries=40, warm_queries=25, warm_seconds=1.0),
+    "dashboard": Budget(cold_queries=50, warm_queries=35, warm_seconds=1.0),
+    "catalog": Budget(cold_queries=40, warm_queries=25, warm_seconds=1.0),
+    "course_nav_api": Budget(cold_queries=20, warm_queries=10, warm_seconds=0.5),
+}
+
+
+@dataclass
+class Measurement:
+    queries: int
+    seconds: float
+    status_code: int
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, "Set RUN_BENCHMARKS=1 to run query budget benchmarks.")
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestQueryBudgets(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        config = LoadDatasetConfig(
+            modules=max(1, int(10 * BENCHMARK_SCALE)),
+            students=max(10, int(2000 * BENCHMARK_SCALE)),
+            prefix="bench",
+        )
+        start = time.perf_counter()
+        dataset = build_load_dataset(config)
+        logger.info(f"Built benchmark dataset in {time.perf_counter() - start:.1f}s")
+        cls.course = dataset.courses[0].course
+        cls.student = dataset.student
+        unit_nodes = dataset.courses[0].unit_nodes
+        unit_node = unit_nodes[len(unit_nodes) // 2]
+        cls.unit_kwargs = {
+            "course_slug": cls.course.slug,
+            "course_run": cls.course.run,
+            "module_slug": unit_node.parent.parent.slug,
+            "section_slug": unit_node.parent.slug,
+            "unit_slug": unit_node.slug,
+        }
+        cls.course_kwargs = {"course_slug": cls.course.slug, "course_run": cls.course.run}
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(self.student)
+
+    def _measure(self, url: str) -> Measurement:
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = self.client.get(url)
+            seconds = time.perf_counter() - start
+        return Measurement(queries=len(context.captured_queries), seconds=seconds, status_code=response.status_code)
+
+    def _assert_within_budget(self, name: str, url: str):
+        budget = BUDGETS[name]
+        cold = self._measure(url)
+        warm = self._measure(url)
+        report = (f"{name}: cold {cold.queries} queries in {cold.seconds:.3f}s, "
+                  f"warm {warm.queries} queries in {warm.seconds:.3f}s")
+        logger.info(report)
+
+        self.assertEqual(cold.status_code, 200, f"{name} returned {cold.status_code}")
+        self.assertLessEqual(cold.queries, budget.cold_queries,
+                             f"{name} used {cold.queries} queries with cold caches "
+                             f"(budget {budget.cold_queries})")
+        self.assertLessEqual(warm.queries, budget.warm_queries,
+                             f"{name} used {warm.queries} queries with warm caches "
+                             f"(budget {budget.warm_queries})")
+        self.assertLessEqual(warm.seconds, budget.warm_seconds,
+                             f"{name} took {warm.seconds:.3f}s with warm caches "
+                             f"(budget {budget.warm_seconds}s)")
+
+    def test_unit_page(self):
+        self._assert_within_budget("unit_page", reverse("course:unit_page", kwargs=self.unit_kwargs))
+
+    def test_progress_overview_page(self):
+        self._assert_within_budget("progress_overview_page",
+                                   reverse("course:progress_overview_page", kwargs=self.course_kwargs))
+
+    def test_course_search_page(self):
+        url = reverse("course:course_search_page", kwargs=self.course_kwargs)
+        self._assert_within_budget("course_search_page", f"{url}?search_text=content")
+
+    def test_dashboard(self):
+        self._assert_within_budget("dashboard", reverse("dashboard:index"))
+
+    def test_catalog(self):
+        self._assert_within_budget("catalog", reverse("catalog:index"))
+
+    def test_course_nav_api(self):
+        self._assert_within_budget("course_nav_api", reverse("course_nav-detail", kwargs={"pk": self.course.id}))
@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.timezone import now
+
+from kinesinlms.course.access_cache import EnrollmentInProgress, get_course_access, recent_enrollment_cache_key
+from kinesinlms.course.middleware import EnrollmentInProgressMiddleware
+from kinesinlms.course.models import Enrollment
+from kinesinlms.course.tests.factories import CourseFactory
+from kinesinlms.users.tests.factories import UserFactory
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-course-access-cache",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestCourseAccessCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.course = CourseFactory()
+        self.course.start_date = now() - timedelta(days=1)
+        self.course.save()
+        self.student = UserFactory(username="access-cache-student", email="access-cache-student@example.com")
+        self.enrollment = Enrollment.objects.create(student=self.student, course=self.course, active=True)
+        self.request_factory = RequestFactory()
+
+    def tearDown(self):
+        cache.clear()
+
+    def _get_request(self):
+        request = self.request_factory.get("/")
+        request.user = self.student
+        return request
+
+    def test_access_remembered_for_request(self):
+        request = self._get_request()
+        access = get_course_access(request, self.course.slug, self.course.run)
+        self.assertEqual(access.enrollment.id, self.enrollment.id)
+
+        with self.assertNumQueries(0):
+            again = get_course_access(request, self.course.slug, self.course.run)
+            self.assertTrue(again.can_access(self.student))
+        self.assertIs(again, access)
+
+    def test_access_shared_between_requests(self):
+        get_course_access(self._get_request(), self.course.slug, self.course.run)
+
+        with self.assertNumQueries(0):
+            access = get_course_access(self._get_request(), self.course.slug, self.course.run)
+            self.assertTrue(access.can_access(self.student))
+            self.assertEqual(access.enrollment.course, self.course)
+
+    def test_unenrollment_invalidates_shared_access(self):
+        get_course_access(self._get_request(), self.course.slug, self.course.run)
+
+        self.enrollment.active = False
+        self.enrollment.save()
+
+        access = get_course_access(self._get_request(), self.course.slug, self.course.run)
+        self.assertIsNone(access.enrollment)
+        self.assertFalse(access.can_access(self.student))
+
+    def test_missing_enrollment_not_shared(self):
+        self.enrollment.delete()
+        access = get_course_access(self._get_request(), self.course.slug, self.course.run)
+        self.assertIsNone(access.enrollment)
+
+        Enrollment.objects.create(student=self.student, course=self.course, active=True)
+
+        access = get_course_access(self._get_request(), self.course.slug, self.course.run)
+        self.assertIsNotNone(access.enrollment)
+
+    def test_enrollment_marked_before_commit(self):
+        self.enrollment.delete()
+        key = recent_enrollment_cache_key(self.course.id, self.student.id)
+        self.assertIsNone(cache.get(key))
+
+        with self.captureOnCommitCallbacks(execute=False):
+            Enrollment.objects.create(student=self.student, course=self.course, active=True)
+            self.assertTrue(cache.get(key))
+
+    def test_marked_enrollment_not_yet_visible(self):
+        # The enrollment has been saved in another transaction that hasn't committed yet.
+        self.enrollment.delete()
+        cache.set(recent_enrollment_cache_key(self.course.id, self.student.id), True)
+
+        request = self.request_factory.get("/", HTTP_HX_REQUEST="true")
+        request.user = self.student
+        with self.assertRaises(EnrollmentInProgress) as context:
+            get_course_access(request, self.course.slug, self.course.run)
+
+        middleware = EnrollmentInProgressMiddleware(lambda r: None)
+        response = middleware.process_exception(request, context.exception)
+        self.assertEqual(response.status_code, 202)
+        self.assertIn("Retry-After", response)
+        self.assertContains(response, 'hx-get="/"', status_code=202)
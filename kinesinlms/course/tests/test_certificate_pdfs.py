@@ -0,0 +1,112 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from kinesinlms.certificates.models import Certificate
+from kinesinlms.course.certificates.bulk import get_certificate_generation_progress, queue_certificate_pdfs
+from kinesinlms.course.certificates.pdfs import get_certificate_pdf, store_certificate_pdf
+from kinesinlms.course.models import CoursePassed
+from kinesinlms.course.tasks import generate_course_certificates_task
+from kinesinlms.course.tests.factories import CourseFactory
+from kinesinlms.users.tests.factories import UserFactory
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TestCertificatePDFs(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.course = CourseFactory()
+        self.student = UserFactory(username="cert-student", name="Cert Student")
+        self.certificate_template = self.course.certificate_template
+        # Factory signatories don't have signature images to render.
+        self.certificate_template.signatories.clear()
+        self.certificate = Certificate.objects.create(certificate_template=self.certificate_template,
+                                                      student=self.student)
+
+    def test_base_certificate_rendered_and_stored(self):
+        pdf = store_certificate_pdf(self.certificate)
+
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.certificate.refresh_from_db()
+        self.assertTrue(self.certificate.pdf_file.name.endswith(f"_{self.certificate.pdf_version}.pdf"))
+        with self.certificate.pdf_file.open("rb") as pdf_file:
+            self.assertEqual(pdf_file.read(), pdf)
+
+    def test_stored_pdf_served_without_rendering(self):
+        store_certificate_pdf(self.certificate)
+
+        with patch("kinesinlms.course.certificates.pdfs.render_certificate_pdf") as render:
+            pdf = get_certificate_pdf(self.certificate)
+
+        render.assert_not_called()
+        self.assertTrue(pdf.startswith(b"%PDF"))
+
+    def test_pdf_rendered_again_when_content_changes(self):
+        store_certificate_pdf(self.certificate)
+        old_version = self.certificate.pdf_version
+
+        self.student.name = "Cert Student Renamed"
+        self.student.save()
+        self.certificate.refresh_from_db()
+        with patch("kinesinlms.course.certificates.pdfs.render_certificate_pdf",
+                   return_value=b"%PDF-renamed") as render:
+            pdf = get_certificate_pdf(self.certificate)
+
+        render.assert_called_once()
+        self.assertEqual(pdf, b"%PDF-renamed")
+        self.assertNotEqual(self.certificate.pdf_version, old_version)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TestBulkCertificateGeneration(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.course = CourseFactory()
+        self.course.certificate_template.signatories.clear()
+        self.students = [UserFactory(username=f"passed-student-{index}") for index in range(3)]
+        for student in self.students:
+            CoursePassed.objects.create(course=self.course, student=student)
+
+    def test_job_generates_certificate_for_every_course_passed(self):
+        progress = get_certificate_generation_progress(self.course)
+        self.assertEqual(progress.total, 0)
+
+        generate_course_certificates_task.delay(course_id=self.course.id)
+
+        progress = get_certificate_generation_progress(self.course)
+        self.assertEqual(progress.total, 3)
+        self.assertEqual(progress.generated, 3)
+
+        # Running again only queues what's left, which is nothing.
+        self.assertEqual(queue_certificate_pdfs(self.course), 0)
+
+    def test_admin_downloads_zip_of_generated_certificates(self):
+        generate_course_certificates_task.delay(course_id=self.course.id)
+        admin = UserFactory(username="cert-admin", is_staff=True)
+        self.client.force_login(admin)
+
+        url = reverse("course:course_admin:download_certificates_zip",
+                      kwargs={"course_slug": self.course.slug, "course_run": self.course.run})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
+            self.assertEqual(sorted(zip_file.namelist()), sorted(
+                f"{student.username}_{self.course.token}_certificate.pdf" for student in self.students
+            ))
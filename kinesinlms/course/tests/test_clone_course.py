@@ -0,0 +1,99 @@
+from django.test import TestCase
+
+from kinesinlms.course.clone import clone_course
+from kinesinlms.course.delete_utils import delete_course
+from kinesinlms.course.models import CourseNode, CourseUnit, Milestone
+from kinesinlms.course.tests.factories import CourseFactory
+from kinesinlms.learning_library.constants import BlockType
+from kinesinlms.learning_library.models import Block, UnitBlock
+
+
+class TestCloneCourse(TestCase):
+    def setUp(self):
+        self.course = CourseFactory()
+
+    def _tree_nodes(self, course):
+        return CourseNode.objects.filter(tree_id=course.course_root_node.tree_id)
+
+    def test_clone_copies_structure(self):
+        result = clone_course(self.course, new_slug=self.course.slug, new_run="NEWRUN")
+        new_course = result.course
+
+        self.assertEqual(new_course.token, f"{self.course.slug}_NEWRUN")
+        self.assertNotEqual(new_course.course_root_node.tree_id, self.course.course_root_node.tree_id)
+        self.assertEqual(self._tree_nodes(new_course).count(), self._tree_nodes(self.course).count())
+        def nav_outline(course):
+            nodes = self._tree_nodes(course).filter(level__gt=0).order_by("lft")
+            return list(nodes.values_list("type", "slug", "level"))
+
+        self.assertEqual(nav_outline(new_course), nav_outline(self.course))
+        # Nav tree is usable through the normal MPTT API.
+        self.assertEqual(
+            new_course.course_root_node.get_descendant_count(),
+            self.course.course_root_node.get_descendant_count(),
+        )
+
+        source_unit_ids = set(CourseUnit.objects.filter(course=self.course).values_list("id", flat=True))
+        new_unit_ids = set(CourseUnit.objects.filter(course=new_course).values_list("id", flat=True))
+        self.assertEqual(len(source_unit_ids), len(new_unit_ids))
+        self.assertFalse(source_unit_ids & new_unit_ids)
+
+        self.assertEqual(
+            Milestone.objects.filter(course=new_course).count(),
+            Milestone.objects.filter(course=self.course).count(),
+        )
+
+    def test_clone_shares_blocks_except_single_parent_types(self):
+        new_course = clone_course(self.course, new_slug=self.course.slug, new_run="NEWRUN").course
+
+        source_blocks = Block.objects.filter(unit_blocks__course_unit__course=self.course)
+        new_blocks = Block.objects.filter(unit_blocks__course_unit__course=new_course)
+        single_parent_types = BlockType.get_single_parent_type_names()
+
+        shared = set(source_blocks.values_list("id", flat=True)) & set(new_blocks.values_list("id", flat=True))
+        self.assertTrue(shared)
+        self.assertFalse(Block.objects.filter(id__in=shared, type__in=single_parent_types).exists())
+        for block in new_blocks.filter(type=BlockType.ASSESSMENT.name):
+            self.assertTrue(hasattr(block, "assessment"))
+        self.assertEqual(
+            UnitBlock.objects.filter(course_unit__course=new_course).count(),
+            UnitBlock.objects.filter(course_unit__course=self.course).count(),
+        )
+
+    def test_clone_regenerates_unit_block_slugs(self):
+        # Importers give unit blocks slugs like "<course token>_<label>".
+        source_unit_blocks = list(UnitBlock.objects.filter(course_unit__course=self.course).order_by("id"))
+        for index, unit_block in enumerate(source_unit_blocks):
+            unit_block.slug = f"{self.course.token}_block_{index}"
+        UnitBlock.objects.bulk_update(source_unit_blocks, ["slug"])
+
+        new_course = clone_course(self.course, new_slug=self.course.slug, new_run="NEWRUN").course
+
+        new_slugs = set(UnitBlock.objects.filter(course_unit__course=new_course).values_list("slug", flat=True))
+        self.assertEqual(len(new_slugs), len(source_unit_blocks))
+        self.assertEqual(
+            new_slugs,
+            {f"{new_course.token}_block_{index}".lower() for index in range(len(source_unit_blocks))},
+        )
+        # Source slugs are untouched.
+        self.assertEqual(
+            {unit_block.slug for unit_block in source_unit_blocks},
+            set(UnitBlock.objects.filter(course_unit__course=self.course).values_list("slug", flat=True)),
+        )
+
+    def test_existing_course_rejected(self):
+        with self.assertRaises(ValueError):
+            clone_course(self.course, new_slug=self.course.slug, new_run=self.course.run)
+
+    def test_deleting_clone_keeps_shared_blocks(self):
+        new_course = clone_course(self.course, new_slug=self.course.slug, new_run="NEWRUN").course
+        source_block_ids = set(
+            Block.objects.filter(unit_blocks__course_unit__course=self.course).values_list("id", flat=True)
+        )
+
+        delete_course(new_course)
+
+        self.assertEqual(
+            source_block_ids,
+            set(Block.objects.filter(unit_blocks__course_unit__course=self.course).values_list("id", flat=True)),
+        )
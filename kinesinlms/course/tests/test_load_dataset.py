@@ -0,0 +1,51 @@
+from django.test import TestCase
+
+from kinesinlms.assessments.models import SubmittedAnswer
+from kinesinlms.course.load_dataset import LoadDatasetConfig, build_load_dataset
+from kinesinlms.course.models import Enrollment, MilestoneProgress
+from kinesinlms.sits.models import SimpleInteractiveToolSubmission
+from kinesinlms.tracking.models import TrackingEvent
+
+
+class TestLoadDataset(TestCase):
+
+    def test_build_small_dataset(self):
+        config = LoadDatasetConfig(
+            courses=2,
+            modules=2,
+            sections_per_module=2,
+            units_per_section=2,
+            blocks_per_unit=4,
+            students=5,
+            cohorts=2,
+            events_per_student=3,
+            submission_rate=0.5,
+            prefix="tiny",
+        )
+        dataset = build_load_dataset(config)
+
+        self.assertEqual(len(dataset.courses), 2)
+        self.assertEqual(len(dataset.students), 5)
+        for load_course in dataset.courses:
+            course = load_course.course
+            # 8 units, each with one assessment and one SIT.
+            self.assertEqual(len(load_course.unit_nodes), 8)
+            self.assertEqual(len(load_course.assessments), 8)
+            self.assertEqual(len(load_course.sits), 8)
+            self.assertEqual(Enrollment.objects.filter(course=course, active=True).count(), 5)
+            self.assertEqual(SubmittedAnswer.objects.filter(course=course).count(), 5 * 4)
+            self.assertEqual(SimpleInteractiveToolSubmission.objects.filter(course=course).count(), 5 * 4)
+            self.assertEqual(TrackingEvent.objects.filter(course_slug=course.slug).count(), 5 * 3)
+            self.assertTrue(MilestoneProgress.objects.filter(course=course).exists())
+
+    def test_same_seed_generates_same_activity(self):
+        first = build_load_dataset(LoadDatasetConfig(modules=1, students=4, prefix="first", seed=7))
+        second = build_load_dataset(LoadDatasetConfig(modules=1, students=4, prefix="second", seed=7))
+
+        def answers(dataset):
+            return list(SubmittedAnswer.objects
+                        .filter(course=dataset.courses[0].course)
+                        .order_by("student__username", "assessment__slug")
+                        .values_list("status", "attempts"))
+
+        self.assertEqual(answers(first), answers(second))
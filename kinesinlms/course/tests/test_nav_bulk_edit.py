@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from kinesinlms.composer.factory import create_module_node, create_section_node
+from kinesinlms.course.constants import NodeType
+from kinesinlms.course.models import CourseNode
+from kinesinlms.course.nav import course_nav_bulk_edit
+from kinesinlms.course.tests.factories import CourseFactory
+
+
+class TestCourseNavBulkEdit(TestCase):
+    def setUp(self):
+        self.course = CourseFactory()
+        self.root_node = self.course.course_root_node
+
+    def test_tree_is_consistent_after_bulk_edit(self):
+        unit_node = CourseNode.objects.filter(tree_id=self.root_node.tree_id, type=NodeType.UNIT.name).first()
+        original_count = self.root_node.get_descendant_count()
+
+        with course_nav_bulk_edit(self.course):
+            module_node = create_module_node(root_node=self.root_node)
+            section_node = create_section_node(module_node=module_node)
+            unit_node.parent = section_node
+            unit_node.save()
+
+        self.root_node.refresh_from_db()
+        self.assertEqual(self.root_node.get_descendant_count(), original_count + 2)
+        module_node.refresh_from_db()
+        self.assertEqual(module_node.get_children().get(), section_node)
+        section_node.refresh_from_db()
+        self.assertEqual(list(section_node.get_children()), [unit_node])
+        self.assertEqual(
+            list(self.root_node.get_children()),
+            list(self.root_node.children.order_by("display_sequence")),
+        )
+
+    def test_nav_cache_cleared(self):
+        cache_key = f"{self.course.token}_nav"
+        cache.set(cache_key, {"stale": True})
+
+        with course_nav_bulk_edit(self.course):
+            create_module_node(root_node=self.root_node)
+
+        self.assertIsNone(cache.get(cache_key))
+
+    def test_nested_blocks_rebuild_once(self):
+        with course_nav_bulk_edit(self.course):
+            with course_nav_bulk_edit(self.course):
+                create_module_node(root_node=self.root_node)
+            # Still delayed: the inner block doesn't rebuild the tree.
+            self.assertTrue(CourseNode._mptt_is_tracking)
+        self.assertFalse(CourseNode._mptt_is_tracking)
@@ -0,0 +1,51 @@
+from django.test import TestCase
+
+from kinesinlms.course.models import CourseNode
+from kinesinlms.course.tests.factories import CourseFactory
+
+
+class TestNavContentIndex(TestCase):
+    def setUp(self):
+        self.course = CourseFactory()
+        self.root_node = self.course.course_root_node
+
+    def _content_indexes(self):
+        return {node.id: node.content_index for node in self.root_node.get_descendants()}
+
+    def test_reindex_course_nav_content(self):
+        self.root_node.clear_course_nav_content_index()
+
+        with self.assertNumQueries(2):
+            # One read of the subtree, one bulk update.
+            self.root_node.reindex_course_nav_content(start_module_index_at=1)
+
+        for module_index, module_node in enumerate(
+            self.root_node.get_children().order_by("display_sequence"), start=1
+        ):
+            self.assertEqual(module_node.content_index, module_index)
+            for section_index, section_node in enumerate(
+                module_node.get_children().order_by("display_sequence"), start=1
+            ):
+                self.assertEqual(section_node.content_index, section_index)
+                for unit_index, unit_node in enumerate(
+                    section_node.get_children().order_by("display_sequence"), start=1
+                ):
+                    self.assertEqual(unit_node.content_index, unit_index)
+
+    def test_reindex_skips_unchanged_nodes(self):
+        self.root_node.reindex_course_nav_content()
+        before = self._content_indexes()
+
+        with self.assertNumQueries(1):
+            # Nothing changed, so no update.
+            self.root_node.reindex_course_nav_content()
+        self.assertEqual(before, self._content_indexes())
+
+    def test_clear_course_nav_content_index(self):
+        self.root_node.reindex_course_nav_content()
+        self.root_node.clear_course_nav_content_index()
+        self.assertFalse(
+            CourseNode.objects.filter(
+                tree_id=self.root_node.tree_id, level__gt=0, content_index__isnull=False
+            ).exists()
+        )
@@ -1,6 +1,5 @@
 import dataclasses
 import logging
-import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, OrderedDict, Tuple
 
@@ -42,26 +41,17 @@ def can_access_course(user, course, enrollment=None) -> bool:
 
     if enrollment:
         # Sanity check...
-        if enrollment.course != course or enrollment.student != user:
+        if enrollment.course_id != course.id or enrollment.student_id != user.id:
             raise ValueError(f"Wrong enrollment for course {course} and user {user}")
     else:
-        try:
-            enrollment = course.enrollments.get(student=user, active=True)
-        except ObjectDoesNotExist:
-            # I've seen errors in the logs where user was not shown as enrolled,
-            # but I can see an enrollment in the event stream, which leads me to
-            # believe a transaction might still be underway when this request was made.
-            # So let's wait a sec and then try again before giving up and saying
-            # student isn't enrolled.
+        # Import here to avoid circular import with course models.
+        from kinesinlms.course.access_cache import find_active_enrollment
+
+        enrollment = find_active_enrollment(course=course, user=user)
+        if enrollment is None:
             logger.warning(f"User {user.username} wants to view course ID {course.id} and cannot "
-                           f"because not enrolled. WAITING A SECOND AND TRYING AGAIN.")
-            time.sleep(1)
-            try:
-                enrollment = course.enrollments.get(student=user, active=True)
-            except ObjectDoesNotExist:
-                logger.warning(f"User {user.username} wants to view course ID {course.id} and cannot "
-                               f"because not enrolled")
-                return False
+                           f"because not enrolled")
+            return False
 
     if not course.has_started:
         if enrollment.beta_tester:
@@ -5,6 +5,7 @@ from django.core.exceptions import PermissionDenied
 from django.http import HttpResponse
 from django.shortcuts import render
 
+from kinesinlms.course.access_cache import get_course_access
 from kinesinlms.course.models import Course, Enrollment
 from kinesinlms.course.nav import CourseNavException, get_course_nav
 from kinesinlms.course.utils_access import (
@@ -14,7 +15,6 @@ from kinesinlms.course.utils_access import (
     SectionNodeNotReleased,
     UnitNavInfo,
     UnitNodeDoesNotExist,
-    can_access_course,
     get_unit_nav_info,
 )
 
@@ -114,9 +114,12 @@ def process_course_hx_request(
     if course_run is None:
         raise ValueError("course_run cannot be None")
 
-    course: Course = Course.objects.get(slug=course_slug, run=course_run)
-    enrollment: Enrollment = Enrollment.objects.get(student=request.user, course=course, active=True)
-    if not can_access_course(request.user, course, enrollment=enrollment):
+    access = get_course_access(request, course_slug, course_run)
+    course: Course = access.course
+    enrollment: Enrollment = access.enrollment
+    if enrollment is None:
+        raise Enrollment.DoesNotExist("Enrollment matching query does not exist.")
+    if not access.can_access(request.user):
         raise PermissionDenied("You do not have access to this course.")
     if enrollment.enrollment_survey_required_url:
         raise PermissionDenied("User has not completed enrollment survey yet.")
@@ -33,10 +33,8 @@ from kinesinlms.badges.models import BadgeAssertion, BadgeClass, BadgeClassType
 from kinesinlms.catalog.service import do_enrollment
 from kinesinlms.certificates.models import Certificate, CertificateTemplate
 from kinesinlms.certificates.service import CertificateTemplateFactory
-from kinesinlms.course.certificates.generators import (
-    generate_base_certificate,
-    generate_custom_certificate,
-)
+from kinesinlms.course.access_cache import get_course_access, get_course_access_or_404
+from kinesinlms.course.certificates.pdfs import get_certificate_pdf
 from kinesinlms.course.custom_views.views import (
     get_custom_unit_data,
     get_custom_unit_template,
@@ -51,7 +49,6 @@ from kinesinlms.course.models import (
     CourseResource,
     CourseUnit,
     CourseUnitType,
-    Enrollment,
     Milestone,
     MilestoneProgress,
     Notice,
@@ -77,7 +74,6 @@ from kinesinlms.course.utils_access import (
     SectionNodeNotReleased,
     UnitNavInfo,
     UnitNodeDoesNotExist,
-    can_access_course,
     get_unit_nav_info,
 )
 from kinesinlms.course.view_helpers import access_denied_page, process_course_hx_request
@@ -88,13 +84,14 @@ from kinesinlms.custom_app.views import (
     simple_html_content,
 )
 from kinesinlms.external_tools.constants import ExternalToolViewLaunchType
+from kinesinlms.forum.cache import get_cached_topic_posts
 from kinesinlms.forum.models import (
     ForumCategory,
     ForumSubcategory,
     ForumSubcategoryType,
     ForumTopic,
 )
-from kinesinlms.forum.service.base_service import BaseForumService
+from kinesinlms.forum.service.base_service import BaseForumService, ForumAPIUnsuccessful
 from kinesinlms.forum.utils import get_forum_provider, get_forum_service
 from kinesinlms.learning_library.constants import BlockViewContext, ResourceType
 from kinesinlms.learning_library.models import BlockResource, Resource, UnitBlock
@@ -284,10 +281,10 @@ def course_home_page(request, course_slug=None, course_run=None):
         course_slug:
         course_run:
     """
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
 
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course_slug, course_run=course_run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -353,9 +350,9 @@ def redirect_to_unit_page(request, course_slug, course_run, module_slug=None, se
     assert course_slug is not None
     assert course_run is not None
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course_slug, course_run=course_run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -451,14 +448,20 @@ def block_page(
     if block_id is None:
         raise ValueError("unit_slug cannot be None")
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
+    try:
+        access = get_course_access(request, course_slug, course_run)
+    except Course.DoesNotExist:
+        raise Http404("No Course matches the given query.")
+    course = access.course
     if request.user.is_superuser or request.user.is_staff:
         # A superuser or staff can view a course block without being enrolled
         is_beta_tester = False
         show_admin_controls = request.session.get("show_admin_controls", True)
     else:
-        enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-        if not can_access_course(request.user, course, enrollment=enrollment):
+        enrollment = access.enrollment
+        if enrollment is None:
+            raise Http404("No Enrollment matches the given query.")
+        if not access.can_access(request.user):
             return access_denied_page(request=request, course_slug=course_slug, course_run=course_run)
         if enrollment.enrollment_survey_required_url:
             return redirect(enrollment.enrollment_survey_required_url)
@@ -548,7 +551,7 @@ def block_page(
             if js_library not in extra_course_unit_js_libraries:
                 extra_course_unit_js_libraries.append(js_library)
 
-    cohort = get_student_cohort(course=course, student=request.user)
+    cohort = access.cohort or get_student_cohort(course=course, student=request.user)
 
     context = {
         "current_block": block,
@@ -611,10 +614,12 @@ def unit_page(
     if unit_slug is None:
         raise ValueError("unit_slug cannot be None")
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
     try:
-        enrollment = Enrollment.objects.get(student=request.user, course=course, active=True)
-    except Enrollment.DoesNotExist:
+        access = get_course_access(request, course_slug, course_run)
+    except Course.DoesNotExist:
+        raise Http404("No Course matches the given query.")
+    course, enrollment = access.course, access.enrollment
+    if enrollment is None:
         if request.user.is_superuser:
             # A superuser can view a course without being enrolled.
             # However, we autoenroll if not, to make sure everything works as expected.
@@ -624,7 +629,7 @@ def unit_page(
             # These types of users have to enroll.
             return access_denied_page(request=request, course_run=course.run, course_slug=course.slug)
 
-    if not can_access_course(request.user, course, enrollment=enrollment):
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -823,7 +828,7 @@ def unit_page(
         show_admin_controls = request.session.get("show_admin_controls", True)
 
     # Cohort
-    cohort = get_student_cohort(course=course, student=request.user)
+    cohort = access.cohort or get_student_cohort(course=course, student=request.user)
 
     # Learning objectives
     learning_objectives = []
@@ -931,11 +936,11 @@ def course_search_page(request, course_slug, course_run):
 
     # TODO: Refactor to use AccessService
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
     page_num = request.GET.get("page", 1)
 
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -1012,9 +1017,9 @@ def course_extra_page(request, course_slug, course_run, page_name):
 
     # TODO: Refactor to use AccessService
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -1048,9 +1053,9 @@ def certificate_download(request, course_slug, course_run):
 
     # TODO: Refactor to use AccessService
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -1062,20 +1067,16 @@ def certificate_download(request, course_slug, course_run):
     except Certificate.DoesNotExist:
         certificate = None
 
-    # Generate PDF in buffer...
-    if certificate_template.custom_template_name:
-        cert_buffer = generate_custom_certificate(certificate)
-    else:
-        cert_buffer = generate_base_certificate(certificate)
-    # Need to reset buffer to start before sending for download to work.
-    cert_buffer.seek(0)
+    if certificate is None:
+        raise Http404("No certificate found for this course.")
+
+    # Serve the stored PDF (rendered when the certificate was awarded).
+    certificate_pdf = get_certificate_pdf(certificate)
 
     certificate_filename = f"{certificate.student.username}_{course.token}_certificate.pdf"
 
-    response = HttpResponse(content_type="application/pdf")
+    response = HttpResponse(certificate_pdf, content_type="application/pdf")
     response["Content-Disposition"] = f"attachment; filename={certificate_filename}"
-    response.write(cert_buffer.getvalue())
-    cert_buffer.close()
 
     return response
 
@@ -1088,9 +1089,9 @@ def certificate_page(request, course_slug, course_run):
     assert course_slug is not None
     assert course_run is not None
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -1165,15 +1166,15 @@ def forum_topics_page(request, course_slug=None, course_run=None):
 
     assert course_slug is not None
     assert course_run is not None
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
 
     forum_topics_list: List[Dict] = []
-    cohort = get_student_cohort(course=course, student=request.user)
+    cohort = access.cohort or get_student_cohort(course=course, student=request.user)
     if cohort:
         # Find all "Discussion" blocks in the course and
         # remember the release state of each block.
@@ -1195,7 +1196,7 @@ def forum_topics_page(request, course_slug=None, course_run=None):
                 type=ForumSubcategoryType.COHORT.name,
                 cohort_forum_group=cohort.cohort_forum_group,
             )
-            forum_topics = forum_subcategory.forum_topics.all()
+            forum_topics = forum_subcategory.forum_topics.filter(topic_id__isnull=False)
 
             for forum_topic in forum_topics:
                 try:
@@ -1254,9 +1255,9 @@ def bookmarks_page(request, course_slug=None, course_run=None):
     assert course_slug is not None
     assert course_run is not None
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -1304,9 +1305,9 @@ def progress_overview_page(request, course_slug=None, course_run=None):
     assert course_slug is not None
     assert course_run is not None
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -1408,9 +1409,9 @@ def progress_detail_page(request, course_slug=None, course_run=None, module_id:
     assert course_slug is not None
     assert course_run is not None
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -1449,9 +1450,9 @@ def custom_app_page(request, course_slug=None, course_run=None, custom_app_slug=
     assert course_run is not None
     assert custom_app_slug is not None
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(user=request.user, course=course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -1769,9 +1770,9 @@ def unit_summary_hx(
     if unit_slug is None:
         raise ValueError("unit_slug cannot be None")
 
-    course = get_object_or_404(Course, slug=course_slug, run=course_run)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=course, active=True)
-    if not can_access_course(request.user, course, enrollment=enrollment):
+    access = get_course_access_or_404(request, course_slug, course_run)
+    course, enrollment = access.course, access.enrollment
+    if not access.can_access(request.user):
         return access_denied_page(request=request, course_slug=course.slug, course_run=course.run)
     if enrollment.enrollment_survey_required_url:
         return redirect(enrollment.enrollment_survey_required_url)
@@ -1970,10 +1971,12 @@ def forum_topic_posts_hx(request, course_slug=None, course_run=None, forum_topic
         if not service.user_can_view_topic(forum_topic=topic, user=request.user):
             raise PermissionDenied("User does not have permission to view this topic")
         topic_url = service.topic_url(forum_topic=topic)
-        posts = service.get_topic_posts(forum_topic_id)
+        posts = get_cached_topic_posts(service, forum_topic_id)
     except PermissionDenied:
         logger.exception("User does not have permission to call this htmx endpoint")
         load_error = _("You do not have permission to view these posts")
+    except ForumAPIUnsuccessful:
+        load_error = _("Forum posts are not available right now. Please try again later.")
     except Exception:
         logger.exception("Could not process course htmx request")
         raise Http404(_("Error processing your request"))
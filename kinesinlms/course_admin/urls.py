@@ -20,6 +20,21 @@ urlpatterns = [
         views.RescoreSubmittedAnswersView.as_view(),
         name="rescore_submitted_answers",
     ),
+    path(
+        "certificates/",
+        views.certificates_index,
+        name="certificates",
+    ),
+    path(
+        "certificates/generate",
+        views.generate_certificates,
+        name="generate_certificates",
+    ),
+    path(
+        "certificates/download",
+        views.download_certificates_zip,
+        name="download_certificates_zip",
+    ),
     path(
         "resources/",
         views.resources_index,
@@ -1,16 +1,23 @@
+from django.contrib import messages
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.generic import FormView
 
 from django.utils.translation import gettext as _
 
-from django.http import Http404
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_POST
 
 from kinesinlms.assessments.utils import (
     delete_submitted_answers,
     rescore_submitted_answers,
 )
 from kinesinlms.core.decorators import course_staff_required
+from kinesinlms.course.certificates.bulk import (
+    get_certificate_generation_progress,
+    schedule_certificate_generation,
+    write_course_certificates_zip,
+)
 from kinesinlms.core.mixins import EducatorCourseStaffMixin
 from kinesinlms.course_admin.forms import SelectSubmittedAnswersForm
 from kinesinlms.course.models import Course
@@ -242,3 +249,69 @@ def resource_detail(request, course_run: str, course_slug: str, pk: int):
     }
 
     return render(request, template, context)
+
+
+@course_staff_required
+def certificates_index(request, course_run: str, course_slug: str):
+    """
+    Main view for Course Admin Certificates section. Shows how many
+    certificate PDFs have been generated for students who passed the course.
+    """
+
+    course = get_object_or_404(Course, run=course_run, slug=course_slug)
+    if not course.enable_certificates:
+        raise Http404(_("Certificates are not enabled for this course."))
+
+    template = "course_admin/certificates/index.html"
+
+    context = {
+        "course": course,
+        "current_course_tab": "course_admin",
+        "course_admin_page_title": "Certificates",
+        "current_course_admin_tab": "course_certificates",
+        "progress": get_certificate_generation_progress(course),
+    }
+
+    return render(request, template, context)
+
+
+@require_POST
+@course_staff_required
+def generate_certificates(request, course_run: str, course_slug: str):
+    """
+    Start generating certificate PDFs for everyone who passed the course.
+    """
+
+    course = get_object_or_404(Course, run=course_run, slug=course_slug)
+    if not course.enable_certificates:
+        raise Http404(_("Certificates are not enabled for this course."))
+
+    if schedule_certificate_generation(course):
+        messages.add_message(request, messages.INFO,
+                             _("Generating certificates. Refresh this page to see progress."))
+    else:
+        messages.add_message(request, messages.INFO,
+                             _("Certificates are already being generated."))
+
+    reverse_url = reverse(
+        "course:course_admin:certificates",
+        kwargs={"course_run": course.run, "course_slug": course.slug},
+    )
+    return redirect(reverse_url)
+
+
+@course_staff_required
+def download_certificates_zip(request, course_run: str, course_slug: str):
+    """
+    Download all generated certificate PDFs for the course in one ZIP file.
+    """
+
+    course = get_object_or_404(Course, run=course_run, slug=course_slug)
+    if not course.enable_certificates:
+        raise Http404(_("Certificates are not enabled for this course."))
+
+    zip_buffer, count = write_course_certificates_zip(course)
+
+    response = HttpResponse(zip_buffer.getvalue(), content_type="application/zip")
+    response["Content-Disposition"] = f"attachment; filename={course.token}_certificates.zip"
+    return response
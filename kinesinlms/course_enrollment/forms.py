@@ -4,9 +4,8 @@ from typing import List
 from django.contrib.auth import get_user_model
 from django.forms import Form, ModelChoiceField, CharField, Textarea, BooleanField, HiddenInput
 
-from kinesinlms.catalog.service import do_enrollment
-from kinesinlms.course.models import Course, Cohort, CohortMembership
-from kinesinlms.course.utils import user_is_enrolled
+from kinesinlms.catalog.bulk_enrollment import bulk_enroll
+from kinesinlms.course.models import Course, Cohort
 from kinesinlms.management.models import ManualEnrollment
 from kinesinlms.users.models import InviteUser
 from kinesinlms.users.services import InviteService
@@ -94,58 +93,31 @@ class ManualEnrollmentForm(Form):
                                                             user=user,
                                                             added_student_ids=[],
                                                             skipped_student_ids=[])
-        errors = []
-        invited_users: List[InviteUser] = []
-        for student_username in student_usernames:
-
-            student = None
-            if "@" in student_username:
-                try:
-                    student = User.objects.get(email__iexact=student_username)
-                except User.DoesNotExist:
-                    if invite_unregistered:
-                        try:
-                            invite_user = InviteUser.objects.get(email=student_username)
-                            errors.append(
-                                f"User {student_username} has already been invited (and hasn't registered yet)")
-                        except InviteUser.DoesNotExist:
-                            invite_user = None
-                        if not invite_user:
-                            try:
-                                invited_user = invite_service.invite_user(student_username, cohort)
-                                invited_user.manual_enrollment = manual_enrollment
-                                invited_user.save()
-                                invited_users.append(invited_user)
-                            except Exception as e:
-                                errors.append(f"Could not invite user with email {student_username} : {e}")
-                    else:
-                        errors.append(f"Cannot find user with email: {student_username}")
-            else:
-                try:
-                    student = User.objects.get(username=student_username)
-                except User.DoesNotExist:
-                    errors.append(f"Cannot find user with username: {student_username}")
-
-            if not student:
-                continue
-
-            if user_is_enrolled(user=student, course=course):
-                cohort_membership = CohortMembership.objects.get(cohort__course=course, student=student)
-                if cohort_membership.cohort != cohort:
-                    # Need to move already enrolled user to new cohort
-                    manual_enrollment.moved_from_cohort_ids.append(student.id)
-                    cohort_membership.cohort = cohort
-                    cohort_membership.save()
-                else:
-                    manual_enrollment.skipped_student_ids.append(student.id)
-            else:
+        result = bulk_enroll(course=course, cohort=cohort, identifiers=student_usernames)
+        manual_enrollment.added_student_ids = result.added_student_ids
+        manual_enrollment.moved_from_cohort_ids = result.moved_student_ids
+        manual_enrollment.skipped_student_ids = result.skipped_student_ids
+        errors = result.errors
+
+        if invite_unregistered and result.unmatched_emails:
+            # Unregistered emails are invited rather than reported as missing.
+            missing_email_errors = {f"Cannot find user with email: {email}" for email in result.unmatched_emails}
+            errors = [error for error in errors if error not in missing_email_errors]
+            already_invited = set(InviteUser.objects.filter(
+                email__in=result.unmatched_emails
+            ).values_list('email', flat=True))
+            invited_users: List[InviteUser] = []
+            for email in result.unmatched_emails:
+                if email in already_invited:
+                    errors.append(f"User {email} has already been invited (and hasn't registered yet)")
+                    continue
                 try:
-                    enrollment = do_enrollment(user=student, course=course, cohort=cohort)
-                    manual_enrollment.added_student_ids.append(student.id)
-                    logger.info(f"Badge enroll {enrollment}: enrolled user : {student} in course {course}")
+                    invited_user = invite_service.invite_user(email, cohort)
+                    invited_user.manual_enrollment = manual_enrollment
+                    invited_user.save()
+                    invited_users.append(invited_user)
                 except Exception as e:
-                    manual_enrollment.skipped_student_ids.append(student.id)
-                    errors.append(f"Error enrolling student {student} : {e}")
+                    errors.append(f"Could not invite user with email {email} : {e}")
 
         if errors:
             manual_enrollment.errors = errors
@@ -1,7 +1,7 @@
 import logging
 from typing import List, Dict
 
-import requests
+from kinesinlms.core.http import ACTIVE_CAMPAIGN, get_integration_session
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # ACTIVECAMPAIGN METHODS AND CLASSES
@@ -25,6 +25,9 @@ class ActiveCampaignClient(object):
     """
     BASE_URL = '{}/api/3'
 
+    # Maximum number of contacts ActiveCampaign accepts in one bulk import.
+    BULK_IMPORT_MAX_CONTACTS = 250
+
     def __init__(self, url, api_key):
         self.BASE_URL = self.BASE_URL.format(url)
         self.API_KEY = api_key
@@ -135,6 +138,22 @@ class ActiveCampaignClient(object):
 
         return False
 
+    def bulk_import_contacts(self, contacts: List[Dict]):
+        """
+        Create or update many contacts in one call. Each contact is a dictionary
+        with at least an 'email', and optionally a list of 'tags' (tag names)
+        to add to the contact.
+
+        ActiveCampaign processes the import in the background.
+        """
+        return self._post("/import/bulk_import", json={"contacts": contacts})
+
+    def remove_contact_tag(self, contact_tag_id: str):
+        """
+        Delete a contactTag, i.e. the association between a contact and a tag.
+        """
+        return self._delete(f"/contactTags/{contact_tag_id}")
+
     def get_tags_for_contact(self, ac_user_id: str) -> List[str]:
         """
         Get a list of tag IDs applied to a user
@@ -166,7 +185,8 @@ class ActiveCampaignClient(object):
         if headers:
             _headers.update(headers)
 
-        return self._parse(requests.request(method, self.BASE_URL + endpoint, headers=_headers, **kwargs))
+        session = get_integration_session(ACTIVE_CAMPAIGN)
+        return self._parse(session.request(method, self.BASE_URL + endpoint, headers=_headers, **kwargs))
 
     def _parse(self, response):
         if 'application/json' in response.headers['Content-Type']:
@@ -1,9 +1,11 @@
+from enum import Enum
 from typing import Optional
 
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.sites.models import Site
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from kinesinlms.email_automation.constants import EmailAutomationProviderType
@@ -112,3 +114,63 @@ class CourseEmailAutomationSettings(models.Model):
             return False
         tracking_event_name = TrackingEventType(tracking_event_name).name
         return tracking_event_name in self.send_event_as_tag
+
+
+class EmailAutomationTagAction(Enum):
+    ADD = "Add"
+    REMOVE = "Remove"
+
+
+class EmailAutomationTagChangeStatus(Enum):
+    PENDING = "Pending"
+    FAILED = "Failed"
+
+
+class EmailAutomationTagChange(models.Model):
+    """
+    An 'outbox' entry recording that a tag should be added to
+    or removed from a user's contact in the email automation provider.
+
+    EmailAutomationNotifier writes these rows rather than starting a task per tag.
+    A celery task (sync_email_automation_tags_task) drains the table, coalescing
+    changes per user and tag and sending them in bulk where the provider supports it.
+    Rows are deleted once they've been sent. Rows that keep failing are marked FAILED.
+    """
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_tag_change_due_idx'),
+        ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             null=False,
+                             blank=False,
+                             on_delete=models.CASCADE,
+                             related_name="email_automation_tag_changes")
+
+    tag = models.CharField(max_length=255,
+                           null=False,
+                           blank=False)
+
+    action = models.CharField(max_length=20,
+                              null=False,
+                              blank=False,
+                              choices=[(item.name, item.value) for item in EmailAutomationTagAction])
+
+    status = models.CharField(max_length=20,
+                              null=False,
+                              blank=False,
+                              default=EmailAutomationTagChangeStatus.PENDING.name,
+                              choices=[(item.name, item.value) for item in EmailAutomationTagChangeStatus])
+
+    attempts = models.PositiveIntegerField(default=0)
+
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+
+    last_error = models.TextField(null=True,
+                                  blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"EmailAutomationTagChange {self.id} {self.action} {self.tag} user: {self.user_id} ({self.status})"
@@ -1,8 +1,10 @@
-from typing import Dict
+from typing import Dict, Iterable, Optional
 import logging
 
-from kinesinlms.email_automation.models import EmailAutomationProvider, CourseEmailAutomationSettings
-from kinesinlms.email_automation.tasks import add_tag_to_user, register_user_with_email_automation_provider, remove_tag_from_user
+from kinesinlms.email_automation.models import EmailAutomationProvider, CourseEmailAutomationSettings, \
+    EmailAutomationTagAction, TRACKING_EVENTS_FOR_EMAIL_AUTOMATION
+from kinesinlms.email_automation.tag_sync import queue_tag_change
+from kinesinlms.email_automation.tasks import register_user_with_email_automation_provider
 from kinesinlms.email_automation.utils import get_email_automation_provider
 from kinesinlms.tracking.event_types import TrackingEventType
 from kinesinlms.tracking.notifiers import TrackerEventHandler
@@ -17,10 +19,26 @@ class EmailAutomationNotifier(TrackerEventHandler):
 
     Requests to the external service are made asynchronously via Celery,
     as they should not block the main request, and multiple tries should be made
-    in case of failure.
+    in case of failure. Tag changes are queued and sent in bulk (see tag_sync.py).
 
     """
 
+    # Events we send regardless of course settings.
+    GLOBAL_HANDLED_EVENTS = [
+        TrackingEventType.USER_EMAIL_CONFIRMED.value
+    ]
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        provider: EmailAutomationProvider = get_email_automation_provider()
+        return bool(provider and provider.enabled)
+
+    @classmethod
+    def handled_event_types(cls) -> Optional[Iterable[str]]:
+        # Courses can only enable the events in TRACKING_EVENTS_FOR_EMAIL_AUTOMATION.
+        course_events = [event_type.value for event_type in TRACKING_EVENTS_FOR_EMAIL_AUTOMATION]
+        return cls.GLOBAL_HANDLED_EVENTS + course_events
+
     @classmethod
     def handle_tracker_event(cls, event_dict: Dict, user_id: int, course_id=None, **kwargs) -> bool:
         """
@@ -42,12 +60,8 @@ class EmailAutomationNotifier(TrackerEventHandler):
             return False
 
         # Make sure we handle this event either globally or at the course level.
-        GLOBAL_HANDLED_EVENTS = [
-            TrackingEventType.USER_EMAIL_CONFIRMED.value
-        ]
-
         event_type_value = event_dict['event_type']
-        if event_type_value not in GLOBAL_HANDLED_EVENTS:
+        if event_type_value not in cls.GLOBAL_HANDLED_EVENTS:
             # This is a course-related event
             # Let's check whether it's enabled for this course.
             if course_id:
@@ -95,31 +109,19 @@ class EmailAutomationNotifier(TrackerEventHandler):
     @classmethod
     def set_tag(cls, tag: str, user_id: int):
         """
-        Start an async task to add a tag to a contact in
-        an email automation system.
+        Queue a tag to be added to a contact in an email automation
+        system. Queued changes are sent in bulk by a celery task.
         """
         provider: EmailAutomationProvider = get_email_automation_provider()
         if provider and provider.enabled:
-            add_tag_to_user.apply_async(args=[],
-                                        kwargs={
-                                            "tag": tag,
-                                            "user_id": user_id,
-                                            "provider_id": provider.id
-                                        },
-                                        countdown=5)
+            queue_tag_change(user_id=user_id, tag=tag, action=EmailAutomationTagAction.ADD)
 
     @classmethod
     def remove_tag(cls, tag: str, user_id: int):
         """
-        Start an async task to remove a tag from a contact in
-        an email automation system.
+        Queue a tag to be removed from a contact in an email automation
+        system. Queued changes are sent in bulk by a celery task.
         """
         provider: EmailAutomationProvider = get_email_automation_provider()
         if provider and provider.enabled:
-            remove_tag_from_user.apply_async(args=[],
-                                             kwargs={
-                                                 "tag": tag,
-                                                 "user_id": user_id,
-                                                 "provider_id": provider.id
-                                             },
-                                             countdown=5)
+            queue_tag_change(user_id=user_id, tag=tag, action=EmailAutomationTagAction.REMOVE)
@@ -68,6 +68,53 @@ class EmailAutomationService(ABC):
     def remove_tag_from_contact(self, user, tag) -> bool:
         pass
 
+    def get_contact_id_for_user(self, user) -> Optional[str]:
+        """
+        Get the user's contact ID in the email automation service.
+
+        The ID is cached on the user (email_automation_provider_user_id), so
+        the service is only asked (by email) when we don't have it yet.
+
+        Returns:
+            Contact ID, or None if the user isn't a contact in the service.
+        """
+        if user.email_automation_provider_user_id:
+            return user.email_automation_provider_user_id
+        if not user.email:
+            return None
+        contact_id = self.get_contact_id(user.email)
+        if contact_id:
+            user.email_automation_provider_user_id = contact_id
+            user.save(update_fields=["email_automation_provider_user_id"])
+        return contact_id
+
+    def add_tags_to_contacts(self, tags_by_user: Dict) -> None:
+        """
+        Add tags to a number of contacts. Subclasses should override this
+        to use the service's bulk endpoints where it has them.
+
+        Args:
+            tags_by_user:   Dictionary of User to a list of tags to add.
+
+        Raises:
+            Exception if the tags could not be added.
+        """
+        for user, tags in tags_by_user.items():
+            for tag in tags:
+                self.add_tag_to_contact(user=user, tag=tag)
+
+    def remove_tags_from_contact(self, user, tags: List[str]) -> None:
+        """
+        Remove a number of tags from one contact. Subclasses can override
+        this to avoid one round trip per tag.
+
+        Raises:
+            Exception if the tags could not be removed.
+        """
+        for tag in tags:
+            if not self.remove_tag_from_contact(user=user, tag=tag):
+                raise Exception(f"Could not remove tag {tag} from user {user}")
+
 
 class ActiveCampaignService(EmailAutomationService):
     client: Optional[ActiveCampaignClient] = None
@@ -330,6 +377,50 @@ class ActiveCampaignService(EmailAutomationService):
 
         return True
 
+    def add_tags_to_contacts(self, tags_by_user: Dict) -> None:
+        """
+        Add tags to contacts with ActiveCampaign's bulk import endpoint, which
+        takes tag names (creating any tags that don't exist yet) and identifies
+        contacts by email, so no per-contact or per-tag lookups are needed.
+        """
+        contacts = [
+            {
+                "email": user.email,
+                "first_name": user.informal_name,
+                "tags": list(tags),
+            }
+            for user, tags in tags_by_user.items()
+        ]
+        batch_size = ActiveCampaignClient.BULK_IMPORT_MAX_CONTACTS
+        for start in range(0, len(contacts), batch_size):
+            response = self.client.bulk_import_contacts(contacts[start:start + batch_size])
+            if not isinstance(response, dict) or not response.get("success"):
+                raise Exception(f"ActiveCampaign bulk import failed: {response}")
+            logger.info(f"Queued tags for {len(contacts[start:start + batch_size])} contacts "
+                        f"in ActiveCampaign bulk import {response.get('batchId')}")
+
+    def remove_tags_from_contact(self, user, tags: List[str]) -> None:
+        """
+        Remove tags from a contact, fetching the contact's tag associations
+        only once rather than once per tag.
+        """
+        if not self.provider.tag_ids or any(tag not in self.provider.tag_ids for tag in tags):
+            # Refresh our local tag ids from AC in case tags were created there (e.g. by bulk import).
+            self.provider.tag_ids = {**(self.provider.tag_ids or {}), **self.client.list_tags()}
+            self.provider.save()
+
+        tag_ids = {str(self.provider.tag_ids[tag]) for tag in tags if tag in self.provider.tag_ids}
+        if not tag_ids:
+            return
+
+        contact_id = self.get_contact_id_for_user(user)
+        if not contact_id:
+            raise Exception(f"User {user} is not a contact in ActiveCampaign")
+        contact_tags = self.client.get_tags_for_contact(ac_user_id=contact_id)["contactTags"]
+        for contact_tag in contact_tags:
+            if str(contact_tag["tag"]) in tag_ids:
+                self.client.remove_contact_tag(contact_tag["id"])
+
     def test_api_connection(self) -> bool:
         """
         Test the ActiveCampaign API connection.
@@ -0,0 +1,259 @@
+"""
+Queue and send email automation tag changes.
+
+Tracking events like enrollment become tags on the user's contact in the
+email automation provider. Rather than starting a celery task per tag per user,
+EmailAutomationNotifier records each change as an EmailAutomationTagChange row
+(an 'outbox'). A celery task drains that table in the background:
+
+    - changes for the same user and tag are coalesced, so only the latest one is sent
+    - tags to add are sent for many contacts at once with the service's
+      add_tags_to_contacts() (a bulk import for ActiveCampaign)
+    - tags to remove are grouped per contact and sent with remove_tags_from_contact()
+    - changes that fail are retried with exponential backoff, and marked FAILED
+      after TAG_SYNC_MAX_ATTEMPTS.
+
+Contact IDs are cached on the user (email_automation_provider_user_id), so a
+contact is only looked up in the provider the first time we need its ID.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from kinesinlms.email_automation.models import (
+    EmailAutomationTagAction,
+    EmailAutomationTagChange,
+    EmailAutomationTagChangeStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+# Wait a little before draining so changes made together
+# (e.g. a bulk enrollment) go out in the same batch.
+TAG_SYNC_DELAY_SECONDS = 10
+
+# Maximum outbox rows handled in one run of the sync task.
+TAG_SYNC_MAX_ROWS = 5000
+
+# After this many failed attempts a change is marked FAILED.
+TAG_SYNC_MAX_ATTEMPTS = 6
+
+# Backoff after the first failure. Doubles after each further failure.
+TAG_SYNC_BACKOFF_SECONDS = 30
+TAG_SYNC_MAX_BACKOFF_SECONDS = 60 * 60
+
+_SYNC_SCHEDULED_KEY = "email_automation_tag_sync_scheduled"
+_SYNC_RUNNING_KEY = "email_automation_tag_sync_running"
+
+
+@dataclass
+class TagSyncResult:
+    sent: int = 0
+    coalesced: int = 0
+    skipped: int = 0
+    retrying: int = 0
+    failed: int = 0
+
+    def summary(self) -> str:
+        return (f"Sent {self.sent} email automation tag changes "
+                f"({self.coalesced} coalesced, {self.skipped} skipped, "
+                f"{self.retrying} to retry, {self.failed} failed).")
+
+
+def queue_tag_change(user_id: int, tag: str, action: EmailAutomationTagAction) -> EmailAutomationTagChange:
+    """
+    Record that a tag should be added to or removed from a user's contact,
+    and make sure a sync task will run once the current transaction commits.
+
+    Any older pending change for the same user and tag is replaced, as only
+    the latest change matters.
+    """
+    EmailAutomationTagChange.objects.filter(
+        user_id=user_id,
+        tag=tag,
+        status=EmailAutomationTagChangeStatus.PENDING.name,
+    ).delete()
+    change = EmailAutomationTagChange.objects.create(user_id=user_id,
+                                                     tag=tag,
+                                                     action=action.name)
+    transaction.on_commit(schedule_tag_sync)
+    return change
+
+
+def schedule_tag_sync(countdown: int = TAG_SYNC_DELAY_SECONDS) -> bool:
+    """
+    Queue the sync task, unless a run is already queued.
+
+    Returns:
+        True if a task was queued.
+    """
+    if not cache.add(_SYNC_SCHEDULED_KEY, True, countdown + TAG_SYNC_DELAY_SECONDS):
+        return False
+
+    # Import here to avoid circular import with tasks module.
+    from kinesinlms.email_automation.tasks import sync_email_automation_tags_task
+
+    try:
+        sync_email_automation_tags_task.apply_async(countdown=countdown)
+    except Exception:
+        # Changes stay in the outbox and will go out with the next run.
+        logger.exception("Could not queue sync_email_automation_tags_task")
+        cache.delete(_SYNC_SCHEDULED_KEY)
+        return False
+    return True
+
+
+def sync_tags(service, max_rows: int = TAG_SYNC_MAX_ROWS) -> TagSyncResult:
+    """
+    Send pending tag changes to the email automation service. If another
+    sync is already running, do nothing.
+
+    Args:
+        service:    An EmailAutomationService instance
+        max_rows:   Maximum number of outbox rows to handle.
+
+    Returns:
+        TagSyncResult with counts of what happened.
+    """
+    # Let changes made from here on schedule another run.
+    cache.delete(_SYNC_SCHEDULED_KEY)
+
+    if not cache.add(_SYNC_RUNNING_KEY, True, 60 * 10):
+        logger.info("sync_tags(): sync already running.")
+        return TagSyncResult()
+    try:
+        return _send_pending_changes(service, max_rows=max_rows)
+    finally:
+        cache.delete(_SYNC_RUNNING_KEY)
+
+
+def next_tag_sync_countdown() -> Optional[int]:
+    """
+    Seconds until the next pending change is due, or None if
+    there are no pending changes.
+    """
+    next_attempt_at = EmailAutomationTagChange.objects.filter(
+        status=EmailAutomationTagChangeStatus.PENDING.name
+    ).order_by('next_attempt_at').values_list('next_attempt_at', flat=True).first()
+    if next_attempt_at is None:
+        return None
+    countdown = int((next_attempt_at - timezone.now()).total_seconds())
+    return max(countdown, TAG_SYNC_DELAY_SECONDS)
+
+
+def _send_pending_changes(service, max_rows: int) -> TagSyncResult:
+    result = TagSyncResult()
+
+    changes = EmailAutomationTagChange.objects.filter(
+        status=EmailAutomationTagChangeStatus.PENDING.name,
+        next_attempt_at__lte=timezone.now(),
+    ).select_related('user').order_by('id')[:max_rows]
+
+    # Coalesce: only the latest change per user and tag is sent.
+    latest: Dict[Tuple[int, str], EmailAutomationTagChange] = {}
+    superseded_ids = []
+    for change in changes:
+        key = (change.user_id, change.tag)
+        if key in latest:
+            superseded_ids.append(latest[key].id)
+        latest[key] = change
+    if superseded_ids:
+        EmailAutomationTagChange.objects.filter(id__in=superseded_ids).delete()
+        result.coalesced = len(superseded_ids)
+
+    # If we're running on STAGING or DEVELOPMENT, we only
+    # send tags to our external service for test users.
+    to_send = []
+    skipped_ids = []
+    for change in latest.values():
+        if settings.DJANGO_PIPELINE in ["DEVELOPMENT", "STAGING"] and not change.user.is_test_user:
+            skipped_ids.append(change.id)
+        else:
+            to_send.append(change)
+    if skipped_ids:
+        logger.warning(f"Skipping {len(skipped_ids)} email automation tag changes. We're running in "
+                       f"{settings.DJANGO_PIPELINE} and the users ARE NOT test users.")
+        EmailAutomationTagChange.objects.filter(id__in=skipped_ids).delete()
+        result.skipped = len(skipped_ids)
+
+    # Group changes per contact.
+    adds: Dict[int, List[EmailAutomationTagChange]] = {}
+    removes: Dict[int, List[EmailAutomationTagChange]] = {}
+    for change in to_send:
+        per_user = adds if change.action == EmailAutomationTagAction.ADD.name else removes
+        per_user.setdefault(change.user_id, []).append(change)
+
+    if adds:
+        # Only tag users that are contacts in the service. Users who were just registered
+        # may not be yet, so their changes are retried later.
+        ready: Dict[int, List[EmailAutomationTagChange]] = {}
+        for user_id, user_changes in adds.items():
+            error = _check_contact(service, user_changes[0].user)
+            if error:
+                _record_failure(user_changes, error, result)
+            else:
+                ready[user_id] = user_changes
+        if ready:
+            batch = [change for user_changes in ready.values() for change in user_changes]
+            try:
+                service.add_tags_to_contacts({
+                    user_changes[0].user: [change.tag for change in user_changes]
+                    for user_changes in ready.values()
+                })
+            except Exception as e:
+                logger.exception(f"Could not add tags for {len(ready)} email automation contacts")
+                _record_failure(batch, str(e), result)
+            else:
+                _record_sent(batch, result)
+
+    for user_id, user_changes in removes.items():
+        user = user_changes[0].user
+        try:
+            service.remove_tags_from_contact(user=user, tags=[change.tag for change in user_changes])
+        except Exception as e:
+            logger.exception(f"Could not remove tags from email automation contact for user {user}")
+            _record_failure(user_changes, str(e), result)
+        else:
+            _record_sent(user_changes, result)
+
+    return result
+
+
+def _check_contact(service, user) -> Optional[str]:
+    """
+    Returns an error message if the user isn't (yet) a contact in the service.
+    """
+    try:
+        contact_id = service.get_contact_id_for_user(user)
+    except Exception as e:
+        return str(e)
+    if not contact_id:
+        return f"User {user} is not a contact in the email automation service."
+    return None
+
+
+def _record_sent(batch: List[EmailAutomationTagChange], result: TagSyncResult):
+    EmailAutomationTagChange.objects.filter(id__in=[change.id for change in batch]).delete()
+    result.sent += len(batch)
+
+
+def _record_failure(batch: List[EmailAutomationTagChange], error: Optional[str], result: TagSyncResult):
+    now = timezone.now()
+    for change in batch:
+        change.attempts += 1
+        change.last_error = error
+        if change.attempts >= TAG_SYNC_MAX_ATTEMPTS:
+            change.status = EmailAutomationTagChangeStatus.FAILED.name
+            result.failed += 1
+        else:
+            backoff = TAG_SYNC_BACKOFF_SECONDS * (2 ** (change.attempts - 1))
+            change.next_attempt_at = now + timedelta(seconds=min(backoff, TAG_SYNC_MAX_BACKOFF_SECONDS))
+            result.retrying += 1
+    EmailAutomationTagChange.objects.bulk_update(batch, ['attempts', 'last_error', 'status', 'next_attempt_at'])
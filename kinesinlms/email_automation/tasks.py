@@ -1,12 +1,14 @@
 import logging
 from typing import Optional
 
+from celery import Task
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
 from config import celery_app
 from kinesinlms.email_automation.clients.active_campaign_client import NoActiveCampaignTagIDDefined
 from kinesinlms.email_automation.service import EmailAutomationService
+from kinesinlms.email_automation.tag_sync import next_tag_sync_countdown, schedule_tag_sync, sync_tags
 from kinesinlms.email_automation.utils import get_email_automation_service
 
 logger = logging.getLogger(__name__)
@@ -206,3 +208,31 @@ def remove_tag_from_user(tag: str,
         logger.exception(f"Could not remove a tag from email service contact. "
                          f"tag: {tag} user_id: {user_id}")
         raise e  # and retry...
+
+
+@celery_app.task(bind=True,
+                 ignore_result=True,
+                 time_limit=60 * 10,
+                 soft_time_limit=60 * 9)
+def sync_email_automation_tags_task(self: Task) -> None:
+    """
+    Send queued tag changes (EmailAutomationTagChange rows) to the email
+    automation provider in bulk. If changes remain afterwards (because they
+    failed and are waiting to be retried, or there were more than one run
+    handles), queue another run for when the next one is due.
+    """
+    service: EmailAutomationService = get_email_automation_service()
+    if not service or not service.provider.enabled:
+        logger.warning("No email automation service enabled. Cannot sync tags.")
+        return
+
+    result = sync_tags(service)
+    logger.info(result.summary())
+
+    # When running eagerly (e.g. in tests) a countdown is ignored,
+    # so don't reschedule or we'd just loop.
+    if self.request.is_eager:
+        return
+    countdown = next_tag_sync_countdown()
+    if countdown is not None:
+        schedule_tag_sync(countdown=countdown)
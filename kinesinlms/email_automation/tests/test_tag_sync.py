@@ -0,0 +1,98 @@
+"""
+Test queuing and bulk sending of email automation tag changes.
+The ActiveCampaignClient is mocked, so an actual ActiveCampaign
+account is not required.
+"""
+from unittest.mock import MagicMock, patch
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from kinesinlms.email_automation.models import EmailAutomationTagAction, EmailAutomationTagChange
+from kinesinlms.email_automation.notifiers import EmailAutomationNotifier
+from kinesinlms.email_automation.tag_sync import queue_tag_change, sync_tags
+from kinesinlms.email_automation.tests.factories import EmailAutomationProviderFactory
+from kinesinlms.email_automation.utils import get_email_automation_service
+from kinesinlms.users.tests.factories import UserFactory
+
+
+@override_settings(EMAIL_AUTOMATION_PROVIDER_API_KEY="test-key",
+                   DJANGO_PIPELINE=None,
+                   CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TestEmailAutomationTagSync(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        EmailAutomationProviderFactory.create(site=Site.objects.get_current(),
+                                              api_url="https://example.api-us1.com")
+        self.client_mock = MagicMock()
+        self.client_mock.bulk_import_contacts.return_value = {"success": 1, "batchId": "abc"}
+        patcher = patch("kinesinlms.email_automation.service.ActiveCampaignClient", return_value=self.client_mock)
+        mock_client_class = patcher.start()
+        mock_client_class.BULK_IMPORT_MAX_CONTACTS = 250
+        self.addCleanup(patcher.stop)
+        self.service = get_email_automation_service()
+
+        self.users = [
+            UserFactory(username=f"student_{index}",
+                        email=f"student_{index}@example.com",
+                        email_automation_provider_user_id=str(100 + index))
+            for index in range(3)
+        ]
+        EmailAutomationTagChange.objects.all().delete()
+
+    def test_notifier_queues_instead_of_calling_provider(self):
+        EmailAutomationNotifier.set_tag(tag="TEST_SP:enrolled", user_id=self.users[0].id)
+
+        self.client_mock.add_a_tag_to_contact.assert_not_called()
+        self.assertTrue(EmailAutomationTagChange.objects.filter(
+            user=self.users[0],
+            tag="TEST_SP:enrolled",
+            action=EmailAutomationTagAction.ADD.name,
+        ).exists())
+
+    def test_added_tags_sent_in_one_bulk_import(self):
+        for user in self.users:
+            queue_tag_change(user.id, "TEST_SP:enrolled", EmailAutomationTagAction.ADD)
+            queue_tag_change(user.id, "TEST_SP:welcome", EmailAutomationTagAction.ADD)
+
+        result = sync_tags(self.service)
+
+        self.assertEqual(result.sent, 6)
+        self.client_mock.bulk_import_contacts.assert_called_once()
+        contacts = self.client_mock.bulk_import_contacts.call_args.args[0]
+        self.assertEqual(len(contacts), 3)
+        self.assertEqual(sorted(contacts[0]["tags"]), ["TEST_SP:enrolled", "TEST_SP:welcome"])
+        self.client_mock.get_contact.assert_not_called()
+        self.assertFalse(EmailAutomationTagChange.objects.exists())
+
+    def test_contact_id_looked_up_once_and_cached(self):
+        user = UserFactory(username="new_student", email="new_student@example.com")
+        self.client_mock.get_contact.return_value = {"contacts": [{"id": "77"}]}
+
+        queue_tag_change(user.id, "TEST_SP:enrolled", EmailAutomationTagAction.ADD)
+        sync_tags(self.service)
+        queue_tag_change(user.id, "TEST_SP:passed", EmailAutomationTagAction.ADD)
+        sync_tags(self.service)
+
+        self.assertEqual(self.client_mock.get_contact.call_count, 1)
+        user.refresh_from_db()
+        self.assertEqual(user.email_automation_provider_user_id, "77")
+
+    def test_removed_tags_grouped_per_contact(self):
+        self.service.provider.tag_ids = {"TEST_SP:enrolled": 1, "TEST_SP:welcome": 2}
+        self.service.provider.save()
+        self.client_mock.get_tags_for_contact.return_value = {
+            "contactTags": [{"id": "11", "tag": "1"}, {"id": "12", "tag": "2"}, {"id": "13", "tag": "3"}]
+        }
+        user = self.users[0]
+        queue_tag_change(user.id, "TEST_SP:enrolled", EmailAutomationTagAction.REMOVE)
+        queue_tag_change(user.id, "TEST_SP:welcome", EmailAutomationTagAction.REMOVE)
+
+        result = sync_tags(self.service)
+
+        self.assertEqual(result.sent, 2)
+        self.client_mock.get_tags_for_contact.assert_called_once_with(ac_user_id="100")
+        removed = sorted(call.args[0] for call in self.client_mock.remove_contact_tag.call_args_list)
+        self.assertEqual(removed, ["11", "12"])
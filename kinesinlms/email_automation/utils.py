@@ -1,7 +1,6 @@
 from typing import Optional
 
-from django.contrib.sites.models import Site
-
+from kinesinlms.core.site_cache import get_site_provider
 from kinesinlms.email_automation.constants import EmailAutomationProviderType
 from kinesinlms.email_automation.service import ActiveCampaignService
 
@@ -18,7 +17,6 @@ def get_email_automation_service() -> Optional["kinesinlms.email_automation.serv
 
 
 def get_email_automation_provider() -> Optional["kinesinlms.email_automation.models.EmailAutomationProvider"]:
-    site = Site.objects.get_current()
-    email_automation_provider = getattr(site, 'email_automation_provider', None)
+    email_automation_provider = get_site_provider('email_automation_provider')
     return email_automation_provider
 
@@ -0,0 +1,95 @@
+"""
+Per-(course, student) forum activity counters.
+
+Each forum post we're told about (via the forum's webhook callbacks) increments
+the student's ForumActivityCounter for the course, in the same transaction that
+marks the callback processed. Reports and forum milestones read these counters
+instead of counting FORUM_POST tracking events on every request.
+"""
+
+import logging
+from typing import Dict, Optional
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from kinesinlms.course.exceptions import CourseFinishedException
+from kinesinlms.course.milestone_monitor import MilestoneMonitor
+from kinesinlms.forum.models import ForumActivityCounter, ForumActivityType
+from kinesinlms.tracking.event_types import TrackingEventType
+from kinesinlms.tracking.models import TrackingEvent
+
+logger = logging.getLogger(__name__)
+
+
+def record_forum_activity(course, student, activity_type: str) -> ForumActivityCounter:
+    """
+    Count a forum post (or new topic) by a student in a course, and update
+    the student's progress towards the course's forum post milestones.
+
+    Args:
+        course:         Course the forum activity belongs to.
+        student:        User who posted.
+        activity_type:  A ForumActivityType name.
+
+    Returns:
+        The student's updated ForumActivityCounter.
+    """
+    counter, _ = ForumActivityCounter.objects.get_or_create(course=course, student=student)
+    topic_increment = 1 if activity_type == ForumActivityType.TOPIC.name else 0
+    ForumActivityCounter.objects.filter(id=counter.id).update(post_count=F('post_count') + 1,
+                                                              topic_count=F('topic_count') + topic_increment,
+                                                              last_activity_at=timezone.now())
+    counter.refresh_from_db()
+
+    try:
+        MilestoneMonitor.track_forum_activity(course=course, student=student, post_count=counter.post_count)
+    except CourseFinishedException:
+        logger.info(f"Not tracking forum milestones for {student} as course {course} has finished.")
+
+    return counter
+
+
+def get_forum_post_counts(course) -> Dict[int, int]:
+    """
+    Returns:
+        Dictionary of student id to number of forum posts in the course,
+        for students who have posted at least once.
+    """
+    return dict(ForumActivityCounter.objects.filter(course=course, post_count__gt=0)
+                .values_list('student_id', 'post_count'))
+
+
+def get_forum_post_count(course, student) -> int:
+    counter: Optional[ForumActivityCounter] = ForumActivityCounter.objects.filter(course=course,
+                                                                                  student=student).first()
+    return counter.post_count if counter else 0
+
+
+def rebuild_forum_activity_counters(course) -> int:
+    """
+    Recompute a course's counters from its FORUM_POST tracking events.
+    Only needed for activity recorded before the counters existed
+    (or to repair them), as this scans the tracking events.
+
+    Returns:
+        Number of counters written.
+    """
+    post_counts = TrackingEvent.objects.filter(
+        course_slug=course.slug,
+        course_run=course.run,
+        event_type=TrackingEventType.FORUM_POST.value,
+        user__isnull=False,
+    ).values('user').annotate(
+        post_count=Count('id'),
+        topic_count=Count('id', filter=Q(event_data__activity_type=ForumActivityType.TOPIC.name)),
+    )
+
+    num_counters = 0
+    for row in post_counts:
+        ForumActivityCounter.objects.update_or_create(course=course,
+                                                      student_id=row['user'],
+                                                      defaults={'post_count': row['post_count'],
+                                                                'topic_count': row['topic_count']})
+        num_counters += 1
+    return num_counters
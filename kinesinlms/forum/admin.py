@@ -2,7 +2,7 @@ from django.contrib import admin
 
 # Register your models here.
 from kinesinlms.forum.models import ForumCategory, ForumSubcategory, ForumTopic, CohortForumGroup, \
-    CourseForumGroup
+    CourseForumGroup, ForumGroupMembershipChange, ForumCallbackEvent, ForumActivityCounter
 
 
 class ForumSubcategoryInline(admin.TabularInline):
@@ -47,3 +47,27 @@ class CourseForumGroupAdmin(admin.ModelAdmin):
 class FormCohortGroupAdmin(admin.ModelAdmin):
     list_display = ('id', 'group_id', 'name', 'course', 'is_default')
     model = CohortForumGroup
+
+
+@admin.register(ForumGroupMembershipChange)
+class ForumGroupMembershipChangeAdmin(admin.ModelAdmin):
+    list_display = ('id', 'group_id', 'username', 'action', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    list_filter = ('status', 'action')
+    search_fields = ('username',)
+    model = ForumGroupMembershipChange
+
+
+@admin.register(ForumCallbackEvent)
+class ForumCallbackEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event_id', 'event_type', 'event', 'status', 'attempts', 'received_at', 'processed_at')
+    list_filter = ('status', 'event_type')
+    search_fields = ('event_id',)
+    model = ForumCallbackEvent
+
+
+@admin.register(ForumActivityCounter)
+class ForumActivityCounterAdmin(admin.ModelAdmin):
+    list_display = ('id', 'course', 'student', 'post_count', 'topic_count', 'last_activity_at')
+    search_fields = ('student__username',)
+    raw_id_fields = ('student',)
+    model = ForumActivityCounter
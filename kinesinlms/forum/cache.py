@@ -0,0 +1,121 @@
+"""
+Caching for forum topic posts.
+
+Unit pages with a FORUM_TOPIC block load the topic's posts via htmx. Rather than
+asking the forum provider for the posts on every unit view, we keep a copy of
+the cleaned posts in the cache, keyed by topic id, and serve it
+"stale-while-revalidate": once an entry is older than
+TOPIC_POSTS_FRESH_SECONDS we still return it, but queue a background refresh.
+
+The forum callback (save_forum_callback) also queues a refresh whenever a
+post is made to a topic, so most entries are updated before anyone sees
+them go stale.
+
+Only a cold cache makes a synchronous call to the forum provider, and
+that call uses a short timeout so a slow forum can't hold up the page.
+"""
+
+import logging
+import time
+from typing import List, Optional
+
+from django.core.cache import cache
+
+from kinesinlms.forum.service.base_service import ForumAPIUnsuccessful
+
+logger = logging.getLogger(__name__)
+
+# How long a cached set of posts is considered fresh.
+TOPIC_POSTS_FRESH_SECONDS = 60
+
+# How long we keep posts around to serve while stale.
+TOPIC_POSTS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Only one background refresh per topic should be queued at a time.
+TOPIC_POSTS_REFRESH_LOCK_SECONDS = 30
+
+# Timeout (in seconds) for the synchronous fetch on a cold cache.
+TOPIC_POSTS_FETCH_TIMEOUT = 3
+
+
+def topic_posts_cache_key(topic_id: int) -> str:
+    return f"forum_topic_{topic_id}_posts"
+
+
+def _refresh_lock_key(topic_id: int) -> str:
+    return f"forum_topic_{topic_id}_posts_refresh"
+
+
+def get_cached_topic_posts(service, topic_id: int) -> List[dict]:
+    """
+    Return the posts for a topic, using the cache when possible.
+
+    Args:
+        service:    A BaseForumService instance
+        topic_id:   Forum topic id (as stored in ForumTopic.topic_id)
+
+    Returns:
+        List of cleaned post dictionaries.
+
+    Raises:
+        ForumAPIUnsuccessful if nothing is cached and the forum
+        provider could not return posts in time.
+    """
+    entry = cache.get(topic_posts_cache_key(topic_id))
+    if entry is None:
+        try:
+            return refresh_topic_posts(service, topic_id, timeout=TOPIC_POSTS_FETCH_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Could not load posts for forum topic {topic_id}: {e}")
+            raise ForumAPIUnsuccessful(f"Could not load posts for forum topic {topic_id}") from e
+
+    if time.time() - entry.get("fetched_at", 0) > TOPIC_POSTS_FRESH_SECONDS:
+        schedule_topic_posts_refresh(topic_id)
+
+    return entry["posts"]
+
+
+def refresh_topic_posts(service, topic_id: int, timeout: Optional[float] = None) -> List[dict]:
+    """
+    Load posts for a topic from the forum provider and store them in the cache.
+    """
+    posts = service.get_topic_posts(topic_id, timeout=timeout)
+    entry = {"posts": posts, "fetched_at": time.time()}
+    cache.set(topic_posts_cache_key(topic_id), entry, TOPIC_POSTS_CACHE_TIMEOUT)
+    return posts
+
+
+def schedule_topic_posts_refresh(topic_id: int, force: bool = False) -> bool:
+    """
+    Queue a background refresh of a topic's cached posts.
+
+    Args:
+        topic_id:   Forum topic id
+        force:      Queue a refresh even if one is already pending. Used
+                    by the forum callback, as a refresh that's already
+                    running may have missed the new post.
+
+    Returns:
+        True if a refresh was queued.
+    """
+    lock_key = _refresh_lock_key(topic_id)
+    if force:
+        cache.set(lock_key, True, TOPIC_POSTS_REFRESH_LOCK_SECONDS)
+    elif not cache.add(lock_key, True, TOPIC_POSTS_REFRESH_LOCK_SECONDS):
+        return False
+
+    # Import here to avoid circular import with tasks module.
+    from kinesinlms.forum.tasks import refresh_forum_topic_posts_task
+
+    try:
+        refresh_forum_topic_posts_task.delay(topic_id)
+    except Exception:
+        # If we can't reach the broker we just keep serving what's cached.
+        logger.exception(f"Could not queue refresh of posts for forum topic {topic_id}")
+        cache.delete(lock_key)
+        return False
+    return True
+
+
+def release_topic_posts_refresh_lock(topic_id: int) -> None:
+    cache.delete(_refresh_lock_key(topic_id))
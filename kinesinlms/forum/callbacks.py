@@ -0,0 +1,189 @@
+"""
+Inbox for webhook callbacks from the external forum.
+
+The forum (Discourse) retries and backs up its webhook queue when we're slow
+to respond, so the callback view does as little as possible: it verifies the
+signature, stores the raw body as a ForumCallbackEvent and responds. A celery
+task then processes the stored events in batches via the forum service's
+save_forum_callback().
+
+Events are keyed by the forum's event id, so an event the forum redelivers
+is only stored once. Each event is processed in its own transaction together
+with marking it PROCESSED, so re-running the task (or the process_forum_callbacks
+command) never handles an event twice.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from kinesinlms.forum.models import ForumCallbackEvent, ForumCallbackEventStatus
+
+logger = logging.getLogger(__name__)
+
+# Wait a little before processing so events arriving together are handled in one batch.
+CALLBACK_PROCESS_DELAY_SECONDS = 5
+
+# Maximum events handled in one run of the processing task.
+CALLBACK_PROCESS_MAX_EVENTS = 1000
+
+# After this many failed attempts an event is marked FAILED.
+CALLBACK_MAX_ATTEMPTS = 3
+
+# Processed events are kept this long (so redeliveries are still recognized), then deleted.
+CALLBACK_RETENTION_DAYS = 30
+
+_PROCESS_SCHEDULED_KEY = "forum_callback_processing_scheduled"
+
+
+@dataclass
+class CallbackProcessResult:
+    processed: int = 0
+    retrying: int = 0
+    failed: int = 0
+
+    def summary(self) -> str:
+        return (f"Processed {self.processed} forum callback events "
+                f"({self.retrying} to retry, {self.failed} failed).")
+
+
+def store_forum_callback(request) -> Tuple[ForumCallbackEvent, bool]:
+    """
+    Store the raw body of a (verified) forum callback request.
+
+    Args:
+        request:    Callback request from the forum
+
+    Returns:
+        Tuple of (ForumCallbackEvent, created). created is False if
+        this event was already received.
+    """
+    body = request.body
+    if isinstance(body, bytes):
+        body = body.decode(encoding='utf-8')
+
+    event_id = request.headers.get('X-Discourse-Event-Id')
+    if not event_id:
+        # Shouldn't happen with Discourse, but make sure identical bodies are still deduped.
+        event_id = f"sha256:{hashlib.sha256(body.encode()).hexdigest()}"
+
+    event, created = ForumCallbackEvent.objects.get_or_create(
+        event_id=event_id,
+        defaults={
+            'event_type': request.headers.get('X-Discourse-Event-Type'),
+            'event': request.headers.get('X-Discourse-Event'),
+            'body': body,
+        }
+    )
+    if created:
+        transaction.on_commit(schedule_forum_callback_processing)
+    else:
+        logger.info(f"Ignoring forum callback event_id {event_id} as it was already received.")
+    return event, created
+
+
+def schedule_forum_callback_processing(countdown: int = CALLBACK_PROCESS_DELAY_SECONDS) -> bool:
+    """
+    Queue the processing task, unless a run is already queued.
+
+    Returns:
+        True if a task was queued.
+    """
+    if not cache.add(_PROCESS_SCHEDULED_KEY, True, countdown + CALLBACK_PROCESS_DELAY_SECONDS):
+        return False
+
+    # Import here to avoid circular import with tasks module.
+    from kinesinlms.forum.tasks import process_forum_callbacks_task
+
+    try:
+        process_forum_callbacks_task.apply_async(countdown=countdown)
+    except Exception:
+        # Events stay in the inbox and will be handled by the next run.
+        logger.exception("Could not queue process_forum_callbacks_task")
+        cache.delete(_PROCESS_SCHEDULED_KEY)
+        return False
+    return True
+
+
+def process_forum_callback_events(service, max_events: int = CALLBACK_PROCESS_MAX_EVENTS) -> CallbackProcessResult:
+    """
+    Process pending forum callback events, oldest first.
+
+    Args:
+        service:        A BaseForumService instance
+        max_events:     Maximum number of events to handle.
+
+    Returns:
+        CallbackProcessResult with counts of what happened.
+    """
+    # Let events received from here on schedule another run.
+    cache.delete(_PROCESS_SCHEDULED_KEY)
+
+    result = CallbackProcessResult()
+    event_ids = list(ForumCallbackEvent.objects.filter(
+        status=ForumCallbackEventStatus.PENDING.name
+    ).order_by('id').values_list('id', flat=True)[:max_events])
+
+    for event_id in event_ids:
+        error = _process_event(service, event_id)
+        if error is None:
+            result.processed += 1
+            continue
+        status = _record_failure(event_id, error)
+        if status == ForumCallbackEventStatus.FAILED.name:
+            result.failed += 1
+        else:
+            result.retrying += 1
+
+    return result
+
+
+def has_pending_forum_callback_events() -> bool:
+    return ForumCallbackEvent.objects.filter(status=ForumCallbackEventStatus.PENDING.name).exists()
+
+
+def delete_old_forum_callback_events(days: int = CALLBACK_RETENTION_DAYS) -> int:
+    cutoff = timezone.now() - timedelta(days=days)
+    num_deleted, _ = ForumCallbackEvent.objects.filter(
+        status=ForumCallbackEventStatus.PROCESSED.name,
+        processed_at__lt=cutoff,
+    ).delete()
+    return num_deleted
+
+
+def _process_event(service, event_id: int) -> Optional[str]:
+    """
+    Process one event. Returns an error message, or None on success.
+    """
+    try:
+        with transaction.atomic():
+            # Lock the row so two workers can't process the same event.
+            event = ForumCallbackEvent.objects.select_for_update().get(id=event_id)
+            if event.status != ForumCallbackEventStatus.PENDING.name:
+                return None
+            json_data = json.loads(event.body)
+            service.save_forum_callback(json_data)
+            event.status = ForumCallbackEventStatus.PROCESSED.name
+            event.processed_at = timezone.now()
+            event.save(update_fields=['status', 'processed_at'])
+    except Exception as e:
+        logger.exception(f"Could not process forum callback event {event_id}")
+        return str(e) or e.__class__.__name__
+    return None
+
+
+def _record_failure(event_id: int, error: str) -> str:
+    event = ForumCallbackEvent.objects.get(id=event_id)
+    event.attempts += 1
+    event.last_error = error
+    if event.attempts >= CALLBACK_MAX_ATTEMPTS:
+        event.status = ForumCallbackEventStatus.FAILED.name
+    event.save(update_fields=['attempts', 'last_error', 'status'])
+    return event.status
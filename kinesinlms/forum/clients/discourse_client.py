@@ -1,6 +1,15 @@
 import logging
+import time
 
 from pydiscourse.client import DiscourseClient as PyDiscourseClient
+from pydiscourse.exceptions import (
+    DiscourseClientError,
+    DiscourseError,
+    DiscourseRateLimitedError,
+    DiscourseServerError,
+)
+
+from kinesinlms.core.http import DISCOURSE, get_integration_session
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # ACTIVECAMPAIGN METHODS AND CLASSES
@@ -8,6 +17,11 @@ from pydiscourse.client import DiscourseClient as PyDiscourseClient
 
 logger = logging.getLogger(__name__)
 
+# How many times to retry when Discourse rate-limits a request,
+# and the longest we're willing to wait before a retry.
+RATE_LIMIT_RETRIES = 2
+RATE_LIMIT_MAX_WAIT_SECONDS = 10
+
 
 class DiscourseClient(PyDiscourseClient):
     """
@@ -15,7 +29,93 @@ class DiscourseClient(PyDiscourseClient):
     At the moment just using functionality defined in the pydiscourse client.
     In the future this class might replace that library as it doesn't provide
     that much functionality.
+
+    Requests are sent through the shared integration HTTP session
+    (kinesinlms.core.http) rather than pydiscourse's one-off requests,
+    so connections to Discourse are pooled and kept alive.
     """
 
     def __init__(self, host, api_username, api_key, timeout=None):
         super().__init__(host, api_username, api_key, timeout=timeout)
+
+    def delete_group_members(self, groupid: int, usernames: list):
+        """
+        Remove several users from a group in one request. (pydiscourse
+        only offers a bulk method for adding group members.)
+        """
+        return self._delete(f"/groups/{groupid}/members.json", usernames=",".join(usernames))
+
+    def _request(self, verb, path, params=None, files=None, data=None, json=None, override_request_kwargs=None):
+        """
+        Same behaviour as pydiscourse's _request(), but using the shared
+        integration session. If no timeout is set on the client, the
+        session's configured timeout is used.
+        """
+        url = self.host + path
+
+        headers = {
+            "Accept": "application/json; charset=utf-8",
+            "Api-Key": self.api_key,
+            "Api-Username": self.api_username,
+        }
+        request_kwargs = dict(
+            allow_redirects=False,
+            params=params,
+            files=files,
+            data=data,
+            json=json,
+            headers=headers,
+            timeout=self.timeout,
+        )
+        request_kwargs.update(override_request_kwargs or {})
+
+        session = get_integration_session(DISCOURSE)
+        retries = RATE_LIMIT_RETRIES
+        while True:
+            response = session.request(verb, url, **request_kwargs)
+            if response.ok:
+                break
+
+            try:
+                msg = ",".join(response.json()["errors"])
+            except (ValueError, TypeError, KeyError):
+                msg = response.reason or f"{response.status_code}: {response.text}"
+
+            if response.status_code == 429:
+                if retries <= 0:
+                    raise DiscourseRateLimitedError(msg, response=response)
+                wait_seconds = 1
+                if "application/json" in response.headers.get("Content-Type", ""):
+                    try:
+                        wait_seconds += response.json()["extras"]["wait_seconds"]
+                    except (ValueError, TypeError, KeyError):
+                        pass
+                wait_seconds = min(wait_seconds, RATE_LIMIT_MAX_WAIT_SECONDS)
+                logger.info(f"Discourse rate limited {verb} {path}. Retrying in {wait_seconds}s.")
+                time.sleep(wait_seconds)
+                retries -= 1
+                continue
+            if 400 <= response.status_code < 500:
+                raise DiscourseClientError(msg, response=response)
+            raise DiscourseServerError(msg, response=response)
+
+        if response.status_code == 302:
+            raise DiscourseError("Unexpected Redirect, invalid api key or host?", response=response)
+
+        content_type = response.headers.get("Content-Type", "")
+        if "application/json" not in content_type:
+            if not response.content or not response.content.strip():
+                return None
+            raise DiscourseError(f'Invalid Response, expecting "application/json" got "{content_type}"',
+                                 response=response)
+
+        try:
+            decoded = response.json()
+        except ValueError:
+            raise DiscourseError("failed to decode response", response=response)
+
+        if "errors" in decoded:
+            message = decoded.get("message") or ",".join(decoded["errors"])
+            raise DiscourseClientError(message, response=response)
+
+        return decoded
@@ -0,0 +1,34 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kinesinlms.forum.callbacks import process_forum_callback_events
+from kinesinlms.forum.models import ForumCallbackEvent, ForumCallbackEventStatus
+from kinesinlms.forum.utils import get_forum_service
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Process stored webhook callbacks from the forum. Events that were already "
+        "processed are skipped, so this is safe to run at any time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retry-failed", action="store_true",
+                            help="Mark FAILED events as pending again before processing")
+
+    def handle(self, *args, **options):
+        service = get_forum_service()
+        if not service:
+            raise CommandError("No forum service is configured for this site.")
+
+        if options["retry_failed"]:
+            num_reset = ForumCallbackEvent.objects.filter(
+                status=ForumCallbackEventStatus.FAILED.name
+            ).update(status=ForumCallbackEventStatus.PENDING.name, attempts=0)
+            self.stdout.write(f"Marked {num_reset} failed events as pending.")
+
+        result = process_forum_callback_events(service)
+        self.stdout.write(self.style.SUCCESS(result.summary()))
@@ -0,0 +1,59 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kinesinlms.course.models import Course
+from kinesinlms.forum.provisioning import (
+    get_forum_topic_provisioning_progress,
+    plan_forum_topics,
+    provision_forum_topics,
+    schedule_forum_topic_provisioning,
+)
+from kinesinlms.forum.utils import get_forum_service
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create any missing forum topics for a course's discussion blocks. Topics that were "
+        "already created are skipped, so this resumes a partially provisioned course."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("token", type=str,
+                            help="Token of the course to provision, e.g. SLUG_RUN")
+        parser.add_argument("--now", action="store_true",
+                            help="Create the topics now rather than in a celery task")
+
+    def handle(self, *args, **options):
+        service = get_forum_service()
+        if not service:
+            raise CommandError("No forum service is configured for this site.")
+
+        token = options["token"]
+        try:
+            slug, run = token.split("_")
+        except ValueError:
+            raise CommandError(f"Invalid course token: {token}")
+        try:
+            course = Course.objects.get(slug=slug, run=run)
+        except Course.DoesNotExist:
+            raise CommandError(f"NO ACTION! Can't find course with token {token}")
+
+        num_planned = plan_forum_topics(course)
+        provisioned, total = get_forum_topic_provisioning_progress(course)
+        self.stdout.write(f"Added {num_planned} forum topics to provision. "
+                          f"{provisioned} of {total} topics already provisioned for {course.token}")
+
+        if options["now"]:
+            while True:
+                result = provision_forum_topics(service, course)
+                self.stdout.write(result.summary())
+                if result.rate_limited or not (result.created or result.linked) or not result.remaining:
+                    break
+            provisioned, total = get_forum_topic_provisioning_progress(course)
+            self.stdout.write(self.style.SUCCESS(f"{provisioned} of {total} topics provisioned."))
+        else:
+            schedule_forum_topic_provisioning(course)
+            self.stdout.write(self.style.SUCCESS("Queued forum topic provisioning task."))
@@ -0,0 +1,37 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kinesinlms.course.models import Course
+from kinesinlms.forum.activity import rebuild_forum_activity_counters
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute forum activity counters from FORUM_POST tracking events. Only needed "
+        "for forum activity recorded before the counters existed, or to repair them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("token", type=str, nargs="?", default=None,
+                            help="Token of the course to rebuild, e.g. SLUG_RUN (defaults to all courses)")
+
+    def handle(self, *args, **options):
+        token = options["token"]
+        if token:
+            try:
+                slug, run = token.split("_")
+            except ValueError:
+                raise CommandError(f"Invalid course token: {token}")
+            courses = Course.objects.filter(slug=slug, run=run)
+            if not courses.exists():
+                raise CommandError(f"NO ACTION! Can't find course with token {token}")
+        else:
+            courses = Course.objects.all()
+
+        for course in courses:
+            num_counters = rebuild_forum_activity_counters(course)
+            self.stdout.write(f"Rebuilt {num_counters} forum activity counters for {course.token}")
+        self.stdout.write(self.style.SUCCESS("Done."))
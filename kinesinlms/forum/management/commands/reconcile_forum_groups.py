@@ -0,0 +1,54 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kinesinlms.course.models import Course
+from kinesinlms.forum.membership import (
+    queue_group_membership_reconciliation,
+    schedule_group_membership_sync,
+    sync_group_memberships,
+)
+from kinesinlms.forum.utils import get_forum_service
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue forum group membership changes so that each course's forum groups match "
+        "its enrollments and cohort memberships. Safe to run repeatedly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("token", type=str, nargs="?", default=None,
+                            help="Token of the course to reconcile, e.g. SLUG_RUN (defaults to all courses)")
+        parser.add_argument("--now", action="store_true",
+                            help="Send the queued changes now rather than in a celery task")
+
+    def handle(self, *args, **options):
+        service = get_forum_service()
+        if not service:
+            raise CommandError("No forum service is configured for this site.")
+
+        token = options["token"]
+        if token:
+            try:
+                slug, run = token.split("_")
+            except ValueError:
+                raise CommandError(f"Invalid course token: {token}")
+            courses = Course.objects.filter(slug=slug, run=run)
+            if not courses.exists():
+                raise CommandError(f"NO ACTION! Can't find course with token {token}")
+        else:
+            courses = Course.objects.filter(course_forum_group__isnull=False)
+
+        for course in courses.select_related("course_forum_group"):
+            num_changes = queue_group_membership_reconciliation(course)
+            self.stdout.write(f"Queued {num_changes} forum group membership changes for {course.token}")
+
+        if options["now"]:
+            result = sync_group_memberships(service)
+            self.stdout.write(self.style.SUCCESS(result.summary()))
+        else:
+            schedule_group_membership_sync()
+            self.stdout.write(self.style.SUCCESS("Queued forum group membership sync task."))
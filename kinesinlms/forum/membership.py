@@ -0,0 +1,294 @@
+"""
+Queue and send forum group membership changes.
+
+When a student enrolls, unenrolls or changes cohort we need to add them to or
+remove them from groups in the external forum. Rather than calling the forum
+API inside the save transaction, signal handlers record each change as a
+ForumGroupMembershipChange row (an 'outbox'). A celery task drains that table
+in the background:
+
+    - changes for the same user and group are coalesced, so only the latest one is sent
+    - the remaining changes are grouped per forum group and sent with the
+      forum service's bulk add_users_to_group() / remove_users_from_group() methods
+    - batches that fail are retried with exponential backoff, and marked FAILED
+      after MEMBERSHIP_SYNC_MAX_ATTEMPTS.
+
+Adding and removing members is idempotent in the forum, so the
+reconcile_forum_groups command can safely re-queue the expected state of
+every group at any time.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from kinesinlms.forum.models import (
+    ForumGroupMembershipAction,
+    ForumGroupMembershipChange,
+    ForumGroupMembershipChangeStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+# Wait a little before draining so changes made together
+# (e.g. a bulk enrollment) go out in the same batch.
+MEMBERSHIP_SYNC_DELAY_SECONDS = 10
+
+# Maximum usernames sent in one bulk API call.
+MEMBERSHIP_SYNC_BATCH_SIZE = 100
+
+# Maximum outbox rows handled in one run of the sync task.
+MEMBERSHIP_SYNC_MAX_ROWS = 5000
+
+# After this many failed attempts a change is marked FAILED.
+MEMBERSHIP_SYNC_MAX_ATTEMPTS = 6
+
+# Backoff after the first failure. Doubles after each further failure.
+MEMBERSHIP_SYNC_BACKOFF_SECONDS = 30
+MEMBERSHIP_SYNC_MAX_BACKOFF_SECONDS = 60 * 60
+
+_SYNC_SCHEDULED_KEY = "forum_group_membership_sync_scheduled"
+_SYNC_RUNNING_KEY = "forum_group_membership_sync_running"
+
+
+@dataclass
+class MembershipSyncResult:
+    sent: int = 0
+    coalesced: int = 0
+    retrying: int = 0
+    failed: int = 0
+
+    def summary(self) -> str:
+        return (f"Sent {self.sent} forum group membership changes "
+                f"({self.coalesced} coalesced, {self.retrying} to retry, {self.failed} failed).")
+
+
+def queue_group_membership_change(group_id: int,
+                                  username: str,
+                                  action: ForumGroupMembershipAction) -> ForumGroupMembershipChange:
+    """
+    Record that a user should be added to or removed from a forum group,
+    and make sure a sync task will run once the current transaction commits.
+
+    Any older pending change for the same user and group is replaced, as only
+    the latest change matters.
+    """
+    ForumGroupMembershipChange.objects.filter(
+        group_id=group_id,
+        username=username,
+        status=ForumGroupMembershipChangeStatus.PENDING.name,
+    ).delete()
+    change = ForumGroupMembershipChange.objects.create(group_id=group_id,
+                                                       username=username,
+                                                       action=action.name)
+    transaction.on_commit(schedule_group_membership_sync)
+    return change
+
+
+def queue_group_membership_changes(group_id: int,
+                                   usernames: List[str],
+                                   action: ForumGroupMembershipAction) -> int:
+    """
+    Like queue_group_membership_change(), but for many users of
+    the same group at once (e.g. a bulk enrollment).
+
+    Returns:
+        Number of changes queued.
+    """
+    if not usernames:
+        return 0
+    ForumGroupMembershipChange.objects.filter(
+        group_id=group_id,
+        username__in=usernames,
+        status=ForumGroupMembershipChangeStatus.PENDING.name,
+    ).delete()
+    ForumGroupMembershipChange.objects.bulk_create([
+        ForumGroupMembershipChange(group_id=group_id, username=username, action=action.name)
+        for username in usernames
+    ], batch_size=1000)
+    transaction.on_commit(schedule_group_membership_sync)
+    return len(usernames)
+
+
+def queue_group_membership_reconciliation(course) -> int:
+    """
+    Queue changes that bring the forum groups for a course in line with
+    enrollments and cohort memberships in the database:
+
+        - actively enrolled students are added to the course group and their cohort's group
+        - students with an inactive enrollment are removed from those groups
+
+    Any pending or failed changes for the course's groups are replaced, as
+    they're superseded by this snapshot. Because adding and removing group
+    members is idempotent in the forum, this can be run as often as needed.
+
+    Args:
+        course: A Course instance
+
+    Returns:
+        Number of changes queued.
+    """
+    # Import here to avoid circular import with course models.
+    from kinesinlms.course.models import CohortMembership, Enrollment
+
+    try:
+        course_forum_group_id = course.course_forum_group.group_id
+    except Exception:
+        logger.warning(f"Course {course} does not have a CourseForumGroup. Nothing to reconcile.")
+        return 0
+
+    enrollments = Enrollment.objects.filter(course=course).values_list('student__username', 'active')
+    active_by_username = dict(enrollments)
+
+    expected: Dict[Tuple[int, str], ForumGroupMembershipAction] = {}
+    for username, active in active_by_username.items():
+        action = ForumGroupMembershipAction.ADD if active else ForumGroupMembershipAction.REMOVE
+        expected[(course_forum_group_id, username)] = action
+
+    cohort_memberships = CohortMembership.objects.filter(
+        cohort__course=course,
+        cohort__cohort_forum_group__isnull=False,
+    ).values_list('cohort__cohort_forum_group__group_id', 'student__username')
+    for group_id, username in cohort_memberships:
+        if username not in active_by_username:
+            continue
+        active = active_by_username[username]
+        action = ForumGroupMembershipAction.ADD if active else ForumGroupMembershipAction.REMOVE
+        expected[(group_id, username)] = action
+
+    group_ids = {group_id for group_id, username in expected}
+    with transaction.atomic():
+        ForumGroupMembershipChange.objects.filter(group_id__in=group_ids).delete()
+        ForumGroupMembershipChange.objects.bulk_create([
+            ForumGroupMembershipChange(group_id=group_id, username=username, action=action.name)
+            for (group_id, username), action in expected.items()
+        ], batch_size=1000)
+    return len(expected)
+
+
+def schedule_group_membership_sync(countdown: int = MEMBERSHIP_SYNC_DELAY_SECONDS) -> bool:
+    """
+    Queue the sync task, unless a run is already queued.
+
+    Returns:
+        True if a task was queued.
+    """
+    if not cache.add(_SYNC_SCHEDULED_KEY, True, countdown + MEMBERSHIP_SYNC_DELAY_SECONDS):
+        return False
+
+    # Import here to avoid circular import with tasks module.
+    from kinesinlms.forum.tasks import sync_forum_group_memberships_task
+
+    try:
+        sync_forum_group_memberships_task.apply_async(countdown=countdown)
+    except Exception:
+        # Changes stay in the outbox and will go out with the next run.
+        logger.exception("Could not queue sync_forum_group_memberships_task")
+        cache.delete(_SYNC_SCHEDULED_KEY)
+        return False
+    return True
+
+
+def sync_group_memberships(service, max_rows: int = MEMBERSHIP_SYNC_MAX_ROWS) -> MembershipSyncResult:
+    """
+    Send pending membership changes to the forum service. If another
+    sync is already running, do nothing.
+
+    Args:
+        service:    A BaseForumService instance
+        max_rows:   Maximum number of outbox rows to handle.
+
+    Returns:
+        MembershipSyncResult with counts of what happened.
+    """
+    # Let changes made from here on schedule another run.
+    cache.delete(_SYNC_SCHEDULED_KEY)
+
+    if not cache.add(_SYNC_RUNNING_KEY, True, 60 * 10):
+        logger.info("sync_group_memberships(): sync already running.")
+        return MembershipSyncResult()
+    try:
+        return _send_pending_changes(service, max_rows=max_rows)
+    finally:
+        cache.delete(_SYNC_RUNNING_KEY)
+
+
+def next_group_membership_sync_countdown() -> Optional[int]:
+    """
+    Seconds until the next pending change is due, or None if
+    there are no pending changes.
+    """
+    next_attempt_at = ForumGroupMembershipChange.objects.filter(
+        status=ForumGroupMembershipChangeStatus.PENDING.name
+    ).order_by('next_attempt_at').values_list('next_attempt_at', flat=True).first()
+    if next_attempt_at is None:
+        return None
+    countdown = int((next_attempt_at - timezone.now()).total_seconds())
+    return max(countdown, MEMBERSHIP_SYNC_DELAY_SECONDS)
+
+
+def _send_pending_changes(service, max_rows: int) -> MembershipSyncResult:
+    result = MembershipSyncResult()
+
+    changes = ForumGroupMembershipChange.objects.filter(
+        status=ForumGroupMembershipChangeStatus.PENDING.name,
+        next_attempt_at__lte=timezone.now(),
+    ).order_by('id')[:max_rows]
+
+    # Coalesce: only the latest change per user and group is sent.
+    latest: Dict[Tuple[int, str], ForumGroupMembershipChange] = {}
+    superseded_ids = []
+    for change in changes:
+        key = (change.group_id, change.username)
+        if key in latest:
+            superseded_ids.append(latest[key].id)
+        latest[key] = change
+    if superseded_ids:
+        ForumGroupMembershipChange.objects.filter(id__in=superseded_ids).delete()
+        result.coalesced = len(superseded_ids)
+
+    batches: Dict[Tuple[int, str], List[ForumGroupMembershipChange]] = {}
+    for change in latest.values():
+        batches.setdefault((change.group_id, change.action), []).append(change)
+
+    for (group_id, action), group_changes in batches.items():
+        for start in range(0, len(group_changes), MEMBERSHIP_SYNC_BATCH_SIZE):
+            batch = group_changes[start:start + MEMBERSHIP_SYNC_BATCH_SIZE]
+            usernames = [change.username for change in batch]
+            try:
+                if action == ForumGroupMembershipAction.ADD.name:
+                    service.add_users_to_group(group_id=group_id, usernames=usernames)
+                else:
+                    service.remove_users_from_group(group_id=group_id, usernames=usernames)
+            except Exception as e:
+                logger.exception(f"Could not {action} {len(usernames)} users for forum group_id {group_id}")
+                retrying, failed = _record_failure(batch, error=str(e))
+                result.retrying += retrying
+                result.failed += failed
+                continue
+            ForumGroupMembershipChange.objects.filter(id__in=[change.id for change in batch]).delete()
+            result.sent += len(batch)
+
+    return result
+
+
+def _record_failure(batch: List[ForumGroupMembershipChange], error: Optional[str]) -> Tuple[int, int]:
+    now = timezone.now()
+    retrying = failed = 0
+    for change in batch:
+        change.attempts += 1
+        change.last_error = error
+        if change.attempts >= MEMBERSHIP_SYNC_MAX_ATTEMPTS:
+            change.status = ForumGroupMembershipChangeStatus.FAILED.name
+            failed += 1
+        else:
+            backoff = MEMBERSHIP_SYNC_BACKOFF_SECONDS * (2 ** (change.attempts - 1))
+            change.next_attempt_at = now + timedelta(seconds=min(backoff, MEMBERSHIP_SYNC_MAX_BACKOFF_SECONDS))
+            retrying += 1
+    ForumGroupMembershipChange.objects.bulk_update(batch, ['attempts', 'last_error', 'status', 'next_attempt_at'])
+    return retrying, failed
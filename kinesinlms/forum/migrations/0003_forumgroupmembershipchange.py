@@ -0,0 +1,43 @@
+# Generated by Django 5.0.9 on 2026-10-18 14:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ForumGroupMembershipChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("group_id", models.IntegerField()),
+                ("username", models.CharField(max_length=150)),
+                (
+                    "action",
+                    models.CharField(choices=[("ADD", "Add"), ("REMOVE", "Remove")], max_length=20),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PENDING", "Pending"), ("FAILED", "Failed")],
+                        default="PENDING",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("next_attempt_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("last_error", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["status", "next_attempt_at"], name="forum_membership_due_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.9 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0003_forumgroupmembershipchange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ForumCallbackEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "event_id",
+                    models.CharField(help_text="ID of event in external forum service", max_length=100, unique=True),
+                ),
+                ("event_type", models.CharField(blank=True, max_length=50, null=True)),
+                ("event", models.CharField(blank=True, max_length=100, null=True)),
+                ("body", models.TextField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PENDING", "Pending"), ("PROCESSED", "Processed"), ("FAILED", "Failed")],
+                        default="PENDING",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, null=True)),
+                ("received_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["status", "id"], name="forum_callback_status_idx")],
+            },
+        ),
+    ]
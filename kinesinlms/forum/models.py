@@ -5,6 +5,7 @@ from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from slugify import slugify
 
@@ -371,3 +372,160 @@ class ForumTopic(models.Model):
     def __str__(self):
         return f"({self.id}) ForumTopic ID {self.id} (topic_id: {self.topic_id} " \
                f"topic_slug: {self.topic_slug})"
+
+
+class ForumGroupMembershipAction(Enum):
+    ADD = "Add"
+    REMOVE = "Remove"
+
+
+class ForumGroupMembershipChangeStatus(Enum):
+    PENDING = "Pending"
+    FAILED = "Failed"
+
+
+class ForumGroupMembershipChange(models.Model):
+    """
+    An 'outbox' entry recording that a user should be added to
+    or removed from a group in the external forum service.
+
+    Signal handlers write these rows rather than calling the forum
+    API directly, so enrollments aren't slowed down by forum requests.
+    A celery task (sync_forum_group_memberships_task) drains the table,
+    coalescing changes per group and sending them in bulk. Rows are deleted
+    once they've been sent. Rows that keep failing are marked FAILED
+    and left for the reconcile_forum_groups command.
+    """
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='forum_membership_due_idx'),
+        ]
+
+    # ID of group in external forum service
+    group_id = models.IntegerField(null=False,
+                                   blank=False)
+
+    username = models.CharField(max_length=150,
+                                null=False,
+                                blank=False)
+
+    action = models.CharField(max_length=20,
+                              null=False,
+                              blank=False,
+                              choices=[(item.name, item.value) for item in ForumGroupMembershipAction])
+
+    status = models.CharField(max_length=20,
+                              null=False,
+                              blank=False,
+                              default=ForumGroupMembershipChangeStatus.PENDING.name,
+                              choices=[(item.name, item.value) for item in ForumGroupMembershipChangeStatus])
+
+    attempts = models.PositiveIntegerField(default=0)
+
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+
+    last_error = models.TextField(null=True,
+                                  blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"ForumGroupMembershipChange {self.id} {self.action} {self.username} " \
+               f"group_id: {self.group_id} ({self.status})"
+
+
+class ForumCallbackEventStatus(Enum):
+    PENDING = "Pending"
+    PROCESSED = "Processed"
+    FAILED = "Failed"
+
+
+class ForumCallbackEvent(models.Model):
+    """
+    An 'inbox' entry holding the raw body of a webhook callback
+    from the external forum.
+
+    The callback view only verifies the signature and stores the body here,
+    so it can respond to the forum straight away. A celery task
+    (process_forum_callbacks_task) then processes events in batches.
+
+    event_id is the forum's own id for the event (X-Discourse-Event-Id for Discourse),
+    so a redelivered event is stored, and processed, only once.
+    """
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='forum_callback_status_idx'),
+        ]
+
+    event_id = models.CharField(max_length=100,
+                                unique=True,
+                                null=False,
+                                blank=False,
+                                help_text=_("ID of event in external forum service"))
+
+    # e.g. 'post' or 'topic'
+    event_type = models.CharField(max_length=50,
+                                  null=True,
+                                  blank=True)
+
+    # e.g. 'post_created' or 'post_destroyed'
+    event = models.CharField(max_length=100,
+                             null=True,
+                             blank=True)
+
+    body = models.TextField(null=False,
+                            blank=False)
+
+    status = models.CharField(max_length=20,
+                              null=False,
+                              blank=False,
+                              default=ForumCallbackEventStatus.PENDING.name,
+                              choices=[(item.name, item.value) for item in ForumCallbackEventStatus])
+
+    attempts = models.PositiveIntegerField(default=0)
+
+    last_error = models.TextField(null=True,
+                                  blank=True)
+
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    processed_at = models.DateTimeField(null=True,
+                                        blank=True)
+
+    def __str__(self):
+        return f"ForumCallbackEvent {self.id} event_id: {self.event_id} {self.event} ({self.status})"
+
+
+class ForumActivityCounter(models.Model):
+    """
+    Running count of a student's forum activity in a course.
+
+    Updated as forum callbacks are processed, so engagement reports and
+    forum milestones can read a student's count directly rather than
+    aggregating FORUM_POST tracking events.
+    """
+
+    class Meta:
+        unique_together = ('course', 'student')
+
+    course = models.ForeignKey('course.Course',
+                               on_delete=models.CASCADE,
+                               related_name='forum_activity_counters')
+
+    student = models.ForeignKey(settings.AUTH_USER_MODEL,
+                                on_delete=models.CASCADE,
+                                related_name='forum_activity_counters')
+
+    # Number of posts (including new topics) the student has made in the course forum.
+    post_count = models.PositiveIntegerField(default=0)
+
+    # Number of those posts that started a new topic.
+    topic_count = models.PositiveIntegerField(default=0)
+
+    last_activity_at = models.DateTimeField(null=True,
+                                            blank=True)
+
+    def __str__(self):
+        return f"ForumActivityCounter course: {self.course_id} student: {self.student_id} posts: {self.post_count}"
@@ -0,0 +1,313 @@
+"""
+Bulk provisioning of forum topics.
+
+Every FORUM_TOPIC block in a course needs a topic in each cohort subcategory,
+so a course with 40 discussions and 10 cohorts needs 400 topics. Rather than
+creating these one at a time inside a request, we:
+
+    1.  'plan' the topics: create a local ForumTopic for every (block, subcategory)
+        pair that doesn't have one yet. These start without a topic_id.
+    2.  queue provision_forum_topics_task, which creates the missing topics
+        in the forum with a bounded number of concurrent requests and saves
+        each ForumTopic's topic_id as soon as its topic is created.
+
+Progress is therefore stored in the ForumTopic rows themselves: a ForumTopic
+without a topic_id still needs provisioning. If the job stops part-way (rate
+limiting, a worker restart, an error) the next run carries on from there.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.db import transaction
+from pydiscourse.exceptions import DiscourseRateLimitedError
+
+from kinesinlms.forum.models import ForumSubcategory, ForumSubcategoryType, ForumTopic
+from kinesinlms.learning_library.constants import BlockType
+from kinesinlms.learning_library.models import Block
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of topic creation requests sent to the forum at once.
+TOPIC_PROVISIONING_CONCURRENCY = 4
+
+# Maximum number of topics created in one run of the task.
+TOPIC_PROVISIONING_MAX_PER_RUN = 200
+
+# How long to wait before continuing after the forum rate-limits us.
+TOPIC_PROVISIONING_RATE_LIMIT_BACKOFF_SECONDS = 60
+
+_PROVISIONING_LOCK_SECONDS = 60 * 15
+
+# Discourse lists about 30 topics per page, so this covers thousands of topics.
+_MAX_TOPIC_LIST_PAGES = 200
+
+
+@dataclass
+class TopicProvisioningResult:
+    created: int = 0
+    linked: int = 0
+    failed: int = 0
+    remaining: int = 0
+    rate_limited: bool = False
+
+    def summary(self) -> str:
+        return (f"Created {self.created} forum topics, linked {self.linked} existing topics, "
+                f"{self.failed} failed, {self.remaining} remaining."
+                f"{' Rate limited.' if self.rate_limited else ''}")
+
+
+def _provisioning_lock_key(course_id: int) -> str:
+    return f"forum_topic_provisioning_{course_id}"
+
+
+def get_course_discussion_blocks(course) -> List[Block]:
+    return list(Block.objects.filter(
+        type=BlockType.FORUM_TOPIC.name,
+        unit_blocks__course_unit__course=course,
+    ).distinct())
+
+
+def plan_forum_topics(course,
+                      forum_subcategories: Optional[List[ForumSubcategory]] = None,
+                      discussion_blocks: Optional[List[Block]] = None) -> int:
+    """
+    Make sure a local ForumTopic exists for each discussion block in each
+    cohort subcategory of the course. New ForumTopics have no topic_id until
+    provision_forum_topics() creates the topic in the forum.
+
+    Args:
+        course:                 Course to plan topics for.
+        forum_subcategories:    Limit to these subcategories (defaults to all
+                                COHORT subcategories in the course).
+        discussion_blocks:      Limit to these blocks (defaults to all
+                                FORUM_TOPIC blocks in the course).
+
+    Returns:
+        Number of ForumTopics created.
+    """
+    if forum_subcategories is None:
+        forum_subcategories = list(ForumSubcategory.objects.filter(forum_category__course=course,
+                                                                   type=ForumSubcategoryType.COHORT.name))
+    if discussion_blocks is None:
+        discussion_blocks = get_course_discussion_blocks(course)
+
+    forum_subcategories = [subcategory for subcategory in forum_subcategories if subcategory.subcategory_id]
+    discussion_blocks = [block for block in discussion_blocks if block.discussion_topic_title]
+    if not forum_subcategories or not discussion_blocks:
+        return 0
+
+    existing = set(ForumTopic.objects.filter(
+        forum_subcategory__in=forum_subcategories,
+        block__in=discussion_blocks,
+    ).values_list('block_id', 'forum_subcategory_id'))
+
+    new_forum_topics = [
+        ForumTopic(block=block, forum_subcategory=subcategory)
+        for subcategory in forum_subcategories
+        for block in discussion_blocks
+        if (block.id, subcategory.id) not in existing
+    ]
+    ForumTopic.objects.bulk_create(new_forum_topics, ignore_conflicts=True)
+    return len(new_forum_topics)
+
+
+def get_pending_forum_topics(course):
+    return ForumTopic.objects.filter(
+        forum_subcategory__forum_category__course=course,
+        forum_subcategory__subcategory_id__isnull=False,
+        block__isnull=False,
+        topic_id__isnull=True,
+    )
+
+
+def get_forum_topic_provisioning_progress(course) -> Tuple[int, int]:
+    """
+    Returns:
+        Tuple of (number of topics provisioned, total number of topics) for the course.
+    """
+    forum_topics = ForumTopic.objects.filter(forum_subcategory__forum_category__course=course)
+    return forum_topics.filter(topic_id__isnull=False).count(), forum_topics.count()
+
+
+def schedule_forum_topic_provisioning(course, countdown: int = 0) -> None:
+    """
+    Queue provision_forum_topics_task for a course once the
+    current transaction commits.
+    """
+    # Import here to avoid circular import with tasks module.
+    from kinesinlms.forum.tasks import provision_forum_topics_task
+
+    course_id = course.id
+
+    def _queue():
+        try:
+            provision_forum_topics_task.apply_async(args=[course_id], countdown=countdown)
+        except Exception:
+            logger.exception(f"Could not queue provision_forum_topics_task for course {course_id}")
+
+    transaction.on_commit(_queue)
+
+
+def provision_forum_topics(service,
+                           course,
+                           max_topics: int = TOPIC_PROVISIONING_MAX_PER_RUN,
+                           concurrency: int = TOPIC_PROVISIONING_CONCURRENCY) -> TopicProvisioningResult:
+    """
+    Create forum topics for ForumTopics in the course that don't have a topic_id yet.
+
+    Topics that already exist in the forum (matched by title within their
+    subcategory) are linked rather than created again.
+
+    Args:
+        service:        A DiscourseForumService instance
+        course:         Course to provision topics for.
+        max_topics:     Maximum number of topics to create in this run.
+        concurrency:    Maximum number of concurrent requests to the forum.
+
+    Returns:
+        TopicProvisioningResult
+    """
+    result = TopicProvisioningResult()
+
+    lock_key = _provisioning_lock_key(course.id)
+    if not cache.add(lock_key, True, _PROVISIONING_LOCK_SECONDS):
+        logger.info(f"Forum topic provisioning already running for course {course}.")
+        result.remaining = get_pending_forum_topics(course).count()
+        return result
+
+    try:
+        pending = list(get_pending_forum_topics(course).select_related('block', 'forum_subcategory')
+                       .order_by('forum_subcategory_id', 'id')[:max_topics])
+
+        # Link topics that already exist in the forum (e.g. from an earlier, interrupted run
+        # that created the topic but didn't get to save its id). If a subcategory's topics
+        # can't be listed, its pending topics are left for the next run rather than risk
+        # creating duplicates.
+        rate_limited = threading.Event()
+        remote_topics_by_subcategory: Dict[int, Optional[Dict[str, dict]]] = {}
+        unlisted_subcategory_ids = set()
+        to_create: List[ForumTopic] = []
+        for forum_topic in pending:
+            subcategory_id = forum_topic.forum_subcategory.subcategory_id
+            if subcategory_id not in remote_topics_by_subcategory:
+                remote_topics_by_subcategory[subcategory_id] = None
+                if not rate_limited.is_set():
+                    try:
+                        remote_topics = _get_remote_topics_by_title(service, subcategory_id)
+                        remote_topics_by_subcategory[subcategory_id] = remote_topics
+                    except DiscourseRateLimitedError:
+                        logger.warning(f"Forum rate limited listing topics in subcategory {subcategory_id}.")
+                        rate_limited.set()
+                    except Exception:
+                        logger.exception(f"Could not list forum topics in subcategory {subcategory_id}")
+                        unlisted_subcategory_ids.add(subcategory_id)
+            remote_topics = remote_topics_by_subcategory[subcategory_id]
+            if remote_topics is None:
+                # Skipped: counted as failed, or left for later if we were rate limited.
+                if subcategory_id in unlisted_subcategory_ids:
+                    result.failed += 1
+                continue
+            remote_topic = remote_topics.get(forum_topic.block.discussion_topic_title)
+            if remote_topic:
+                forum_topic.topic_id = remote_topic['id']
+                forum_topic.topic_slug = remote_topic.get('slug', None)
+                forum_topic.save(update_fields=['topic_id', 'topic_slug'])
+                result.linked += 1
+            else:
+                to_create.append(forum_topic)
+
+        # Only the HTTP requests run in worker threads. Results are saved here,
+        # in this thread, as they come back. Once the forum rate-limits us
+        # no further requests are sent.
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(_create_remote_topic, service, forum_topic, rate_limited): forum_topic
+                for forum_topic in to_create
+            }
+            for future in as_completed(futures):
+                forum_topic = futures[future]
+                try:
+                    response = future.result()
+                except Exception:
+                    logger.exception(f"Could not create forum topic for {forum_topic}")
+                    result.failed += 1
+                    continue
+                if response is None:
+                    # Skipped because of rate limiting.
+                    continue
+                forum_topic.topic_id = response['topic_id']
+                forum_topic.topic_slug = response.get('topic_slug', None)
+                forum_topic.save(update_fields=['topic_id', 'topic_slug'])
+                result.created += 1
+        if rate_limited.is_set():
+            logger.warning(f"Forum rate limited topic provisioning for course {course}. Will continue later.")
+            result.rate_limited = True
+    finally:
+        cache.delete(lock_key)
+
+    result.remaining = get_pending_forum_topics(course).count()
+    return result
+
+
+def _get_remote_topics_by_title(service, subcategory_id: int) -> Dict[str, dict]:
+    """
+    List every topic in a forum subcategory, following the
+    topic list's more_topics_url through all its pages.
+    """
+    topics_by_title = {}
+    page = 0
+    for _ in range(_MAX_TOPIC_LIST_PAGES):
+        if page:
+            response = service.client.category_topics(subcategory_id, page=page)
+        else:
+            response = service.client.category_topics(subcategory_id)
+        topic_list = response.get('topic_list', {})
+        for topic in topic_list.get('topics', []):
+            topics_by_title.setdefault(topic['title'], topic)
+        next_page = _get_next_page(topic_list.get('more_topics_url'))
+        if next_page is None or next_page <= page:
+            return topics_by_title
+        page = next_page
+    raise Exception(f"Subcategory {subcategory_id} has more than {_MAX_TOPIC_LIST_PAGES} pages of topics.")
+
+
+def _get_next_page(more_topics_url: Optional[str]) -> Optional[int]:
+    if not more_topics_url:
+        return None
+    page = parse_qs(urlparse(more_topics_url).query).get('page')
+    try:
+        return int(page[0]) if page else None
+    except ValueError:
+        return None
+
+
+def _create_remote_topic(service, forum_topic: ForumTopic, rate_limited: threading.Event) -> Optional[dict]:
+    """
+    Create the topic in the forum and return the response, or None
+    if the forum has rate-limited us and the request was skipped.
+    """
+    if rate_limited.is_set():
+        return None
+
+    block = forum_topic.block
+    topic_title = block.discussion_topic_title
+    if block.html_content:
+        topic_content = block.html_content
+    else:
+        topic_content = f"Contribute below to the discussion topic : {topic_title}"
+
+    # As in DiscourseForumService.create_topic(), topics are created
+    # with create_post() and no topic_id.
+    try:
+        return service.client.create_post(category_id=forum_topic.forum_subcategory.subcategory_id,
+                                          title=topic_title,
+                                          content=topic_content)
+    except DiscourseRateLimitedError:
+        rate_limited.set()
+        return None
@@ -134,7 +134,12 @@ class BaseForumService(ABC):
         pass
 
     @abstractmethod
-    def get_topic_posts(self, topic_id: int) -> List[dict]:
+    def get_topic_posts(self, topic_id: int, timeout: Optional[float] = None) -> List[dict]:
+        """
+        Return the posts for a topic from the forum provider. Views
+        should use kinesinlms.forum.cache.get_cached_topic_posts() instead
+        of calling this directly.
+        """
         pass
 
     @abstractmethod
@@ -145,6 +150,10 @@ class BaseForumService(ABC):
     # CALLBACKS
     # ~~~~~~~~~~~~~~~~~~~
 
+    @abstractmethod
+    def verify_forum_callback(self, request) -> None:
+        pass
+
     @abstractmethod
     def read_forum_callback(self, request) -> Dict:
         pass
@@ -164,6 +173,22 @@ class BaseForumService(ABC):
     def remove_user_from_group(self, group_id: int, username: str):
         pass
 
+    def add_users_to_group(self, group_id: int, usernames: List[str]):
+        """
+        Add several users to a group. Services that support a bulk
+        API call should override this method.
+        """
+        for username in usernames:
+            self.add_user_to_group(group_id=group_id, username=username)
+
+    def remove_users_from_group(self, group_id: int, usernames: List[str]):
+        """
+        Remove several users from a group. Services that support a bulk
+        API call should override this method.
+        """
+        for username in usernames:
+            self.remove_user_from_group(group_id=group_id, username=username)
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     # SSO METHODS
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
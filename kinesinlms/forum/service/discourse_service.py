@@ -14,14 +14,19 @@ from urllib.parse import unquote, urlencode, parse_qs
 
 from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from pydiscourse.exceptions import DiscourseClientError
 
 from kinesinlms.core.utils import is_valid_hex_string
 from kinesinlms.course.models import Cohort, CourseUnit, Course, Enrollment
+from kinesinlms.forum.activity import record_forum_activity
+from kinesinlms.forum.cache import schedule_topic_posts_refresh
 from kinesinlms.forum.clients.discourse_client import DiscourseClient
 from kinesinlms.forum.models import (CohortForumGroup, ForumSubcategory, ForumCategory, ForumTopic,
                                      ForumSubcategoryType,
                                      ForumProvider, ForumActivityType, CourseForumGroup)
+from kinesinlms.forum.provisioning import (get_pending_forum_topics, plan_forum_topics,
+                                           schedule_forum_topic_provisioning)
 from kinesinlms.forum.service.base_service import BaseForumService, ForumAPIUnsuccessful, ForumAPIFailed, \
     ForumServiceError
 from kinesinlms.learning_library.constants import BlockType
@@ -33,6 +38,9 @@ logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+# How long the Discourse category and group lookups are shared via the cache.
+DISCOURSE_LOOKUP_CACHE_SECONDS = 60
+
 
 # CLASSES
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -63,6 +71,12 @@ class DiscourseForumService(BaseForumService):
             api_username=provider.forum_api_username,
             api_key=provider.api_key)
 
+        # Lookups of Discourse categories and groups, keyed by id. Loaded on first
+        # use (see _get_discourse_categories_lookup() and _get_discourse_groups_lookup())
+        # and updated in place as this service creates or deletes items.
+        self._categories_lookup: Optional[Dict[int, dict]] = None
+        self._groups_lookup: Optional[Dict[int, dict]] = None
+
         logger.debug("DiscourseForumService initialized")
 
     def is_course_forum_configured(self, course) -> bool:
@@ -203,6 +217,7 @@ class DiscourseForumService(BaseForumService):
             self.client.delete_group(groupid=course_forum_group.group_id)
         except Exception:
             raise ForumAPIFailed("Discourse API call failed.")
+        self._forget_discourse_group(course_forum_group.group_id)
 
         if delete_model:
             try:
@@ -242,6 +257,7 @@ class DiscourseForumService(BaseForumService):
             # Remote group might have already been deleted if we're e.g.
             # in the process of deleting a course.
             raise ForumAPIFailed(f"Discourse API call failed. Error : {e}")
+        self._forget_discourse_group(cohort_forum_group.group_id)
 
         if delete_model:
             try:
@@ -267,13 +283,9 @@ class DiscourseForumService(BaseForumService):
         """
         # Get any existing groups in Discourse
         logger.info("Loading existing Discourse groups")
-        existing_remote_discourse_groups: Dict[str, int] = {}
-        results = self.client.groups()
-        if results:
-            for result in results:
-                g_id = result.get('id')
-                name = result.get('name', '')
-                existing_remote_discourse_groups[name] = g_id
+        existing_remote_discourse_groups: Dict[str, int] = {
+            group.get('name', ''): group_id for group_id, group in self._get_discourse_groups_lookup().items()
+        }
 
         course = cohort.course
         if cohort.is_default:
@@ -304,6 +316,7 @@ class DiscourseForumService(BaseForumService):
                 # Let's hold on to the ID for the new Group created by Discourse
                 # (Yes, for some reason they call the object in the return object 'basic_group')
                 remote_cohort_forum_group_id = result['basic_group']['id']
+                self._remember_discourse_group(result['basic_group'])
             except Exception:
                 raise ForumAPIFailed("create_group_for_cohort() ")
 
@@ -332,13 +345,9 @@ class DiscourseForumService(BaseForumService):
 
         # Get any existing groups in Discourse
         logger.info("Loading existing Discourse groups")
-        existing_remote_discourse_groups: Dict[str, int] = {}
-        results = self.client.groups()
-        if results:
-            for result in results:
-                g_id = result.get('id')
-                name = result.get('name', '')
-                existing_remote_discourse_groups[name] = g_id
+        existing_remote_discourse_groups: Dict[str, int] = {
+            group.get('name', ''): group_id for group_id, group in self._get_discourse_groups_lookup().items()
+        }
 
         # Create COURSE GROUP in Discourse
         # By convention, we use the course token for the Discourse group name...
@@ -366,6 +375,7 @@ class DiscourseForumService(BaseForumService):
             # Let's hold on to the ID for the new Group created by Discourse
             # (Yes, for some reason they call the object in the return object 'basic_group')
             group_id = result['basic_group']['id']
+            self._remember_discourse_group(result['basic_group'])
         except Exception:
             raise ForumAPIFailed("_create_group_for_course() Discourse API call failed. ")
 
@@ -491,6 +501,7 @@ class DiscourseForumService(BaseForumService):
 
         try:
             self.client.delete_category(category_id=forum_category.category_id)
+            self._forget_discourse_category(forum_category.category_id)
         except Exception:
             logger.exception(f"Could not delete Discourse category for course {course.token}")
 
@@ -535,6 +546,7 @@ class DiscourseForumService(BaseForumService):
 
         try:
             self.client.delete_category(category_id=forum_subcategory.subcategory_id)
+            self._forget_discourse_category(forum_subcategory.subcategory_id)
         except Exception:
             logger.exception(f"Could not delete Discourse (sub)category for course {course}")
 
@@ -581,13 +593,15 @@ class DiscourseForumService(BaseForumService):
 
         # Delete all Topics in subcategory before deleting subcategory
         if delete_all_topics:
+            # delete_topic() logs rather than raises, so one topic that can't be
+            # deleted doesn't stop the rest (or the subcategory) being deleted.
             for forum_topic in forum_subcategory.forum_topics.all():
-                self.client.delete_topic(forum_topic.topic_id)
-                forum_topic.delete()
+                self.delete_topic(forum_topic)
 
         # Now delete subcategory
         try:
             self.client.delete_category(category_id=forum_subcategory.subcategory_id)
+            self._forget_discourse_category(forum_subcategory.subcategory_id)
         except Exception:
             logger.exception(f"Could not delete Discourse (sub)category "
                              f"for forum_subcategory {forum_subcategory}")
@@ -706,6 +720,7 @@ class DiscourseForumService(BaseForumService):
                                                      color=subcategory_color)
                 logger.debug(f"Result after creating (sub)category in Discourse: {result}")
                 subcategory_id = result['category']['id']
+                self._remember_discourse_category(result['category'])
             except Exception as e:
                 raise ForumAPIFailed(f"_create_subcategory() Discourse API call failed. Error : {e}")
 
@@ -786,6 +801,7 @@ class DiscourseForumService(BaseForumService):
                                                      color=category_color)
                 category_id = result['category']['id']
                 category_slug = result['category'].get('slug', None)
+                self._remember_discourse_category(result['category'])
             except Exception as e:
                 raise ForumAPIFailed(f"Discourse API call failed. Error : {e}")
 
@@ -795,14 +811,23 @@ class DiscourseForumService(BaseForumService):
         """
         Returns a dictionary of JSON data about categories
         from Discourse, keyed by category_id.
+
+        The lookup is loaded once per service instance, and shared
+        between processes via the cache for DISCOURSE_LOOKUP_CACHE_SECONDS.
         :return:
         """
-        site_json = self.client.site()
-        dcategories = site_json['categories']
-        dcategories_lookup = {}
-        for dcategory in dcategories:
-            dcategories_lookup[int(dcategory['id'])] = dcategory
-        return dcategories_lookup
+        if self._categories_lookup is None:
+            cache_key = self._lookup_cache_key("categories")
+            dcategories_lookup = cache.get(cache_key)
+            if dcategories_lookup is None:
+                site_json = self.client.site()
+                dcategories = site_json['categories']
+                dcategories_lookup = {}
+                for dcategory in dcategories:
+                    dcategories_lookup[int(dcategory['id'])] = dcategory
+                cache.set(cache_key, dcategories_lookup, DISCOURSE_LOOKUP_CACHE_SECONDS)
+            self._categories_lookup = dcategories_lookup
+        return self._categories_lookup
 
     # ~~~~~~~~~~~~~~~~~~~
     # TOPICS
@@ -836,8 +861,16 @@ class DiscourseForumService(BaseForumService):
         else:
             return False
 
-    def get_topic_posts(self, topic_id: int) -> List[dict]:
-        topic = self.client.topic_posts(topic_id)
+    def get_topic_posts(self, topic_id: int, timeout: Optional[float] = None) -> List[dict]:
+        if timeout:
+            default_timeout = self.client.timeout
+            self.client.timeout = timeout
+            try:
+                topic = self.client.topic_posts(topic_id)
+            finally:
+                self.client.timeout = default_timeout
+        else:
+            topic = self.client.topic_posts(topic_id)
         post_stream = topic.get('post_stream', None)
         if post_stream:
             posts = post_stream['posts']
@@ -989,12 +1022,15 @@ class DiscourseForumService(BaseForumService):
         """
         Create or update a topic in Discourse for a given Discussion block.
 
+        Existing topics are updated right away. Missing topics are
+        created in the background by the provisioning task.
+
         Args:
             discussion_block:
             course:
 
         Returns:
-            ForumTopic instance
+            List of ForumTopic instances that were updated.
         """
         assert discussion_block is not None, "create_or_update_topic() discussion_block must be defined"
         assert course is not None, "create_or_update_topic() course must be defined"
@@ -1004,28 +1040,26 @@ class DiscourseForumService(BaseForumService):
         forum_subcategories = ForumSubcategory.objects.filter(forum_category__course=course,
                                                               type=ForumSubcategoryType.COHORT.name)
 
-        forum_topics = []
-        for subcat in forum_subcategories.all():
-            try:
-                forum_topic = ForumTopic.objects.get(block=discussion_block,
-                                                     forum_subcategory=subcat)
-                self.update_topic(forum_topic=forum_topic,
-                                  title=discussion_block.discussion_topic_title,
-                                  html_content=discussion_block.html_content)
-                forum_topics.append(forum_topic)
-            except ForumTopic.DoesNotExist:
-                forum_topic = None
-
-            if forum_topic is None:
-                try:
-                    forum_topic = self.create_topic(discussion_block=discussion_block,
-                                                    course=course,
-                                                    forum_subcategory=subcat)
-                    forum_topics.append(forum_topic)
-                except Exception as e:
-                    logger.exception(f"Could not create Discourse topic for block {discussion_block} "
-                                     f"course {course} "
-                                     f"error: {e}")
+        # Update topics that already exist in Discourse.
+        forum_topics = list(ForumTopic.objects.filter(block=discussion_block,
+                                                      forum_subcategory__in=forum_subcategories,
+                                                      topic_id__isnull=False))
+        for forum_topic in forum_topics:
+            self.update_topic(forum_topic=forum_topic,
+                              title=discussion_block.discussion_topic_title,
+                              html_content=discussion_block.html_content)
+
+        # Topics missing in any subcategory are created by the provisioning task.
+        try:
+            plan_forum_topics(course=course,
+                              forum_subcategories=list(forum_subcategories),
+                              discussion_blocks=[discussion_block])
+        except Exception as e:
+            logger.exception(f"Could not create Discourse topic for block {discussion_block} "
+                             f"course {course} "
+                             f"error: {e}")
+        if get_pending_forum_topics(course).filter(block=discussion_block).exists():
+            schedule_forum_topic_provisioning(course)
 
         return forum_topics
 
@@ -1158,6 +1192,12 @@ class DiscourseForumService(BaseForumService):
         assert forum_topic is not None, "delete_topic() forum_topic must be defined"
 
         topic_id = forum_topic.topic_id
+        if topic_id is None:
+            # Planned but not provisioned yet (see kinesinlms.forum.provisioning),
+            # so there's nothing to delete in Discourse.
+            forum_topic.delete()
+            return True
+
         try:
             response = self.client.delete_topic(topic_id)
             logger.debug(f"Response from deleting remote topic {topic_id}: {response}")
@@ -1173,40 +1213,23 @@ class DiscourseForumService(BaseForumService):
     # ~~~~~~~~~~~~~~~~~~~
     # CALLBACKS
     # ~~~~~~~~~~~~~~~~~~~
-    def read_forum_callback(self, request) -> Dict:
+    def verify_forum_callback(self, request) -> None:
         """
-        Reads an incoming 'callback' request from Discourse and
-        decrypts and parses it. Returns the JSON body of the request.
+        Check the HMAC signature on an incoming 'callback' request from Discourse.
 
-        Note: when a user deletes a post, we get a POST event but the event
-        doesn't say anything about the deletion. The only way to know it was a
-        "delete" is looking in the header for X-Discourse-Event
-
-            X-Discourse-Event: post_destroyed
-
-        For more info see:
-
-            https://meta.discourse.org/t/post-event-webhook-does-not-indicate-post-was-deleted/121356/4
+        Discourse passes the signature in the X-Discourse-Event-Signature header.
 
         Args:
             request:    Callback request from Discourse
 
-        Returns:
-            Dictionary of data received by discourse callback
-
-        JSON body of the request.
-
+        Raises:
+            ForumServiceError if the signature is missing or doesn't match.
         """
-
         try:
             # get data passed in  headers...
             discourse_event_signature = request.headers.get('X-Discourse-Event-Signature')
-            # We need these two props in case there's an error, and we need to log which event failed
+            # We need this prop in case there's an error, and we need to log which event failed
             discourse_event_id = request.headers.get('X-Discourse-Event-Id')
-            # TODO: watch for discourse_event_type values like 'post-destroyed' and
-            # TODO: decide e.g. not to record an event
-            discourse_event_type = request.headers.get('X-Discourse-Event-Type')
-            logger.debug(f"discourse_event_type: {discourse_event_type}")
         except Exception:
             raise ForumServiceError("Could not load a required header. ")
 
@@ -1229,13 +1252,42 @@ class DiscourseForumService(BaseForumService):
             logger.error(f"Error processing discourse_event_id {discourse_event_id}: {error_message}")
             raise ForumServiceError(error_message)
 
-        if computed_signature != discourse_event_signature:
+        if not hmac.compare_digest(computed_signature, discourse_event_signature):
             error_message = f"Computed signature does not match provided signature"
             logger.error(f"Error processing discourse_event_id {discourse_event_id}: {error_message}")
             raise ForumServiceError(error_message)
 
+    def read_forum_callback(self, request) -> Dict:
+        """
+        Reads an incoming 'callback' request from Discourse and
+        decrypts and parses it. Returns the JSON body of the request.
+
+        Note: when a user deletes a post, we get a POST event but the event
+        doesn't say anything about the deletion. The only way to know it was a
+        "delete" is looking in the header for X-Discourse-Event
+
+            X-Discourse-Event: post_destroyed
+
+        For more info see:
+
+            https://meta.discourse.org/t/post-event-webhook-does-not-indicate-post-was-deleted/121356/4
+
+        Args:
+            request:    Callback request from Discourse
+
+        Returns:
+            Dictionary of data received by discourse callback
+
+        JSON body of the request.
+
+        """
+
+        self.verify_forum_callback(request)
+
         # Callback credentials are ok. Let's get json and return it.
+        discourse_event_id = request.headers.get('X-Discourse-Event-Id')
         try:
+            request_body = request.body
             if isinstance(request_body, bytes):
                 request_body = request_body.decode(encoding='utf-8')
             json_data = json.loads(request_body)
@@ -1275,6 +1327,14 @@ class DiscourseForumService(BaseForumService):
         # Read in event props we care about common to both post and topic
         logger.info(f"Discourse event data {data}")
 
+        # Any post to a topic means our cached copy of its posts is out of date.
+        if activity_type == ForumActivityType.POST.name:
+            cached_topic_id = data.get('topic_id', None)
+        else:
+            cached_topic_id = data.get('id', None)
+        if cached_topic_id:
+            schedule_topic_posts_refresh(cached_topic_id, force=True)
+
         # Read in common data
         user_id = data.get('user_id', None)
         if not user_id:
@@ -1379,6 +1439,12 @@ class DiscourseForumService(BaseForumService):
                              f"event: {event_data}")
             # Fail silently in this case. We'll get a note via Sentry
 
+        # Update the student's forum activity counter (and forum milestones).
+        # This runs in the same transaction that marks the callback processed,
+        # so a callback is only ever counted once.
+        if course:
+            record_forum_activity(course=course, student=student, activity_type=activity_type)
+
     # ~~~~~~~~~~~~~~~~~~~
     # USERS
     # ~~~~~~~~~~~~~~~~~~~
@@ -1416,6 +1482,45 @@ class DiscourseForumService(BaseForumService):
         logger.info(f"remove_user_from_group() Removing {username} from Discourse group_id {group_id}")
         return self.client.delete_group_member(groupid=group_id, username=username)
 
+    def add_users_to_group(self, group_id: int, usernames: List[str]):
+        """
+        Add several students to a Discourse group with one call to
+        Discourse's bulk group 'members' endpoint.
+
+        Unlike add_user_to_group(), errors are raised so the caller
+        can retry the batch later.
+
+        Args:
+            group_id:   Discourse group id
+            usernames:  Usernames to add
+        """
+        if not usernames:
+            return
+        logger.info(f"add_users_to_group() Adding {len(usernames)} users to Discourse group_id {group_id}")
+        try:
+            self.client.add_group_members(groupid=group_id, usernames=usernames)
+        except DiscourseClientError as dce:
+            # Discourse returns an error if *every* user is already a member.
+            if "already a member" in str(dce) or "already members" in str(dce):
+                logger.info(f"Tried to add {usernames} to Discourse group_id {group_id} but users "
+                            f"were already in that group.")
+            else:
+                raise
+
+    def remove_users_from_group(self, group_id: int, usernames: List[str]):
+        """
+        Remove several students from a Discourse group with one call to
+        Discourse's bulk group 'members' endpoint.
+
+        Args:
+            group_id:   Discourse group id
+            usernames:  Usernames to remove
+        """
+        if not usernames:
+            return
+        logger.info(f"remove_users_from_group() Removing {len(usernames)} users from Discourse group_id {group_id}")
+        self.client.delete_group_members(groupid=group_id, usernames=usernames)
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     # SSO METHODS
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -1709,23 +1814,22 @@ class DiscourseForumService(BaseForumService):
         # Create Discourse Topics
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Add a topic for each discussion in the course to the
-        # subcategory we just created.
+        # subcategory we just created. There can be many of these, so
+        # we only record the ForumTopics here and let the provisioning
+        # task create them in Discourse.
 
         try:
-            forum_topics: List[ForumTopic] = self.create_topics_for_subcategory(
-                course=course,
-                forum_subcategory=forum_subcategory)
+            num_planned = plan_forum_topics(course=course, forum_subcategories=[forum_subcategory])
         except Exception as e:
             error = f"Could not create topics for Discourse subcategory {forum_subcategory}"
             logger.exception(error)
             raise ForumServiceError(error) from e
+        schedule_forum_topic_provisioning(course)
 
         # All done. Report success!
-        topic_ids = [f"{topic.id}, " for topic in forum_topics]
-        logger.debug(f"Created {len(forum_topics)} ForumTopics in {forum_subcategory} "
+        logger.debug(f"Queued {num_planned} ForumTopics in {forum_subcategory} "
                      f"for new ForumCohortGroup {cohort_forum_group} "
                      f"in course {course}")
-        logger.debug(f"Ids for forum_topics: {topic_ids}")
         logger.debug(f"Done configuring Discourse for ForumCohortGroup : {cohort_forum_group}")
 
     def delete_all_discourse_items_for_course(self, course: Course):
@@ -1766,11 +1870,65 @@ class DiscourseForumService(BaseForumService):
         Returns a dictionary of JSON data about groups
         from Discourse, keyed by group id.
 
+        Like _get_discourse_categories_lookup(), the lookup is loaded once per
+        service instance and shared via the cache.
+
         Returns:
             Dictionary of category data, keyed by category_id.
         """
-        dgroups = self.client.groups()
-        dgroups_lookup = {}
-        for dgroup in dgroups:
-            dgroups_lookup[int(dgroup['id'])] = dgroup
-        return dgroups_lookup
+        if self._groups_lookup is None:
+            cache_key = self._lookup_cache_key("groups")
+            dgroups_lookup = cache.get(cache_key)
+            if dgroups_lookup is None:
+                dgroups = self.client.groups() or []
+                dgroups_lookup = {}
+                for dgroup in dgroups:
+                    dgroups_lookup[int(dgroup['id'])] = dgroup
+                cache.set(cache_key, dgroups_lookup, DISCOURSE_LOOKUP_CACHE_SECONDS)
+            self._groups_lookup = dgroups_lookup
+        return self._groups_lookup
+
+    def clear_discourse_lookups(self):
+        """
+        Forget the category and group lookups, both on this
+        instance and in the shared cache.
+        """
+        self._categories_lookup = None
+        self._groups_lookup = None
+        cache.delete_many([self._lookup_cache_key("categories"), self._lookup_cache_key("groups")])
+
+    def _lookup_cache_key(self, lookup_name: str) -> str:
+        return f"discourse_{self.provider.id}_{lookup_name}_lookup"
+
+    def _remember_discourse_category(self, category: dict):
+        self._update_lookup("categories", category['id'], category)
+
+    def _forget_discourse_category(self, category_id: Optional[int]):
+        if category_id:
+            self._update_lookup("categories", category_id, None)
+
+    def _remember_discourse_group(self, group: dict):
+        self._update_lookup("groups", group['id'], group)
+
+    def _forget_discourse_group(self, group_id: Optional[int]):
+        if group_id:
+            self._update_lookup("groups", group_id, None)
+
+    def _update_lookup(self, lookup_name: str, item_id: int, item: Optional[dict]):
+        """
+        Add (or, if item is None, remove) an item in a lookup after this
+        service has changed it in Discourse. If the lookup hasn't been
+        loaded there's nothing to update, but any shared copy is dropped
+        so other processes don't keep using it.
+        """
+        attr_name = f"_{lookup_name}_lookup"
+        lookup = getattr(self, attr_name)
+        cache_key = self._lookup_cache_key(lookup_name)
+        if lookup is None:
+            cache.delete(cache_key)
+            return
+        if item is None:
+            lookup.pop(int(item_id), None)
+        else:
+            lookup[int(item_id)] = item
+        cache.set(cache_key, lookup, DISCOURSE_LOOKUP_CACHE_SECONDS)
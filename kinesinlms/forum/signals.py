@@ -5,7 +5,8 @@ from django.dispatch import receiver
 
 from kinesinlms.course.models import Cohort, CohortMembership, Enrollment
 from kinesinlms.course.utils import get_student_cohort
-from kinesinlms.forum.models import ForumCategory, CohortForumGroup
+from kinesinlms.forum.membership import queue_group_membership_change
+from kinesinlms.forum.models import ForumCategory, CohortForumGroup, ForumGroupMembershipAction
 from kinesinlms.forum.service.base_service import BaseForumService
 from kinesinlms.forum.utils import get_forum_service
 
@@ -15,9 +16,9 @@ logger = logging.getLogger(__name__)
 # Most of our 'setup' tasks for an external forum happen here: we listen for save signals from things like
 # a course or a cohort, and then we create the corresponding structure in our external forum service.
 
-# The only thing we *don't* handle here is adding a new enrollee to an external forum group.
-# That happens as a celery task (it's a celery task because we don't want it to slow up or
-# error out the user's enrollment process).
+# The only thing we *don't* do here directly is add or remove students from external forum
+# groups. Those changes are queued here and sent by a celery task (so we don't slow up or
+# error out the user's enrollment process). See kinesinlms.forum.membership.
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~
 # ADMIN ACTIONS
@@ -166,36 +167,35 @@ def student_enrollment_changed(sender, instance: Enrollment, created, **kwargs):
     except Exception:
         logger.exception("student_enrollment_changed(): Could not get forum service.")
         return
+    if not service:
+        return
 
     # TODO:
     #  Check if student exists in forum. They should have been added upon registration
     #  but perhaps that process failed and now when we're ready to add them to a forum
     #  group, the forum won't recognize the user.
 
+    # Group membership changes are queued and sent to the forum in bulk
+    # by a celery task. (See kinesinlms.forum.membership)
+    username = student.username
+
     if enrollment.active:
         # STUDENT ENROLLED.
         # Add student to forum 'Course' group for this course
         try:
             course_forum_group_id = course.course_forum_group.group_id
-            username = student.username
-            # TODO: Make this a proper async call...right now we're doing in process...
-            try:
-                service.add_user_to_group(group_id=course_forum_group_id, username=username)
-            except Exception as e:
-                logger.exception(f"add_user_to_forum_group() couldn't add username "
-                                 f"{username} to discussion group via API call. error: {e}")
-                return
+            queue_group_membership_change(group_id=course_forum_group_id,
+                                          username=username,
+                                          action=ForumGroupMembershipAction.ADD)
         except Exception as e:
             logger.exception(f"Error adding student {student} to forum course "
-                             f"group for course {course}")
-            pass
+                             f"group for course {course}: {e}")
 
         # We need to try to add the student to the forum cohort group for this course,
         # even though that also happens when the student is added to a cohort.
         # We have to do this here because the student's enrollment may have been made
         # inactivate and then active again, so the cohort membership is already established.
-        # If they're already added, we'll just assume the add_user_to_forum_group will
-        # throw an exception, with forum saying they already belong.
+        # Adding a student who already belongs to the group is harmless.
         try:
             cohort = get_student_cohort(course=course, student=student)
             cohort_forum_group = getattr(cohort, 'cohort_forum_group', None)
@@ -205,49 +205,40 @@ def student_enrollment_changed(sender, instance: Enrollment, created, **kwargs):
             if cohort_forum_group_id is None:
                 raise Exception(f"CohortForumGroup {cohort_forum_group} group_id "
                                 f"property is not defined.")
-            username = enrollment.student.username
-            service.add_user_to_group(group_id=cohort_forum_group_id,
-                                      username=username)
+            queue_group_membership_change(group_id=cohort_forum_group_id,
+                                          username=username,
+                                          action=ForumGroupMembershipAction.ADD)
         except Exception as e:
-            logger.exception(f"Error adding student {enrollment.student} to forum "
-                             f"cohort group for course {enrollment.course}: {e}")
-            pass
+            logger.exception(f"Error adding student {student} to forum "
+                             f"cohort group for course {course}: {e}")
     else:
         # STUDENT UNENROLLED.
         # Remove student from forum 'Cohort' Group for this course...
         try:
-            cohort = get_student_cohort(course=enrollment.course,
-                                        student=enrollment.student,
+            cohort = get_student_cohort(course=course,
+                                        student=student,
                                         auto_add_to_default=False)
             if cohort:
                 cohort_forum_group_id = cohort.cohort_forum_group.group_id
-                username = enrollment.student.username
-                # TODO: Make this a proper async call...right now we're doing in process...
-                try:
-                    service = get_forum_service()
-                    service.remove_user_from_group(group_id=cohort_forum_group_id, username=username)
-                except Exception as e:
-                    logger.exception("remove_user_from_forum_group() couldn't complete API call.")
-                    return
+                queue_group_membership_change(group_id=cohort_forum_group_id,
+                                              username=username,
+                                              action=ForumGroupMembershipAction.REMOVE)
             else:
                 logger.error(f"student_enrollment_changed(): Student just unenrolled. But could "
                              f"not find student cohort for enrollment {enrollment}")
-        except Exception as e:
-            logger.exception(f"Error removing student {enrollment.student} from forum "
-                             f"cohort group for course {enrollment.course}.")
-            pass
+        except Exception:
+            logger.exception(f"Error removing student {student} from forum "
+                             f"cohort group for course {course}.")
 
         # Remove student from forum 'Course' Group for this course...
         try:
-            course_forum_group_id = enrollment.course.course_forum_group.group_id
-            username = enrollment.student.username
-
-            service.remove_user_from_group(group_id=course_forum_group_id,
-                                           username=username)
-        except Exception as e:
-            logger.exception(f"Error removing student {enrollment.student} from forum "
-                             f"course group for course {enrollment.course}.")
-            pass
+            course_forum_group_id = course.course_forum_group.group_id
+            queue_group_membership_change(group_id=course_forum_group_id,
+                                          username=username,
+                                          action=ForumGroupMembershipAction.REMOVE)
+        except Exception:
+            logger.exception(f"Error removing student {student} from forum "
+                             f"course group for course {course}.")
 
 
 # noinspection PyUnusedLocal
@@ -255,12 +246,11 @@ def student_enrollment_changed(sender, instance: Enrollment, created, **kwargs):
 def cohort_membership_saved(sender, instance: CohortMembership, created, **kwargs):
     """
     When a student joins a cohort, add them to the corresponding forum group.
+    The change is queued and sent to the forum by a celery task, so
+    course enrollment (which probably kicked off this signal) isn't delayed.
 
     It's important we catch all errors here as we don't want to stop any parent
     processes from completing.
-
-    TODO:   We want this to spawn a celery task for this as we don't want a delay in
-            course enrollment (which is probably what kicked off this signal).
     """
     cohort_membership = instance
     if not hasattr(cohort_membership, 'cohort'):
@@ -291,13 +281,11 @@ def cohort_membership_saved(sender, instance: CohortMembership, created, **kwarg
 
     try:
         username = cohort_membership.student.username
-        # TODO:
-        #   Make this a proper async call.
-        #   Right now we're doing in process...
         service = get_forum_service()
         if service:
-            service.add_user_to_group(group_id=cohort_forum_group.group_id,
-                                      username=username)
+            queue_group_membership_change(group_id=cohort_forum_group.group_id,
+                                          username=username,
+                                          action=ForumGroupMembershipAction.ADD)
     except Exception:
         logger.error(f"Could not add student in {cohort_membership} to forum group. ")
 
@@ -312,8 +300,8 @@ def cohort_membership_deleted(sender, instance: CohortMembership, **kwargs):
     At the moment, this method's only task is to remove the student from the
     corresponding forum Cohort group.
 
-    IMPORTANT: We want this to spawn a celery task as we don't want a delay in
-    course unenrollment (which is probably what kicked off this signal).
+    The change is queued and sent to the forum by a celery task, as we don't
+    want a delay in course unenrollment (which is probably what kicked off this signal).
     """
     cohort_membership = instance
     if not hasattr(cohort_membership, 'cohort'):
@@ -358,8 +346,9 @@ def cohort_membership_deleted(sender, instance: CohortMembership, **kwargs):
         username = student.username
         service = get_forum_service()
         if service:
-            service.remove_user_from_group(group_id=forum_group_id,
-                                           username=username)
+            queue_group_membership_change(group_id=forum_group_id,
+                                          username=username,
+                                          action=ForumGroupMembershipAction.REMOVE)
     except Exception:
         logger.exception(f"Could not remove student in {cohort_membership} from forum "
                          f"group ID {forum_group_id}.")
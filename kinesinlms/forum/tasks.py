@@ -0,0 +1,157 @@
+from celery import Task
+from celery.utils.log import get_task_logger
+
+from config import celery_app
+from kinesinlms.course.models import Course
+from kinesinlms.forum.cache import (
+    TOPIC_POSTS_FETCH_TIMEOUT,
+    refresh_topic_posts,
+    release_topic_posts_refresh_lock,
+)
+from kinesinlms.forum.callbacks import (
+    delete_old_forum_callback_events,
+    has_pending_forum_callback_events,
+    process_forum_callback_events,
+    schedule_forum_callback_processing,
+)
+from kinesinlms.forum.membership import (
+    next_group_membership_sync_countdown,
+    schedule_group_membership_sync,
+    sync_group_memberships,
+)
+from kinesinlms.forum.provisioning import (
+    TOPIC_PROVISIONING_RATE_LIMIT_BACKOFF_SECONDS,
+    provision_forum_topics,
+    schedule_forum_topic_provisioning,
+)
+from kinesinlms.forum.utils import get_forum_service
+
+logger = get_task_logger(__name__)
+
+
+@celery_app.task(
+    ignore_result=True,
+    time_limit=60,
+    soft_time_limit=30,
+)
+def refresh_forum_topic_posts_task(topic_id: int) -> None:
+    """
+    Refresh the cached posts for a forum topic. If the forum
+    provider is slow or down, the existing cached posts are left in place.
+
+    Args:
+        topic_id: Forum topic id (as stored in ForumTopic.topic_id)
+    """
+    try:
+        service = get_forum_service()
+        if not service:
+            logger.warning("No forum service configured. Cannot refresh forum topic posts.")
+            return
+        refresh_topic_posts(service, topic_id, timeout=TOPIC_POSTS_FETCH_TIMEOUT * 5)
+    except Exception:
+        logger.exception(f"Could not refresh posts for forum topic {topic_id}")
+    finally:
+        release_topic_posts_refresh_lock(topic_id)
+
+
+@celery_app.task(
+    bind=True,
+    ignore_result=True,
+    time_limit=60 * 10,
+    soft_time_limit=60 * 9,
+)
+def sync_forum_group_memberships_task(self: Task) -> None:
+    """
+    Send queued forum group membership changes (ForumGroupMembershipChange rows)
+    to the forum service in bulk. If changes remain afterwards (because they failed
+    and are waiting to be retried, or there were more than one run handles),
+    queue another run for when the next one is due.
+    """
+    service = get_forum_service()
+    if not service:
+        logger.warning("No forum service configured. Cannot sync forum group memberships.")
+        return
+
+    result = sync_group_memberships(service)
+    logger.info(result.summary())
+
+    # When running eagerly (e.g. in tests) a countdown is ignored,
+    # so don't reschedule or we'd just loop.
+    if self.request.is_eager:
+        return
+    countdown = next_group_membership_sync_countdown()
+    if countdown is not None:
+        schedule_group_membership_sync(countdown=countdown)
+
+
+@celery_app.task(
+    bind=True,
+    ignore_result=True,
+    time_limit=60 * 10,
+    soft_time_limit=60 * 9,
+)
+def process_forum_callbacks_task(self: Task) -> None:
+    """
+    Process webhook callbacks from the forum that were stored by the
+    callback view (ForumCallbackEvent rows). If events remain afterwards
+    (because they failed and will be retried, or there were more than one
+    run handles), queue another run.
+    """
+    service = get_forum_service()
+    if not service:
+        logger.warning("No forum service configured. Cannot process forum callbacks.")
+        return
+
+    result = process_forum_callback_events(service)
+    logger.info(result.summary())
+    delete_old_forum_callback_events()
+
+    # When running eagerly (e.g. in tests) a countdown is ignored,
+    # so don't reschedule or we'd just loop.
+    if self.request.is_eager:
+        return
+    if result.retrying:
+        schedule_forum_callback_processing(countdown=60)
+    elif has_pending_forum_callback_events():
+        schedule_forum_callback_processing()
+
+
+@celery_app.task(
+    bind=True,
+    ignore_result=True,
+    time_limit=60 * 15,
+    soft_time_limit=60 * 14,
+)
+def provision_forum_topics_task(self: Task, course_id: int) -> None:
+    """
+    Create forum topics for a course's ForumTopics that don't have a
+    topic_id yet. Each run creates a limited number of topics; if topics
+    remain afterwards (or the forum rate-limited us) another run is queued
+    to carry on where this one stopped.
+
+    Args:
+        course_id: ID of the course to provision topics for.
+    """
+    service = get_forum_service()
+    if not service:
+        logger.warning("No forum service configured. Cannot provision forum topics.")
+        return
+    try:
+        course = Course.objects.get(id=course_id)
+    except Course.DoesNotExist:
+        logger.warning(f"Course {course_id} does not exist. Cannot provision forum topics.")
+        return
+
+    result = provision_forum_topics(service, course)
+    logger.info(f"Course {course}: {result.summary()}")
+
+    # When running eagerly (e.g. in tests) a countdown is ignored,
+    # so don't reschedule or we'd just loop.
+    if self.request.is_eager:
+        return
+    if result.rate_limited:
+        schedule_forum_topic_provisioning(course, countdown=TOPIC_PROVISIONING_RATE_LIMIT_BACKOFF_SECONDS)
+    elif result.remaining > result.failed and (result.created or result.linked):
+        # More topics than one run handles. Failed topics are left for
+        # the next time provisioning is triggered for this course.
+        schedule_forum_topic_provisioning(course)
@@ -0,0 +1,91 @@
+"""
+Test that forum callbacks keep per-student forum activity counters
+up to date. The DiscourseClient is mocked, so an actual Discourse
+instance is not required.
+"""
+from unittest.mock import MagicMock, patch
+
+from django.contrib.sites.models import Site
+from django.test import TestCase
+
+from kinesinlms.analytics.views import get_forum_milestone
+from kinesinlms.course.constants import MilestoneType
+from kinesinlms.course.models import MilestoneProgress
+from kinesinlms.course.tests.factories import CourseFactory, EnrollmentFactory, MilestoneFactory
+from kinesinlms.forum.activity import get_forum_post_count
+from kinesinlms.forum.models import ForumActivityCounter, ForumSubcategoryType
+from kinesinlms.forum.tests.factories import ForumCategoryFactory, ForumProviderFactory, ForumSubcategoryFactory
+from kinesinlms.forum.utils import get_forum_service
+from kinesinlms.users.tests.factories import UserFactory
+
+SUBCATEGORY_ID = 20
+
+
+class TestForumActivityCounters(TestCase):
+
+    def setUp(self):
+        ForumProviderFactory.create(site=Site.objects.get_current())
+        patcher = patch("kinesinlms.forum.service.discourse_service.DiscourseClient", return_value=MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = get_forum_service()
+
+        self.course = CourseFactory()
+        forum_category = ForumCategoryFactory(course=self.course, category_id=1)
+        ForumSubcategoryFactory(forum_category=forum_category,
+                                type=ForumSubcategoryType.COHORT.name,
+                                subcategory_id=SUBCATEGORY_ID)
+        self.student = UserFactory(username="poster", email="poster@example.com")
+        self.quiet_student = UserFactory(username="quiet", email="quiet@example.com")
+        EnrollmentFactory(student=self.student, course=self.course)
+        EnrollmentFactory(student=self.quiet_student, course=self.course)
+
+    def _post(self, post_id: int):
+        self.service.save_forum_callback({
+            "post": {
+                "id": post_id,
+                "user_id": 5,
+                "username": self.student.username,
+                "topic_id": 300,
+                "topic_slug": "a-topic",
+                "category_id": SUBCATEGORY_ID,
+            }
+        })
+
+    def test_callbacks_increment_counter(self):
+        for post_id in range(3):
+            self._post(post_id)
+
+        counter = ForumActivityCounter.objects.get(course=self.course, student=self.student)
+        self.assertEqual(counter.post_count, 3)
+        self.assertEqual(counter.topic_count, 0)
+        self.assertIsNotNone(counter.last_activity_at)
+        self.assertEqual(get_forum_post_count(self.course, self.quiet_student), 0)
+
+    def test_engagement_milestone_reads_counters(self):
+        self._post(1)
+        self._post(2)
+
+        with self.assertNumQueries(2):
+            forum_milestone = get_forum_milestone(self.course)
+
+        progresses = {progress["student"]: progress for progress in forum_milestone["progresses"]}
+        self.assertEqual(progresses[self.student.id]["count"], 2)
+        self.assertEqual(progresses[self.quiet_student.id]["count"], 0)
+        self.assertFalse(progresses[self.student.id]["achieved"])
+
+    def test_forum_milestone_achieved_from_counter(self):
+        milestone = MilestoneFactory.create(course=self.course,
+                                            slug="forum-posts",
+                                            name="Forum Posts",
+                                            type=MilestoneType.FORUM_POSTS.name,
+                                            count_requirement=2)
+        self._post(1)
+        progress = MilestoneProgress.objects.get(milestone=milestone, student=self.student)
+        self.assertEqual(progress.count, 1)
+        self.assertFalse(progress.achieved)
+
+        self._post(2)
+        progress.refresh_from_db()
+        self.assertEqual(progress.count, 2)
+        self.assertTrue(progress.achieved)
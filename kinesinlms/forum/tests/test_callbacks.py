@@ -0,0 +1,94 @@
+"""
+Test the Discourse callback inbox. The DiscourseClient is mocked,
+so an actual Discourse instance is not required.
+"""
+import hashlib
+import hmac
+import json
+from unittest.mock import MagicMock, patch
+
+from django.contrib.sites.models import Site
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from kinesinlms.forum.callbacks import CALLBACK_MAX_ATTEMPTS, process_forum_callback_events
+from kinesinlms.forum.models import ForumCallbackEvent, ForumCallbackEventStatus
+from kinesinlms.forum.tests.factories import ForumProviderFactory
+from kinesinlms.forum.utils import get_forum_service
+
+WEBHOOK_SECRET = "test-webhook-secret"
+
+
+@override_settings(FORUM_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class TestForumCallbacks(TestCase):
+
+    def setUp(self):
+        ForumProviderFactory.create(site=Site.objects.get_current())
+        patcher = patch("kinesinlms.forum.service.discourse_service.DiscourseClient", return_value=MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.callback_url = reverse("forum:discourse-activity-callback")
+        self.body = json.dumps({"post": {"id": 1, "topic_id": 2, "user_id": 3}}).encode()
+
+    def _post_callback(self, body: bytes, event_id: str = "100", signature: str = None):
+        if signature is None:
+            digest = hmac.new(WEBHOOK_SECRET.encode(), msg=body, digestmod=hashlib.sha256).hexdigest()
+            signature = f"sha256={digest}"
+        return self.client.post(self.callback_url,
+                                data=body,
+                                content_type="application/json",
+                                HTTP_X_DISCOURSE_EVENT_SIGNATURE=signature,
+                                HTTP_X_DISCOURSE_EVENT_ID=event_id,
+                                HTTP_X_DISCOURSE_EVENT_TYPE="post",
+                                HTTP_X_DISCOURSE_EVENT="post_created")
+
+    @patch("kinesinlms.forum.service.discourse_service.DiscourseForumService.save_forum_callback")
+    def test_callback_is_stored_not_processed(self, save_mock):
+        response = self._post_callback(self.body)
+        self.assertEqual(response.status_code, 204)
+        save_mock.assert_not_called()
+
+        event = ForumCallbackEvent.objects.get()
+        self.assertEqual(event.event_id, "100")
+        self.assertEqual(event.event, "post_created")
+        self.assertEqual(event.status, ForumCallbackEventStatus.PENDING.name)
+
+        # A redelivery of the same event is not stored again.
+        self.assertEqual(self._post_callback(self.body).status_code, 204)
+        self.assertEqual(ForumCallbackEvent.objects.count(), 1)
+
+    def test_bad_signature_rejected(self):
+        response = self._post_callback(self.body, signature="sha256=not-the-signature")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ForumCallbackEvent.objects.exists())
+
+    @patch("kinesinlms.forum.service.discourse_service.DiscourseForumService.save_forum_callback")
+    def test_events_processed_once(self, save_mock):
+        self._post_callback(self.body, event_id="100")
+        self._post_callback(self.body, event_id="101")
+        service = get_forum_service()
+
+        result = process_forum_callback_events(service)
+        self.assertEqual(result.processed, 2)
+        self.assertEqual(save_mock.call_count, 2)
+        save_mock.assert_called_with(json.loads(self.body))
+
+        # Running again doesn't process anything twice.
+        process_forum_callback_events(service)
+        self.assertEqual(save_mock.call_count, 2)
+        self.assertEqual(ForumCallbackEvent.objects.filter(status=ForumCallbackEventStatus.PROCESSED.name).count(),
+                         2)
+
+    @patch("kinesinlms.forum.service.discourse_service.DiscourseForumService.save_forum_callback")
+    def test_failing_event_marked_failed(self, save_mock):
+        save_mock.side_effect = Exception("No such user")
+        self._post_callback(self.body)
+        service = get_forum_service()
+
+        for _ in range(CALLBACK_MAX_ATTEMPTS):
+            process_forum_callback_events(service)
+
+        event = ForumCallbackEvent.objects.get()
+        self.assertEqual(event.status, ForumCallbackEventStatus.FAILED.name)
+        self.assertEqual(event.attempts, CALLBACK_MAX_ATTEMPTS)
+        self.assertEqual(event.last_error, "No such user")
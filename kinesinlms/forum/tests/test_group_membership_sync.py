@@ -0,0 +1,109 @@
+"""
+Test queuing and bulk sending of forum group membership changes.
+The DiscourseClient is mocked, so an actual Discourse instance is not required.
+"""
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from kinesinlms.course.tests.factories import CourseFactory, EnrollmentFactory
+from kinesinlms.forum.membership import (
+    MEMBERSHIP_SYNC_MAX_ATTEMPTS,
+    queue_group_membership_change,
+    queue_group_membership_reconciliation,
+    sync_group_memberships,
+)
+from kinesinlms.forum.models import (
+    ForumGroupMembershipAction,
+    ForumGroupMembershipChange,
+    ForumGroupMembershipChangeStatus,
+)
+from kinesinlms.forum.tests.factories import CourseForumGroupFactory, ForumProviderFactory
+from kinesinlms.forum.utils import get_forum_service
+from kinesinlms.users.tests.factories import UserFactory
+
+GROUP_ID = 42
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TestGroupMembershipSync(TestCase):
+    def setUp(self):
+        cache.clear()
+        ForumProviderFactory.create(site=Site.objects.get_current())
+        self.client_mock = MagicMock()
+        patcher = patch("kinesinlms.forum.service.discourse_service.DiscourseClient", return_value=self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = get_forum_service()
+
+    def test_enrollment_queues_change_instead_of_calling_forum(self):
+        course = CourseFactory()
+        CourseForumGroupFactory.create(course=course, group_id=GROUP_ID, name="course-group")
+        student = UserFactory(username="student_a", email="student_a@example.com")
+
+        EnrollmentFactory(student=student, course=course)
+
+        self.client_mock.add_group_member.assert_not_called()
+        self.client_mock.add_group_members.assert_not_called()
+        self.assertTrue(ForumGroupMembershipChange.objects.filter(
+            group_id=GROUP_ID,
+            username="student_a",
+            action=ForumGroupMembershipAction.ADD.name,
+        ).exists())
+
+    def test_changes_coalesced_and_sent_in_bulk(self):
+        for username in ["a", "b", "c"]:
+            queue_group_membership_change(GROUP_ID, username, ForumGroupMembershipAction.ADD)
+        queue_group_membership_change(GROUP_ID, "d", ForumGroupMembershipAction.ADD)
+        queue_group_membership_change(GROUP_ID, "d", ForumGroupMembershipAction.REMOVE)
+
+        result = sync_group_memberships(self.service)
+
+        self.assertEqual(result.sent, 4)
+        self.client_mock.add_group_members.assert_called_once_with(groupid=GROUP_ID, usernames=["a", "b", "c"])
+        self.client_mock.delete_group_members.assert_called_once_with(groupid=GROUP_ID, usernames=["d"])
+        self.assertFalse(ForumGroupMembershipChange.objects.exists())
+
+    def test_failed_batch_backs_off_then_fails(self):
+        self.client_mock.add_group_members.side_effect = Exception("Discourse is down")
+        queue_group_membership_change(GROUP_ID, "a", ForumGroupMembershipAction.ADD)
+
+        result = sync_group_memberships(self.service)
+        self.assertEqual(result.retrying, 1)
+        change = ForumGroupMembershipChange.objects.get()
+        self.assertEqual(change.attempts, 1)
+        self.assertEqual(change.status, ForumGroupMembershipChangeStatus.PENDING.name)
+        self.assertGreater(change.next_attempt_at, timezone.now())
+
+        # Not due yet, so nothing is sent.
+        sync_group_memberships(self.service)
+        self.assertEqual(self.client_mock.add_group_members.call_count, 1)
+
+        change.attempts = MEMBERSHIP_SYNC_MAX_ATTEMPTS - 1
+        change.next_attempt_at = timezone.now() - timedelta(seconds=1)
+        change.save()
+        result = sync_group_memberships(self.service)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(ForumGroupMembershipChange.objects.get().status,
+                         ForumGroupMembershipChangeStatus.FAILED.name)
+
+    def test_reconciliation_is_idempotent(self):
+        course = CourseFactory()
+        CourseForumGroupFactory.create(course=course, group_id=GROUP_ID, name="course-group")
+        active_student = UserFactory(username="active", email="active@example.com")
+        inactive_student = UserFactory(username="inactive", email="inactive@example.com")
+        EnrollmentFactory(student=active_student, course=course)
+        EnrollmentFactory(student=inactive_student, course=course, active=False)
+
+        queue_group_membership_reconciliation(course)
+        queue_group_membership_reconciliation(course)
+
+        course_group_changes = ForumGroupMembershipChange.objects.filter(group_id=GROUP_ID)
+        self.assertEqual(course_group_changes.count(), 2)
+        self.assertEqual(course_group_changes.get(username="active").action, ForumGroupMembershipAction.ADD.name)
+        self.assertEqual(course_group_changes.get(username="inactive").action,
+                         ForumGroupMembershipAction.REMOVE.name)
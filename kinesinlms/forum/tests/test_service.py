@@ -9,13 +9,14 @@ import logging
 from unittest.mock import patch, MagicMock
 
 from django.contrib.sites.models import Site
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 from kinesinlms.course.models import CohortType
 from kinesinlms.course.tests.factories import CourseFactory, CohortFactory
-from kinesinlms.forum.models import ForumSubcategoryType
+from kinesinlms.forum.models import ForumSubcategoryType, ForumTopic
 from kinesinlms.forum.tests.factories import ForumCategoryFactory, CourseForumGroupFactory, \
-    FormCohortGroupFactory, ForumProviderFactory
+    FormCohortGroupFactory, ForumProviderFactory, ForumSubcategoryFactory, ForumTopicFactory
 from kinesinlms.forum.utils import get_forum_service
 from kinesinlms.users.tests.factories import UserFactory
 
@@ -170,3 +171,63 @@ class TestForumService(TestCase):
             self.assertEqual(forum_subcategory.course_forum_group, None)
             self.assertEqual(forum_subcategory.cohort_forum_group, cohort_forum_group)
             self.assertEqual(forum_subcategory.subcategory_id, 14)
+
+    def test_delete_subcategory_for_cohort_with_pending_topics(self):
+        discourse_client_mock = MagicMock()
+
+        def delete_topic(topic_id):
+            if topic_id == 100:
+                raise Exception("Forum error")
+            return {}
+
+        discourse_client_mock.delete_topic.side_effect = delete_topic
+
+        parent_category = ForumCategoryFactory(course=self.course, category_id=1)
+        cohort_forum_group = FormCohortGroupFactory(group_id=20, name="test-2020-co-special")
+        forum_subcategory = ForumSubcategoryFactory(forum_category=parent_category,
+                                                    type=ForumSubcategoryType.COHORT.name,
+                                                    cohort_forum_group=cohort_forum_group,
+                                                    subcategory_id=14)
+        # Planned but not yet provisioned, so it has no topic_id.
+        pending_topic = ForumTopicFactory(forum_subcategory=forum_subcategory, topic_id=None)
+        failing_topic = ForumTopicFactory(forum_subcategory=forum_subcategory, topic_id=100)
+        deleted_topic = ForumTopicFactory(forum_subcategory=forum_subcategory, topic_id=101)
+
+        with patch('kinesinlms.forum.service.discourse_service.DiscourseClient', return_value=discourse_client_mock):
+            service = get_forum_service()
+            deleted_id = service.delete_forum_subcategory_for_cohort_forum_group(cohort_forum_group)
+
+        self.assertEqual(deleted_id, forum_subcategory.id)
+        deleted_topic_ids = [call.args[0] for call in discourse_client_mock.delete_topic.call_args_list]
+        self.assertNotIn(None, deleted_topic_ids)
+        self.assertCountEqual(deleted_topic_ids, [100, 101])
+        discourse_client_mock.delete_category.assert_called_once_with(category_id=14)
+        self.assertFalse(ForumTopic.objects.filter(id__in=[pending_topic.id, deleted_topic.id]).exists())
+        # The topic that couldn't be deleted in the forum is kept, detached from the deleted subcategory.
+        self.assertTrue(ForumTopic.objects.filter(id=failing_topic.id).exists())
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_discourse_lookups_are_memoized(self):
+        cache.clear()
+        discourse_client_mock = MagicMock()
+        discourse_client_mock.groups.return_value = [{"id": 5, "name": "existing"}]
+        discourse_client_mock.create_group.return_value = {
+            "basic_group": {
+                "id": 12,
+                "name": self.course.token
+            }
+        }
+
+        with patch('kinesinlms.forum.service.discourse_service.DiscourseClient', return_value=discourse_client_mock):
+            service = get_forum_service()
+            service.get_or_create_course_forum_group(self.course)
+            default_cohort = self.course.get_default_cohort()
+            service.get_or_create_cohort_forum_group(cohort=default_cohort)
+            # Both group creations used a single fetch of the group list...
+            self.assertEqual(discourse_client_mock.groups.call_count, 1)
+            # ...which was updated with the group created in between.
+            self.assertIn(12, service._get_discourse_groups_lookup())
+
+            # A new service instance uses the shared cached copy.
+            get_forum_service()._get_discourse_groups_lookup()
+            self.assertEqual(discourse_client_mock.groups.call_count, 1)
@@ -0,0 +1,82 @@
+"""
+Test caching of forum topic posts. The DiscourseClient is mocked,
+so an actual Discourse instance is not required.
+"""
+from unittest.mock import MagicMock, patch
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from kinesinlms.forum.cache import get_cached_topic_posts, topic_posts_cache_key
+from kinesinlms.forum.service.base_service import ForumAPIUnsuccessful
+from kinesinlms.forum.tests.factories import ForumProviderFactory
+from kinesinlms.forum.utils import get_forum_service
+
+TOPIC_ID = 1234
+
+
+def _topic_posts_response(*post_ids):
+    posts = [
+        {"id": post_id, "avatar_template": "/user/{size}.png", "cooked": f"<p>{post_id}</p>"}
+        for post_id in post_ids
+    ]
+    return {"post_stream": {"posts": posts}}
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TestTopicPostsCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        ForumProviderFactory.create(site=Site.objects.get_current())
+        self.client_mock = MagicMock()
+        self.client_mock.timeout = None
+        patcher = patch("kinesinlms.forum.service.discourse_service.DiscourseClient", return_value=self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = get_forum_service()
+
+    def test_fresh_entry_served_from_cache(self):
+        self.client_mock.topic_posts.return_value = _topic_posts_response(1, 2)
+
+        posts = get_cached_topic_posts(self.service, TOPIC_ID)
+        self.assertEqual([post["id"] for post in posts], [2])
+        self.assertEqual(posts[0]["avatar_template"], f"{self.service.provider.forum_url.rstrip('/')}/user/90.png")
+
+        get_cached_topic_posts(self.service, TOPIC_ID)
+        self.assertEqual(self.client_mock.topic_posts.call_count, 1)
+
+    def test_stale_entry_served_while_refreshing(self):
+        self.client_mock.topic_posts.return_value = _topic_posts_response(1, 2)
+        get_cached_topic_posts(self.service, TOPIC_ID)
+
+        entry = cache.get(topic_posts_cache_key(TOPIC_ID))
+        entry["fetched_at"] = 0
+        cache.set(topic_posts_cache_key(TOPIC_ID), entry)
+        self.client_mock.topic_posts.return_value = _topic_posts_response(1, 2, 3)
+
+        with patch("kinesinlms.forum.tasks.refresh_forum_topic_posts_task.delay") as delay_mock:
+            posts = get_cached_topic_posts(self.service, TOPIC_ID)
+            # Stale posts are returned straight away...
+            self.assertEqual([post["id"] for post in posts], [2])
+            # ...and only one refresh is queued.
+            get_cached_topic_posts(self.service, TOPIC_ID)
+            delay_mock.assert_called_once_with(TOPIC_ID)
+
+    def test_failed_refresh_keeps_cached_posts(self):
+        self.client_mock.topic_posts.return_value = _topic_posts_response(1, 2)
+        get_cached_topic_posts(self.service, TOPIC_ID)
+        entry = cache.get(topic_posts_cache_key(TOPIC_ID))
+        entry["fetched_at"] = 0
+        cache.set(topic_posts_cache_key(TOPIC_ID), entry)
+
+        self.client_mock.topic_posts.side_effect = TimeoutError("Discourse is slow")
+        # Celery runs eagerly in tests, so the refresh runs (and fails) here.
+        posts = get_cached_topic_posts(self.service, TOPIC_ID)
+        self.assertEqual([post["id"] for post in posts], [2])
+        self.assertEqual(cache.get(topic_posts_cache_key(TOPIC_ID))["posts"], posts)
+
+    def test_cold_cache_upstream_failure(self):
+        self.client_mock.topic_posts.side_effect = TimeoutError("Discourse is slow")
+        with self.assertRaises(ForumAPIUnsuccessful):
+            get_cached_topic_posts(self.service, TOPIC_ID)
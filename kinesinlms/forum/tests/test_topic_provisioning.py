@@ -0,0 +1,136 @@
+"""
+Test bulk provisioning of forum topics. The DiscourseClient is mocked,
+so an actual Discourse instance is not required.
+"""
+import itertools
+from unittest.mock import MagicMock, patch
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from pydiscourse.exceptions import DiscourseRateLimitedError
+
+from kinesinlms.course.models import CourseUnit
+from kinesinlms.course.tests.factories import CourseFactory
+from kinesinlms.forum.models import ForumSubcategoryType, ForumTopic
+from kinesinlms.forum.provisioning import (
+    get_forum_topic_provisioning_progress,
+    plan_forum_topics,
+    provision_forum_topics,
+)
+from kinesinlms.forum.tests.factories import ForumCategoryFactory, ForumProviderFactory, ForumSubcategoryFactory
+from kinesinlms.forum.utils import get_forum_service
+from kinesinlms.learning_library.constants import BlockType
+from kinesinlms.learning_library.models import UnitBlock
+from kinesinlms.learning_library.tests.factories import BlockFactory
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TestForumTopicProvisioning(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ForumProviderFactory.create(site=Site.objects.get_current())
+        self.client_mock = MagicMock()
+        self.client_mock.category_topics.return_value = {"topic_list": {"topics": []}}
+        topic_ids = itertools.count(1000)
+        self.client_mock.create_post.side_effect = lambda **kwargs: {"topic_id": next(topic_ids)}
+        patcher = patch("kinesinlms.forum.service.discourse_service.DiscourseClient", return_value=self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = get_forum_service()
+
+        self.course = CourseFactory()
+        course_unit = CourseUnit.objects.filter(course=self.course).first()
+        self.discussion_blocks = []
+        for index in range(3):
+            block = BlockFactory(type=BlockType.FORUM_TOPIC.name, display_name=f"Discussion {index}")
+            UnitBlock.objects.create(course_unit=course_unit, block=block, block_order=10 + index)
+            self.discussion_blocks.append(block)
+
+        forum_category = ForumCategoryFactory(course=self.course, category_id=1)
+        for subcategory_id in [10, 11]:
+            ForumSubcategoryFactory(forum_category=forum_category,
+                                    type=ForumSubcategoryType.COHORT.name,
+                                    subcategory_id=subcategory_id)
+
+    def test_plan_is_idempotent(self):
+        self.assertEqual(plan_forum_topics(self.course), 6)
+        self.assertEqual(plan_forum_topics(self.course), 0)
+        self.assertEqual(get_forum_topic_provisioning_progress(self.course), (0, 6))
+        self.client_mock.create_post.assert_not_called()
+
+    def test_provisioning_resumes_where_it_stopped(self):
+        plan_forum_topics(self.course)
+
+        result = provision_forum_topics(self.service, self.course, max_topics=4, concurrency=2)
+        self.assertEqual(result.created, 4)
+        self.assertEqual(result.remaining, 2)
+
+        # One topic already exists in the forum, so it's linked rather than created again.
+        existing_title = self.discussion_blocks[2].discussion_topic_title
+        self.client_mock.category_topics.return_value = {
+            "topic_list": {"topics": [{"id": 500, "title": existing_title, "slug": "existing"}]}
+        }
+        result = provision_forum_topics(self.service, self.course)
+        self.assertEqual(result.created + result.linked, 2)
+        self.assertEqual(result.remaining, 0)
+
+        self.assertEqual(self.client_mock.create_post.call_count, 4 + result.created)
+        self.assertEqual(get_forum_topic_provisioning_progress(self.course), (6, 6))
+        topic_ids = list(ForumTopic.objects.values_list("topic_id", flat=True))
+        self.assertEqual(len(set(topic_ids)), 6)
+
+    def test_rate_limited_provisioning_stops(self):
+        plan_forum_topics(self.course)
+        self.client_mock.create_post.side_effect = DiscourseRateLimitedError("Too many requests")
+
+        result = provision_forum_topics(self.service, self.course, concurrency=1)
+
+        self.assertTrue(result.rate_limited)
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.remaining, 6)
+        self.assertEqual(self.client_mock.create_post.call_count, 1)
+
+    def test_existing_topics_on_later_pages_are_linked(self):
+        plan_forum_topics(self.course)
+        existing_title = self.discussion_blocks[2].discussion_topic_title
+
+        def category_topics(subcategory_id, page=0):
+            if page == 0:
+                topics = [{"id": 100 + index, "title": f"Other topic {index}"} for index in range(30)]
+                return {"topic_list": {"topics": topics, "more_topics_url": f"/c/{subcategory_id}/l/latest?page=1"}}
+            return {"topic_list": {"topics": [{"id": 500 + subcategory_id, "title": existing_title}]}}
+
+        self.client_mock.category_topics.side_effect = category_topics
+
+        result = provision_forum_topics(self.service, self.course)
+
+        self.assertEqual(result.linked, 2)
+        self.assertEqual(result.created, 4)
+        self.assertEqual(self.client_mock.create_post.call_count, 4)
+
+    def test_listing_error_skips_only_that_subcategory(self):
+        plan_forum_topics(self.course)
+
+        def category_topics(subcategory_id, **kwargs):
+            if subcategory_id == 10:
+                raise DiscourseRateLimitedError("Too many requests")
+            return {"topic_list": {"topics": []}}
+
+        self.client_mock.category_topics.side_effect = category_topics
+        result = provision_forum_topics(self.service, self.course)
+        self.assertTrue(result.rate_limited)
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.remaining, 6)
+
+        def category_topics_with_error(subcategory_id, **kwargs):
+            if subcategory_id == 10:
+                raise Exception("Forum error")
+            return {"topic_list": {"topics": []}}
+
+        self.client_mock.category_topics.side_effect = category_topics_with_error
+        result = provision_forum_topics(self.service, self.course)
+        self.assertEqual(result.failed, 3)
+        self.assertEqual(result.created, 3)
+        self.assertEqual(result.remaining, 3)
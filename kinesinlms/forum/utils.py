@@ -2,9 +2,9 @@ import logging
 from typing import Optional
 
 from django.contrib.auth import get_user_model
-from django.contrib.sites.models import Site
 
 from kinesinlms.core.constants import ForumProviderType
+from kinesinlms.core.site_cache import get_site_provider
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +29,5 @@ def get_forum_service() -> (
 
 
 def get_forum_provider() -> Optional["kinesinlms.forum.model.ForumProvider"]:
-    site = Site.objects.get_current()
-    forum_provider = getattr(site, "forum_provider", None)
+    forum_provider = get_site_provider("forum_provider")
     return forum_provider
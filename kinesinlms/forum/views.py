@@ -13,6 +13,7 @@ from rest_framework.exceptions import APIException
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from kinesinlms.forum.callbacks import store_forum_callback
 from kinesinlms.forum.models import ForumTopic
 from kinesinlms.forum.utils import get_forum_provider, get_forum_service
 
@@ -112,7 +113,8 @@ class TopicViewSet(ViewSet):
 def activity_callback(request):
     """
     Handle a callback from Discourse. Currently, we're just listening
-    for posting activity.
+    for posting activity. The event is verified and stored here,
+    then processed later by process_forum_callbacks_task.
 
     Secret will be passed as X-Discourse-Event-Signature in headers.
 
@@ -124,20 +126,22 @@ def activity_callback(request):
 
     try:
         service = get_forum_service()
-        json_data = service.read_forum_callback(request)
+        service.verify_forum_callback(request)
     except Exception:
-        logger.exception("activity_callback(): read_forum_callback() raised Exception")
+        logger.exception("activity_callback(): verify_forum_callback() raised Exception")
         return JsonResponse({'error': 'Could not process event '}, status=400)
 
-    if not json_data:
-        logger.exception("activity_callback() : received callback from Discourse but response body was empty")
+    if not request.body:
+        logger.error("activity_callback() : received callback from Discourse but response body was empty")
         return JsonResponse({'error': 'Could not process event : empty request body'}, status=400)
 
+    # Just store the event here. It's processed by a celery task
+    # so that Discourse isn't kept waiting. (See kinesinlms.forum.callbacks)
     try:
-        service.save_forum_callback(json_data)
+        store_forum_callback(request)
     except Exception as e:
-        logger.exception(f"activity_callback(): save_forum_callback() raised Exception {e}")
-        return JsonResponse({'error': f'Could not process event : {e}'}, status=400)
+        logger.exception(f"activity_callback(): store_forum_callback() raised Exception {e}")
+        return JsonResponse({'error': 'Could not store event'}, status=500)
 
     return HttpResponse(status=204)
 
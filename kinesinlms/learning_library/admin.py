@@ -9,6 +9,7 @@ from kinesinlms.learning_library.models import (
     LearningObjective,
     LibraryItem,
     Resource,
+    ResourceBlob,
     UnitBlock,
 )
 from kinesinlms.sits.models import SimpleInteractiveTool
@@ -120,4 +121,21 @@ class ResourceAdmin(admin.ModelAdmin):
         "file_name",
         "url",
         "description",
+        "content_hash",
     )
+    raw_id_fields = ("blob",)
+
+
+@admin.register(ResourceBlob)
+class ResourceBlobAdmin(admin.ModelAdmin):
+    model = ResourceBlob
+    search_fields = ("sha256",)
+    list_display = (
+        "id",
+        "sha256",
+        "blob_file",
+        "size",
+        "ref_count",
+    )
+    readonly_fields = ("sha256", "blob_file", "size", "ref_count")
+
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from kinesinlms.learning_library.models import Resource, ResourceBlob
+from kinesinlms.learning_library.service import dedupe_resource
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing Resources onto shared, content-addressed file blobs "
+        "so identical files are only stored once. Also repairs blob ref counts."
+    )
+
+    def __init__(self, stdout=None, stderr=None, no_color=False):
+        super().__init__(stdout=stdout, stderr=stderr, no_color=no_color)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Moving resources onto shared file blobs...")
+
+        resources = Resource.objects.filter(blob__isnull=True).exclude(resource_file="")
+        num_deduped = 0
+        for resource in resources.iterator():
+            blob = dedupe_resource(resource)
+            if blob:
+                num_deduped += 1
+                self.stdout.write(f"  - resource {resource} -> blob {blob.sha256[:12]}")
+            else:
+                self.stdout.write(self.style.WARNING(f"  - could not read file for resource {resource}"))
+
+        self.stdout.write("Checking blob reference counts...")
+        blobs = ResourceBlob.objects.annotate(num_resources=Count("resources"))
+        for blob in blobs:
+            if blob.ref_count != blob.num_resources:
+                self.stdout.write(f"  - fixing ref_count for {blob} to {blob.num_resources}")
+                ResourceBlob.objects.filter(id=blob.id).update(ref_count=blob.num_resources)
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Moved {num_deduped} resources onto shared blobs."))
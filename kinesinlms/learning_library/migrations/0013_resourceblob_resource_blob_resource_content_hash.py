@@ -0,0 +1,61 @@
+# Generated by Django 5.0.9 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("learning_library", "0012_alter_resource_slug"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResourceBlob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "sha256",
+                    models.CharField(help_text="SHA-256 hex digest of the file contents.", max_length=64, unique=True),
+                ),
+                ("blob_file", models.FileField(max_length=300, upload_to="block_resources/blobs")),
+                ("size", models.PositiveBigIntegerField(default=0, help_text="Size of the file in bytes.")),
+                (
+                    "ref_count",
+                    models.PositiveIntegerField(default=0, help_text="Number of Resource instances using this blob."),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.AlterField(
+            model_name="resource",
+            name="resource_file",
+            field=models.FileField(max_length=300, upload_to="block_resources"),
+        ),
+        migrations.AddField(
+            model_name="resource",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="resources",
+                to="learning_library.resourceblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="resource",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="SHA-256 hex digest of the resource file contents.",
+                max_length=64,
+                null=True,
+            ),
+        ),
+    ]
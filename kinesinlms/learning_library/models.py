@@ -8,7 +8,7 @@ from django.conf import settings
 from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, models
+from django.db import IntegrityError, models, transaction
 from django.db.models import JSONField
 from django.utils.translation import gettext_lazy as _
 from django_react_templatetags.mixins import RepresentationMixin
@@ -40,6 +40,46 @@ from kinesinlms.sits.constants import SimpleInteractiveToolType
 logger = logging.getLogger(__name__)
 
 
+class ResourceBlob(Trackable):
+    """
+    The actual file contents behind one or more Resources, stored once
+    in media storage and addressed by the SHA-256 hash of its contents.
+
+    Course runs cloned from a template (and course imports in general)
+    tend to bring in the same images and PDFs over and over. Rather than
+    writing a new copy of the file for every Resource, Resources with
+    identical contents point at the same ResourceBlob. The ref_count
+    tracks how many Resources use the blob, so we know when it's safe
+    to remove the file from storage.
+
+    Don't create or update these directly. Use the helpers in
+    kinesinlms.learning_library.service so ref_count stays correct.
+    """
+
+    sha256 = models.CharField(
+        max_length=64,
+        unique=True,
+        null=False,
+        blank=False,
+        help_text=_("SHA-256 hex digest of the file contents."),
+    )
+
+    blob_file = models.FileField(upload_to="block_resources/blobs", max_length=300)
+
+    size = models.PositiveBigIntegerField(
+        default=0,
+        help_text=_("Size of the file in bytes."),
+    )
+
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Number of Resource instances using this blob."),
+    )
+
+    def __str__(self):
+        return f"ResourceBlob [{self.id}] : {self.sha256[:12]} (refs: {self.ref_count})"
+
+
 class Resource(Trackable):
     """
     A global, immutable resource that can be used by one or more blocks.
@@ -83,7 +123,27 @@ class Resource(Trackable):
         blank=False,
     )
 
-    resource_file = models.FileField(upload_to="block_resources")
+    resource_file = models.FileField(upload_to="block_resources", max_length=300)
+
+    # The shared, content-addressed file behind this resource. When set,
+    # resource_file points at the same storage path as blob.blob_file.
+    # Older resources that haven't been through dedupe_resources
+    # yet will have no blob and keep their own copy of the file.
+    blob = models.ForeignKey(
+        ResourceBlob,
+        null=True,
+        blank=True,
+        related_name="resources",
+        on_delete=models.PROTECT,
+    )
+
+    content_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text=_("SHA-256 hex digest of the resource file contents."),
+    )
 
     name = models.CharField(
         max_length=400,
@@ -134,6 +194,29 @@ class Resource(Trackable):
                 # Use uuid for resources without files
                 self.slug = f"resource-{self.uuid}"
 
+    def save(self, *args, **kwargs):
+        """
+        Route newly assigned (uncommitted) files through the content-addressed
+        blob store, so identical files are only written to storage once.
+        """
+        if not self.resource_file or self.resource_file._committed:
+            super().save(*args, **kwargs)
+            return
+
+        from kinesinlms.learning_library.service import attach_resource_blob, release_resource_blob
+
+        previous_blob_id = self.blob_id
+        with transaction.atomic():
+            attach_resource_blob(
+                resource=self,
+                content=self.resource_file.file,
+                file_name=os.path.basename(self.resource_file.name),
+                save=False,
+            )
+            super().save(*args, **kwargs)
+            if previous_blob_id and previous_blob_id != self.blob_id:
+                release_resource_blob(previous_blob_id)
+
     @property
     def info(self) -> Dict:
         return {
@@ -0,0 +1,240 @@
+import hashlib
+import logging
+import os
+from typing import IO, Optional, Tuple, Union
+
+from django.core.files.base import ContentFile, File
+from django.db import transaction
+from django.db.models import F
+
+from kinesinlms.learning_library.models import Block, BlockResource, Resource, ResourceBlob
+
+logger = logging.getLogger(__name__)
+
+# Read files in chunks when hashing so large PDFs and notebooks
+# don't have to be held in memory twice.
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# HELPER METHODS
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+
+def compute_content_hash(content: Union[bytes, IO]) -> str:
+    """
+    Compute the SHA-256 hex digest of some file content.
+
+    Args:
+        content:    Raw bytes or a file-like object. If a file-like object
+                    is passed in, it's rewound to the start after hashing.
+
+    Returns:
+        A 64 character hex digest.
+    """
+    hasher = hashlib.sha256()
+    if isinstance(content, bytes):
+        hasher.update(content)
+        return hasher.hexdigest()
+
+    if hasattr(content, "seek"):
+        content.seek(0)
+    if hasattr(content, "chunks"):
+        for chunk in content.chunks(chunk_size=HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    else:
+        for chunk in iter(lambda: content.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+def blob_file_name(sha256: str, file_name: str) -> str:
+    """
+    Build the storage name for a blob. We keep the original file name
+    as the last path part so downloads and exports still get a sensible
+    file name, e.g. 'ab/ab12...ef/some-figure.png'
+    """
+    file_name = os.path.basename(file_name) or sha256
+    return f"{sha256[:2]}/{sha256}/{file_name}"
+
+
+@transaction.atomic
+def get_or_create_blob(content: Union[bytes, IO], file_name: str) -> Tuple[ResourceBlob, bool]:
+    """
+    Get the ResourceBlob for this content, writing the file to storage
+    only if we haven't seen this content before (or if the blob's file
+    has gone missing from storage).
+
+    Note that this does not change ref_count. That's handled when
+    a Resource is attached to the blob.
+
+    Args:
+        content:    Raw bytes or a file-like object.
+        file_name:  Original file name of the content.
+
+    Returns:
+        A tuple of (ResourceBlob, created)
+    """
+    sha256 = compute_content_hash(content)
+    blob, created = ResourceBlob.objects.select_for_update().get_or_create(sha256=sha256)
+
+    file_missing = not blob.blob_file or not blob.blob_file.storage.exists(blob.blob_file.name)
+    if created or file_missing:
+        if isinstance(content, bytes):
+            django_file = ContentFile(content)
+        elif isinstance(content, File):
+            django_file = content
+        else:
+            django_file = File(content)
+        blob.size = django_file.size or 0
+        blob.blob_file.save(blob_file_name(sha256, file_name), django_file, save=False)
+        blob.save()
+        if created:
+            logger.info(f"Stored new resource blob {blob}")
+        else:
+            logger.warning(f"Replaced missing file for resource blob {blob}")
+    return blob, created
+
+
+@transaction.atomic
+def attach_resource_blob(
+    resource: Resource,
+    content: Union[bytes, IO],
+    file_name: str,
+    save: bool = True,
+) -> ResourceBlob:
+    """
+    Point a Resource at the shared blob for some content, creating
+    the blob if this content hasn't been stored yet.
+
+    If save is True and the resource was using a different blob, that
+    blob is released once the resource is saved. If save is False, the
+    caller is responsible for saving the resource and then calling
+    release_resource_blob() on the previous blob id.
+
+    Args:
+        resource:   The Resource to update.
+        content:    Raw bytes or a file-like object with the file contents.
+        file_name:  Original file name of the content.
+        save:       Save the Resource after updating its file fields.
+
+    Returns:
+        The ResourceBlob the resource now uses.
+    """
+    blob, created = get_or_create_blob(content=content, file_name=file_name)
+
+    previous_blob_id = resource.blob_id
+    if previous_blob_id != blob.id:
+        ResourceBlob.objects.filter(id=blob.id).update(ref_count=F("ref_count") + 1)
+
+    resource.blob = blob
+    resource.content_hash = blob.sha256
+    # Assigning the name (rather than a File) gives us a committed field file,
+    # so saving the resource won't write a second copy to storage.
+    resource.resource_file = blob.blob_file.name
+    if save:
+        resource.save()
+        if previous_blob_id and previous_blob_id != blob.id:
+            release_resource_blob(previous_blob_id)
+    return blob
+
+
+@transaction.atomic
+def release_resource_blob(blob_id: Optional[int]) -> None:
+    """
+    Drop one reference to a blob. When nothing uses the blob any more,
+    delete the file from storage and remove the blob.
+    """
+    if not blob_id:
+        return
+    try:
+        blob = ResourceBlob.objects.select_for_update().get(id=blob_id)
+    except ResourceBlob.DoesNotExist:
+        logger.warning(f"release_resource_blob() blob {blob_id} does not exist")
+        return
+
+    if blob.ref_count > 1:
+        ResourceBlob.objects.filter(id=blob.id).update(ref_count=F("ref_count") - 1)
+        return
+
+    if Resource.objects.filter(blob_id=blob.id).exists():
+        # ref_count has drifted. Trust the database rather than delete a file in use.
+        ref_count = Resource.objects.filter(blob_id=blob.id).count()
+        logger.warning(f"ResourceBlob {blob} ref_count was out of sync. Resetting to {ref_count}")
+        ResourceBlob.objects.filter(id=blob.id).update(ref_count=ref_count)
+        return
+
+    file_name = blob.blob_file.name
+    storage = blob.blob_file.storage
+    blob.delete()
+    if file_name:
+        # Wait until the transaction commits before removing the
+        # file, so a rollback doesn't leave a blob without its file.
+        transaction.on_commit(lambda: _delete_blob_file(storage, file_name))
+
+
+def _delete_blob_file(storage, file_name: str) -> None:
+    try:
+        storage.delete(file_name)
+        logger.info(f"Deleted unused resource blob file {file_name}")
+    except Exception:
+        logger.exception(f"Could not delete unused resource blob file {file_name}")
+
+
+def link_resource_to_block(block: Block, resource: Resource) -> Tuple[BlockResource, Resource]:
+    """
+    Link a resource to a block. If the block already has a resource of the
+    same type with identical file contents, reuse that link rather than
+    adding a second copy of the same file to the block.
+
+    Returns:
+        A tuple of (BlockResource, Resource) where Resource is the resource
+        actually linked to the block (which may not be the one passed in).
+    """
+    if resource.content_hash:
+        existing = (
+            BlockResource.objects.filter(
+                block=block,
+                resource__content_hash=resource.content_hash,
+                resource__type=resource.type,
+            )
+            .exclude(resource=resource)
+            .select_related("resource")
+            .first()
+        )
+        if existing:
+            logger.info(f"Block {block} already has resource with same contents as {resource}. Reusing {existing}.")
+            return existing, existing.resource
+
+    block_resource, created = BlockResource.objects.get_or_create(block=block, resource=resource)
+    return block_resource, resource
+
+
+def dedupe_resource(resource: Resource) -> Optional[ResourceBlob]:
+    """
+    Move an existing Resource that still has its own file copy onto
+    a shared blob. The old file is removed from storage once the
+    resource points at the blob, unless it *is* the blob file.
+
+    Returns:
+        The ResourceBlob now used by the resource, or None if the
+        resource has no file or its file couldn't be read.
+    """
+    if resource.blob_id or not resource.resource_file:
+        return resource.blob
+
+    old_name = resource.resource_file.name
+    storage = resource.resource_file.storage
+    try:
+        with storage.open(old_name, "rb") as f:
+            content = f.read()
+    except Exception:
+        logger.exception(f"dedupe_resource() could not read file {old_name} for resource {resource}")
+        return None
+
+    blob = attach_resource_blob(resource=resource, content=content, file_name=old_name)
+    if old_name != blob.blob_file.name:
+        transaction.on_commit(lambda: _delete_blob_file(storage, old_name))
+    return blob
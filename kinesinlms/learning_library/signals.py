@@ -1,11 +1,12 @@
 import logging
 
 from django.contrib.postgres.search import SearchVector
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from kinesinlms.learning_library.constants import BlockType
-from kinesinlms.learning_library.models import Block
+from kinesinlms.learning_library.models import Block, Resource
+from kinesinlms.learning_library.service import release_resource_blob
 
 logger = logging.getLogger(__name__)
 
@@ -37,3 +38,19 @@ def handle_block_saved(sender, instance: Block, **kwargs):  # noqa: F841
     except Exception as e:
         logger.exception(f"handle_block_saved() post save signal: Could not update search vector "
                          f"fields for block {instance} error: {e}")
+
+
+@receiver(post_delete, sender=Resource)
+def handle_resource_deleted(sender, instance: Resource, **kwargs):  # noqa: F841
+    """
+    Release the Resource's shared file blob when the Resource is deleted.
+    The blob (and its file in storage) is only removed once no other
+    Resource uses it.
+    """
+    if not instance.blob_id:
+        return
+    try:
+        release_resource_blob(instance.blob_id)
+    except Exception as e:
+        logger.exception(f"handle_resource_deleted() post delete signal: Could not release "
+                         f"blob for resource {instance} error: {e}")
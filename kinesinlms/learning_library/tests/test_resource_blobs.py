@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from kinesinlms.learning_library.constants import ResourceType
+from kinesinlms.learning_library.models import BlockResource, Resource, ResourceBlob
+from kinesinlms.learning_library.service import attach_resource_blob, compute_content_hash, link_resource_to_block
+from kinesinlms.learning_library.tests.factories import BlockFactory
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TestResourceBlobs(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def _create_resource(self, content: bytes, file_name: str = "figure.png") -> Resource:
+        return Resource.objects.create(
+            type=ResourceType.IMAGE.name,
+            resource_file=SimpleUploadedFile(file_name, content, content_type="image/png"),
+        )
+
+    def test_identical_files_share_blob(self):
+        first = self._create_resource(b"some image bytes", "figure.png")
+        second = self._create_resource(b"some image bytes", "figure-copy.png")
+
+        self.assertIsNotNone(first.blob)
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(first.resource_file.name, second.resource_file.name)
+        self.assertEqual(first.content_hash, compute_content_hash(b"some image bytes"))
+        self.assertEqual(ResourceBlob.objects.count(), 1)
+        self.assertEqual(ResourceBlob.objects.get().ref_count, 2)
+
+    def test_different_files_get_different_blobs(self):
+        first = self._create_resource(b"image one")
+        second = self._create_resource(b"image two")
+        self.assertNotEqual(first.blob_id, second.blob_id)
+        self.assertEqual(ResourceBlob.objects.count(), 2)
+
+    def test_blob_removed_when_last_resource_deleted(self):
+        first = self._create_resource(b"shared bytes")
+        second = self._create_resource(b"shared bytes")
+        blob = first.blob
+        storage = blob.blob_file.storage
+        blob_file_name = blob.blob_file.name
+
+        first.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(storage.exists(blob_file_name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(ResourceBlob.objects.filter(id=blob.id).exists())
+        self.assertFalse(storage.exists(blob_file_name))
+
+    def test_attach_releases_previous_blob(self):
+        resource = self._create_resource(b"version one")
+        old_blob_id = resource.blob_id
+
+        attach_resource_blob(resource=resource, content=b"version two", file_name="figure.png")
+
+        resource.refresh_from_db()
+        self.assertNotEqual(resource.blob_id, old_blob_id)
+        self.assertFalse(ResourceBlob.objects.filter(id=old_blob_id).exists())
+
+    def test_link_reuses_existing_block_resource_with_same_contents(self):
+        block = BlockFactory()
+        first = self._create_resource(b"same diagram")
+        second = self._create_resource(b"same diagram")
+
+        block_resource, linked = link_resource_to_block(block=block, resource=first)
+        self.assertEqual(linked, first)
+
+        block_resource_2, linked_2 = link_resource_to_block(block=block, resource=second)
+        self.assertEqual(linked_2, first)
+        self.assertEqual(block_resource, block_resource_2)
+        self.assertEqual(BlockResource.objects.filter(block=block).count(), 1)
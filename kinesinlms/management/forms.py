@@ -9,9 +9,10 @@ from django.forms import Form, ModelChoiceField, CharField, Textarea, BooleanFie
 from django.utils.translation import gettext as _
 
 from kinesinlms.badges.models import BadgeClass
-from kinesinlms.catalog.service import do_enrollment, do_unenrollment
+from kinesinlms.catalog.bulk_enrollment import bulk_enroll
+from kinesinlms.catalog.service import do_unenrollment
 from kinesinlms.core.models import SiteProfile
-from kinesinlms.course.models import Course, Enrollment, Cohort, CohortMembership
+from kinesinlms.course.models import Course, Enrollment, Cohort
 from kinesinlms.course.utils import user_is_enrolled
 from kinesinlms.management.models import ManualEnrollment, ManualUnenrollment
 
@@ -213,42 +214,12 @@ class ManualEnrollmentForm(Form):
                                                             user=user,
                                                             added_student_ids=[],
                                                             skipped_student_ids=[])
-        errors = []
-        for student_username in student_usernames:
-
-            if "@" in student_username:
-                try:
-                    student = User.objects.get(email__iexact=student_username)
-                except User.DoesNotExist:
-                    errors.append(f"Cannot find user with email: {student_username}")
-                    continue
-            else:
-                try:
-                    student = User.objects.get(username=student_username)
-                except User.DoesNotExist:
-                    errors.append(f"Cannot find user with username: {student_username}")
-                    continue
-
-            if user_is_enrolled(user=student, course=course):
-                cohort_membership = CohortMembership.objects.get(cohort__course=course, student=student)
-                if cohort_membership.cohort != cohort:
-                    # Need to move already enrolled user to new cohort
-                    manual_enrollment.moved_from_cohort_ids.append(student.id)
-                    cohort_membership.cohort = cohort
-                    cohort_membership.save()
-                else:
-                    manual_enrollment.skipped_student_ids.append(student.id)
-            else:
-                try:
-                    enrollment = do_enrollment(user=student, course=course, cohort=cohort)
-                    manual_enrollment.added_student_ids.append(student.id)
-                    logger.info(f"Badge enroll {enrollment}: enrolled user : {student} in course {course}")
-                except Exception as e:
-                    manual_enrollment.skipped_student_ids.append(student.id)
-                    errors.append(f"Error enrolling student {student} : {e}")
-
-        if errors:
-            manual_enrollment.errors = errors
+        result = bulk_enroll(course=course, cohort=cohort, identifiers=student_usernames)
+        manual_enrollment.added_student_ids = result.added_student_ids
+        manual_enrollment.moved_from_cohort_ids = result.moved_student_ids
+        manual_enrollment.skipped_student_ids = result.skipped_student_ids
+        if result.errors:
+            manual_enrollment.errors = result.errors
 
         manual_enrollment.save()
 
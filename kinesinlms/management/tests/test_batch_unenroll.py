@@ -12,6 +12,8 @@ from kinesinlms.course.models import CohortMembership, CohortType, Enrollment, C
 from kinesinlms.course.tests.factories import CourseFactory, CohortFactory
 from kinesinlms.email_automation.tests.factories import EmailAutomationProviderFactory
 from kinesinlms.email_automation.utils import get_email_automation_provider
+from kinesinlms.tracking.event_types import TrackingEventType
+from kinesinlms.tracking.routing import clear_notifier_routes
 from kinesinlms.users.tests.factories import UserFactory
 
 logger = logging.getLogger(__name__)
@@ -124,7 +126,7 @@ class TestBatchUnenroll(TestCase):
 
         logger.debug("Done.")
 
-    @patch('kinesinlms.tracking.tracker.EmailAutomationNotifier')
+    @patch('kinesinlms.tracking.routing.EmailAutomationNotifier')
     def test_batch_unenroll_notifies_email_automation_provider(self, mock_email_automation_notifier: MagicMock):
         """
         When students are batch unenrolled by an admin, we still want
@@ -141,6 +143,13 @@ class TestBatchUnenroll(TestCase):
         self.assertIsNotNone(email_automation_provider)
 
         mock_email_automation_notifier.handle_tracker_event.return_value = True
+        mock_email_automation_notifier.is_enabled.return_value = True
+        mock_email_automation_notifier.handled_event_types.return_value = [
+            TrackingEventType.ENROLLMENT_DEACTIVATED.value
+        ]
+        mock_email_automation_notifier.__name__ = "EmailAutomationNotifier"
+        clear_notifier_routes()
+        self.addCleanup(clear_notifier_routes)
 
         # Make sure both students enrolled
         enrollment_1 = Enrollment.objects.get(student=self.student_1, course=self.course)
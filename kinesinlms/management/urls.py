@@ -16,6 +16,7 @@ urlpatterns = [
         name="site_profile",
     ),
     path("site_features/", views.SiteFeaturesView.as_view(), name="site_features"),
+    path("task_metrics/", views.task_metrics, name="task_metrics"),
 
     # Manage various service integrations...
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -7,6 +7,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.sites.models import Site
+from django.http import HttpResponseForbidden
 from django.shortcuts import render, get_object_or_404, resolve_url, redirect
 from django.urls import reverse, reverse_lazy
 from django.views.generic import FormView, UpdateView
@@ -16,6 +17,12 @@ from waffle.models import Switch
 
 from kinesinlms.certificates.models import Certificate
 from kinesinlms.core.models import SiteProfile
+from kinesinlms.core.task_metrics import (
+    get_broker_queue_length,
+    get_task_metrics_config,
+    get_task_metrics_report,
+    reset_task_metrics,
+)
 from kinesinlms.course.models import Course, Enrollment
 from kinesinlms.course.utils import get_student_cohort
 from kinesinlms.forum.service.discourse_service import ForumAPIUnsuccessful
@@ -276,6 +283,57 @@ def index(request):
     return render(request, "management/index.html", context)
 
 
+TASK_METRICS_HOURS_CHOICES = [1, 6, 24, 48]
+
+TASK_METRICS_SORT_CHOICES = ["mean_wait_ms", "max_wait_ms", "queued", "mean_runtime_ms",
+                             "failure_rate", "published", "task_name"]
+
+
+@user_passes_test(lambda u: u.is_superuser or u.is_staff)
+def task_metrics(request):
+    """
+    Show which background (Celery) tasks are backing up: per task,
+    how long it waits in the queue, how long it runs, and how
+    often it's retried or fails. See kinesinlms.core.task_metrics.
+    """
+    if request.method == "POST":
+        if not request.user.is_superuser:
+            return HttpResponseForbidden()
+        reset_task_metrics()
+        messages.success(request, "Task metrics reset.")
+        return redirect("management:task_metrics")
+
+    try:
+        hours = int(request.GET.get("hours", 24))
+    except ValueError:
+        hours = 24
+    if hours not in TASK_METRICS_HOURS_CHOICES:
+        hours = 24
+    sort = request.GET.get("sort", "mean_wait_ms")
+    if sort not in TASK_METRICS_SORT_CHOICES:
+        sort = "mean_wait_ms"
+
+    report = get_task_metrics_report(hours=hours)
+    report.sort(key=lambda row: row[sort], reverse=sort != "task_name")
+
+    context = {
+        "section": "management",
+        "title": "Task metrics",
+        "description": "Queue wait time, runtime and failures of background tasks.",
+        "fluid_info_bar": True,
+        "breadcrumbs": [
+            {"label": "Management", "url": reverse("management:index")},
+        ],
+        "metrics_enabled": get_task_metrics_config()["ENABLED"],
+        "report": report,
+        "hours": hours,
+        "hours_choices": TASK_METRICS_HOURS_CHOICES,
+        "sort": sort,
+        "broker_queue_length": get_broker_queue_length(),
+    }
+    return render(request, "management/task_metrics.html", context)
+
+
 @user_passes_test(lambda u: u.is_superuser or u.is_staff)
 def student_certificate(request, user_id: int, certificate_id: int):
     """
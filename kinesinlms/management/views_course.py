@@ -11,6 +11,7 @@ from kinesinlms.badges.models import BadgeClass, BadgeAssertion
 from kinesinlms.course.models import Course, CourseUnit, Enrollment
 from kinesinlms.management.forms import DeleteCourseForm, \
     DuplicateCourseForm, UpdateCourseForm
+from kinesinlms.management.utils import duplicate_course as duplicate_course_util
 from kinesinlms.users.mixins import SuperuserRequiredMixin
 
 logger = logging.getLogger(__name__)
@@ -251,8 +252,19 @@ def duplicate_course(request, course_slug=None, course_run=None):
 
     if request.POST:
         form = DuplicateCourseForm(request.POST)
-        if not form.is_valid():
-            raise Exception("Invalid form")
+        if form.is_valid():
+            try:
+                new_course = duplicate_course_util(course,
+                                                   new_slug=form.cleaned_data['slug'],
+                                                   new_run=form.cleaned_data['run'],
+                                                   duplicate_blocks=form.cleaned_data['duplicate_blocks'],
+                                                   self_paced=form.cleaned_data['self_paced'])
+            except ValueError as e:
+                form.add_error(None, str(e))
+            else:
+                msg = f"Created course {new_course.token} as a copy of {course.token}."
+                messages.add_message(request, messages.INFO, msg)
+                return redirect(reverse('management:courses_list'))
     else:
         # Make sure to change key props, so we indicate this is a dup.
         initial = {"slug": f"{course.slug}_COPY"}
@@ -1,9 +1,10 @@
 import logging
 from datetime import timedelta, date
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
 from django.template import loader
 from django.template.loader import render_to_string
 from django.utils.timezone import now
@@ -15,6 +16,9 @@ from kinesinlms.survey.models import SurveyEmail, Survey
 
 logger = logging.getLogger(__name__)
 
+# Number of survey emails claimed and sent at a time by send_emails().
+SURVEY_EMAIL_CHUNK_SIZE = 100
+
 
 class SurveyEmailService:
     """
@@ -24,11 +28,19 @@ class SurveyEmailService:
     """
 
     @classmethod
-    def send_emails(cls) -> Tuple[List[SurveyEmail], List[SurveyEmail]]:
+    def send_emails(cls, chunk_size: int = SURVEY_EMAIL_CHUNK_SIZE) -> Tuple[List[SurveyEmail], List[SurveyEmail]]:
         """
         Read in all SurveyEmail objects that have a scheduled_date for today or earlier.
         Send each email and mark as processed, or as error if there's trouble reading or sending.
 
+        Emails are claimed in chunks with SELECT ... FOR UPDATE SKIP LOCKED, so this
+        can run on several workers at once without any email being sent twice. Each
+        chunk is sent over one email backend connection and its statuses are saved
+        with a single bulk_update.
+
+        Args:
+            chunk_size:     Number of emails to claim and send at a time.
+
         Returns:
             List of SurveyEmails sent
             List of SurveyEmails not sent
@@ -37,32 +49,62 @@ class SurveyEmailService:
         today_date = now()
         logger.info(f"Running 'survey_emails' management command for {today_date.isoformat()}.")
 
-        survey_emails = cls.get_survey_emails_to_send(less_than_date=today_date)
-
-        count = 0
-        errors = 0
         sent = []
         not_sent = []
 
-        if not survey_emails:
-            logger.info("SurveyEmailService: No emails to send today!")
+        try:
+            email_from = cls.get_from_email()
+        except Exception:
+            logger.exception("SurveyEmailService: Cannot send survey emails.")
             return sent, not_sent
 
-        logger.info(f"SurveyEmailService: Found {len(survey_emails)} survey emails to send.")
-        for survey_email in survey_emails:
-            try:
-                cls.send_survey_email(survey_email)
-                survey_email.status = SurveyEmailStatus.SENT.name
-                survey_email.save()
-                logger.info(f"SurveyEmailService: Send survey email to {survey_email.user.email}")
-                sent.append(survey_email)
-            except Exception:
-                logger.exception(f"SurveyEmailService: Couldn't send survey email id {survey_email.id}")
-                survey_email.status = SurveyEmailStatus.ERROR.name
-                survey_email.save()
-                not_sent.append(survey_email)
-
-        logger.info(f"SurveyEmailService: Finished sending emails. count={count} errors={errors}.")
+        while True:
+            with transaction.atomic():
+                survey_emails = cls.claim_survey_emails_to_send(less_than_date=today_date, limit=chunk_size)
+                if not survey_emails:
+                    break
+                logger.info(f"SurveyEmailService: Claimed {len(survey_emails)} survey emails to send.")
+                chunk_sent, chunk_not_sent = cls._send_chunk(survey_emails, email_from)
+                for survey_email in chunk_sent:
+                    survey_email.status = SurveyEmailStatus.SENT.name
+                for survey_email in chunk_not_sent:
+                    survey_email.status = SurveyEmailStatus.ERROR.name
+                updated_at = now()
+                for survey_email in survey_emails:
+                    survey_email.updated_at = updated_at
+                SurveyEmail.objects.bulk_update(survey_emails, ['status', 'updated_at'])
+            sent.extend(chunk_sent)
+            not_sent.extend(chunk_not_sent)
+
+        if not sent and not not_sent:
+            logger.info("SurveyEmailService: No emails to send today!")
+        logger.info(f"SurveyEmailService: Finished sending emails. count={len(sent)} errors={len(not_sent)}.")
+        return sent, not_sent
+
+    @classmethod
+    def _send_chunk(cls,
+                    survey_emails: List[SurveyEmail],
+                    email_from: str) -> Tuple[List[SurveyEmail], List[SurveyEmail]]:
+        """
+        Send a chunk of survey emails over a single email backend connection.
+        Messages are still sent one at a time, so one bad address doesn't
+        stop the rest of the chunk.
+        """
+        sent = []
+        not_sent = []
+        with get_connection() as connection:
+            for survey_email in survey_emails:
+                try:
+                    message = cls.build_survey_email_message(survey_email, email_from=email_from)
+                    if message is not None:
+                        num_sent = connection.send_messages([message])
+                        if not num_sent:
+                            raise Exception("Email backend was not able to send message (returned 0).")
+                    logger.info(f"SurveyEmailService: Send survey email to {survey_email.user.email}")
+                    sent.append(survey_email)
+                except Exception:
+                    logger.exception(f"SurveyEmailService: Couldn't send survey email id {survey_email.id}")
+                    not_sent.append(survey_email)
         return sent, not_sent
 
     @classmethod
@@ -71,6 +113,30 @@ class SurveyEmailService:
                                              status=SurveyEmailStatus.UNPROCESSED.name).all()
         return results
 
+    @classmethod
+    def claim_survey_emails_to_send(cls, less_than_date, limit: int) -> List[SurveyEmail]:
+        """
+        Lock up to 'limit' due survey emails that no other worker has locked.
+        Must be called inside a transaction; the emails stay claimed until it ends.
+        """
+        survey_emails = cls.get_survey_emails_to_send(less_than_date=less_than_date) \
+            .select_for_update(skip_locked=True, of=("self",)) \
+            .select_related('user', 'survey', 'survey__course') \
+            .order_by('id')[:limit]
+        return list(survey_emails)
+
+    @classmethod
+    def get_from_email(cls) -> str:
+        site_profile: SiteProfile = get_current_site_profile()
+
+        email_from = site_profile.support_email
+        if not email_from:
+            email_from = settings.CONTACT_EMAIL
+            if not email_from:
+                raise Exception("Cannot send survey email since no support email "
+                                "is defined in SiteSettings nor a CONTACT_EMAIL in settings.py")
+        return email_from
+
     @classmethod
     def send_survey_email(cls, survey_email: SurveyEmail):
         """
@@ -85,16 +151,36 @@ class SurveyEmailService:
         Raises:
             Exception if there's a problem sending the email.
         """
+        message = cls.build_survey_email_message(survey_email, email_from=cls.get_from_email())
+        if message is None:
+            return
 
-        site_profile: SiteProfile = get_current_site_profile()
+        result = message.send()
+        if result == 0:
+            error_message = "send_survey_email() send_mail was not able to send message (returned 0)."
+            logger.exception(error_message)
+            raise Exception(error_message)
 
-        email_from = site_profile.support_email
-        if not email_from:
-            email_from = settings.CONTACT_EMAIL
-            if not email_from:
-                raise Exception("Cannot send survey email since no support email "
-                                "is defined in SiteSettings nor a CONTACT_EMAIL in settings.py")
+        logger.debug(f"send_survey_email() Complete! Send_mail result: {result}")
+
+    @classmethod
+    def build_survey_email_message(cls,
+                                   survey_email: SurveyEmail,
+                                   email_from: str) -> Optional[EmailMultiAlternatives]:
+        """
+        Render the email message for a survey email.
+
+        Args:
+            survey_email:   SurveyEmail object to send.
+            email_from:     Address to send from.
+
+        Returns:
+            The message, or None if it shouldn't be sent (outside of production,
+            only test addresses get survey emails).
 
+        Raises:
+            Exception if there's a problem creating the email.
+        """
         email_to = survey_email.user.email
         if not email_to:
             raise Exception("missing email to address")
@@ -159,21 +245,11 @@ class SurveyEmailService:
             if email_to.split("@")[1] not in ['kinesinlms.org', 'example.com']:
                 error_msg = f"Can't send email to {email_to}...we're not in production!"
                 logger.exception(error_msg)
-                return
-
-        result = send_mail(
-            email_subject,
-            msg_plain,
-            email_from,
-            [email_to],
-            html_message=msg_html,
-        )
-        if result == 0:
-            error_message = "send_survey_email() send_mail was not able to send message (returned 0)."
-            logger.exception(error_message)
-            raise Exception(error_message)
+                return None
 
-        logger.debug(f"send_survey_email() Complete! Send_mail result: {result}")
+        message = EmailMultiAlternatives(email_subject, msg_plain, email_from, [email_to])
+        message.attach_alternative(msg_html, "text/html")
+        return message
 
     @classmethod
     def get_subject(cls, survey_email: SurveyEmail) -> str:
@@ -227,6 +303,37 @@ class SurveyEmailService:
                                      f"for survey {course_survey} "
                                      f"and user {user}")
 
+    @classmethod
+    def schedule_survey_emails_for_start_of_course_bulk(cls, user_ids: List[int], course_surveys: List[Survey]) -> int:
+        """
+        Like schedule_survey_emails_for_start_of_course(), but for many users at once.
+        Used when students are enrolled in bulk.
+
+        Args:
+            user_ids:           IDs of users to schedule reminder emails for.
+            course_surveys:     Surveys that might need reminder emails.
+
+        Returns:
+            Number of SurveyEmails created.
+        """
+        relevant_survey_types = [SurveyType.PRE_COURSE.name]
+        survey_emails = []
+        for course_survey in course_surveys:
+            if course_survey.type not in relevant_survey_types or not course_survey.send_reminder_email:
+                continue
+            already_scheduled = set(SurveyEmail.objects.filter(
+                survey=course_survey,
+                user_id__in=user_ids,
+            ).values_list('user_id', flat=True))
+            date_to_send = date.today() + timedelta(days=course_survey.days_delay)
+            survey_emails.extend(
+                SurveyEmail(survey=course_survey, user_id=user_id, scheduled_date=date_to_send)
+                for user_id in user_ids
+                if user_id not in already_scheduled
+            )
+        SurveyEmail.objects.bulk_create(survey_emails, batch_size=1000)
+        return len(survey_emails)
+
     @classmethod
     def schedule_survey_email(cls, course_survey: Survey, user) -> bool:
         """
@@ -1,9 +1,9 @@
 import logging
 from datetime import timedelta
-from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.sites.models import Site
+from django.core import mail
 from django.test import TestCase
 from django.utils.timezone import now
 
@@ -43,28 +43,50 @@ class TestSurveyEmailService(TestCase):
         SurveyEmailFactory(user=self.enrolled_user,
                            survey=self.post_course_survey,
                            scheduled_date=now())
-        with patch('kinesinlms.survey.service.send_mail', return_value=1):
-            sent_emails, not_sent_emails = SurveyEmailService.send_emails()
-            self.assertEqual(len(sent_emails), 1)
-            sent_email: SurveyEmail = sent_emails[0]
-            self.assertEqual(sent_email.status, SurveyEmailStatus.SENT.name)
+        sent_emails, not_sent_emails = SurveyEmailService.send_emails()
+        self.assertEqual(len(sent_emails), 1)
+        sent_email: SurveyEmail = sent_emails[0]
+        self.assertEqual(sent_email.status, SurveyEmailStatus.SENT.name)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["enrolled_user@example.com"])
 
     def test_email_due_yesterday_is_sent(self):
         yesteday = now() + timedelta(days=-1)
         SurveyEmailFactory(user=self.enrolled_user,
                            survey=self.post_course_survey,
                            scheduled_date=yesteday)
-        with patch('kinesinlms.survey.service.send_mail', return_value=1):
-            sent_emails, not_sent_emails = SurveyEmailService.send_emails()
-            self.assertEqual(len(sent_emails), 1)
-            sent_email: SurveyEmail = sent_emails[0]
-            self.assertEqual(sent_email.status, SurveyEmailStatus.SENT.name)
+        sent_emails, not_sent_emails = SurveyEmailService.send_emails()
+        self.assertEqual(len(sent_emails), 1)
+        sent_email: SurveyEmail = sent_emails[0]
+        self.assertEqual(sent_email.status, SurveyEmailStatus.SENT.name)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["enrolled_user@example.com"])
 
     def test_email_due_tomorrow_is_not_sent(self):
         tomorrow = now() + timedelta(days=1)
         SurveyEmailFactory(user=self.enrolled_user,
                            survey=self.post_course_survey,
                            scheduled_date=tomorrow)
-        with patch('kinesinlms.survey.service.send_mail', return_value=1):
-            sent_emails, not_sent_emails = SurveyEmailService.send_emails()
-            self.assertEqual(len(sent_emails), 0)
+        sent_emails, not_sent_emails = SurveyEmailService.send_emails()
+        self.assertEqual(len(sent_emails), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_emails_sent_in_chunks_with_statuses_saved(self):
+        users = [UserFactory(username=f"student-{index}", email=f"student_{index}@example.com")
+                 for index in range(5)]
+        for user in users:
+            SurveyEmailFactory(user=user,
+                               survey=self.post_course_survey,
+                               scheduled_date=now())
+
+        sent_emails, not_sent_emails = SurveyEmailService.send_emails(chunk_size=2)
+
+        self.assertEqual(len(sent_emails), 5)
+        self.assertEqual(len(not_sent_emails), 0)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(SurveyEmail.objects.filter(status=SurveyEmailStatus.SENT.name).count(), 5)
+
+        # Already sent emails aren't claimed again.
+        sent_emails, not_sent_emails = SurveyEmailService.send_emails()
+        self.assertEqual(len(sent_emails), 0)
+        self.assertEqual(len(mail.outbox), 5)
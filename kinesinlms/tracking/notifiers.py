@@ -5,7 +5,7 @@ apps (e.g. email_automation).
 """
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Iterable, Optional
 
 from django.conf import settings
 
@@ -34,9 +34,29 @@ class TrackerEventHandler(ABC):
         """
         pass
 
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """
+        Whether this notifier is configured to send events at all.
+        """
+        return True
+
+    @classmethod
+    def handled_event_types(cls) -> Optional[Iterable[str]]:
+        """
+        The event types (values) this notifier might handle,
+        or None if it wants every event. Used to build the
+        routing table in routing.py.
+        """
+        return None
+
 
 class AWSNotifier(TrackerEventHandler):
 
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(settings.AWS_KINESINLMS_EVENTS_LAMBDA)
+
     @classmethod
     def handle_tracker_event(cls, event_dict: Dict, user_id: int, coures_id=None, **kwargs) -> bool:
         """
@@ -87,6 +107,14 @@ class SlackNotifier(TrackerEventHandler):
         TrackingEventType.SURVEY_COMPLETED.value
     ]
 
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(settings.SLACK_TOKEN)
+
+    @classmethod
+    def handled_event_types(cls) -> Optional[Iterable[str]]:
+        return cls.HANDLE_EVENTS
+
     @classmethod
     def handle_tracker_event(cls,
                              event_dict: Dict,
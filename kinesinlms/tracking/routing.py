@@ -0,0 +1,87 @@
+"""
+Routing table from tracking event types to the notifiers interested in them.
+
+Most tracking events (page views, video activity...) don't interest any
+notifier, so Tracker.notify() looks up the event type here first and skips
+serializing and dispatching events nobody wants.
+
+The table is built once per process, the first time an event is tracked,
+from each notifier's is_enabled() and handled_event_types(). It's rebuilt:
+    - when the email automation provider is saved or deleted, or settings
+      are changed in tests (see signals.py)
+    - after NOTIFIER_ROUTES_MAX_AGE_SECONDS, so that a provider change made in
+      another process is picked up here too.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Type
+
+from kinesinlms.email_automation.notifiers import EmailAutomationNotifier
+from kinesinlms.tracking.event_types import ALL_VALID_EVENTS
+from kinesinlms.tracking.notifiers import AWSNotifier, SlackNotifier, TrackerEventHandler
+
+logger = logging.getLogger(__name__)
+
+NOTIFIER_ROUTES_MAX_AGE_SECONDS = 60
+
+_lock = threading.Lock()
+_routes: Optional[Dict[str, Tuple[Type[TrackerEventHandler], ...]]] = None
+_routes_built_at: float = 0
+
+
+def get_notifier_classes() -> List[Type[TrackerEventHandler]]:
+    """
+    Every notifier that might want to hear about tracking events, in the order they're notified.
+    """
+    return [
+        EmailAutomationNotifier,
+        AWSNotifier,
+        SlackNotifier,
+    ]
+
+
+def build_notifier_routes() -> Dict[str, Tuple[Type[TrackerEventHandler], ...]]:
+    """
+    Returns:
+        Dictionary of event type (value) to the enabled notifiers that handle it.
+        Event types no notifier handles are left out.
+    """
+    routes: Dict[str, List[Type[TrackerEventHandler]]] = {}
+    for notifier in get_notifier_classes():
+        try:
+            if not notifier.is_enabled():
+                continue
+            event_types = notifier.handled_event_types()
+        except Exception:
+            logger.exception(f"Could not build tracking routes for {notifier.__name__}. Skipping it.")
+            continue
+        if event_types is None:
+            event_types = ALL_VALID_EVENTS
+        for event_type in event_types:
+            routes.setdefault(event_type, []).append(notifier)
+    return {event_type: tuple(notifiers) for event_type, notifiers in routes.items()}
+
+
+def get_notifiers_for_event(event_type: str) -> Tuple[Type[TrackerEventHandler], ...]:
+    """
+    Returns:
+        The enabled notifiers that handle this event type (possibly none).
+    """
+    global _routes, _routes_built_at
+    routes = _routes
+    if routes is None or time.monotonic() - _routes_built_at > NOTIFIER_ROUTES_MAX_AGE_SECONDS:
+        with _lock:
+            routes = build_notifier_routes()
+            _routes = routes
+            _routes_built_at = time.monotonic()
+    return routes.get(event_type, ())
+
+
+def clear_notifier_routes():
+    """
+    Force the routing table to be rebuilt the next time an event is tracked.
+    """
+    global _routes
+    _routes = None
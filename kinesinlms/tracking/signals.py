@@ -7,9 +7,14 @@ import allauth
 from allauth.account.signals import email_confirmed
 from allauth.account.signals import user_logged_in
 from allauth.account.signals import user_signed_up
+from django.contrib.sites.models import Site
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from kinesinlms.email_automation.models import EmailAutomationProvider
 from kinesinlms.tracking.event_types import TrackingEventType
+from kinesinlms.tracking.routing import clear_notifier_routes
 from kinesinlms.tracking.tracker import Tracker
 
 logger = logging.getLogger(__name__)
@@ -74,3 +79,23 @@ def user_logged_in(request, user, **kwargs):
                   user=user,
                   event_data={},
                   course=None)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=EmailAutomationProvider)
+@receiver(post_delete, sender=EmailAutomationProvider)
+def email_automation_provider_changed(sender, **kwargs):
+    """
+    Rebuild the tracking notifier routes, as the email automation
+    provider may have been enabled or disabled.
+    """
+    # The current Site is cached along with its (related) provider.
+    Site.objects.clear_cache()
+    clear_notifier_routes()
+
+
+# noinspection PyUnusedLocal
+@receiver(setting_changed)
+def tracking_setting_changed(setting, **kwargs):
+    if setting in ["AWS_KINESINLMS_EVENTS_LAMBDA", "SLACK_TOKEN", "EMAIL_AUTOMATION_PROVIDER_API_KEY"]:
+        clear_notifier_routes()
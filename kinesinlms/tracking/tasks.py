@@ -9,6 +9,7 @@ from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
 from config import celery_app
+from kinesinlms.core.http import AWS_LAMBDA, integration_call
 from kinesinlms.core.utils import get_aws_lambda_client
 
 logger = logging.getLogger(__name__)
@@ -50,12 +51,13 @@ def send_tracking_event_to_aws(event_dict: Dict) -> Optional[str]:
     payload = json.dumps(event_dict, cls=DjangoJSONEncoder)
 
     try:
-        response = aws_client.invoke(
-            FunctionName=KINESINLMS_EVENTS_LAMBDA,
-            InvocationType='Event',
-            LogType='Tail',
-            Payload=payload,
-        )
+        with integration_call(AWS_LAMBDA, aws_client.meta.endpoint_url):
+            response = aws_client.invoke(
+                FunctionName=KINESINLMS_EVENTS_LAMBDA,
+                InvocationType='Event',
+                LogType='Tail',
+                Payload=payload,
+            )
     except Exception:
         logger.exception("Error sending tracking event to AWS Lambda.")
         return None
@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+from django.contrib.sites.models import Site
+from django.test import TestCase, override_settings
+
+from kinesinlms.email_automation.notifiers import EmailAutomationNotifier
+from kinesinlms.email_automation.tests.factories import EmailAutomationProviderFactory
+from kinesinlms.tracking.event_types import TrackingEventType
+from kinesinlms.tracking.notifiers import SlackNotifier
+from kinesinlms.tracking.routing import clear_notifier_routes, get_notifiers_for_event
+from kinesinlms.tracking.serializers import TrackingEventSerializer
+from kinesinlms.tracking.tracker import Tracker
+from kinesinlms.users.tests.factories import UserFactory
+
+
+@override_settings(AWS_KINESINLMS_EVENTS_LAMBDA=None, SLACK_TOKEN=None, EMAIL_AUTOMATION_PROVIDER_API_KEY=None)
+class TestNotifierRouting(TestCase):
+
+    def setUp(self):
+        clear_notifier_routes()
+        self.addCleanup(clear_notifier_routes)
+        self.user = UserFactory(username="tracked", email="tracked@example.com")
+
+    def test_unrouted_event_not_serialized_for_notifiers(self):
+        with patch("kinesinlms.tracking.tracker.TrackingEventSerializer",
+                   wraps=TrackingEventSerializer) as serializer_class:
+            tracked = Tracker.track(event_type=TrackingEventType.COURSE_VIDEO_PLAY.value, user=self.user)
+
+        self.assertTrue(tracked)
+        self.assertEqual(get_notifiers_for_event(TrackingEventType.COURSE_VIDEO_PLAY.value), ())
+        # Only used to save the event, not to serialize it for notifiers.
+        self.assertEqual(serializer_class.call_count, 1)
+
+    def test_routes_follow_notifier_settings(self):
+        with override_settings(SLACK_TOKEN="slack-token"):
+            self.assertEqual(get_notifiers_for_event(TrackingEventType.USER_LOGIN.value), (SlackNotifier,))
+            self.assertEqual(get_notifiers_for_event(TrackingEventType.COURSE_VIDEO_PLAY.value), ())
+        self.assertEqual(get_notifiers_for_event(TrackingEventType.USER_LOGIN.value), ())
+
+    @override_settings(EMAIL_AUTOMATION_PROVIDER_API_KEY="test-key")
+    def test_routes_rebuilt_when_provider_added(self):
+        event_type = TrackingEventType.ENROLLMENT_ACTIVATED.value
+        self.assertEqual(get_notifiers_for_event(event_type), ())
+
+        EmailAutomationProviderFactory.create(site=Site.objects.get_current(),
+                                              api_url="https://example.api-us1.com")
+
+        self.assertEqual(get_notifiers_for_event(event_type), (EmailAutomationNotifier,))
+        self.assertEqual(get_notifiers_for_event(TrackingEventType.COURSE_VIDEO_PLAY.value), ())
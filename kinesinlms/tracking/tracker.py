@@ -1,16 +1,12 @@
 import logging
 from typing import Optional
 
-from django.conf import settings
-
 from kinesinlms.course.exceptions import CourseFinishedException
 from kinesinlms.course.models import Course
-from kinesinlms.email_automation.notifiers import EmailAutomationNotifier
-from kinesinlms.email_automation.utils import get_email_automation_provider
 from kinesinlms.tracking.event_types import ALL_VALID_EVENTS, POST_COURSE_TRACKED_EVENTS, ANON_USER_VALID_EVENTS
 from kinesinlms.tracking.models import TrackingEvent
-from kinesinlms.tracking.notifiers import AWSNotifier
 from kinesinlms.tracking.notifiers import SlackNotifier
+from kinesinlms.tracking.routing import get_notifiers_for_event
 from kinesinlms.tracking.serializers import TrackingEventSerializer
 
 tracking_logger = logging.getLogger("Tracker")
@@ -119,9 +115,6 @@ class Tracker(object):
             ( nothing )
         """
 
-        serializer = TrackingEventSerializer(event)
-        event_dict = serializer.data
-
         if course:
             course_id = course.id
             # If a course has finished, the only thing we track are things like interactions with videos.
@@ -132,30 +125,24 @@ class Tracker(object):
         else:
             course_id = None
 
-        email_automation_provider = get_email_automation_provider()
-        if email_automation_provider and email_automation_provider.enabled:
-            try:
-                EmailAutomationNotifier.handle_tracker_event(event_dict=event_dict,
-                                                             user_id=user.id,
-                                                             course_id=course_id)
-            except Exception as e:
-                debug_logger.exception(f"Could not send tracking event to"
-                                       f" ActiveCampaignNotifier: {event_dict}: {e}")
-
-        if settings.AWS_KINESINLMS_EVENTS_LAMBDA:
-            try:
-                AWSNotifier.handle_tracker_event(event_dict=event_dict,
-                                                 user_id=user.id,
-                                                 course_id=course_id)
-            except Exception:
-                debug_logger.exception(f"Could not send tracking event to AWS Lambda: {event_dict}")
+        # Most events don't interest any notifier, in which case there's nothing more to do.
+        notifiers = get_notifiers_for_event(event.event_type)
+        if not notifiers:
+            return
 
-        if settings.SLACK_TOKEN:
+        serializer = TrackingEventSerializer(event)
+        event_dict = serializer.data
+
+        for notifier in notifiers:
             try:
-                event_message = event.get_nice_message()
-                SlackNotifier.handle_tracker_event(event_dict=event_dict,
-                                                   user_id=user.id,
-                                                   slack_message=event_message,
-                                                   course_id=course_id)
+                if notifier is SlackNotifier:
+                    SlackNotifier.handle_tracker_event(event_dict=event_dict,
+                                                       user_id=user.id,
+                                                       slack_message=event.get_nice_message(),
+                                                       course_id=course_id)
+                else:
+                    notifier.handle_tracker_event(event_dict=event_dict,
+                                                  user_id=user.id,
+                                                  course_id=course_id)
             except Exception:
-                debug_logger.exception(f"Could not send tracking event to SlackNotifier: {event_dict}")
+                debug_logger.exception(f"Could not send tracking event to {notifier.__name__}: {event_dict}")